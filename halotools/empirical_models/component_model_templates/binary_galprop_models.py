@@ -7,7 +7,6 @@ from __future__ import division, print_function, absolute_import
 import numpy as np
 from astropy.extern import six
 from abc import ABCMeta
-from astropy.utils.misc import NumpyRNGContext
 
 from .. import model_defaults
 from .. import model_helpers
@@ -98,8 +97,8 @@ class BinaryGalpropModel(object):
 
         mean_func = getattr(self, 'mean_'+self.galprop_name+'_fraction')
         mean_galprop_fraction = mean_func(**kwargs)
-        with NumpyRNGContext(seed):
-            mc_generator = np.random.random(custom_len(mean_galprop_fraction))
+        rng = model_helpers.random_number_generator(seed)
+        mc_generator = rng.random(custom_len(mean_galprop_fraction))
         result = np.where(mc_generator < mean_galprop_fraction, True, False)
         if 'table' in kwargs:
             kwargs['table'][self.galprop_name][:] = result
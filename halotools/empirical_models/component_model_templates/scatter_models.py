@@ -5,7 +5,6 @@ used to model stochasticity in the mapping between stellar mass and halo propert
 from __future__ import division, print_function, absolute_import, unicode_literals
 
 import numpy as np
-from astropy.utils.misc import NumpyRNGContext
 
 from .. import model_defaults
 from .. import model_helpers as model_helpers
@@ -139,8 +138,8 @@ class LogNormalScatterModel(object):
 
         # only draw from a normal distribution for non-zero values of scatter
         mask = (scatter_scale > 0.0)
-        with NumpyRNGContext(seed):
-            result[mask] = np.random.normal(loc=0, scale=scatter_scale[mask])
+        rng = model_helpers.random_number_generator(seed)
+        result[mask] = rng.normal(loc=0, scale=scatter_scale[mask])
 
         return result
 
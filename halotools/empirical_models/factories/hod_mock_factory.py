@@ -9,13 +9,17 @@ and Halotools models.
 """
 
 import numpy as np
-from copy import copy
+from copy import copy, deepcopy
+from collections import OrderedDict
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 from astropy.table import Table
 from astropy.utils.misc import NumpyRNGContext
 
 from .mock_factory_template import MockFactory
 
-from .. import model_helpers
+from .. import model_helpers, model_defaults
+from ..assembias_models import HeavisideAssembias
 
 from ...sim_manager import sim_defaults
 from ...utils.table_utils import SampleSelector
@@ -28,6 +32,20 @@ __author__ = ['Andrew Hearin']
 unavailable_haloprop_msg = ("Your model requires that the ``%s`` key appear in the halo catalog,\n"
     "but this column is not available in the catalog you attempted to populate.\n")
 
+def _equal_param_values(param_values1, param_values2):
+    """ Determine whether two dictionaries of parameter values are identical.
+    """
+    if (param_values1 is None) or (param_values2 is None):
+        return False
+    if set(param_values1) != set(param_values2):
+        return False
+    return all(np.array_equal(param_values1[key], param_values2[key]) for key in param_values1)
+
+
+# Columns added to the halo_table of a CachedHaloCatalog that, for host halos,
+# are equal to another column of the catalog
+_host_halo_derived_columns = {'halo_hostid': 'halo_id', 'halo_mvir_host_halo': 'halo_mvir'}
+
 missing_halo_upid_msg = ("All HOD-style models populate host halos with mock galaxies.\n"
     "The way Halotools distinguishes host halos from subhalos is via the ``halo_upid`` column,\n"
     "with halo_upid = -1 for host halos and !=-1 for subhalos.\n"
@@ -52,7 +70,8 @@ class HodMockFactory(MockFactory):
     """
 
     def __init__(self, Num_ptcl_requirement=sim_defaults.Num_ptcl_requirement,
-            halo_mass_column_key='halo_mvir', **kwargs):
+            halo_mass_column_key='halo_mvir',
+            halo_shard_size=model_defaults.default_halo_shard_size, **kwargs):
         """
         Parameters
         ----------
@@ -82,6 +101,15 @@ class HodMockFactory(MockFactory):
             will be thrown out immediately after reading the original halo catalog in memory.
             Default is 'halo_mvir'
 
+        halo_shard_size : int, optional
+            Number of host halos in each of the contiguous shards of the halo table.
+            The occupation statistics and the properties of the galaxies in each shard
+            are drawn from their own random number streams, so that the shards can be
+            populated in parallel, see the ``num_threads`` argument of `populate`.
+            The Monte Carlo realization for a given seed depends on ``halo_shard_size``,
+            but not on the number of threads.
+            Default is set in `~halotools.empirical_models.model_defaults`.
+
         """
 
         MockFactory.__init__(self, **kwargs)
@@ -89,6 +117,8 @@ class HodMockFactory(MockFactory):
         halocat = kwargs['halocat']
         self.Num_ptcl_requirement = Num_ptcl_requirement
         self.halo_mass_column_key = halo_mass_column_key
+        self.halo_shard_size = int(halo_shard_size)
+        self._num_threads = 1
 
         self.preprocess_halo_catalog(halocat)
 
@@ -114,21 +144,18 @@ class HodMockFactory(MockFactory):
             Default is set in `~halotools.empirical_models.model_defaults`.
 
         """
-        try:
-            assert 'halo_upid' in list(halocat.halo_table.keys())
-        except AssertionError:
-            raise HalotoolsError(missing_halo_upid_msg)
-
-        # Make cuts on halo catalog #
-        # Select host halos only, since this is an HOD-style model
-        halo_table, subhalo_table = SampleSelector.host_halo_selection(
-            table=halocat.halo_table, return_subhalos=True)
-
-        # make a (possibly trivial) completeness cut
         cutoff_mvir = self.Num_ptcl_requirement*self.particle_mass
-        mass_cut = halo_table[self.halo_mass_column_key] > cutoff_mvir
-        max_column_value = np.max(halo_table[self.halo_mass_column_key])
-        halo_table = halo_table[mass_cut]
+
+        stream_host_halos = self._can_stream_host_halos(halocat)
+        if stream_host_halos:
+            # Only read the required columns of the host halos passing the
+            # completeness cut, streaming over the catalog on disk in chunks
+            halo_table, max_column_value = self._stream_host_halos(
+                halocat.lazy_halo_table, cutoff_mvir)
+            subhalo_table = None
+        else:
+            halo_table, subhalo_table, max_column_value = self._select_host_halos(
+                halocat.halo_table, cutoff_mvir)
         if len(halo_table) == 0:
             msg = ("During the pre-processing phase of HOD mock-making \n"
                 "controlled by the `preprocess_halo_catalog` method of the HodMockFactory,\n"
@@ -159,12 +186,17 @@ class HodMockFactory(MockFactory):
 
         # Create new columns of the halo catalog, if applicable
         try:
-            d = self.model.new_haloprop_func_dict
-            for new_haloprop_key, new_haloprop_func in d.items():
-                halo_table[new_haloprop_key] = new_haloprop_func(table=halo_table)
-                self.additional_haloprops.append(new_haloprop_key)
-        except AttributeError:
-            pass
+            new_haloprops = self._new_haloprops(halo_table)
+        except KeyError:
+            if not stream_host_halos:
+                raise
+            # A function creating new halo properties requires a column
+            # that was not read from disk, so use the full halo_table instead
+            halo_table = self._select_host_halos(halocat.halo_table, cutoff_mvir)[0]
+            new_haloprops = self._new_haloprops(halo_table)
+        for new_haloprop_key, new_haloprop in new_haloprops.items():
+            halo_table[new_haloprop_key] = new_haloprop
+            self.additional_haloprops.append(new_haloprop_key)
 
         self._orig_halo_table = Table()
         for key in self.additional_haloprops:
@@ -175,6 +207,95 @@ class HodMockFactory(MockFactory):
 
         self.model.build_lookup_tables()
 
+    def _select_host_halos(self, halo_table, cutoff_mvir):
+        """ Select the host halos of ``halo_table`` passing the completeness cut.
+
+        Returns the table of host halos passing the cut, the table of subhalos,
+        and the largest value of the ``halo_mass_column_key`` column of the
+        un-cut host halos.
+        """
+        try:
+            assert 'halo_upid' in list(halo_table.keys())
+        except AssertionError:
+            raise HalotoolsError(missing_halo_upid_msg)
+
+        # Make cuts on halo catalog #
+        # Select host halos only, since this is an HOD-style model
+        halo_table, subhalo_table = SampleSelector.host_halo_selection(
+            table=halo_table, return_subhalos=True)
+
+        # make a (possibly trivial) completeness cut
+        mass_cut = halo_table[self.halo_mass_column_key] > cutoff_mvir
+        max_column_value = np.max(halo_table[self.halo_mass_column_key])
+        return halo_table[mass_cut], subhalo_table, max_column_value
+
+    def _new_haloprops(self, halo_table):
+        """ Dictionary storing the values of each new halo property
+        of the ``new_haloprop_func_dict`` of the model, evaluated on ``halo_table``.
+        """
+        try:
+            d = self.model.new_haloprop_func_dict
+        except AttributeError:
+            return {}
+        return {key: func(table=halo_table) for key, func in d.items()}
+
+    def _can_stream_host_halos(self, halocat):
+        """ Determine whether the host halos can be read directly from the catalog on disk.
+
+        This requires that ``halocat`` provides a ``lazy_halo_table``
+        (e.g., `~halotools.sim_manager.CachedHaloCatalog`) whose ``halo_table``
+        has not already been loaded into memory, that no component model needs
+        the subhalos, and that every column inherited by the mock is either
+        stored on disk or can be derived for host halos.
+        """
+        if not hasattr(type(halocat), 'lazy_halo_table'):
+            return False
+        if '_halo_table' in halocat.__dict__:
+            return False
+        for component_model in self.model.model_dictionary.values():
+            if hasattr(component_model, 'preprocess_subhalo_table'):
+                return False
+
+        available_keys = halocat.lazy_halo_table.keys()
+        required_keys = ['halo_upid', self.halo_mass_column_key]
+        for key in required_keys + list(self.additional_haloprops):
+            if key in available_keys:
+                continue
+            if _host_halo_derived_columns.get(key) not in available_keys:
+                return False
+        return True
+
+    def _stream_host_halos(self, lazy_halo_table, cutoff_mvir):
+        """ Read the columns inherited by the mock for the host halos
+        passing the completeness cut, streaming over the catalog in chunks.
+
+        Returns the table of host halos together with the largest value of the
+        ``halo_mass_column_key`` column of the un-cut host halos.
+        """
+        max_column_value = [-np.inf]
+
+        def host_halo_mask(chunk):
+            mass = chunk[self.halo_mass_column_key]
+            is_host = chunk['halo_upid'] == -1
+            if np.any(is_host):
+                max_column_value[0] = max(max_column_value[0], np.max(mass[is_host]))
+            return is_host & (mass > cutoff_mvir)
+
+        keys_on_disk = lazy_halo_table.keys()
+        columns = [key for key in self.additional_haloprops if key in keys_on_disk]
+        derived_keys = [key for key in self.additional_haloprops if key not in keys_on_disk]
+        for key in derived_keys:
+            parent_key = _host_halo_derived_columns[key]
+            if parent_key not in columns:
+                columns.append(parent_key)
+        halo_table = lazy_halo_table.read(columns, row_mask_func=host_halo_mask)
+
+        # The host of a host halo is itself
+        for key in derived_keys:
+            halo_table[key] = halo_table[_host_halo_derived_columns[key]].copy()
+
+        return halo_table, max_column_value[0]
+
     def populate(self, seed=None, **kwargs):
         """
         Method populating host halos with mock galaxies.
@@ -208,8 +329,45 @@ class HodMockFactory(MockFactory):
 
         seed : int, optional
             Random number seed used in the Monte Carlo realization.
+            Each method of the calling sequence draws its random numbers
+            from its own stream derived from ``seed``, and the component models
+            of Halotools never modify the global state of `numpy.random`.
             Default is None, which will produce stochastic results.
 
+        incremental : bool, optional
+            If set to True, the mock keeps track of the ``param_dict`` values
+            used by each method of the calling sequence, and the next call to
+            `populate` with ``incremental`` set to True and the same ``seed``
+            only reruns the stages whose parameters changed: if the
+            occupation statistics are unchanged, the galaxy_table is reused,
+            and for each gal_type only the methods beginning with the first method
+            whose parameters changed are called again, e.g., only the satellite
+            phase space when a satellite profile parameter changes.
+            The result is identical to repopulating the entire mock with the same seed,
+            provided that the ``galaxy_table`` of the previous call has not been modified.
+            Each component model must declare the galaxy properties it assigns in its
+            ``_galprop_dtypes_to_allocate``. Every stage is rerun when ``seed`` is None,
+            or when a ``masking_function`` is used.
+            Default is False.
+
+        reuse_buffers : bool, optional
+            If True, the columns of the ``galaxy_table`` are stored in buffers
+            that are reused by subsequent calls to `populate` with ``reuse_buffers=True``,
+            so that repopulating a mock does not allocate new memory unless
+            the number of galaxies exceeds the capacity of the buffers.
+            In this case, the ``galaxy_table`` of a previous call is overwritten,
+            and so it must be copied if it is to be kept.
+            Default is False, in which case new memory is allocated by each call.
+
+        num_threads : int, optional
+            Number of threads used to populate the shards of the halo table
+            defined by the ``halo_shard_size`` of the mock.
+            The mock is identical for any number of threads.
+            Methods of assembly-biased component models, and methods requiring
+            additional data such as the ``subhalo_table``, depend on the entire table
+            and are called once rather than on each shard.
+            If set to string 'max', use all available cores. Default is 1.
+
         Notes
         -----
         Note the difference between the
@@ -298,80 +456,318 @@ class HodMockFactory(MockFactory):
         except KeyError:
             self.enforce_PBC = True
 
+        try:
+            incremental = kwargs['incremental']
+        except KeyError:
+            incremental = False
+
         try:
             masking_function = kwargs['masking_function']
             mask = masking_function(self._orig_halo_table)
             self.halo_table = self._orig_halo_table[mask]
+            is_masked = True
         except:
             self.halo_table = self._orig_halo_table
+            is_masked = False
 
-        self.allocate_memory(seed=seed)
+        if incremental is True:
+            first_methods_to_rerun = self._incremental_population_plan(seed, is_masked)
+        else:
+            first_methods_to_rerun = None
+            self._population_cache = None
 
-        # Loop over all gal_types in the model
-        for gal_type in self.gal_types:
+        try:
+            reuse_buffers = kwargs['reuse_buffers']
+        except KeyError:
+            reuse_buffers = False
 
-            # Retrieve the indices of our pre-allocated arrays
-            # that store the info pertaining to gal_type galaxies
-            gal_type_slice = self._gal_type_indices[gal_type]
-            # gal_type_slice is a slice object
+        try:
+            self._num_threads = kwargs['num_threads']
+        except KeyError:
+            self._num_threads = 1
+        if self._num_threads == 'max':
+            self._num_threads = cpu_count()
 
-            # For the gal_type_slice indices of
-            # the pre-allocated array self.gal_type,
-            # set each string-type entry equal to the gal_type string
-            self.galaxy_table['gal_type'][gal_type_slice] = (
-                np.repeat(gal_type, self._total_abundance[gal_type], axis=0))
-
-            # Store all other relevant host halo properties into their
-            # appropriate pre-allocated array
-            for halocatkey in self.additional_haloprops:
-                self.galaxy_table[halocatkey][gal_type_slice] = np.repeat(
-                    self.halo_table[halocatkey], self._occupation[gal_type], axis=0)
-
-        self.galaxy_table['x'] = self.galaxy_table['halo_x']
-        self.galaxy_table['y'] = self.galaxy_table['halo_y']
-        self.galaxy_table['z'] = self.galaxy_table['halo_z']
-        self.galaxy_table['vx'] = self.galaxy_table['halo_vx']
-        self.galaxy_table['vy'] = self.galaxy_table['halo_vy']
-        self.galaxy_table['vz'] = self.galaxy_table['halo_vz']
-
-        for method in self._remaining_methods_to_call:
-            func = getattr(self.model, method)
-            try:
-                d = {key: getattr(self, key) for key in func.additional_kwargs}
-            except AttributeError:
-                d = {}
-            gal_type_slice = self._gal_type_indices[func.gal_type]
-            if seed is not None:
-                seed += 1
-            func(table=self.galaxy_table[gal_type_slice], seed=seed, **d)
+        if first_methods_to_rerun is None:
+            self._populate_all_stages(seed, record_pre_images=incremental,
+                reuse_buffers=reuse_buffers)
+        else:
+            self._repopulate_changed_stages(seed, first_methods_to_rerun)
 
         if self.enforce_PBC is True:
-            self.galaxy_table['x'], self.galaxy_table['vx'] = (
+            self.galaxy_table['x'][:], self.galaxy_table['vx'][:] = (
                 model_helpers.enforce_periodicity_of_box(
                     self.galaxy_table['x'], self.Lbox[0],
                     velocity=self.galaxy_table['vx'],
                     check_multiple_box_lengths=self._testing_mode)
                 )
 
-            self.galaxy_table['y'], self.galaxy_table['vy'] = (
+            self.galaxy_table['y'][:], self.galaxy_table['vy'][:] = (
                 model_helpers.enforce_periodicity_of_box(
                     self.galaxy_table['y'], self.Lbox[1],
                     velocity=self.galaxy_table['vy'],
                     check_multiple_box_lengths=self._testing_mode)
                 )
 
-            self.galaxy_table['z'], self.galaxy_table['vz'] = (
+            self.galaxy_table['z'][:], self.galaxy_table['vz'][:] = (
                 model_helpers.enforce_periodicity_of_box(
                     self.galaxy_table['z'], self.Lbox[2],
                     velocity=self.galaxy_table['vz'],
                     check_multiple_box_lengths=self._testing_mode)
                 )
 
+        if incremental is True:
+            self._update_population_cache(seed, is_masked)
+
         if hasattr(self.model, 'galaxy_selection_func'):
             mask = self.model.galaxy_selection_func(self.galaxy_table)
             self.galaxy_table = self.galaxy_table[mask]
 
-    def allocate_memory(self, seed=None):
+    def _populate_all_stages(self, seed, record_pre_images=False, reuse_buffers=False):
+        """ Run every stage of mock population: the occupation statistics,
+        the inheritance of the host halo properties, and the remaining methods
+        of the calling sequence, e.g., the phase space and other galaxy properties.
+
+        If ``record_pre_images`` is True, the values of the columns written by each of
+        the remaining methods are stored before the method is called,
+        so that a later call to `_repopulate_changed_stages` can restore them.
+        """
+        self.allocate_memory(seed=seed, reuse_buffers=reuse_buffers)
+
+        # Loop over all gal_types in the model
+        for gal_type in self.gal_types:
+
+            # Retrieve the indices of our pre-allocated arrays
+            # that store the info pertaining to gal_type galaxies
+            gal_type_slice = self._gal_type_indices[gal_type]
+            # gal_type_slice is a slice object
+
+            # For the gal_type_slice indices of
+            # the pre-allocated array self.gal_type,
+            # set each string-type entry equal to the gal_type string
+            self.galaxy_table['gal_type'][gal_type_slice] = gal_type
+
+            # Store all other relevant host halo properties into their
+            # appropriate pre-allocated array, shard by shard
+            self._map_shards(self._inherit_halo_properties_function(gal_type),
+                len(self._halo_shards))
+
+        self.galaxy_table['x'][:] = self.galaxy_table['halo_x']
+        self.galaxy_table['y'][:] = self.galaxy_table['halo_y']
+        self.galaxy_table['z'][:] = self.galaxy_table['halo_z']
+        self.galaxy_table['vx'][:] = self.galaxy_table['halo_vx']
+        self.galaxy_table['vy'][:] = self.galaxy_table['halo_vy']
+        self.galaxy_table['vz'][:] = self.galaxy_table['halo_vz']
+
+        self._pre_images = {}
+        for method_index, method in enumerate(self._remaining_methods_to_call):
+            self._call_galaxy_method(method_index, method, seed, record_pre_images)
+
+    def _call_galaxy_method(self, method_index, method, seed, record_pre_images=False):
+        """ Call the method in position ``method_index`` of ``_remaining_methods_to_call``
+        on the rows of ``galaxy_table`` of its gal_type.
+        The method is passed the same seed regardless of which other methods are called.
+        """
+        func = getattr(self.model, method)
+        try:
+            d = {key: getattr(self, key) for key in func.additional_kwargs}
+        except AttributeError:
+            d = {}
+        gal_type_slice = self._gal_type_indices[func.gal_type]
+
+        if record_pre_images is True:
+            self._pre_images[method] = dict(
+                (key, np.copy(self.galaxy_table[key][gal_type_slice]))
+                for key in self._galaxy_method_columns(func))
+
+        self._call_on_shards(func, method, self.galaxy_table[gal_type_slice],
+            self._gal_type_shards[func.gal_type], seed, **d)
+
+    def _inherit_halo_properties_function(self, gal_type):
+        """ Return a function of the shard index that copies the ``additional_haloprops``
+        of the host halos in that shard to the rows of their gal_type galaxies.
+        """
+        gal_type_start = self._gal_type_indices[gal_type].start
+        occupation = self._occupation[gal_type]
+        # Plain ndarray views of the columns avoid the overhead of slicing astropy Columns
+        columns = [(np.asarray(self.halo_table[halocatkey]), np.asarray(self.galaxy_table[halocatkey]))
+            for halocatkey in self.additional_haloprops]
+
+        def inherit_halo_properties(shard):
+            halo_shard = self._halo_shards[shard]
+            galaxy_shard = self._gal_type_shards[gal_type][shard]
+            galaxy_shard = slice(gal_type_start + galaxy_shard.start,
+                gal_type_start + galaxy_shard.stop)
+            for halo_column, galaxy_column in columns:
+                galaxy_column[galaxy_shard] = np.repeat(
+                    halo_column[halo_shard], occupation[halo_shard], axis=0)
+        return inherit_halo_properties
+
+    def _halo_shard_slices(self):
+        """ Contiguous slices of the rows of ``halo_table``, each of length
+        ``halo_shard_size`` except for the last one.
+        """
+        num_halos = len(self.halo_table)
+        return [slice(first, min(first + self.halo_shard_size, num_halos))
+            for first in range(0, max(num_halos, 1), self.halo_shard_size)]
+
+    def _map_shards(self, func, num_shards):
+        """ Return the list of ``func(shard)`` for each shard index,
+        using ``_num_threads`` threads.
+        """
+        if (self._num_threads > 1) and (num_shards > 1):
+            pool = ThreadPool(min(self._num_threads, num_shards))
+            try:
+                return pool.map(func, range(num_shards))
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            return [func(shard) for shard in range(num_shards)]
+
+    def _is_shardable(self, func):
+        """ Determine whether ``func`` can be called separately on each shard of its table,
+        i.e., whether it acts independently on each row of the table.
+
+        Methods of assembly-biased component models depend on the conditional percentiles
+        of the entire table, and methods with ``additional_kwargs`` depend on other data
+        such as the entire ``halo_table`` or ``subhalo_table``.
+        """
+        if len(getattr(func, 'additional_kwargs', [])) > 0:
+            return False
+        return not isinstance(getattr(func, 'component_model', None), HeavisideAssembias)
+
+    def _call_on_shards(self, func, method, table, shards, seed, **kwargs):
+        """ Call ``func`` on the rows of ``table`` in each of the ``shards``
+        and return the list of results.
+
+        The call on shard ``i`` is passed the seed ``_method_seed(seed, method, i)``,
+        so that the result does not depend on the number of threads.
+        If there is a single shard, or if ``func`` is not shardable,
+        ``func`` is instead called once on the entire table with ``_method_seed(seed, method)``.
+        Columns created or replaced by ``func`` in the shards, rather than
+        written in place, are assembled and stored in ``table``.
+        """
+        if (len(shards) == 1) or (not self._is_shardable(func)):
+            return [func(table=table, seed=self._method_seed(seed, method), **kwargs)]
+
+        shard_tables = [table[shard] for shard in shards]
+
+        def call_shard(i):
+            return func(table=shard_tables[i], seed=self._method_seed(seed, method, i), **kwargs)
+        result = self._map_shards(call_shard, len(shards))
+
+        for key in shard_tables[0].keys():
+            if (key not in table.keys()) or any(
+                    not np.may_share_memory(shard_table[key], table[key])
+                    for shard_table in shard_tables):
+                table[key] = np.concatenate([shard_table[key] for shard_table in shard_tables])
+        return result
+
+    def _galaxy_method_columns(self, func):
+        """ Names of the columns of ``galaxy_table`` that can be written by ``func``,
+        as declared by the ``_galprop_dtypes_to_allocate`` of its component model.
+        """
+        try:
+            names = func._galprop_dtypes_to_allocate.names
+        except AttributeError:
+            names = None
+        if names is None:
+            return []
+        return [key for key in names if key in self.galaxy_table.keys()]
+
+    def _method_param_values(self, method):
+        """ Return a copy of the values of the parameters controlling ``method``,
+        i.e., the keys of the ``param_dict`` of the component model defining ``method``,
+        or None if the component model is unknown.
+        """
+        func = getattr(self.model, method)
+        try:
+            component_param_dict = func.component_model.param_dict
+        except AttributeError:
+            return None
+        return dict((key, deepcopy(self.model.param_dict.get(key, value)))
+            for key, value in component_param_dict.items())
+
+    def _occupation_methods(self):
+        """ Names of the methods that are called by `allocate_memory`
+        to determine the occupation statistics of the halos.
+        """
+        remaining_methods = set(self._population_cache['remaining_methods'])
+        return [method for method in self.model._mock_generation_calling_sequence
+            if method not in remaining_methods]
+
+    def _incremental_population_plan(self, seed, is_masked):
+        """ Compare the current parameters to those of the previous call to `populate`.
+
+        Returns None if the occupation statistics must be recomputed, in which case
+        every stage of mock population is rerun. Otherwise, returns a dictionary
+        whose keys are gal_types and whose values are the positions in
+        ``_remaining_methods_to_call`` of the first method of that gal_type
+        whose parameters changed, or None if no method of that gal_type needs to be rerun.
+        """
+        cache = getattr(self, '_population_cache', None)
+        if cache is None:
+            return None
+        if (seed is None) or (seed != cache['seed']):
+            return None
+        if is_masked or cache['is_masked'] or (self.enforce_PBC != cache['enforce_PBC']):
+            return None
+        if self.halo_shard_size != cache['halo_shard_size']:
+            return None
+
+        for method in self._occupation_methods():
+            if not _equal_param_values(self._method_param_values(method), cache['params'][method]):
+                return None
+
+        first_methods_to_rerun = dict((gal_type, None) for gal_type in self.gal_types)
+        for method_index, method in enumerate(cache['remaining_methods']):
+            gal_type = getattr(self.model, method).gal_type
+            if first_methods_to_rerun[gal_type] is not None:
+                continue
+            if not _equal_param_values(self._method_param_values(method), cache['params'][method]):
+                first_methods_to_rerun[gal_type] = method_index
+        return first_methods_to_rerun
+
+    def _repopulate_changed_stages(self, seed, first_methods_to_rerun):
+        """ Starting from the galaxy_table of the previous call to `populate`,
+        rerun the methods of each gal_type beginning with the first method whose
+        parameters changed, after restoring the columns written by the methods
+        to their values prior to the first such method.
+        """
+        cache = self._population_cache
+        self.galaxy_table = cache['galaxy_table']
+        self._remaining_methods_to_call = cache['remaining_methods']
+
+        for gal_type, first_method_index in first_methods_to_rerun.items():
+            if first_method_index is None:
+                continue
+            methods_to_rerun = [(method_index, method)
+                for method_index, method in enumerate(self._remaining_methods_to_call)
+                if (method_index >= first_method_index) &
+                (getattr(self.model, method).gal_type == gal_type)]
+
+            gal_type_slice = self._gal_type_indices[gal_type]
+            for method_index, method in methods_to_rerun[::-1]:
+                for key, pre_image in self._pre_images[method].items():
+                    self.galaxy_table[key][gal_type_slice] = pre_image
+
+            for method_index, method in methods_to_rerun:
+                self._call_galaxy_method(method_index, method, seed, record_pre_images=True)
+
+    def _update_population_cache(self, seed, is_masked):
+        """ Store the parameters and the galaxy_table of the current call to `populate`
+        for use by the next call with ``incremental`` set to True.
+        """
+        self._population_cache = {'seed': seed, 'is_masked': is_masked,
+            'enforce_PBC': self.enforce_PBC, 'halo_shard_size': self.halo_shard_size,
+            'galaxy_table': self.galaxy_table,
+            'remaining_methods': self._remaining_methods_to_call}
+        self._population_cache['params'] = dict(
+            (method, self._method_param_values(method))
+            for method in self.model._mock_generation_calling_sequence)
+
+    def allocate_memory(self, seed=None, reuse_buffers=False):
         """ Method allocates the memory for all the numpy arrays
         that will store the information about the mock.
         These arrays are bound directly to the mock object.
@@ -379,6 +775,8 @@ class HodMockFactory(MockFactory):
         The main bookkeeping devices generated by this method are
         ``_occupation`` and ``_gal_type_indices``.
 
+        If ``reuse_buffers`` is True, the columns of the galaxy_table are views of
+        buffers that are kept by the mock and reused by subsequent calls.
         """
 
         self.galaxy_table = Table()
@@ -391,6 +789,7 @@ class HodMockFactory(MockFactory):
         # Call all composite model methods that should be called prior to mc_occupation
         # All such function calls must be applied to the table, since we do not yet know
         # how much memory we need for the mock galaxy_table
+        self._halo_shards = self._halo_shard_slices()
         galprops_assigned_to_halo_table = []
         for func_name in self.model._mock_generation_calling_sequence:
             if 'mc_occupation' in func_name:
@@ -402,9 +801,7 @@ class HodMockFactory(MockFactory):
                     d = {key: getattr(self, key) for key in func.additional_kwargs}
                 except AttributeError:
                     d = {}
-                if seed is not None:
-                    seed += 1
-                func(table=self.halo_table, seed=seed, **d)
+                self._call_on_shards(func, func_name, self.halo_table, self._halo_shards, seed, **d)
                 galprops_assigned_to_halo_table_by_func = func._galprop_dtypes_to_allocate.names
                 galprops_assigned_to_halo_table.extend(galprops_assigned_to_halo_table_by_func)
                 self._remaining_methods_to_call.remove(func_name)
@@ -422,6 +819,7 @@ class HodMockFactory(MockFactory):
         self._occupation = {}
         self._total_abundance = {}
         self._gal_type_indices = {}
+        self._gal_type_shards = {}
 
         for gal_type in self.gal_types:
             self.halo_table['halo_num_'+gal_type] = 0
@@ -432,12 +830,17 @@ class HodMockFactory(MockFactory):
             occupation_func = getattr(self.model, occupation_func_name)
             # Call the component model to get a Monte Carlo
             # realization of the abundance of gal_type galaxies
-            if seed is not None:
-                seed += 1
-
-            self._occupation[gal_type] = occupation_func(table=self.halo_table, seed=seed)
+            self._occupation[gal_type] = np.concatenate(self._call_on_shards(
+                occupation_func, occupation_func_name, self.halo_table, self._halo_shards, seed))
             self.halo_table['halo_num_'+gal_type][:] = self._occupation[gal_type]
 
+            # Galaxies are stored in the order of their host halos,
+            # so each shard of halos hosts a contiguous range of gal_type galaxies
+            first_galaxy_in_halo = np.append(0, np.cumsum(self._occupation[gal_type]))
+            self._gal_type_shards[gal_type] = [
+                slice(first_galaxy_in_halo[shard.start], first_galaxy_in_halo[shard.stop])
+                for shard in self._halo_shards]
+
             # Now use the above result to set up the indexing scheme
             self._total_abundance[gal_type] = (
                 self._occupation[gal_type].sum()
@@ -454,23 +857,70 @@ class HodMockFactory(MockFactory):
 
         self.Ngals = np.sum(list(self._total_abundance.values()))
 
+        # Determine the type of each column of the galaxy_table,
+        # in the order in which the columns appear in the table
+        column_dtypes = OrderedDict()
+
         # Allocate memory for all additional halo properties,
         # including profile parameters of the halos such as 'conc_NFWmodel'
         for halocatkey in self.additional_haloprops:
-            self.galaxy_table[halocatkey] = np.zeros(self.Ngals,
-                dtype=self.halo_table[halocatkey].dtype)
+            column_dtypes[halocatkey] = self.halo_table[halocatkey].dtype
 
         # Separately allocate memory for the galaxy profile parameters
         for galcatkey in self.model.halo_prof_param_keys:
-            self.galaxy_table[galcatkey] = 0.
+            column_dtypes.setdefault(galcatkey, np.dtype(float))
         for galcatkey in self.model.gal_prof_param_keys:
-            self.galaxy_table[galcatkey] = 0.
+            column_dtypes.setdefault(galcatkey, np.dtype(float))
 
-        self.galaxy_table['gal_type'] = np.zeros(self.Ngals, dtype=object)
+        # Fixed-width strings are filled much faster than an object array
+        column_dtypes['gal_type'] = np.dtype(
+            'U%i' % max(len(gal_type) for gal_type in self.gal_types))
 
         dt = self.model._galprop_dtypes_to_allocate
         for key in dt.names:
-            self.galaxy_table[key] = np.zeros(self.Ngals, dtype=dt[key].type)
+            column_dtypes[key] = np.dtype(dt[key].type)
+
+        # Galaxies are initially placed at the position of their host halo
+        for key in ('x', 'y', 'z', 'vx', 'vy', 'vz'):
+            column_dtypes[key] = self.halo_table['halo_' + key].dtype
+
+        self.galaxy_table = Table(
+            [self._galaxy_buffer_column(key, dtype, reuse_buffers)
+                for key, dtype in column_dtypes.items()],
+            names=list(column_dtypes.keys()), copy=False)
+
+    def _galaxy_buffer_column(self, key, dtype, reuse_buffers=False):
+        """ Return a zero-filled array of length ``Ngals`` for the ``key`` column
+        of the galaxy_table.
+
+        If ``reuse_buffers`` is True, the array is a view of a buffer stored by the mock
+        that is reused by subsequent calls to `populate` whenever its capacity suffices.
+        When a larger buffer is needed, its capacity is at least doubled,
+        so that a sequence of populate calls only rarely allocates new memory.
+        """
+        if not hasattr(self, '_galaxy_buffers'):
+            self._galaxy_buffers = {}
+
+        if reuse_buffers is False:
+            self._galaxy_buffers = {}
+            return np.zeros(self.Ngals, dtype=dtype)
+
+        try:
+            buffer = self._galaxy_buffers[key]
+            assert buffer.dtype == dtype
+            assert len(buffer) >= self.Ngals
+        except (KeyError, AssertionError):
+            try:
+                capacity = max(self.Ngals, 2*len(self._galaxy_buffers[key]))
+            except KeyError:
+                capacity = self.Ngals
+            buffer = np.zeros(capacity, dtype=dtype)
+            self._galaxy_buffers[key] = buffer
+            return buffer[:self.Ngals]
+
+        column = buffer[:self.Ngals]
+        column[:] = np.zeros(1, dtype=dtype)[0]
+        return column
 
     def estimate_ngals(self, seed=None):
         """ Method to estimate the number of galaxies produced by the
@@ -479,20 +929,22 @@ class HodMockFactory(MockFactory):
         produced. However, no extra memory is allocated for the
         galaxy tables. Note that model.populate() will invoke a new call
         to all mc_occupation methods and can produce a different number
-        of galaxies.
+        of galaxies, unless both are called with the same ``seed``
+        and no ``masking_function``.
 
         """
 
         # Call all composite model methods that should be called prior to mc_occupation
         # All such function calls must be applied to the table.
-        halo_table = np.copy(self.halo_table)
+        halo_table = self.halo_table.copy()
+        halo_shards = self._halo_shard_slices()
         for func_name in self.model._mock_generation_calling_sequence:
             if 'mc_occupation' in func_name:
                 # exit when we encounter a ``mc_occupation_`` function
                 break
             else:
                 func = getattr(self.model, func_name)
-                func(table=halo_table)
+                self._call_on_shards(func, func_name, halo_table, halo_shards, seed)
 
         # Call the component model to get a Monte Carlo
         # realization of the abundance of galaxies for all gal_type.
@@ -500,8 +952,7 @@ class HodMockFactory(MockFactory):
         for gal_type in self.gal_types:
             occupation_func_name = 'mc_occupation_'+gal_type
             occupation_func = getattr(self.model, occupation_func_name)
-            if seed is not None:
-                seed += 1
-            ngals = ngals + np.sum(occupation_func(table=halo_table, seed=seed))
+            ngals = ngals + sum(np.sum(occupation) for occupation in self._call_on_shards(
+                occupation_func, occupation_func_name, halo_table, halo_shards, seed))
 
         return ngals
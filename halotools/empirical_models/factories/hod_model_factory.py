@@ -613,6 +613,7 @@ class HodModelFactory(ModelFactory):
                     '_galprop_dtypes_to_allocate', component_model_galprop_dtype)
                 setattr(getattr(self, new_method_name), 'gal_type', gal_type)
                 setattr(getattr(self, new_method_name), 'feature_name', feature_name)
+                setattr(getattr(self, new_method_name), 'component_model', component_model)
 
                 docstring = getattr(component_model, methodname).__doc__
                 getattr(self, new_method_name).__doc__ = docstring
@@ -66,10 +66,8 @@ class MockFactory(object):
         for key in list(halocat.__dict__.keys()):
             setattr(self, key, halocat.__dict__[key])
 
-        try:
-            self.ptcl_table = halocat.ptcl_table  # pre-retrieve the particles from disk, if available
-        except:
-            pass
+        # The particles, if available, are only retrieved from disk when first accessed
+        self._halocat = halocat
 
         try:
             self.gal_types = self.model.gal_types
@@ -86,6 +84,24 @@ class MockFactory(object):
 
         self.galaxy_table = Table()
 
+    @property
+    def ptcl_table(self):
+        """ Astropy `~astropy.table.Table` storing the dark matter particles
+        of the halo catalog, retrieved from disk the first time it is accessed.
+        """
+        try:
+            return self._ptcl_table
+        except AttributeError:
+            try:
+                self._ptcl_table = self._halocat.ptcl_table
+            except Exception:
+                raise AttributeError("The halo catalog used to build the mock has no ``ptcl_table``")
+            return self._ptcl_table
+
+    @ptcl_table.setter
+    def ptcl_table(self, ptcl_table):
+        self._ptcl_table = ptcl_table
+
     @abstractmethod
     def populate(self, **kwargs):
         """
@@ -175,6 +191,22 @@ class MockFactory(object):
         raise NotImplementedError("All subclasses of MockFactory"
         " must include a populate method")
 
+    def _method_seed(self, seed, method, shard=None):
+        """ Seed passed to ``method`` when populating the mock with the input ``seed``.
+
+        Each method of the ``_mock_generation_calling_sequence`` of the model draws
+        from its own stream, labeled by the position of the method in the sequence,
+        so that the random numbers of a method depend neither on which other methods
+        are called nor on the order in which they are called.
+        If ``shard`` is not None, the stream is further labeled by the index
+        of the shard of the table passed to ``method``.
+        Returns None if ``seed`` is None.
+        """
+        key = [self.model._mock_generation_calling_sequence.index(method)]
+        if shard is not None:
+            key.append(shard)
+        return model_helpers.child_seed(seed, *key)
+
     @property
     def number_density(self):
         """ Comoving number density of the mock galaxy catalog.
@@ -151,6 +151,17 @@ class ModelFactory(object):
             Random number seed used in the Monte Carlo realization.
             Default is None, which will produce stochastic results.
 
+        halo_shard_size : int, optional
+            Number of host halos in each of the contiguous shards of the halo table
+            that are populated independently.
+            Default is set in `~halotools.empirical_models.model_defaults`.
+            Currently only supported for instances of `~halotools.empirical_models.HodModelFactory`.
+
+        num_threads : int, optional
+            Number of threads used to populate the shards of the halo table.
+            The mock is identical for any number of threads. Default is 1.
+            Currently only supported for instances of `~halotools.empirical_models.HodModelFactory`.
+
         Notes
         -----
         Note the difference between the
@@ -228,9 +239,14 @@ class ModelFactory(object):
             mock_factory_init_args['halo_mass_column_key'] = kwargs['halo_mass_column_key']
         except KeyError:
             pass
+        try:
+            mock_factory_init_args['halo_shard_size'] = kwargs['halo_shard_size']
+        except KeyError:
+            pass
         self.mock = self.mock_factory(**mock_factory_init_args)
 
-        additional_potential_kwargs = ('masking_function', '_testing_mode', 'enforce_PBC', 'seed')
+        additional_potential_kwargs = ('masking_function', '_testing_mode', 'enforce_PBC', 'seed',
+            'num_threads')
         mockpop_keys = set(additional_potential_kwargs) & set(kwargs)
         mockpop_kwargs = {key: kwargs[key] for key in mockpop_keys}
         self.mock.populate(**mockpop_kwargs)
@@ -233,9 +233,7 @@ class SubhaloMockFactory(MockFactory):
 
         for method in self.model._mock_generation_calling_sequence:
             func = getattr(self.model, method)
-            if seed is not None:
-                seed += 1
-            func(table=self.galaxy_table, seed=seed)
+            func(table=self.galaxy_table, seed=self._method_seed(seed, method))
 
         if hasattr(self.model, 'galaxy_selection_func'):
             mask = self.model.galaxy_selection_func(self.galaxy_table)
@@ -4,13 +4,24 @@ from __future__ import (absolute_import, division, print_function)
 
 from astropy.tests.helper import pytest
 from astropy.config.paths import _find_home
+from astropy.table import Table
+import os
 import numpy as np
 from copy import deepcopy
+from threading import Thread
+
+try:
+    import h5py
+    HAS_H5PY = True
+except ImportError:
+    HAS_H5PY = False
 
 from ....mock_observables import return_xyz_formatted_array, tpcf_one_two_halo_decomp
 
 from ....sim_manager import FakeSim, CachedHaloCatalog
 from ....sim_manager.fake_sim import FakeSimHalosNearBoundaries
+from ....sim_manager.lazy_hdf5_table import LazyHDF5Table
+from ....utils import add_halo_hostid, broadcast_host_halo_property
 from ..prebuilt_model_factory import PrebuiltHodModelFactory
 from ....custom_exceptions import HalotoolsError
 
@@ -267,3 +278,230 @@ def test_one_two_halo_decomposition_on_mock():
     xi_1h, xi_2h = tpcf_one_two_halo_decomp(pos, halo_hostid, rbins,
         period=model.mock.Lbox, num_threads='max')
     assert xi_1h[-1] == -1
+
+
+def test_incremental_repopulation():
+    """ Verify that incremental repopulation only reruns the stages whose
+    parameters changed, and agrees exactly with a complete repopulation.
+    """
+    from ..hod_model_factory import HodModelFactory
+    from ...component_model_templates import BinaryGalpropInterpolModel
+
+    def build_model():
+        baseline_model = PrebuiltHodModelFactory('zheng07')
+        quiescent_model = BinaryGalpropInterpolModel(galprop_name='quiescent',
+            galprop_abscissa=[12, 15], galprop_ordinates=[0.25, 0.75], gal_type='satellites')
+        return HodModelFactory(baseline_model_instance=baseline_model,
+            satellites_quiescent=quiescent_model)
+
+    def assert_identical_mocks(mock1, mock2):
+        assert len(mock1.galaxy_table) == len(mock2.galaxy_table)
+        for key in mock2.galaxy_table.keys():
+            assert np.all(mock1.galaxy_table[key] == mock2.galaxy_table[key])
+
+    halocat = FakeSim(seed=fixed_seed)
+    model, model2 = build_model(), build_model()
+    model.populate_mock(halocat, seed=fixed_seed)
+    model2.populate_mock(halocat, seed=fixed_seed)
+    model.mock.populate(seed=fixed_seed, incremental=True)
+
+    quiescent_key = 'satellites_quiescent_ordinates_param1'
+    for key, value in ((quiescent_key, 0.6), ('logMmin', 12.5), (quiescent_key, 0.1)):
+        model.param_dict[key] = value
+        model2.param_dict[key] = value
+        plan = model.mock._incremental_population_plan(fixed_seed, False)
+        if key == quiescent_key:
+            assert plan['centrals'] is None
+            assert plan['satellites'] is not None
+        else:
+            assert plan is None
+        model.mock.populate(seed=fixed_seed, incremental=True)
+        model2.mock.populate(seed=fixed_seed)
+        assert_identical_mocks(model.mock, model2.mock)
+
+    plan = model.mock._incremental_population_plan(fixed_seed, False)
+    assert plan == {'centrals': None, 'satellites': None}
+    assert model.mock._incremental_population_plan(fixed_seed+1, False) is None
+    assert model.mock._incremental_population_plan(None, False) is None
+
+
+def test_reuse_galaxy_buffers():
+    """ Verify that repopulating a mock into reused buffers agrees exactly
+    with repopulating into newly allocated memory.
+    """
+    halocat = FakeSim(seed=fixed_seed)
+    model = PrebuiltHodModelFactory('zheng07')
+    model2 = PrebuiltHodModelFactory('zheng07')
+    model.populate_mock(halocat, seed=fixed_seed)
+    model2.populate_mock(halocat, seed=fixed_seed)
+
+    for logMmin in (12., 11.5, 12.5, 11.):
+        model.param_dict['logMmin'] = logMmin
+        model2.param_dict['logMmin'] = logMmin
+        model.mock.populate(seed=fixed_seed, reuse_buffers=True)
+        model2.mock.populate(seed=fixed_seed)
+
+        gals, gals2 = model.mock.galaxy_table, model2.mock.galaxy_table
+        assert gals.keys() == gals2.keys()
+        assert len(gals) == len(gals2)
+        for key in gals2.keys():
+            assert np.all(gals[key] == gals2[key])
+        num_centrals = np.count_nonzero(gals['gal_type'] == 'centrals')
+        assert num_centrals == model.mock._total_abundance['centrals']
+
+        buffers = model.mock._galaxy_buffers
+        assert np.may_share_memory(gals['x'], buffers['x'])
+        assert np.all(np.array([len(buffers[key]) for key in gals.keys()]) >= len(gals))
+
+
+def test_concurrent_mock_population():
+    """ Verify that mocks populated concurrently in several threads with the same seed
+    agree exactly with a mock populated serially, that the global state of
+    numpy.random is left untouched, and that `estimate_ngals` reproduces the
+    occupation statistics of `populate` called with the same seed.
+    """
+    halocat = FakeSim(seed=fixed_seed)
+    models = [PrebuiltHodModelFactory('zheng07', threshold=-20) for i in range(4)]
+    for model in models:
+        model.populate_mock(halocat, seed=fixed_seed)
+
+    np.random.seed(fixed_seed)
+    threads = [Thread(target=model.mock.populate, kwargs={'seed': fixed_seed+1})
+        for model in models[1:]]
+    for thread in threads:
+        thread.start()
+    models[0].mock.populate(seed=fixed_seed+1)
+    for thread in threads:
+        thread.join()
+    uran = np.random.random(5)
+    np.random.seed(fixed_seed)
+    assert np.all(uran == np.random.random(5))
+
+    gals = models[0].mock.galaxy_table
+    for model in models[1:]:
+        assert len(model.mock.galaxy_table) == len(gals)
+        for key in gals.keys():
+            assert np.all(model.mock.galaxy_table[key] == gals[key])
+
+    assert models[0].mock.estimate_ngals(seed=fixed_seed+1) == len(gals)
+
+
+def test_sharded_mock_population():
+    """ Verify that mocks populated over many halo shards agree exactly
+    regardless of the number of threads, and that `estimate_ngals` reproduces
+    the occupation statistics of the sharded `populate`.
+    """
+    halocat = FakeSim(seed=fixed_seed)
+    model = PrebuiltHodModelFactory('zheng07', threshold=-20)
+    model.populate_mock(halocat, seed=fixed_seed, halo_shard_size=37)
+    assert len(model.mock._halo_shards) > 1
+    gals = deepcopy(model.mock.galaxy_table)
+
+    model.mock.populate(seed=fixed_seed, num_threads=3)
+    assert len(model.mock.galaxy_table) == len(gals)
+    for key in gals.keys():
+        assert np.all(model.mock.galaxy_table[key] == gals[key])
+
+    assert model.mock.estimate_ngals(seed=fixed_seed) == len(gals)
+
+
+class _LazyFakeSim(object):
+    """ Halo catalog mimicking a `~halotools.sim_manager.CachedHaloCatalog`
+    whose halos are stored in an hdf5 file without the derived
+    ``halo_hostid`` and ``halo_mvir_host_halo`` columns.
+    """
+
+    def __init__(self, tmpdir):
+        fakesim = FakeSim(seed=fixed_seed)
+        for key in ('Lbox', 'particle_mass', 'redshift', 'simname',
+                'halo_finder', 'version_name'):
+            setattr(self, key, getattr(fakesim, key))
+
+        t = Table(fakesim.halo_table, copy=True)
+        del t['halo_hostid']
+        del t['halo_mvir_host_halo']
+        self.fname = os.path.join(str(tmpdir), 'lazy_fake_halos.hdf5')
+        t.write(self.fname, path='data')
+
+    @property
+    def halo_table(self):
+        try:
+            return self._halo_table
+        except AttributeError:
+            self._halo_table = Table.read(self.fname, path='data')
+            add_halo_hostid(self._halo_table)
+            broadcast_host_halo_property(self._halo_table, 'halo_mvir')
+            return self._halo_table
+
+    @property
+    def lazy_halo_table(self):
+        try:
+            return self._lazy_halo_table
+        except AttributeError:
+            self._lazy_halo_table = LazyHDF5Table(self.fname, path='data')
+            return self._lazy_halo_table
+
+
+def _assert_identical_mocks(mock1, mock2):
+    assert np.all(mock1.halo_table['halo_id'] == mock2.halo_table['halo_id'])
+    for key in mock1.halo_table.keys():
+        assert np.all(mock1.halo_table[key] == mock2.halo_table[key])
+
+    gals1, gals2 = mock1.galaxy_table, mock2.galaxy_table
+    assert len(gals1) == len(gals2)
+    assert set(gals1.keys()) == set(gals2.keys())
+    for key in gals1.keys():
+        assert np.all(gals1[key] == gals2[key])
+
+
+@pytest.mark.skipif('not HAS_H5PY')
+def test_streamed_host_halos(tmpdir):
+    """ Verify that a mock populated from host halos streamed from disk
+    agrees exactly with a mock populated from the fully loaded halo_table,
+    including the host halo columns that are derived rather than stored on disk.
+    """
+    lazy_halocat = _LazyFakeSim(tmpdir)
+    model = PrebuiltHodModelFactory('zheng07', threshold=-20,
+        prim_haloprop_key='halo_mvir_host_halo')
+    model.populate_mock(lazy_halocat, seed=fixed_seed)
+    # The halo_table of the catalog was never loaded into memory
+    assert '_halo_table' not in lazy_halocat.__dict__
+    streamed_mock = model.mock
+
+    halos = streamed_mock.halo_table
+    assert np.all(halos['halo_upid'] == -1)
+    assert np.all(halos['halo_hostid'] == halos['halo_id'])
+    assert np.all(halos['halo_mvir_host_halo'] == halos['halo_mvir'])
+
+    full_halocat = _LazyFakeSim(tmpdir.mkdir('full'))
+    __ = full_halocat.halo_table
+    assert not streamed_mock._can_stream_host_halos(full_halocat)
+    model2 = PrebuiltHodModelFactory('zheng07', threshold=-20,
+        prim_haloprop_key='halo_mvir_host_halo')
+    model2.populate_mock(full_halocat, seed=fixed_seed)
+
+    _assert_identical_mocks(streamed_mock, model2.mock)
+
+
+@pytest.mark.skipif('not HAS_H5PY')
+def test_streamed_host_halos_fallback(tmpdir):
+    """ Verify that when a function creating a new halo property requires a column
+    that is not read from disk, the mock falls back to the fully loaded halo_table.
+    """
+    lazy_halocat = _LazyFakeSim(tmpdir)
+    model = PrebuiltHodModelFactory('zheng07', threshold=-20,
+        conc_mass_model='direct_from_halo_catalog')
+    assert 'halo_nfw_conc' not in model._haloprop_list
+    model.populate_mock(lazy_halocat, seed=fixed_seed)
+    # The host halos were first streamed from disk, and
+    # the halo_table was then loaded to compute conc_NFWmodel from halo_nfw_conc
+    assert '_lazy_halo_table' in lazy_halocat.__dict__
+    assert '_halo_table' in lazy_halocat.__dict__
+
+    full_halocat = _LazyFakeSim(tmpdir.mkdir('full'))
+    __ = full_halocat.halo_table
+    model2 = PrebuiltHodModelFactory('zheng07', threshold=-20,
+        conc_mass_model='direct_from_halo_catalog')
+    model2.populate_mock(full_halocat, seed=fixed_seed)
+
+    _assert_identical_mocks(model.mock, model2.mock)
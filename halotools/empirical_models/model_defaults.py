@@ -17,6 +17,10 @@ default_stellar_mass_threshold = 10.5
 # scipy method to raise an exception.
 default_tiny_poisson_fluctuation = 1.e-20
 
+# Number of host halos in each of the contiguous shards of the halo catalog
+# into which mock population is divided by the HodMockFactory
+default_halo_shard_size = 2**19
+
 default_smhm_scatter = 0.2
 default_smhm_haloprop = 'halo_mpeak'
 default_binary_galprop_haloprop = default_smhm_haloprop
@@ -274,6 +274,225 @@ def call_func_table(func_table, abscissa, func_indices):
     return out
 
 
+def cubic_hermite_slopes(table_abscissa, table_ordinates):
+    r""" Slopes at the control points of the cubic spline interpolating
+    each row of a dense table, used by `call_table_rows`.
+
+    The slopes are those of the twice-differentiable cubic spline
+    with not-a-knot end conditions, so that `call_table_rows` reproduces
+    the interpolation of `custom_spline` with ``k=3``.
+    The tridiagonal system of each row is solved simultaneously for all rows.
+
+    Parameters
+    ----------
+    table_abscissa : array_like
+        Array of shape (..., Npts) storing strictly increasing abscissa values
+        along the last axis. A length-Npts array is shared by all rows.
+
+    table_ordinates : array_like
+        Array of shape (..., Npts) storing the ordinate values,
+        broadcastable against ``table_abscissa``.
+
+    Returns
+    -------
+    slopes : array_like
+        Array with the broadcast shape of the inputs storing the slope
+        at each control point.
+    """
+    x = np.atleast_1d(table_abscissa).astype(np.float64)
+    y = np.atleast_1d(table_ordinates).astype(np.float64)
+    x, y = np.broadcast_arrays(x, y)
+    npts = y.shape[-1]
+
+    h = np.diff(x, axis=-1)
+    delta = np.diff(y, axis=-1)/h
+    if npts < 4:
+        # The not-a-knot spline through three points is the parabola
+        # whose slopes are given exactly by three-point finite differences
+        slopes = np.zeros_like(y)
+        slopes[...] = delta[..., :1]
+        if npts == 3:
+            h0, h1, delta0, delta1 = h[..., 0], h[..., 1], delta[..., 0], delta[..., 1]
+            slopes[..., 0] = ((2*h0 + h1)*delta0 - h0*delta1)/(h0 + h1)
+            slopes[..., 1] = (h1*delta0 + h0*delta1)/(h0 + h1)
+            slopes[..., 2] = ((2*h1 + h0)*delta1 - h1*delta0)/(h0 + h1)
+        return slopes
+
+    # Tridiagonal system lower*s[i-1] + diag*s[i] + upper*s[i+1] = rhs
+    lower, diag, upper = np.zeros_like(y), np.zeros_like(y), np.zeros_like(y)
+    rhs = np.zeros_like(y)
+    lower[..., 1:-1] = h[..., 1:]
+    diag[..., 1:-1] = 2*(h[..., :-1] + h[..., 1:])
+    upper[..., 1:-1] = h[..., :-1]
+    rhs[..., 1:-1] = 3*(h[..., 1:]*delta[..., :-1] + h[..., :-1]*delta[..., 1:])
+
+    d = x[..., 2] - x[..., 0]
+    diag[..., 0], upper[..., 0] = h[..., 1], d
+    rhs[..., 0] = ((h[..., 0] + 2*d)*h[..., 1]*delta[..., 0] +
+        h[..., 0]**2*delta[..., 1])/d
+    d = x[..., -1] - x[..., -3]
+    lower[..., -1], diag[..., -1] = d, h[..., -2]
+    rhs[..., -1] = (h[..., -1]**2*delta[..., -2] +
+        (2*d + h[..., -1])*h[..., -2]*delta[..., -1])/d
+
+    # Forward elimination and back substitution of the Thomas algorithm
+    for i in range(1, npts):
+        w = lower[..., i]/diag[..., i-1]
+        diag[..., i] -= w*upper[..., i-1]
+        rhs[..., i] -= w*rhs[..., i-1]
+    slopes = np.zeros_like(y)
+    slopes[..., -1] = rhs[..., -1]/diag[..., -1]
+    for i in range(npts-2, -1, -1):
+        slopes[..., i] = (rhs[..., i] - upper[..., i]*slopes[..., i+1])/diag[..., i]
+    return slopes
+
+
+def call_table_rows(table_abscissa, table_ordinates, table_slopes, abscissa, row_indices):
+    r""" Vectorized counterpart of `call_func_table` for functions tabulated
+    as the rows of a dense array: evaluates the piecewise-cubic Hermite interpolant
+    of row ``row_indices[i]`` at ``abscissa[i]``.
+
+    Parameters
+    ----------
+    table_abscissa : array_like
+        Array of shape (num_rows, Npts) storing strictly increasing abscissa values
+        along each row. A length-Npts array is shared by all rows.
+
+    table_ordinates : array_like
+        Array of shape (num_rows, Npts) storing the ordinate values of each row.
+        A length-Npts array is shared by all rows.
+
+    table_slopes : array_like
+        Array of shape (num_rows, Npts) storing the slopes of each row,
+        as computed by `cubic_hermite_slopes`.
+
+    abscissa : array_like
+        Length Npts array of points at which to evaluate the functions.
+        Points outside the range of a row are extrapolated with the cubic
+        of the first or last interval.
+
+    row_indices : array_like
+        Length Npts array of integers providing the row of the table
+        to use for each abscissa element.
+
+    Returns
+    -------
+    out : array_like
+        Length Npts array giving the evaluation of the appropriate row
+        on each abscissa element.
+
+    Examples
+    --------
+    >>> table_abscissa = np.linspace(0, 1, 11)
+    >>> table_ordinates = np.array([table_abscissa**2, table_abscissa**3])
+    >>> table_slopes = cubic_hermite_slopes(table_abscissa, table_ordinates)
+    >>> x = np.random.random(100)
+    >>> row_indices = np.random.randint(0, 2, 100)
+    >>> result = call_table_rows(table_abscissa, table_ordinates, table_slopes, x, row_indices)
+    """
+    abscissa = np.atleast_1d(abscissa).astype(np.float64)
+    row_indices = np.atleast_1d(row_indices).astype(np.int64)
+    table_slopes = np.atleast_2d(table_slopes)
+    npts = table_slopes.shape[-1]
+
+    table_abscissa = np.atleast_1d(table_abscissa).astype(np.float64)
+    if table_abscissa.ndim == 1:
+        interval = np.searchsorted(table_abscissa, abscissa)
+    else:
+        # Offset each row beyond the range of the previous one
+        # so that a single binary search over the flattened table locates
+        # the interval of every point within its own row
+        row_offset = table_abscissa.max() - table_abscissa.min() + 1.
+        offsets = row_offset*np.arange(table_abscissa.shape[0])
+        flattened = (table_abscissa + offsets[:, np.newaxis]).flatten()
+        interval = (np.searchsorted(flattened, abscissa + offsets[row_indices]) -
+            row_indices*npts)
+    interval = np.clip(interval, 1, npts - 1) - 1
+
+    def _row_values(table, column):
+        table = np.atleast_1d(table)
+        if table.ndim == 1:
+            return table[column]
+        else:
+            return table[row_indices, column]
+
+    x0, x1 = _row_values(table_abscissa, interval), _row_values(table_abscissa, interval + 1)
+    y0, y1 = _row_values(table_ordinates, interval), _row_values(table_ordinates, interval + 1)
+    d0, d1 = table_slopes[row_indices, interval], table_slopes[row_indices, interval + 1]
+
+    h = x1 - x0
+    t = (abscissa - x0)/h
+    return (y0*(1 + 2*t)*(1 - t)**2 + h*d0*t*(1 - t)**2 +
+        y1*t*t*(3 - 2*t) + h*d1*t*t*(t - 1))
+
+
+def random_number_generator(seed=None):
+    r""" Random number generator used by the Monte Carlo methods of component models
+    in place of `~astropy.utils.misc.NumpyRNGContext`.
+
+    The generator is a local object, so drawing from it leaves the global state of
+    `numpy.random` untouched, and Monte Carlo methods may be called
+    concurrently from several threads.
+
+    Parameters
+    ----------
+    seed : int, `numpy.random.Generator` or `numpy.random.RandomState`, optional
+        Integer seeds give a `numpy.random.RandomState`, whose draws are identical
+        to those made within ``NumpyRNGContext(seed)``.
+        Generator instances are returned unchanged, so that a single stream can be
+        shared by several calls. Default is None, in which case a generator
+        is seeded from fresh entropy.
+
+    Returns
+    -------
+    rng : `numpy.random.RandomState` or `numpy.random.Generator`
+
+    Examples
+    --------
+    >>> rng = random_number_generator(43)
+    >>> uran = rng.uniform(0, 1, 10)
+    """
+    if isinstance(seed, (np.random.Generator, np.random.RandomState)):
+        return seed
+    elif seed is None:
+        return np.random.default_rng()
+    else:
+        return np.random.RandomState(seed)
+
+
+def child_seed(seed, *key):
+    r""" Integer seed of the independent random number stream labeled by ``key``
+    among the streams derived from ``seed``.
+
+    The streams are the children of ``numpy.random.SeedSequence(seed)``
+    with spawn keys ``key``, so the seed of each stream depends only on
+    ``seed`` and its own label, and not on which other streams are used.
+
+    Parameters
+    ----------
+    seed : int or None
+        Root seed. If None, None is returned.
+
+    *key : int
+        Non-negative integers labeling the stream, e.g., the position of a method
+        in the ``_mock_generation_calling_sequence`` of a model.
+
+    Returns
+    -------
+    seed : int or None
+        Seed in the range [0, 2**32) of the stream, which can be passed
+        to any Monte Carlo method accepting a ``seed`` argument.
+
+    Examples
+    --------
+    >>> seeds = [child_seed(43, i) for i in range(3)]
+    """
+    if seed is None:
+        return None
+    sequence = np.random.SeedSequence(seed, spawn_key=tuple(int(k) for k in key))
+    return int(sequence.generate_state(1)[0])
+
+
 def bind_required_kwargs(required_kwargs, obj, **kwargs):
     r""" Method binds each element of ``required_kwargs`` to
     the input object ``obj``, or raises and exception for cases
@@ -5,12 +5,11 @@ model.
 
 import numpy as np
 from scipy.special import erfc, erfcinv
-from astropy.utils.misc import NumpyRNGContext
 
 from .occupation_model_template import OccupationComponent
 from .engines import cacciato09_sats_mc_prim_galprop_engine
 
-from .. import custom_incomplete_gamma
+from .. import custom_incomplete_gamma, model_helpers
 
 from ...custom_exceptions import HalotoolsError
 
@@ -257,28 +256,28 @@ class Cacciato09Cens(OccupationComponent):
 
         prim_galprop = np.zeros(len(mean_occupation))
 
-        with NumpyRNGContext(seed):
-
-            # Draw cumulative distribution function (CDF) values for the
-            # primary galaxy properties in [0, 1).
-            x = np.random.random(len(mass))
-
-            # Take into account that the occupation with one central sets a
-            # lower limit on the CDF values. We also compute 1 - CDF because
-            # for low expected occupations CDF ~ 1 which can lead to numerical
-            # problems.
-            cdf = mean_occupation * x + (1 - mean_occupation)
-            cdfc = mean_occupation * (1 - x)  # 1 - cdf
-
-            # Draw primary galaxy properties.
-            mask = cdf <= 0.5
-            prim_galprop[mask] = 10**(-erfcinv(2 * cdf[mask]) *
-                                      np.sqrt(2 * self.param_dict['sigma']**2) +
-                                      log_median_prim_galprop[mask])
-            mask = np.logical_not(mask)  # cdf > 0.5
-            prim_galprop[mask] = 10**(erfcinv(2 * cdfc[mask]) *
-                                      np.sqrt(2 * self.param_dict['sigma']**2) +
-                                      log_median_prim_galprop[mask])
+        rng = model_helpers.random_number_generator(seed)
+
+        # Draw cumulative distribution function (CDF) values for the
+        # primary galaxy properties in [0, 1).
+        x = rng.random(len(mass))
+
+        # Take into account that the occupation with one central sets a
+        # lower limit on the CDF values. We also compute 1 - CDF because
+        # for low expected occupations CDF ~ 1 which can lead to numerical
+        # problems.
+        cdf = mean_occupation * x + (1 - mean_occupation)
+        cdfc = mean_occupation * (1 - x)  # 1 - cdf
+
+        # Draw primary galaxy properties.
+        mask = cdf <= 0.5
+        prim_galprop[mask] = 10**(-erfcinv(2 * cdf[mask]) *
+                                  np.sqrt(2 * self.param_dict['sigma']**2) +
+                                  log_median_prim_galprop[mask])
+        mask = np.logical_not(mask)  # cdf > 0.5
+        prim_galprop[mask] = 10**(erfcinv(2 * cdfc[mask]) *
+                                  np.sqrt(2 * self.param_dict['sigma']**2) +
+                                  log_median_prim_galprop[mask])
 
         if 'table' in list(kwargs.keys()):
             kwargs['table'][self.prim_galprop_key][:] = prim_galprop
@@ -662,12 +661,12 @@ class Cacciato09Sats(OccupationComponent):
             raise HalotoolsError(msg)
 
         seed = kwargs.get('seed', None)
-        with NumpyRNGContext(seed):
-            while np.any(prim_galprop == 0):
-                randoms = np.random.random(size=len(mass) * 2)
-                prim_galprop = cacciato09_sats_mc_prim_galprop_engine(
-                    prim_galprop, randoms, alpha_sat, prim_galprop_cut,
-                    10**self.threshold)
+        rng = model_helpers.random_number_generator(seed)
+        while np.any(prim_galprop == 0):
+            randoms = rng.random(size=len(mass) * 2)
+            prim_galprop = cacciato09_sats_mc_prim_galprop_engine(
+                prim_galprop, randoms, alpha_sat, prim_galprop_cut,
+                10**self.threshold)
 
         if 'table' in list(kwargs.keys()):
             kwargs['table'][self.prim_galprop_key][:] = prim_galprop
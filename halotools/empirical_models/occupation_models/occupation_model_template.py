@@ -8,7 +8,6 @@ import numpy as np
 from scipy.stats import poisson
 from astropy.extern import six
 from abc import ABCMeta
-from astropy.utils.misc import NumpyRNGContext
 
 from .. import model_defaults, model_helpers
 
@@ -154,8 +153,8 @@ class OccupationComponent(object):
         mc_abundance : array
             Integer array giving the number of galaxies in each of the input table.
         """
-        with NumpyRNGContext(seed):
-            mc_generator = np.random.random(custom_len(first_occupation_moment))
+        rng = model_helpers.random_number_generator(seed)
+        mc_generator = rng.random(custom_len(first_occupation_moment))
 
         result = np.where(mc_generator < first_occupation_moment, 1, 0)
         if 'table' in kwargs:
@@ -185,8 +184,8 @@ class OccupationComponent(object):
         first_occupation_moment = np.where(first_occupation_moment <= 0,
             model_defaults.default_tiny_poisson_fluctuation, first_occupation_moment)
 
-        with NumpyRNGContext(seed):
-            result = poisson.rvs(first_occupation_moment)
+        rng = model_helpers.random_number_generator(seed)
+        result = poisson.rvs(first_occupation_moment, random_state=rng)
         if 'table' in kwargs:
             kwargs['table']['halo_num_'+self.gal_type] = result
         return result
@@ -5,7 +5,6 @@ This module contains occupation components used by the Tinker13 composite model.
 import numpy as np
 import math
 from scipy.special import erf
-from astropy.utils.misc import NumpyRNGContext
 
 from .occupation_model_template import OccupationComponent
 
@@ -167,8 +166,8 @@ class Tinker13Cens(OccupationComponent):
         """
         quiescent_fraction = self.mean_quiescent_fraction(**kwargs)
 
-        with NumpyRNGContext(seed):
-            mc_generator = np.random.random(custom_len(quiescent_fraction))
+        rng = model_helpers.random_number_generator(seed)
+        mc_generator = rng.random(custom_len(quiescent_fraction))
 
         result = np.where(mc_generator < quiescent_fraction, 'quiescent', 'active')
         if 'table' in kwargs:
@@ -7,14 +7,17 @@ is a composite class that can be used to generate Monte Carlo realizations
 of the full phase space distribution of galaxies within their halos.
 """
 
+import os
+import hashlib
+import tempfile
 import numpy as np
 
 from itertools import product
-from astropy.utils.misc import NumpyRNGContext
 
-from ...model_helpers import custom_spline, call_func_table
+from ...model_helpers import cubic_hermite_slopes, call_table_rows, random_number_generator
 from ... import model_defaults
 
+from .... import __version__ as halotools_version
 from ....custom_exceptions import HalotoolsError
 
 
@@ -35,11 +38,25 @@ class MonteCarloGalProf(object):
     inverse transformation sampling, and so the `MonteCarloGalProf` class
     will not be performant when used with models having more than two
     profile parameters.
+
+    If ``lookup_table_cache_dirname`` is set, the profiles tabulated by
+    `build_lookup_tables` are stored in that directory as ``.npy`` files
+    keyed by the profile class, cosmology, redshift, mass definition and
+    lookup table grids, so that later instances of the same model,
+    e.g., in other processes of a likelihood analysis,
+    memory-map the stored tables rather than recomputing them.
     """
 
-    def __init__(self):
+    def __init__(self, lookup_table_cache_dirname=None):
         r"""
+        Parameters
+        ----------
+        lookup_table_cache_dirname : string, optional
+            Directory in which the profile lookup tables are stored on disk.
+            Default is None, in which case the tables are computed by every instance.
         """
+        self.lookup_table_cache_dirname = lookup_table_cache_dirname
+
         # For each function computing a profile parameter,
         # add it to new_haloprop_func_dict so that the profile parameter
         # will be pre-computed for each halo prior to mock population
@@ -83,15 +100,15 @@ class MonteCarloGalProf(object):
         Parameters
         ----------
         logrmin : float, optional
-            Minimum radius used to build the spline table.
+            Minimum radius used to build the lookup table.
             Default is set in `~halotools.empirical_models.model_defaults`.
 
         logrmax : float, optional
-            Maximum radius used to build the spline table
+            Maximum radius used to build the lookup table
             Default is set in `~halotools.empirical_models.model_defaults`.
 
         Npts_radius_table : int, optional
-            Number of control points used in the spline.
+            Number of control points used in the lookup table.
             Default is set in `~halotools.empirical_models.model_defaults`.
 
         """
@@ -113,29 +130,94 @@ class MonteCarloGalProf(object):
         # Using the itertools product method requires
         # special handling of the length-zero edge case
         if len(profile_params_list) == 0:
-            self.rad_prof_func_table = np.array([])
-            self.rad_prof_func_table_indices = np.array([])
+            self.rad_prof_table = np.array([])
+            self.vel_prof_table = np.array([])
         else:
-            func_table = []
-            velocity_func_table = []
-            for ii, items in enumerate(product(*profile_params_list)):
-                table_ordinates = self.cumulative_gal_PDF(radius_array, *items)
-                log_table_ordinates = np.log10(table_ordinates)
-                funcobj = custom_spline(log_table_ordinates, self.logradius_array, k=3)
-                func_table.append(funcobj)
-
-                velocity_table_ordinates = self.dimensionless_radial_velocity_dispersion(
-                    radius_array, *items)
-                velocity_funcobj = custom_spline(self.logradius_array, velocity_table_ordinates, k=3)
-                velocity_func_table.append(velocity_funcobj)
-
-            profile_params_dimensions = [len(p) for p in profile_params_list]
-            self.rad_prof_func_table = np.array(func_table).reshape(profile_params_dimensions)
-            self.vel_prof_func_table = np.array(velocity_func_table).reshape(profile_params_dimensions)
-
-            self.rad_prof_func_table_indices = (
-                np.arange(np.prod(profile_params_dimensions)).reshape(profile_params_dimensions)
-                )
+            if self.lookup_table_cache_dirname is None:
+                ordinates = self._lookup_table_ordinates(radius_array, profile_params_list)
+            else:
+                ordinates = self._cached_lookup_table_ordinates(
+                    radius_array, profile_params_list)
+
+            # The radial profiles are stored as dense arrays of shape
+            # (num_bins_param1, num_bins_param2, ..., Npts_radius_table):
+            # rad_prof_table stores log10 of the cumulative_gal_PDF at each logradius,
+            # which is inverted by interpolation to draw radial positions,
+            # and vel_prof_table stores the dimensionless radial velocity dispersion.
+            # Each row is interpolated by a cubic Hermite polynomial whose slopes
+            # reproduce the interpolation of custom_spline with k=3
+            table_shape = [len(p) for p in profile_params_list] + [len(radius_array)]
+            self.rad_prof_table = np.log10(ordinates[:, 0]).reshape(table_shape)
+            self.vel_prof_table = np.array(ordinates[:, 1]).reshape(table_shape)
+
+            self._rad_prof_table_slopes = cubic_hermite_slopes(
+                self.rad_prof_table, self.logradius_array)
+            self._vel_prof_table_slopes = cubic_hermite_slopes(
+                self.logradius_array, self.vel_prof_table)
+
+    def _lookup_table_ordinates(self, radius_array, profile_params_list):
+        r""" Array of shape (num_grid_points, 2, Npts_radius_table) storing
+        `cumulative_gal_PDF` and `dimensionless_radial_velocity_dispersion` evaluated
+        at ``radius_array`` for every combination of the profile parameter bins.
+        """
+        num_grid_points = int(np.prod([len(p) for p in profile_params_list]))
+        ordinates = np.zeros((num_grid_points, 2, len(radius_array)))
+        for ii, items in enumerate(product(*profile_params_list)):
+            ordinates[ii, 0] = self.cumulative_gal_PDF(radius_array, *items)
+            ordinates[ii, 1] = self.dimensionless_radial_velocity_dispersion(
+                radius_array, *items)
+        return ordinates
+
+    def _lookup_table_cache_fname(self, radius_array, profile_params_list):
+        r""" Name of the file in ``lookup_table_cache_dirname`` storing the lookup tables
+        of the model, hashed from the profile class, cosmology, redshift, mass definition,
+        Halotools version and lookup table grids.
+        """
+        cls = type(self)
+        h = hashlib.sha1((cls.__module__ + '.' + cls.__name__).encode('utf-8'))
+        for attr in ('cosmology', 'redshift', 'mdef'):
+            h.update(repr(getattr(self, attr, None)).encode('utf-8'))
+        h.update(halotools_version.encode('utf-8'))
+        for arr in [radius_array] + list(profile_params_list):
+            arr = np.ascontiguousarray(arr, dtype='f8')
+            h.update(str(arr.shape).encode('utf-8'))
+            h.update(arr.tobytes())
+        return os.path.join(self.lookup_table_cache_dirname,
+            cls.__name__ + '_' + h.hexdigest() + '.npy')
+
+    def _cached_lookup_table_ordinates(self, radius_array, profile_params_list):
+        r""" Memory-map the lookup table ordinates stored in ``lookup_table_cache_dirname``,
+        computing and storing them first if they are not already stored.
+        """
+        fname = self._lookup_table_cache_fname(radius_array, profile_params_list)
+        num_grid_points = int(np.prod([len(p) for p in profile_params_list]))
+        try:
+            ordinates = np.load(fname, mmap_mode='r')
+            assert ordinates.shape == (num_grid_points, 2, len(radius_array))
+        except (IOError, ValueError, AssertionError):
+            ordinates = self._lookup_table_ordinates(radius_array, profile_params_list)
+
+            dirname = self.lookup_table_cache_dirname
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            # The tables are written to a temporary file that is renamed once complete,
+            # so that concurrent processes never load a partially written file
+            fd, temp_fname = tempfile.mkstemp(suffix='.npy', dir=dirname)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.save(f, ordinates)
+                try:
+                    getattr(os, 'replace', os.rename)(temp_fname, fname)
+                except OSError:
+                    # On Windows, the file cannot be replaced once another process
+                    # has stored (and possibly memory-mapped) the same tables
+                    if not os.path.isfile(fname):
+                        raise
+                    ordinates = np.load(fname, mmap_mode='r')
+            finally:
+                if os.path.isfile(temp_fname):
+                    os.remove(temp_fname)
+        return ordinates
 
     def _mc_dimensionless_radial_distance(self, *profile_params, **kwargs):
         r""" Method to generate Monte Carlo realizations of the profile model.
@@ -162,7 +244,7 @@ class MonteCarloGalProf(object):
 
         """
 
-        if not hasattr(self, 'rad_prof_func_table'):
+        if not hasattr(self, 'rad_prof_table'):
             self.build_lookup_tables()
 
         profile_params = list(np.atleast_1d(arg) for arg in profile_params)
@@ -171,8 +253,7 @@ class MonteCarloGalProf(object):
         # These will be turned into random radial positions
         # by inverting the tabulated cumulative_gal_PDF
         seed = kwargs.get('seed', None)
-        with NumpyRNGContext(seed):
-            rho = np.random.random(len(profile_params[0]))
+        rho = random_number_generator(seed).random(len(profile_params[0]))
 
         # Discretize each profile parameter for every galaxy
         # Store the collection of arrays in digitized_param_list
@@ -195,21 +276,20 @@ class MonteCarloGalProf(object):
         # Now we have a collection of arrays storing indices of individual
         # profile parameters, [A_0, A_1, A_2, ...], [B_0, B_1, B_2, ...], etc.
         # For the combination of profile parameters [A_0, B_0, ...], we need
-        # the profile function object f_0, which we need to then evaluate
-        # on the randomly generated rho[0], and likewise for
-        # [A_i, B_i, ...], f_i, and rho[i], for i = 0, ..., Ngals-1.
-        # To do this, we first determine the index in the profile function table
-        # where the relevant function object is stored:
-        rad_prof_func_table_indices = (
-            self.rad_prof_func_table_indices[digitized_param_list]
-            )
-        # Now we have an array of indices for our functions, and we need to evaluate
-        # the i^th function on the i^th element of rho.
-        # Call the model_helpers module to access generic code for doing this.
+        # the row of the profile table that we need to then invert
+        # at the randomly generated rho[0], and likewise for
+        # [A_i, B_i, ...] and rho[i], for i = 0, ..., Ngals-1.
+        # To do this, we determine the index of the row in the flattened table:
+        table_shape = self.rad_prof_table.shape
+        row_indices = np.ravel_multi_index(digitized_param_list, table_shape[:-1])
+        # Now we have an array of row indices, and we need to interpolate
+        # the i^th row at the i^th element of rho, for all rows at once.
         # (Remember that the interpolation is being done in log-space)
-        return 10.**call_func_table(
-            self.rad_prof_func_table.flatten(), np.log10(rho),
-            rad_prof_func_table_indices.flatten())
+        num_rows = int(np.prod(table_shape[:-1]))
+        return 10.**call_table_rows(
+            self.rad_prof_table.reshape((num_rows, table_shape[-1])), self.logradius_array,
+            self._rad_prof_table_slopes.reshape((num_rows, table_shape[-1])),
+            np.log10(rho), row_indices)
 
     def mc_unit_sphere(self, Npts, **kwargs):
         r""" Returns Npts random points on the unit sphere.
@@ -230,9 +310,9 @@ class MonteCarloGalProf(object):
         """
         seed = kwargs.get('seed', None)
 
-        with NumpyRNGContext(seed):
-            cos_t = np.random.uniform(-1., 1., Npts)
-            phi = np.random.uniform(0, 2*np.pi, Npts)
+        rng = random_number_generator(seed)
+        cos_t = rng.uniform(-1., 1., Npts)
+        phi = rng.uniform(0, 2*np.pi, Npts)
         sin_t = np.sqrt((1.-cos_t*cos_t))
 
         x = sin_t * np.cos(phi)
@@ -489,7 +569,7 @@ class MonteCarloGalProf(object):
             if len(profile_params[ipar]) == 1:
                 profile_params[ipar] = np.zeros_like(scaled_radius) + profile_params[ipar][0]
 
-        if not hasattr(self, 'vel_prof_func_table'):
+        if not hasattr(self, 'vel_prof_table'):
             self.build_lookup_tables()
         # Discretize each profile parameter for every galaxy
         # Store the collection of arrays in digitized_param_list
@@ -512,20 +592,19 @@ class MonteCarloGalProf(object):
         # Now we have a collection of arrays storing indices of individual
         # profile parameters, [A_0, A_1, A_2, ...], [B_0, B_1, B_2, ...], etc.
         # For the combination of profile parameters [A_0, B_0, ...], we need
-        # the profile function object f_0, which we need to then evaluate
-        # on the randomly generated rho[0], and likewise for
-        # [A_i, B_i, ...], f_i, and rho[i], for i = 0, ..., Ngals-1.
-        # To do this, we first determine the index in the profile function table
-        # where the relevant function object is stored:
-        vel_prof_func_table_indices = (
-            self.rad_prof_func_table_indices[digitized_param_list]
-            )
-        # Now we have an array of indices for our functions, and we need to evaluate
-        # the i^th function on the i^th element of rho.
-        # Call the model_helpers module to access generic code for doing this.
-        dimensionless_radial_dispersions = call_func_table(
-            self.vel_prof_func_table.flatten(), np.log10(scaled_radius),
-            vel_prof_func_table_indices.flatten())
+        # the row of the velocity table that we need to then evaluate
+        # at scaled_radius[0], and likewise for
+        # [A_i, B_i, ...] and scaled_radius[i], for i = 0, ..., Ngals-1.
+        # To do this, we determine the index of the row in the flattened table:
+        table_shape = self.vel_prof_table.shape
+        row_indices = np.ravel_multi_index(digitized_param_list, table_shape[:-1])
+        # Now we have an array of row indices, and we need to interpolate
+        # the i^th row at the i^th element of scaled_radius, for all rows at once.
+        num_rows = int(np.prod(table_shape[:-1]))
+        dimensionless_radial_dispersions = call_table_rows(
+            self.logradius_array, self.vel_prof_table.reshape((num_rows, table_shape[-1])),
+            self._vel_prof_table_slopes.reshape((num_rows, table_shape[-1])),
+            np.log10(scaled_radius), row_indices)
 
         return dimensionless_radial_dispersions
 
@@ -570,8 +649,7 @@ class MonteCarloGalProf(object):
         radial_dispersions = np.where(radial_dispersions < 0, 0, radial_dispersions)
 
         seed = kwargs.get('seed', None)
-        with NumpyRNGContext(seed):
-            radial_velocities = np.random.normal(scale=radial_dispersions)
+        radial_velocities = random_number_generator(seed).normal(scale=radial_dispersions)
 
         return radial_velocities
 
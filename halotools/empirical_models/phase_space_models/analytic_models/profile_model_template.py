@@ -8,12 +8,12 @@ from __future__ import division, print_function, absolute_import, unicode_litera
 import numpy as np
 from astropy.extern import six
 from abc import ABCMeta, abstractmethod
-from scipy.integrate import quad as quad_integration
 from scipy.optimize import minimize as scipy_minimize
 from astropy import units as u
 from astropy.constants import G
 
 from . import halo_boundary_functions
+from .quadrature_helpers import interval_integrals
 
 from ... import model_defaults
 
@@ -215,16 +215,20 @@ class AnalyticDensityProf(object):
         See :ref:`halo_profile_definitions` for derivations and implementation details.
         """
         x = np.atleast_1d(scaled_radius).astype(np.float64)
-        enclosed_mass = np.zeros_like(x)
 
-        for i in range(len(x)):
-            enclosed_mass[i], _ = quad_integration(
-                self._enclosed_dimensionless_mass_integrand, 0., x[i], epsrel=1e-5,
-                args=prof_params)
-
-        total, _ = quad_integration(
-                self._enclosed_dimensionless_mass_integrand, 0., 1.0, epsrel=1e-5,
-                args=prof_params)
+        # Integrate over the intervals between the sorted radii, merged with a grid
+        # that is logarithmically spaced towards the halo center to resolve cuspy profiles,
+        # and accumulate the integrals outwards from the halo center
+        radii, inverse = np.unique(x, return_inverse=True)
+        grid = np.append(0., np.logspace(-6, 0, 121))
+        edges = np.union1d(radii, grid)
+        integrals = interval_integrals(
+            self._enclosed_dimensionless_mass_integrand, edges, args=prof_params)
+        cumulative_integral = np.append(0., np.cumsum(integrals))
+        cumulative_integral -= cumulative_integral[np.searchsorted(edges, 0.)]
+
+        enclosed_mass = cumulative_integral[np.searchsorted(edges, radii)][inverse]
+        total = cumulative_integral[np.searchsorted(edges, 1.)]
 
         return enclosed_mass / total
 
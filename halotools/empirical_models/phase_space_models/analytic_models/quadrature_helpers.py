@@ -0,0 +1,71 @@
+"""
+Module containing the `interval_integrals` function used to evaluate
+the profile integrals for many limits of integration at once.
+"""
+from __future__ import division, print_function, absolute_import, unicode_literals
+
+import numpy as np
+
+__author__ = ['Andrew Hearin']
+
+__all__ = ['interval_integrals']
+
+
+def interval_integrals(func, edges, args=(), order=8, logspace=False):
+    r"""
+    Integral of ``func`` over each interval between consecutive entries of ``edges``,
+    computed with fixed-order Gauss-Legendre quadrature in a single vectorized
+    evaluation of ``func``.
+
+    Cumulative integrals with many different limits of integration are obtained by
+    passing the sorted limits, together with a grid that resolves the integrand,
+    as ``edges`` and taking the cumulative sum of the result.
+
+    Parameters
+    -----------
+    func : callable
+        Integrand ``func(x, *args)``, which must be evaluated element-wise
+        on an input array ``x`` of shape edges.shape[:-1] + (Nedges-1, order).
+
+    edges : array_like
+        Array of shape (..., Nedges) storing the boundaries of the intervals
+        in increasing order along the last axis.
+
+    args : tuple, optional
+        Additional arguments passed to ``func``, which must be broadcastable
+        against ``x``.
+
+    order : int, optional
+        Number of Gauss-Legendre nodes in each interval. Default is 8.
+
+    logspace : bool, optional
+        If True, the nodes are placed uniformly in :math:`\ln x` rather than in :math:`x`,
+        which requires positive ``edges``. Default is False.
+
+    Returns
+    --------
+    integrals : array_like
+        Array of shape (..., Nedges-1) storing the integral over each interval.
+
+    Examples
+    --------
+    >>> edges = np.linspace(0, 1, 5)
+    >>> integrals = interval_integrals(np.square, edges)
+    >>> total = np.sum(integrals)
+    """
+    edges = np.atleast_1d(edges).astype(np.float64)
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+
+    if logspace:
+        edges = np.log(edges)
+    midpoints = (edges[..., 1:] + edges[..., :-1])/2.
+    half_widths = (edges[..., 1:] - edges[..., :-1])/2.
+    abscissas = midpoints[..., np.newaxis] + half_widths[..., np.newaxis]*nodes
+
+    if logspace:
+        abscissas = np.exp(abscissas)
+        integrand = func(abscissas, *args)*abscissas
+    else:
+        integrand = func(abscissas, *args)
+
+    return half_widths*np.dot(integrand, weights)
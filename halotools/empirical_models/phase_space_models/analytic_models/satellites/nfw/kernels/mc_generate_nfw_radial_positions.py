@@ -1,13 +1,12 @@
 """
 """
 import numpy as np
-from astropy.utils.misc import NumpyRNGContext
 
 from .mass_profile import cumulative_mass_PDF
 
 from ....halo_boundary_functions import halo_mass_to_halo_radius
 
-from ......model_helpers import custom_spline
+from ......model_helpers import custom_spline, random_number_generator
 from ......model_defaults import halo_mass_definition as default_halo_mass_definition
 
 from .......sim_manager.sim_defaults import default_cosmology, default_redshift
@@ -116,8 +115,7 @@ def mc_generate_nfw_radial_positions(num_pts=int(1e4), conc=5,
 
     # Use method of Inverse Transform Sampling to generate a Monte Carlo realization
     # of the radial positions
-    with NumpyRNGContext(seed):
-        randoms = np.random.uniform(0, 1, num_pts)
+    randoms = random_number_generator(seed).uniform(0, 1, num_pts)
     log_randoms = np.log10(randoms)
     log_scaled_radial_positions = funcobj(log_randoms)
     scaled_radial_positions = 10.**log_scaled_radial_positions
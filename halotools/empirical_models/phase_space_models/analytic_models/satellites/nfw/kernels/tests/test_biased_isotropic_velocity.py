@@ -1,10 +1,13 @@
 """
 """
 import numpy as np
+from scipy.integrate import quad as quad_integration
 from astropy.utils.data import get_pkg_data_filename
 
 from ..unbiased_isotropic_velocity import dimensionless_radial_velocity_dispersion as unbiased_dimless_vel_rad_disp
 from ..biased_isotropic_velocity import dimensionless_radial_velocity_dispersion as biased_dimless_vel_rad_disp
+from ..biased_isotropic_velocity import _jeans_integrand
+from ..mass_profile import _g_integral
 
 
 __all__ = ('test_unbiased_vel_rad_disp1', )
@@ -48,3 +51,27 @@ def test_unbiased_vel_rad_disp_external_ch5_cg10():
     frank_dimless_sigma_rad = x[:, 2]
     aph_result = biased_dimless_vel_rad_disp(frank_r_by_Rvir, halo_conc, gal_conc)
     assert np.allclose(aph_result, frank_dimless_sigma_rad, rtol=1e-3)
+
+
+def test_biased_vel_rad_disp_agrees_with_quad():
+    """ Verify that the vectorized quadrature agrees with a direct numerical integral
+    of the Jeans equation evaluated separately for each scaled radius.
+    """
+    scaled_radius = np.logspace(-4, 0, 20)
+    for halo_conc, gal_conc in ((5, 5), (10, 5), (5, 10), (20, 2), (2, 20)):
+        result = biased_dimless_vel_rad_disp(scaled_radius, halo_conc, gal_conc)
+
+        correct_result = np.zeros_like(scaled_radius)
+        for i, lower_limit in enumerate(gal_conc*scaled_radius):
+            integral, _ = quad_integration(_jeans_integrand,
+                lower_limit, float("inf"), epsrel=1e-10, args=(halo_conc/gal_conc, ))
+            prefactor = gal_conc*lower_limit*(1. + lower_limit)**2/_g_integral(halo_conc)
+            correct_result[i] = np.sqrt(integral*prefactor)
+        assert np.allclose(result, correct_result, rtol=1e-5)
+
+    # the result does not depend on the order or repetition of the input radii
+    shuffled_radius = np.concatenate((scaled_radius[::-1], scaled_radius[5:10]))
+    shuffled_result = biased_dimless_vel_rad_disp(shuffled_radius, 10, 5)
+    result = biased_dimless_vel_rad_disp(scaled_radius, 10, 5)
+    assert np.allclose(shuffled_result[:20], result[::-1], rtol=1e-12)
+    assert np.allclose(shuffled_result[20:], result[5:10], rtol=1e-12)
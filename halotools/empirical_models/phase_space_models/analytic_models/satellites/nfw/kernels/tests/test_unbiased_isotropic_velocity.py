@@ -1,9 +1,12 @@
 """
 """
 import numpy as np
+from scipy.integrate import quad as quad_integration
 from astropy.utils.data import get_pkg_data_filename
 
 from ..unbiased_isotropic_velocity import dimensionless_radial_velocity_dispersion as unbiased_dimless_vel_rad_disp
+from ..unbiased_isotropic_velocity import _jeans_integrand_term1, _jeans_integrand_term2
+from ..mass_profile import _g_integral
 
 
 __all__ = ('test_unbiased_vel_rad_disp1', )
@@ -31,3 +34,26 @@ def test_unbiased_vel_rad_disp_external_c10():
     frank_dimless_sigma_rad = x[:, 2]
     aph_dimless_sigma_rad = unbiased_dimless_vel_rad_disp(frank_r_by_Rvir, 10)
     assert np.allclose(frank_dimless_sigma_rad, aph_dimless_sigma_rad, rtol=1e-3)
+
+
+def test_unbiased_vel_rad_disp_agrees_with_quad():
+    """ Verify that the closed-form solution agrees with a direct numerical integral
+    of the Jeans equation, including at large scaled radii where the integral
+    is evaluated numerically, and that the dispersion vanishes at the halo center.
+    """
+    scaled_radius = np.logspace(-4, 0, 20)
+    for conc in (2, 5, 20, 40):
+        result = unbiased_dimless_vel_rad_disp(scaled_radius, conc)
+
+        correct_result = np.zeros_like(scaled_radius)
+        for i, lower_limit in enumerate(conc*scaled_radius):
+            integral, _ = quad_integration(
+                lambda y: _jeans_integrand_term1(y) - _jeans_integrand_term2(y),
+                lower_limit, float("inf"), epsrel=1e-10)
+            prefactor = conc*lower_limit*(1. + lower_limit)**2/_g_integral(conc)
+            correct_result[i] = np.sqrt(integral*prefactor)
+        assert np.allclose(result, correct_result, rtol=1e-5)
+
+    result = unbiased_dimless_vel_rad_disp(np.array((0, 0.5)), 5)
+    assert result[0] == 0
+    assert result[1] > 0
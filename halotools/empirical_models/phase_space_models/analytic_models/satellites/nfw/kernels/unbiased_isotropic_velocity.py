@@ -1,9 +1,10 @@
 """
 """
 import numpy as np
-from scipy.integrate import quad as quad_integration
+from scipy.special import spence
 
 from .mass_profile import _g_integral
+from .biased_isotropic_velocity import _jeans_integral as _biased_jeans_integral
 
 
 __all__ = ('dimensionless_radial_velocity_dispersion', )
@@ -21,6 +22,31 @@ def _jeans_integrand_term2(y):
     return 1/(y**2*(1+y)**3)
 
 
+def _jeans_integral(y):
+    r""" Closed-form integral of the Jeans integrand from ``y`` to infinity,
+    (Lokas & Mamon 2001, arXiv:astro-ph/0002395),
+
+    :math:`\frac{1}{2}\left[\pi^{2} - \ln y - \frac{1}{y} - \frac{1}{(1+y)^{2}} - \frac{6}{1+y} + \left(1 + \frac{1}{y^{2}} - \frac{4}{y} - \frac{2}{1+y}\right)\ln(1+y) + 3\ln^{2}(1+y) + 6{\rm Li}_{2}(-y)\right]`,
+
+    where :math:`{\rm Li}_{2}(-y)` is computed by `scipy.special.spence` as
+    :math:`{\rm spence}(1+y)`. The closed form is evaluated for :math:`y \leq 10`,
+    where it is accurate to better than 1e-8. At larger :math:`y`, the terms cancel to
+    within the round-off error of the result, and the integral is evaluated numerically.
+    """
+    y = np.atleast_1d(y).astype(np.float64)
+    result = np.zeros_like(y)
+
+    closed_form = y <= 10.
+    x = y[closed_form]
+    log1px = np.log1p(x)
+    result[closed_form] = 0.5*(np.pi**2 - np.log(x) - 1./x - 1./(1. + x)**2 - 6./(1. + x) +
+        (1. + 1./x**2 - 4./x - 2./(1. + x))*log1px + 3.*log1px**2 + 6.*spence(1. + x))
+
+    if np.any(~closed_form):
+        result[~closed_form] = _biased_jeans_integral(y[~closed_form], 1.)
+    return result
+
+
 def dimensionless_radial_velocity_dispersion(scaled_radius, *conc):
     r"""
     Analytical solution to the isotropic jeans equation for an NFW potential,
@@ -51,13 +77,10 @@ def dimensionless_radial_velocity_dispersion(scaled_radius, *conc):
 
     prefactor = conc*(conc*x)*(1. + conc*x)**2/_g_integral(conc)
 
+    # The dispersion vanishes at the halo center
     lower_limit = conc*x
-    upper_limit = float("inf")
-    for i in range(len(x)):
-        term1, _ = quad_integration(_jeans_integrand_term1,
-            lower_limit[i], upper_limit, epsrel=1e-5)
-        term2, _ = quad_integration(_jeans_integrand_term2,
-            lower_limit[i], upper_limit, epsrel=1e-5)
-        result[i] = term1 - term2
+    positive = lower_limit > 0
+    if np.any(positive):
+        result[positive] = _jeans_integral(lower_limit[positive])
 
     return np.sqrt(result*prefactor)
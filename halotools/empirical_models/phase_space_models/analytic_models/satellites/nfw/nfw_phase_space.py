@@ -66,12 +66,19 @@ class NFWPhaseSpace(NFWProfile, MonteCarloGalProf):
             The spacing of this array sets a limit on how accurately the
             concentration parameter can be recovered in a likelihood analysis.
 
+        lookup_table_cache_dirname : string, optional
+            Directory in which the lookup tables built for mock-population purposes
+            are stored on disk, so that later instances of the model with the same
+            cosmology, redshift, mass definition and lookup table bins load the stored tables.
+            Default is None, in which case the tables are computed by every instance.
+
         Examples
         --------
         >>> model = NFWPhaseSpace()
         """
         NFWProfile.__init__(self, **kwargs)
-        MonteCarloGalProf.__init__(self)
+        MonteCarloGalProf.__init__(self,
+            lookup_table_cache_dirname=kwargs.get('lookup_table_cache_dirname', None))
 
         prof_lookup_args = self._retrieve_prof_lookup_info(**kwargs)
         self.setup_prof_lookup_tables(*prof_lookup_args)
@@ -625,15 +632,15 @@ class NFWPhaseSpace(NFWProfile, MonteCarloGalProf):
         Parameters
         ----------
         logrmin : float, optional
-            Minimum radius used to build the spline table.
+            Minimum radius used to build the lookup table.
             Default is set in `~halotools.empirical_models.model_defaults`.
 
         logrmax : float, optional
-            Maximum radius used to build the spline table
+            Maximum radius used to build the lookup table
             Default is set in `~halotools.empirical_models.model_defaults`.
 
         Npts_radius_table : int, optional
-            Number of control points used in the spline.
+            Number of control points used in the lookup table.
             Default is set in `~halotools.empirical_models.model_defaults`.
 
         """
@@ -51,21 +51,22 @@ def test_biased_nfw_phase_space_lookup_tables():
 
     # MonteCarloGalProf attributes
     assert not hasattr(model, 'logradius_array')
-    assert not hasattr(model, 'rad_prof_func_table')
-    assert not hasattr(model, 'vel_prof_func_table')
+    assert not hasattr(model, 'rad_prof_table')
+    assert not hasattr(model, 'vel_prof_table')
 
     model.build_lookup_tables()
 
     assert hasattr(model, 'logradius_array')
-    assert hasattr(model, 'rad_prof_func_table')
-    assert hasattr(model, 'vel_prof_func_table')
+    assert hasattr(model, 'rad_prof_table')
+    assert hasattr(model, 'vel_prof_table')
 
     assert np.allclose(model._conc_gal_bias_lookup_table_bins, gal_bias_bins)
     assert np.allclose(model._conc_NFWmodel_lookup_table_bins, conc_bins)
 
-    assert hasattr(model, 'rad_prof_func_table')
+    assert hasattr(model, 'rad_prof_table')
     npts_conc, npts_conc_bias = len(conc_bins), len(gal_bias_bins)
-    assert model.rad_prof_func_table.shape == (npts_conc, npts_conc_bias)
+    assert model.rad_prof_table.shape == (npts_conc, npts_conc_bias, model.Npts_radius_table)
+    assert model.vel_prof_table.shape == model.rad_prof_table.shape
 
 
 def test_raises_memory_warning():
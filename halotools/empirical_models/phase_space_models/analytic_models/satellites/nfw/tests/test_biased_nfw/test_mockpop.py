@@ -129,7 +129,7 @@ def test_mockpop2():
     model.param_dict['conc_gal_bias_param0'] = gal_bias_bins.min()
     model.param_dict['conc_gal_bias_param1'] = gal_bias_bins.max()
 
-    halocat = FakeSim(seed=43, num_halos_per_massbin=25)
+    halocat = FakeSim(seed=43, num_halos_per_massbin=100)
     model.populate_mock(halocat, seed=43)
     assert 'conc_gal_bias' in list(model.mock.galaxy_table.keys())
     assert 'conc_gal_bias_param0' not in list(model.mock.galaxy_table.keys())
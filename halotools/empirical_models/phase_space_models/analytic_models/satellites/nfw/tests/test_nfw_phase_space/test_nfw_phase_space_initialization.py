@@ -40,10 +40,10 @@ def test_constructor2():
 
     # MonteCarloGalProf attributes
     assert not hasattr(nfw, 'logradius_array')
-    assert not hasattr(nfw, 'rad_prof_func_table')
-    assert not hasattr(nfw, 'vel_prof_func_table')
+    assert not hasattr(nfw, 'rad_prof_table')
+    assert not hasattr(nfw, 'vel_prof_table')
 
     nfw.build_lookup_tables()
     assert hasattr(nfw, 'logradius_array')
-    assert hasattr(nfw, 'rad_prof_func_table')
-    assert hasattr(nfw, 'vel_prof_func_table')
+    assert hasattr(nfw, 'rad_prof_table')
+    assert hasattr(nfw, 'vel_prof_table')
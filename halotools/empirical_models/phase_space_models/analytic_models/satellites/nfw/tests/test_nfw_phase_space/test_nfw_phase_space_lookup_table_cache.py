@@ -0,0 +1,110 @@
+"""
+"""
+import os
+import numpy as np
+from astropy.tests.helper import pytest
+
+from ...nfw_phase_space import NFWPhaseSpace
+from ...biased_nfw_phase_space import BiasedNFWPhaseSpace
+
+
+__all__ = ('test_lookup_table_cache1', )
+
+fixed_seed = 43
+
+
+def _raise_if_called(*args):
+    raise AssertionError("Lookup tables were recomputed rather than loaded from the cache")
+
+
+def test_lookup_table_cache1(tmpdir):
+    r""" Verify that a second instance of the same model loads the lookup tables
+    stored by the first instance, and that the loaded tables agree with tables
+    computed without the cache.
+    """
+    dirname = str(tmpdir)
+    model = NFWPhaseSpace(lookup_table_cache_dirname=dirname)
+    model.build_lookup_tables()
+    assert len(os.listdir(dirname)) == 1
+
+    model2 = NFWPhaseSpace(lookup_table_cache_dirname=dirname)
+    model2._lookup_table_ordinates = _raise_if_called
+    model2.build_lookup_tables()
+    assert len(os.listdir(dirname)) == 1
+
+    uncached_model = NFWPhaseSpace()
+    uncached_model.build_lookup_tables()
+    scaled_radius = np.logspace(-2, 0, 10)
+    for conc in (5, 10):
+        v1 = uncached_model._vrad_disp_from_lookup(scaled_radius, conc)
+        v2 = model2._vrad_disp_from_lookup(scaled_radius, conc)
+        assert np.allclose(v1, v2)
+
+        r1 = uncached_model._mc_dimensionless_radial_distance(
+            np.zeros(100) + conc, seed=fixed_seed)
+        r2 = model2._mc_dimensionless_radial_distance(
+            np.zeros(100) + conc, seed=fixed_seed)
+        assert np.allclose(r1, r2)
+
+
+def test_lookup_table_cache2(tmpdir):
+    r""" Verify that models differing in their lookup table bins, mass definition
+    or class are stored under different names.
+    """
+    dirname = str(tmpdir)
+    NFWPhaseSpace(lookup_table_cache_dirname=dirname).build_lookup_tables()
+    NFWPhaseSpace(lookup_table_cache_dirname=dirname,
+        concentration_bins=np.linspace(5, 10, 3)).build_lookup_tables()
+    NFWPhaseSpace(lookup_table_cache_dirname=dirname, mdef='200m').build_lookup_tables()
+    BiasedNFWPhaseSpace(lookup_table_cache_dirname=dirname,
+        concentration_bins=np.linspace(5, 10, 3)).build_lookup_tables()
+    fnames = os.listdir(dirname)
+    assert len(fnames) == 4
+    assert len([fname for fname in fnames if fname.startswith('BiasedNFWPhaseSpace_')]) == 1
+
+    model = BiasedNFWPhaseSpace(lookup_table_cache_dirname=dirname,
+        concentration_bins=np.linspace(5, 10, 3))
+    model._lookup_table_ordinates = _raise_if_called
+    model.build_lookup_tables()
+
+
+def test_lookup_table_cache_concurrent_writers(tmpdir, monkeypatch):
+    r""" Verify that when another process stores the same lookup tables while they are
+    being computed, and the stored file cannot be replaced as on Windows,
+    the stored tables are used and no temporary file is left behind.
+    """
+    dirname = str(tmpdir)
+    model = NFWPhaseSpace(lookup_table_cache_dirname=dirname)
+    compute_ordinates = model._lookup_table_ordinates
+
+    def compute_while_another_process_stores(*args):
+        NFWPhaseSpace(lookup_table_cache_dirname=dirname).build_lookup_tables()
+        return compute_ordinates(*args)
+
+    def raise_os_error(*args):
+        raise OSError("Cannot create a file when that file already exists")
+
+    model._lookup_table_ordinates = compute_while_another_process_stores
+    monkeypatch.setattr(os, 'rename', raise_os_error)
+    monkeypatch.setattr(os, 'replace', raise_os_error, raising=False)
+    model.build_lookup_tables()
+    assert len(os.listdir(dirname)) == 1
+
+    uncached_model = NFWPhaseSpace()
+    uncached_model.build_lookup_tables()
+    assert np.allclose(model.rad_prof_table, uncached_model.rad_prof_table)
+
+
+def test_lookup_table_cache_failed_write(tmpdir, monkeypatch):
+    r""" Verify that no temporary file is left behind when storing the lookup tables fails.
+    """
+    dirname = str(tmpdir)
+
+    def raise_io_error(*args):
+        raise IOError("No space left on device")
+
+    monkeypatch.setattr(np, 'save', raise_io_error)
+    model = NFWPhaseSpace(lookup_table_cache_dirname=dirname)
+    with pytest.raises(IOError):
+        model.build_lookup_tables()
+    assert len(os.listdir(dirname)) == 0
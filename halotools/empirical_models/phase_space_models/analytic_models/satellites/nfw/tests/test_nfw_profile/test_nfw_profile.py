@@ -9,6 +9,7 @@ from astropy.tests.helper import pytest
 from astropy.cosmology import WMAP9, FLRW
 
 from ...nfw_profile import NFWProfile
+from ...kernels.mass_profile import _g_integral as nfw_g
 
 from ........utils.array_utils import array_is_monotonic
 
@@ -215,6 +216,20 @@ def test_cumulative_mass_PDF():
         assert np.allclose(enclosed_mass, derived_enclosed_mass, rtol=1e-4)
 
 
+def test_cumulative_mass_PDF_template_accuracy():
+    r""" Require the numerical integral computed by the
+    `~halotools.empirical_models.profile_model_template.AnalyticDensityProf.cumulative_mass_PDF`
+    method to agree with the analytical NFW expression for unsorted and repeated inputs,
+    including inputs beyond the halo boundary.
+    """
+    model = NFWProfile(concentration_bins=np.array((5, 10, 15)))
+    scaled_radius = np.concatenate((np.logspace(-5, 0.3, 50)[::-1], (0.5, 0.5, 1)))
+    for conc in (1, 5, 20):
+        super_class_result = super(NFWProfile, model).cumulative_mass_PDF(
+            scaled_radius, conc)
+        correct_result = nfw_g(conc*scaled_radius)/nfw_g(conc)
+        assert np.allclose(super_class_result, correct_result, rtol=1e-7)
+
 def test_vmax():
     r""" Require that the analytic approximation used to estimate the NFW :math:`V_{\rm max}`
     by the `~halotools.empirical_models.NFWProfile.vmax` method
@@ -7,6 +7,8 @@ from astropy.utils.misc import NumpyRNGContext
 from ..model_helpers import custom_spline, create_composite_dtype
 from ..model_helpers import bounds_enforcing_decorator_factory, enforce_periodicity_of_box
 from ..model_helpers import call_func_table, bind_default_kwarg_mixin_safe
+from ..model_helpers import cubic_hermite_slopes, call_table_rows
+from ..model_helpers import random_number_generator, child_seed
 
 from ...custom_exceptions import HalotoolsError
 
@@ -189,3 +191,76 @@ def test_call_func_table2():
 
 def test_call_func_table3():
     pass
+
+
+def test_call_table_rows1():
+    r""" Verify that `call_table_rows` with a shared abscissa reproduces
+    `custom_spline`, including extrapolation beyond the table.
+    """
+    table_abscissa = np.linspace(-1, 2, 25)
+    table_ordinates = np.array(list(np.sin(table_abscissa) + i for i in range(4)))
+    table_slopes = cubic_hermite_slopes(table_abscissa, table_ordinates)
+
+    with NumpyRNGContext(fixed_seed):
+        x = np.random.uniform(-1.5, 2.5, 500)
+        row_indices = np.random.randint(0, 4, 500)
+    result = call_table_rows(table_abscissa, table_ordinates, table_slopes, x, row_indices)
+
+    f_table = list(custom_spline(table_abscissa, table_ordinates[i], k=3) for i in range(4))
+    correct_result = call_func_table(f_table, x, row_indices)
+    assert np.allclose(result, correct_result, rtol=1e-8)
+
+
+def test_call_table_rows2():
+    r""" Verify that `call_table_rows` locates the correct interval
+    when each row has its own abscissa, and that cubic polynomials are reproduced exactly.
+    """
+    with NumpyRNGContext(fixed_seed):
+        table_abscissa = np.sort(np.random.uniform(0, 1, (3, 10)), axis=1)
+        table_abscissa[1] += 5.
+        table_abscissa[2] -= 5.
+        row_indices = np.random.randint(0, 3, 500)
+        x = np.random.uniform(table_abscissa[row_indices, 0], table_abscissa[row_indices, -1])
+    coeffs = np.array((1., -2., 3.))
+    table_ordinates = table_abscissa**3 + coeffs[:, np.newaxis]*table_abscissa
+    table_slopes = cubic_hermite_slopes(table_abscissa, table_ordinates)
+
+    result = call_table_rows(table_abscissa, table_ordinates, table_slopes, x, row_indices)
+    correct_result = x**3 + coeffs[row_indices]*x
+    assert np.allclose(result, correct_result, rtol=1e-8)
+
+
+def test_cubic_hermite_slopes_short_tables():
+    table_abscissa = np.array((0., 1., 3.))
+    slopes = cubic_hermite_slopes(table_abscissa, table_abscissa**2)
+    assert np.allclose(slopes, 2*table_abscissa)
+
+    slopes = cubic_hermite_slopes(table_abscissa[:2], 2*table_abscissa[:2])
+    assert np.allclose(slopes, 2)
+
+
+def test_random_number_generator():
+    r""" Verify that integer seeds reproduce the draws of `NumpyRNGContext`
+    without modifying the global state of numpy.random,
+    and that generator instances are used as they are.
+    """
+    with NumpyRNGContext(fixed_seed):
+        correct_result = np.random.uniform(0, 1, 10)
+        global_state = np.random.get_state()[1]
+        result = random_number_generator(fixed_seed).uniform(0, 1, 10)
+        assert np.all(np.random.get_state()[1] == global_state)
+    assert np.all(result == correct_result)
+
+    rng = np.random.default_rng(fixed_seed)
+    assert random_number_generator(rng) is rng
+    result = random_number_generator(rng).uniform(0, 1, 10)
+    assert np.all(result == np.random.default_rng(fixed_seed).uniform(0, 1, 10))
+
+
+def test_child_seed():
+    assert child_seed(None, 0) is None
+    seeds = [child_seed(fixed_seed, i) for i in range(10)]
+    assert len(set(seeds)) == 10
+    assert seeds == [child_seed(fixed_seed, i) for i in range(10)]
+    assert child_seed(fixed_seed, 1, 2) != child_seed(fixed_seed, 2, 1)
+    assert child_seed(fixed_seed+1, 0) != child_seed(fixed_seed, 0)
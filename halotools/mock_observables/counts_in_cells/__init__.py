@@ -1,3 +1,4 @@
 """
 """
 from .counts_in_cylinders import counts_in_cylinders
+from .counts_in_cylinders_grid import counts_in_cylinders_grid
@@ -0,0 +1,320 @@
+""" Module containing the `~halotools.mock_observables.counts_in_cylinders_grid` function
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+import multiprocessing
+from functools import partial
+
+from .engines import counts_in_cylinders_grid_engine
+
+from ..mock_observables_helpers import (get_num_threads, get_period,
+    enforce_sample_has_correct_shape)
+from ..pair_counters.rectangular_mesh import RectangularDoubleMesh
+from ..pair_counters.mesh_helpers import (_set_approximate_cell_sizes,
+    _cell1_parallelization_indices, _enclose_in_box, _enforce_maximum_search_length)
+
+from ...utils import unsorting_indices
+from ...utils.array_utils import custom_len
+
+__author__ = ('Andrew Hearin', )
+
+__all__ = ('counts_in_cylinders_grid', )
+
+default_num_centers_per_block = int(1e6)
+
+
+def counts_in_cylinders_grid(sample1, sample2, proj_search_radii, cylinder_half_lengths,
+        period=None, return_histograms=False, num_threads=1,
+        approx_cell1_size=None, approx_cell2_size=None,
+        num_centers_per_block=default_num_centers_per_block):
+    """
+    Function counts the number of points in ``sample2`` inside cylinders
+    surrounding each point in ``sample1``, for every combination of
+    cylinder radius in ``proj_search_radii`` and
+    cylinder half-length in ``cylinder_half_lengths``.
+
+    All cylinder sizes are counted in a single pass over the pairs of points,
+    so that calling `counts_in_cylinders_grid` is much faster than calling
+    `~halotools.mock_observables.counts_in_cylinders` once for each cylinder size.
+    The counts can either be returned for each point in ``sample1``, or directly
+    accumulated into the counts-in-cells distribution :math:`P(N|R, L)`.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 3 numpy array containing 3-D positions of the cylinder centers.
+        See the :ref:`mock_obs_pos_formatting` documentation page, or the
+        Examples section below, for instructions on how to transform
+        your coordinate position arrays into the
+        format accepted by the ``sample1`` and ``sample2`` arguments.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    sample2 : array_like
+        Npts2 x 3 array containing 3-D positions of points.
+
+    proj_search_radii : array_like
+        Monotonically increasing array of strictly positive cylinder radii,
+        i.e., xy-distances.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    cylinder_half_lengths : array_like
+        Monotonically increasing array of strictly positive cylinder half-lengths,
+        i.e., z-distances. Thus the *total* length of each cylinder
+        is *twice* the corresponding value stored in ``cylinder_half_lengths``.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    period : array_like, optional
+        Length-3 array defining the periodic boundary conditions.
+        If only one number is specified, the enclosing volume is assumed to
+        be a periodic cube (by far the most common case).
+        If period is set to None, the default option,
+        PBCs are set to infinity.
+
+    return_histograms : bool, optional
+        If False, the default option, the function returns the number of points
+        in each cylinder surrounding each point in ``sample1``.
+        If True, the function instead returns the number of points in ``sample1``
+        whose cylinder contains exactly *N* points of ``sample2``,
+        so that the counts of individual points never need to be stored at once.
+
+    num_threads : int, optional
+        Number of threads to use in calculation, where parallelization is performed
+        using the python ``multiprocessing`` module. Default is 1 for a purely serial
+        calculation, in which case a multiprocessing Pool object will
+        never be instantiated. A string 'max' may be used to indicate that
+        the pair counters should use all available cores on the machine.
+
+    approx_cell1_size : array_like, optional
+        Length-3 array serving as a guess for the optimal manner by how points
+        will be apportioned into subvolumes of the simulation box.
+        The optimum choice unavoidably depends on the specs of your machine.
+        Default choice is to use the largest cylinder in each dimension,
+        which will return reasonable result performance for most use-cases.
+        Performance can vary sensitively with this parameter, so it is highly
+        recommended that you experiment with this parameter when carrying out
+        performance-critical calculations.
+
+    approx_cell2_size : array_like, optional
+        Analogous to ``approx_cell1_size``, but for sample2.  See comments for
+        ``approx_cell1_size`` for details.
+
+    num_centers_per_block : int, optional
+        Number of points in ``sample1`` whose cylinders are counted at a time.
+        Default is 1e6. When ``return_histograms`` is True,
+        the memory required by the calculation does not grow with the size of ``sample1``.
+
+    Returns
+    -------
+    counts : array_like
+        If ``return_histograms`` is False, integer array of shape
+        (Npts1, len(proj_search_radii), len(cylinder_half_lengths)) storing the
+        number of points in ``sample2`` inside the cylinder of radius
+        ``proj_search_radii[k]`` and half-length ``cylinder_half_lengths[g]``
+        surrounding each point in ``sample1``.
+
+        If ``return_histograms`` is True, integer array of shape
+        (len(proj_search_radii), len(cylinder_half_lengths), Nmax+1),
+        where Nmax is the largest number of points found in any cylinder.
+        The element [k, g, N] stores the number of points in ``sample1``
+        whose cylinder of radius ``proj_search_radii[k]`` and half-length
+        ``cylinder_half_lengths[g]`` contains exactly *N* points in ``sample2``.
+
+    Notes
+    -----
+    As in `~halotools.mock_observables.counts_in_cylinders`, a point of ``sample2``
+    lies inside a cylinder if its xy-distance and z-distance to the center
+    are strictly smaller than the cylinder radius and half-length.
+
+    Examples
+    --------
+    For demonstration purposes we create randomly distributed sets of points
+    within a periodic unit cube.
+
+    >>> Npts1, Npts2 = 1000, 5000
+    >>> Lbox = 1.0
+    >>> sample1 = np.random.random((Npts1, 3))
+    >>> sample2 = np.random.random((Npts2, 3))
+
+    Now we count the points of ``sample2`` in cylinders of four different radii
+    and three different half-lengths surrounding each point of ``sample1``:
+
+    >>> proj_search_radii = np.array([0.02, 0.04, 0.06, 0.08])
+    >>> cylinder_half_lengths = np.array([0.05, 0.1, 0.2])
+    >>> counts = counts_in_cylinders_grid(sample1, sample2, proj_search_radii, cylinder_half_lengths, period=Lbox)
+    >>> assert counts.shape == (Npts1, 4, 3)
+
+    The counts-in-cells distribution :math:`P(N|R, L)` can be computed directly:
+
+    >>> histograms = counts_in_cylinders_grid(sample1, sample2, proj_search_radii, cylinder_half_lengths, period=Lbox, return_histograms=True)
+    >>> prob_N = histograms/float(Npts1)
+
+    Here ``prob_N[k, g, N]`` is the probability that a cylinder of radius
+    ``proj_search_radii[k]`` and half-length ``cylinder_half_lengths[g]``
+    contains exactly *N* points.
+
+    """
+    result = _counts_in_cylinders_grid_process_args(sample1, sample2,
+        proj_search_radii, cylinder_half_lengths, period, num_threads,
+        approx_cell1_size, approx_cell2_size, num_centers_per_block)
+    x1in, y1in, z1in, x2in, y2in, z2in, proj_search_radii, cylinder_half_lengths = result[0:8]
+    period, num_threads, PBCs, approx_cell1_size, approx_cell2_size = result[8:13]
+    num_centers_per_block = result[13]
+    xperiod, yperiod, zperiod = period
+
+    rp_max = np.max(proj_search_radii)
+    pi_max = np.max(cylinder_half_lengths)
+    search_xlength, search_ylength, search_zlength = rp_max, rp_max, pi_max
+
+    # Compute the estimates for the cell sizes
+    approx_cell1_size, approx_cell2_size = (
+        _set_approximate_cell_sizes(approx_cell1_size, approx_cell2_size, period)
+        )
+    approx_x1cell_size, approx_y1cell_size, approx_z1cell_size = approx_cell1_size
+    approx_x2cell_size, approx_y2cell_size, approx_z2cell_size = approx_cell2_size
+
+    num_rp, num_pi = len(proj_search_radii), len(cylinder_half_lengths)
+    npts1 = len(x1in)
+    if return_histograms:
+        histograms = np.zeros((num_rp, num_pi, 1), dtype=np.int64)
+    else:
+        counts = np.zeros((npts1, num_rp, num_pi), dtype=np.int64)
+
+    # The mesh of sample2 is built for the first block and re-used for all others
+    mesh2 = None
+    pool = multiprocessing.Pool(num_threads) if num_threads > 1 else None
+    try:
+        for first in range(0, npts1, num_centers_per_block):
+            block = slice(first, first + num_centers_per_block)
+            x1, y1, z1 = x1in[block], y1in[block], z1in[block]
+
+            double_mesh = RectangularDoubleMesh(x1, y1, z1, x2in, y2in, z2in,
+                approx_x1cell_size, approx_y1cell_size, approx_z1cell_size,
+                approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
+                search_xlength, search_ylength, search_zlength,
+                xperiod, yperiod, zperiod, PBCs, mesh2=mesh2)
+            mesh2 = double_mesh.mesh2
+
+            # Create a function object that has a single argument, for parallelization purposes
+            engine = partial(counts_in_cylinders_grid_engine, double_mesh,
+                x1, y1, z1, x2in, y2in, z2in, proj_search_radii, cylinder_half_lengths)
+
+            # Calculate the cell1 indices that will be looped over by the engine
+            __, cell1_tuples = _cell1_parallelization_indices(
+                double_mesh.mesh1.ncells, num_threads)
+
+            if pool is not None:
+                block_counts = np.concatenate(pool.map(engine, cell1_tuples))
+            else:
+                block_counts = engine(cell1_tuples[0])
+
+            # Convert the counts of the smallest enclosing cylinder of each pair
+            # into the number of points inside each cylinder
+            block_counts = np.cumsum(np.cumsum(block_counts, axis=1), axis=2)
+
+            if return_histograms:
+                histograms = _accumulate_histograms(histograms, block_counts)
+            else:
+                idx_unsorted = unsorting_indices(double_mesh.mesh1.idx_sorted)
+                counts[block] = block_counts[idx_unsorted]
+    finally:
+        if pool is not None:
+            pool.close()
+
+    if return_histograms:
+        return histograms
+    else:
+        return counts
+
+
+def _accumulate_histograms(histograms, counts):
+    """ Add the number of points with each value of ``counts``
+    to the input ``histograms``, extending the last axis of ``histograms``
+    when ``counts`` exceeds its length.
+    """
+    num_rp, num_pi, num_counts = histograms.shape
+    max_count = np.max(counts) if counts.size > 0 else 0
+    if max_count >= num_counts:
+        padding = np.zeros((num_rp, num_pi, max_count + 1 - num_counts), dtype=np.int64)
+        histograms = np.concatenate((histograms, padding), axis=2)
+        num_counts = max_count + 1
+
+    offsets = np.arange(num_rp*num_pi)*num_counts
+    idx = (counts.reshape((-1, num_rp*num_pi)) + offsets).ravel()
+    histograms += np.bincount(idx, minlength=histograms.size).reshape(histograms.shape)
+    return histograms
+
+
+def _get_cylinder_size_array(x, name):
+    """ Verify that the input ``x`` is a monotonically increasing array
+    of strictly positive numbers.
+    """
+    x = np.atleast_1d(x).astype('f8')
+    try:
+        assert x.ndim == 1
+        assert len(x) > 0
+        assert np.all(x > 0)
+        assert np.all(np.diff(x) > 0)
+    except AssertionError:
+        msg = ("Input ``%s`` must be a monotonically increasing 1-D array \n"
+            "of strictly positive numbers" % name)
+        raise ValueError(msg)
+    return x
+
+
+def _counts_in_cylinders_grid_process_args(sample1, sample2,
+        proj_search_radii, cylinder_half_lengths, period, num_threads,
+        approx_cell1_size, approx_cell2_size, num_centers_per_block):
+    """
+    """
+    num_threads = get_num_threads(num_threads)
+
+    sample1 = enforce_sample_has_correct_shape(sample1)
+    sample2 = enforce_sample_has_correct_shape(sample2)
+
+    proj_search_radii = _get_cylinder_size_array(proj_search_radii, 'proj_search_radii')
+    cylinder_half_lengths = _get_cylinder_size_array(cylinder_half_lengths, 'cylinder_half_lengths')
+    max_rp_max = np.max(proj_search_radii)
+    max_pi_max = np.max(cylinder_half_lengths)
+
+    try:
+        num_centers_per_block = int(num_centers_per_block)
+        assert num_centers_per_block > 0
+    except (AssertionError, TypeError, ValueError):
+        msg = "Input ``num_centers_per_block`` must be a positive integer"
+        raise ValueError(msg)
+
+    period, PBCs = get_period(period)
+    # At this point, period may still be set to None,
+    # in which case we must remap our points inside the smallest enclosing cube
+    # and set ``period`` equal to this cube size.
+    if period is None:
+        x1, y1, z1, x2, y2, z2, period = (
+            _enclose_in_box(
+                sample1[:, 0], sample1[:, 1], sample1[:, 2],
+                sample2[:, 0], sample2[:, 1], sample2[:, 2],
+                min_size=[max_rp_max*3.0, max_rp_max*3.0, max_pi_max*3.0]))
+    else:
+        x1 = sample1[:, 0]
+        y1 = sample1[:, 1]
+        z1 = sample1[:, 2]
+        x2 = sample2[:, 0]
+        y2 = sample2[:, 1]
+        z2 = sample2[:, 2]
+
+    _enforce_maximum_search_length(max_rp_max, period[0])
+    _enforce_maximum_search_length(max_rp_max, period[1])
+    _enforce_maximum_search_length(max_pi_max, period[2])
+
+    if approx_cell1_size is None:
+        approx_cell1_size = [max_rp_max, max_rp_max, max_pi_max]
+    elif custom_len(approx_cell1_size) == 1:
+        approx_cell1_size = [approx_cell1_size, approx_cell1_size, approx_cell1_size]
+    if approx_cell2_size is None:
+        approx_cell2_size = [max_rp_max, max_rp_max, max_pi_max]
+    elif custom_len(approx_cell2_size) == 1:
+        approx_cell2_size = [approx_cell2_size, approx_cell2_size, approx_cell2_size]
+
+    return (x1, y1, z1, x2, y2, z2,
+        proj_search_radii, cylinder_half_lengths, period, num_threads, PBCs,
+        approx_cell1_size, approx_cell2_size, num_centers_per_block)
@@ -4,5 +4,6 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 from .counts_in_cylinders_engine import counts_in_cylinders_engine
+from .counts_in_cylinders_grid_engine import counts_in_cylinders_grid_engine
 
-__all__ = ('counts_in_cylinders_engine', )
+__all__ = ('counts_in_cylinders_engine', 'counts_in_cylinders_grid_engine')
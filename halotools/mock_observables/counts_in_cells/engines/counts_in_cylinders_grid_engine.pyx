@@ -0,0 +1,236 @@
+"""
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+
+from ...pair_counters.cpairs.bin_search cimport lower_bound_bin
+from ...isolation_functions.engines.cell_pruning cimport cell_separation
+
+__author__ = ('Andrew Hearin', )
+__all__ = ('counts_in_cylinders_grid_engine', )
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def counts_in_cylinders_grid_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
+        proj_search_radii, cylinder_half_lengths, cell1_tuple):
+    """
+    Cython engine counting the number of points in ``sample2`` inside
+    cylinders of every combination of radius and half-length
+    surrounding each point in ``sample1``.
+
+    Parameters
+    ----------
+    double_mesh : object
+        Instance of `~halotools.mock_observables.RectangularDoubleMesh`
+
+    x1in, y1in, z1in : arrays
+        Numpy arrays storing Cartesian coordinates of points in sample 1
+
+    x2in, y2in, z2in : arrays
+        Numpy arrays storing Cartesian coordinates of points in sample 2
+
+    proj_search_radii : numpy.array
+        Monotonically increasing array storing the radii of the cylinders.
+
+    cylinder_half_lengths : numpy.array
+        Monotonically increasing array storing the half-lengths of the cylinders.
+
+    cell1_tuple : tuple
+        Two-element tuple defining the first and last cells in
+        double_mesh.mesh1 that will be looped over. Intended for use with
+        python multiprocessing.
+
+    Returns
+    -------
+    counts : numpy.array
+        Integer array of shape (Npts, len(proj_search_radii), len(cylinder_half_lengths)),
+        where Npts is the number of ``sample1`` points in the cells of ``cell1_tuple``.
+        The rows are ordered as the points in ``double_mesh.mesh1.idx_sorted``.
+        Each pair is only counted in the element of the smallest
+        cylinder that contains it, so that the number of points in the
+        cylinder of radius ``proj_search_radii[k]`` and half-length
+        ``cylinder_half_lengths[g]`` is given by the sum of all elements
+        with indices no larger than *k* and *g*, i.e., by the cumulative sum of
+        ``counts`` along its last two axes.
+    """
+    cdef cnp.float64_t[:] rp_bins_squared = np.ascontiguousarray(
+        proj_search_radii*proj_search_radii, dtype=np.float64)
+    cdef cnp.float64_t[:] pi_bins_squared = np.ascontiguousarray(
+        cylinder_half_lengths*cylinder_half_lengths, dtype=np.float64)
+    cdef int num_rp_bins = len(proj_search_radii)
+    cdef int num_pi_bins = len(cylinder_half_lengths)
+    cdef cnp.float64_t rp_max_squared = rp_bins_squared[num_rp_bins-1]
+    cdef cnp.float64_t pi_max_squared = pi_bins_squared[num_pi_bins-1]
+
+    cdef cnp.float64_t xperiod = double_mesh.xperiod
+    cdef cnp.float64_t yperiod = double_mesh.yperiod
+    cdef cnp.float64_t zperiod = double_mesh.zperiod
+    cdef cnp.int64_t first_cell1_element = cell1_tuple[0]
+    cdef cnp.int64_t last_cell1_element = cell1_tuple[1]
+    cdef int PBCs = double_mesh._PBCs
+
+    cdef cnp.float64_t[:] x1_sorted = np.ascontiguousarray(
+        x1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y1_sorted = np.ascontiguousarray(
+        y1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z1_sorted = np.ascontiguousarray(
+        z1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] x2_sorted = np.ascontiguousarray(
+        x2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y2_sorted = np.ascontiguousarray(
+        y2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z2_sorted = np.ascontiguousarray(
+        z2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+
+    cdef cnp.int64_t icell1, icell2
+    cdef cnp.int64_t[:] cell1_indices = np.ascontiguousarray(
+        double_mesh.mesh1.cell_id_indices, dtype=np.int64)
+    cdef cnp.int64_t[:] cell2_indices = np.ascontiguousarray(
+        double_mesh.mesh2.cell_id_indices, dtype=np.int64)
+
+    cdef cnp.int64_t first_point1 = cell1_indices[first_cell1_element]
+    cdef cnp.int64_t last_point1 = cell1_indices[last_cell1_element]
+    cdef cnp.int64_t[:, :, :] counts = np.zeros(
+        (last_point1 - first_point1, num_rp_bins, num_pi_bins), dtype=np.int64)
+
+    cdef cnp.int64_t ifirst1, ilast1, ifirst2, ilast2, i, j
+
+    cdef int ix2, iy2, iz2, ix1, iy1, iz1
+    cdef int nonPBC_ix2, nonPBC_iy2, nonPBC_iz2
+
+    cdef int num_x2_covering_steps = int(np.ceil(
+        double_mesh.search_xlength / double_mesh.mesh2.xcell_size))
+    cdef int num_y2_covering_steps = int(np.ceil(
+        double_mesh.search_ylength / double_mesh.mesh2.ycell_size))
+    cdef int num_z2_covering_steps = int(np.ceil(
+        double_mesh.search_zlength / double_mesh.mesh2.zcell_size))
+
+    cdef int leftmost_ix2, rightmost_ix2
+    cdef int leftmost_iy2, rightmost_iy2
+    cdef int leftmost_iz2, rightmost_iz2
+
+    cdef int num_x1divs = double_mesh.mesh1.num_xdivs
+    cdef int num_y1divs = double_mesh.mesh1.num_ydivs
+    cdef int num_z1divs = double_mesh.mesh1.num_zdivs
+    cdef int num_x2divs = double_mesh.mesh2.num_xdivs
+    cdef int num_y2divs = double_mesh.mesh2.num_ydivs
+    cdef int num_z2divs = double_mesh.mesh2.num_zdivs
+    cdef int num_x2_per_x1 = num_x2divs // num_x1divs
+    cdef int num_y2_per_y1 = num_y2divs // num_y1divs
+    cdef int num_z2_per_z1 = num_z2divs // num_z1divs
+
+    cdef cnp.float64_t x1cell_size = double_mesh.mesh1.xcell_size
+    cdef cnp.float64_t y1cell_size = double_mesh.mesh1.ycell_size
+    cdef cnp.float64_t z1cell_size = double_mesh.mesh1.zcell_size
+    cdef cnp.float64_t x2cell_size = double_mesh.mesh2.xcell_size
+    cdef cnp.float64_t y2cell_size = double_mesh.mesh2.ycell_size
+    cdef cnp.float64_t z2cell_size = double_mesh.mesh2.zcell_size
+
+    cdef cnp.float64_t x2shift, y2shift, z2shift, dx, dy, dz, dxy_sq, dz_sq
+    cdef cnp.float64_t x1low, y1low, z1low, x2low, y2low, z2low
+    cdef cnp.float64_t dx_cell, dy_cell, dz_cell, dx_cell_sq
+    cdef cnp.float64_t x1tmp, y1tmp, z1tmp
+    cdef int k, g
+
+    for icell1 in range(first_cell1_element, last_cell1_element):
+        ifirst1 = cell1_indices[icell1]
+        ilast1 = cell1_indices[icell1+1]
+        if ilast1 == ifirst1:
+            continue
+
+        ix1 = icell1 // (num_y1divs*num_z1divs)
+        iy1 = (icell1 - ix1*num_y1divs*num_z1divs) // num_z1divs
+        iz1 = icell1 - (ix1*num_y1divs*num_z1divs) - (iy1*num_z1divs)
+        x1low = ix1*x1cell_size
+        y1low = iy1*y1cell_size
+        z1low = iz1*z1cell_size
+
+        leftmost_ix2 = ix1*num_x2_per_x1 - num_x2_covering_steps
+        leftmost_iy2 = iy1*num_y2_per_y1 - num_y2_covering_steps
+        leftmost_iz2 = iz1*num_z2_per_z1 - num_z2_covering_steps
+
+        rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps
+        rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps
+        rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps
+
+        for nonPBC_ix2 in range(leftmost_ix2, rightmost_ix2):
+            if nonPBC_ix2 < 0:
+                x2shift = -xperiod*PBCs
+            elif nonPBC_ix2 >= num_x2divs:
+                x2shift = +xperiod*PBCs
+            else:
+                x2shift = 0.
+            # Now apply the PBCs
+            ix2 = nonPBC_ix2 % num_x2divs
+
+            x2low = ix2*x2cell_size + x2shift
+            dx_cell = cell_separation(x1low, x1low + x1cell_size, x2low, x2low + x2cell_size)
+            dx_cell_sq = dx_cell*dx_cell
+            if dx_cell_sq >= rp_max_squared:
+                continue
+
+            for nonPBC_iy2 in range(leftmost_iy2, rightmost_iy2):
+                if nonPBC_iy2 < 0:
+                    y2shift = -yperiod*PBCs
+                elif nonPBC_iy2 >= num_y2divs:
+                    y2shift = +yperiod*PBCs
+                else:
+                    y2shift = 0.
+                # Now apply the PBCs
+                iy2 = nonPBC_iy2 % num_y2divs
+
+                y2low = iy2*y2cell_size + y2shift
+                dy_cell = cell_separation(y1low, y1low + y1cell_size, y2low, y2low + y2cell_size)
+                if dx_cell_sq + dy_cell*dy_cell >= rp_max_squared:
+                    continue
+
+                for nonPBC_iz2 in range(leftmost_iz2, rightmost_iz2):
+                    if nonPBC_iz2 < 0:
+                        z2shift = -zperiod*PBCs
+                    elif nonPBC_iz2 >= num_z2divs:
+                        z2shift = +zperiod*PBCs
+                    else:
+                        z2shift = 0.
+                    # Now apply the PBCs
+                    iz2 = nonPBC_iz2 % num_z2divs
+
+                    z2low = iz2*z2cell_size + z2shift
+                    dz_cell = cell_separation(z1low, z1low + z1cell_size, z2low, z2low + z2cell_size)
+                    if dz_cell*dz_cell >= pi_max_squared:
+                        continue
+
+                    icell2 = ix2*(num_y2divs*num_z2divs) + iy2*num_z2divs + iz2
+                    ifirst2 = cell2_indices[icell2]
+                    ilast2 = cell2_indices[icell2+1]
+                    if ilast2 == ifirst2:
+                        continue
+
+                    #loop over points in cell1
+                    for i in range(ifirst1, ilast1):
+                        x1tmp = x1_sorted[i] - x2shift
+                        y1tmp = y1_sorted[i] - y2shift
+                        z1tmp = z1_sorted[i] - z2shift
+
+                        #loop over points in cell2
+                        for j in range(ifirst2, ilast2):
+                            dx = x1tmp - x2_sorted[j]
+                            dy = y1tmp - y2_sorted[j]
+                            dz = z1tmp - z2_sorted[j]
+                            dxy_sq = dx*dx + dy*dy
+                            dz_sq = dz*dz
+
+                            if (dxy_sq < rp_max_squared) & (dz_sq < pi_max_squared):
+                                # index of the smallest cylinder strictly enclosing the pair
+                                k = lower_bound_bin(&rp_bins_squared[0], num_rp_bins, dxy_sq)
+                                if rp_bins_squared[k] == dxy_sq:
+                                    k = k + 1
+                                g = lower_bound_bin(&pi_bins_squared[0], num_pi_bins, dz_sq)
+                                if pi_bins_squared[g] == dz_sq:
+                                    g = g + 1
+                                counts[i - first_point1, k, g] += 1
+
+    return np.array(counts)
@@ -0,0 +1,113 @@
+""" Module providing testing for the `~halotools.mock_observables.counts_in_cylinders_grid` function.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from astropy.utils.misc import NumpyRNGContext
+from astropy.tests.helper import pytest
+
+from .pure_python_counts_in_cells import pure_python_counts_in_cylinders
+
+from ..counts_in_cylinders import counts_in_cylinders
+from ..counts_in_cylinders_grid import counts_in_cylinders_grid
+
+__all__ = ('test_counts_in_cylinders_grid_brute_force', )
+
+fixed_seed = 43
+
+
+def test_counts_in_cylinders_grid_brute_force():
+    """ Verify that each cylinder of the grid agrees with the brute force counts,
+    with and without periodic boundary conditions.
+    """
+    npts1, npts2 = 50, 200
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts1, 3))
+        sample2 = np.random.random((npts2, 3))
+    proj_search_radii = np.array([0.05, 0.1, 0.2])
+    cylinder_half_lengths = np.array([0.1, 0.3])
+
+    for period in (1, None):
+        counts = counts_in_cylinders_grid(sample1, sample2,
+            proj_search_radii, cylinder_half_lengths, period=period)
+        assert counts.shape == (npts1, 3, 2)
+        for k, rp_max in enumerate(proj_search_radii):
+            for g, pi_max in enumerate(cylinder_half_lengths):
+                correct_counts = pure_python_counts_in_cylinders(sample1, sample2,
+                    np.zeros(npts1) + rp_max, np.zeros(npts1) + pi_max, period=period)
+                assert np.all(counts[:, k, g] == correct_counts)
+    #  ensure the test is non-trivial
+    assert np.any(counts[:, 0, 0] == 0)
+    assert np.any(counts[:, 0, 0] > 0)
+
+
+def test_counts_in_cylinders_grid_agrees_with_counts_in_cylinders():
+    """ Verify that the grid of counts agrees with calling
+    `~halotools.mock_observables.counts_in_cylinders` once for each cylinder size.
+    """
+    npts1, npts2 = 500, 1000
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts1, 3))
+        sample2 = np.random.random((npts2, 3))
+    proj_search_radii = np.array([0.01, 0.05, 0.1])
+    cylinder_half_lengths = np.array([0.02, 0.1, 0.25])
+
+    counts = counts_in_cylinders_grid(sample1, sample2,
+        proj_search_radii, cylinder_half_lengths, period=1)
+    for k, rp_max in enumerate(proj_search_radii):
+        for g, pi_max in enumerate(cylinder_half_lengths):
+            correct_counts = counts_in_cylinders(sample1, sample2, rp_max, pi_max, period=1)
+            assert np.all(counts[:, k, g] == correct_counts)
+
+
+def test_counts_in_cylinders_grid_histograms():
+    """ Verify that the histograms returned when ``return_histograms`` is True
+    agree with the histograms of the per-object counts, and that neither depends on
+    how ``sample1`` is divided into blocks or on the number of processes.
+    """
+    npts1, npts2 = 500, 1000
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts1, 3))
+        sample2 = np.random.random((npts2, 3))
+    proj_search_radii = np.array([0.01, 0.05, 0.1])
+    cylinder_half_lengths = np.array([0.02, 0.1, 0.25])
+
+    counts = counts_in_cylinders_grid(sample1, sample2,
+        proj_search_radii, cylinder_half_lengths, period=1)
+    counts2 = counts_in_cylinders_grid(sample1, sample2,
+        proj_search_radii, cylinder_half_lengths, period=1,
+        num_centers_per_block=77, num_threads=2)
+    assert np.all(counts == counts2)
+
+    histograms = counts_in_cylinders_grid(sample1, sample2,
+        proj_search_radii, cylinder_half_lengths, period=1,
+        return_histograms=True, num_centers_per_block=77)
+    assert histograms.shape == (3, 3, counts.max() + 1)
+    assert np.all(histograms.sum(axis=2) == npts1)
+    for k in range(len(proj_search_radii)):
+        for g in range(len(cylinder_half_lengths)):
+            correct_histogram = np.bincount(counts[:, k, g], minlength=histograms.shape[2])
+            assert np.all(histograms[k, g] == correct_histogram)
+
+
+def test_counts_in_cylinders_grid_error_handling():
+    npts1, npts2 = 50, 200
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts1, 3))
+        sample2 = np.random.random((npts2, 3))
+
+    with pytest.raises(ValueError) as err:
+        __ = counts_in_cylinders_grid(sample1, sample2, [0.1, 0.05], [0.1], period=1)
+    substr = "Input ``proj_search_radii`` must be a monotonically increasing 1-D array"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        __ = counts_in_cylinders_grid(sample1, sample2, [0.05, 0.1], [0, 0.1], period=1)
+    substr = "Input ``cylinder_half_lengths`` must be a monotonically increasing 1-D array"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        __ = counts_in_cylinders_grid(sample1, sample2, [0.05, 0.1], [0.1], period=1,
+            num_centers_per_block=0)
+    substr = "Input ``num_centers_per_block`` must be a positive integer"
+    assert substr in err.value.args[0]
@@ -0,0 +1,7 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from .fof_xy_z_engine import fof_xy_z_engine, merge_fof_labels
+
+__all__ = ('fof_xy_z_engine', 'merge_fof_labels')
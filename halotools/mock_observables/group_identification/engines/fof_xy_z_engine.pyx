@@ -0,0 +1,241 @@
+"""
+"""
+from __future__ import (absolute_import, division, print_function, unicode_literals)
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+
+__author__ = ('Andrew Hearin', 'Duncan Campbell')
+__all__ = ('fof_xy_z_engine', 'merge_fof_labels')
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def fof_xy_z_engine(double_mesh, x1in, y1in, z1in, d_perp, d_para, cell1_tuple):
+    """ Cython engine linking friends-of-friends groups of points
+    with separate linking lengths in the xy-plane and along the z-direction.
+
+    Rather than storing the linked pairs, the engine merges the groups of
+    each linked pair with a disjoint-set (union-find) forest as the pairs are found,
+    so that the memory used by the engine is proportional to the number of points.
+
+    Parameters
+    ------------
+    double_mesh : object
+        Instance of `~halotools.mock_observables.RectangularDoubleMesh`
+        built with the points as both sample 1 and sample 2.
+
+    x1in, y1in, z1in : arrays
+        Numpy arrays storing Cartesian coordinates of the points
+
+    d_perp : float
+        Linking length in the xy-plane
+
+    d_para : float
+        Linking length in the z-direction
+
+    cell1_tuple : tuple
+        Two-element tuple defining the first and last cells in
+        double_mesh.mesh1 that will be looped over. Intended for use with
+        python multiprocessing.
+
+    Returns
+    --------
+    labels : array
+        Integer array of length len(x1in). Two points are in the same group
+        among the pairs found in the cells of ``cell1_tuple`` if and only if
+        they have the same label, which is the index of one of the points of the group.
+    """
+    cdef cnp.float64_t d_perp_squared = d_perp*d_perp
+    cdef cnp.float64_t d_para_squared = d_para*d_para
+    cdef cnp.float64_t xperiod = double_mesh.xperiod
+    cdef cnp.float64_t yperiod = double_mesh.yperiod
+    cdef cnp.float64_t zperiod = double_mesh.zperiod
+    cdef cnp.int64_t first_cell1_element = cell1_tuple[0]
+    cdef cnp.int64_t last_cell1_element = cell1_tuple[1]
+    cdef int PBCs = double_mesh._PBCs
+
+    idx_sorted = np.ascontiguousarray(double_mesh.mesh1.idx_sorted, dtype=np.int64)
+    cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z1 = np.ascontiguousarray(z1in[idx_sorted], dtype=np.float64)
+
+    # parent[i] is the parent of the point stored in position i of the sorted arrays
+    cdef cnp.int64_t[:] parent = np.arange(len(idx_sorted), dtype=np.int64)
+
+    cdef cnp.int64_t icell1, icell2
+    cdef cnp.int64_t[:] cell1_indices = np.ascontiguousarray(double_mesh.mesh1.cell_id_indices, dtype=np.int64)
+    cdef cnp.int64_t[:] cell2_indices = np.ascontiguousarray(double_mesh.mesh2.cell_id_indices, dtype=np.int64)
+
+    cdef cnp.int64_t ifirst1, ilast1, ifirst2, ilast2
+
+    cdef int ix2, iy2, iz2, ix1, iy1, iz1
+    cdef int nonPBC_ix2, nonPBC_iy2, nonPBC_iz2
+
+    cdef int num_x2_covering_steps = int(np.ceil(
+        double_mesh.search_xlength / double_mesh.mesh2.xcell_size))
+    cdef int num_y2_covering_steps = int(np.ceil(
+        double_mesh.search_ylength / double_mesh.mesh2.ycell_size))
+    cdef int num_z2_covering_steps = int(np.ceil(
+        double_mesh.search_zlength / double_mesh.mesh2.zcell_size))
+
+    cdef int leftmost_ix2, rightmost_ix2
+    cdef int leftmost_iy2, rightmost_iy2
+    cdef int leftmost_iz2, rightmost_iz2
+
+    cdef int num_x1divs = double_mesh.mesh1.num_xdivs
+    cdef int num_y1divs = double_mesh.mesh1.num_ydivs
+    cdef int num_z1divs = double_mesh.mesh1.num_zdivs
+    cdef int num_x2divs = double_mesh.mesh2.num_xdivs
+    cdef int num_y2divs = double_mesh.mesh2.num_ydivs
+    cdef int num_z2divs = double_mesh.mesh2.num_zdivs
+    cdef int num_x2_per_x1 = num_x2divs // num_x1divs
+    cdef int num_y2_per_y1 = num_y2divs // num_y1divs
+    cdef int num_z2_per_z1 = num_z2divs // num_z1divs
+
+    cdef cnp.float64_t x2shift, y2shift, z2shift, dx, dy, dz
+    cdef cnp.float64_t x1tmp, y1tmp, z1tmp
+    cdef cnp.int64_t i, j, jfirst2
+    cdef int wrapped
+
+    for icell1 in range(first_cell1_element, last_cell1_element):
+        ifirst1 = cell1_indices[icell1]
+        ilast1 = cell1_indices[icell1+1]
+
+        if ilast1 > ifirst1:
+
+            ix1 = icell1 // (num_y1divs*num_z1divs)
+            iy1 = (icell1 - ix1*num_y1divs*num_z1divs) // num_z1divs
+            iz1 = icell1 - (ix1*num_y1divs*num_z1divs) - (iy1*num_z1divs)
+
+            leftmost_ix2 = ix1*num_x2_per_x1 - num_x2_covering_steps
+            leftmost_iy2 = iy1*num_y2_per_y1 - num_y2_covering_steps
+            leftmost_iz2 = iz1*num_z2_per_z1 - num_z2_covering_steps
+
+            rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps
+            rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps
+            rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps
+
+            for nonPBC_ix2 in range(leftmost_ix2, rightmost_ix2):
+                if nonPBC_ix2 < 0:
+                    x2shift = -xperiod*PBCs
+                elif nonPBC_ix2 >= num_x2divs:
+                    x2shift = +xperiod*PBCs
+                else:
+                    x2shift = 0.
+                # Now apply the PBCs
+                ix2 = nonPBC_ix2 % num_x2divs
+
+                for nonPBC_iy2 in range(leftmost_iy2, rightmost_iy2):
+                    if nonPBC_iy2 < 0:
+                        y2shift = -yperiod*PBCs
+                    elif nonPBC_iy2 >= num_y2divs:
+                        y2shift = +yperiod*PBCs
+                    else:
+                        y2shift = 0.
+                    # Now apply the PBCs
+                    iy2 = nonPBC_iy2 % num_y2divs
+
+                    for nonPBC_iz2 in range(leftmost_iz2, rightmost_iz2):
+                        if nonPBC_iz2 < 0:
+                            z2shift = -zperiod*PBCs
+                        elif nonPBC_iz2 >= num_z2divs:
+                            z2shift = +zperiod*PBCs
+                        else:
+                            z2shift = 0.
+                        # Now apply the PBCs
+                        iz2 = nonPBC_iz2 % num_z2divs
+
+                        icell2 = ix2*(num_y2divs*num_z2divs) + iy2*num_z2divs + iz2
+
+                        # Linking is symmetric, and the cell pair (icell2, icell1) is visited
+                        # with the opposite shift, so only the cell pairs with icell2 >= icell1,
+                        # and the pairs j > i within the same unshifted cell, are needed
+                        if icell2 < icell1:
+                            continue
+                        wrapped = (nonPBC_ix2 != ix2) | (nonPBC_iy2 != iy2) | (nonPBC_iz2 != iz2)
+
+                        ifirst2 = cell2_indices[icell2]
+                        ilast2 = cell2_indices[icell2+1]
+
+                        for i in range(ifirst1, ilast1):
+                            x1tmp = x1[i] - x2shift
+                            y1tmp = y1[i] - y2shift
+                            z1tmp = z1[i] - z2shift
+                            if (icell2 == icell1) & (wrapped == 0):
+                                jfirst2 = i + 1
+                            else:
+                                jfirst2 = ifirst2
+                            for j in range(jfirst2, ilast2):
+                                dx = x1tmp - x1[j]
+                                dy = y1tmp - y1[j]
+                                dz = z1tmp - z1[j]
+                                if (dx*dx + dy*dy <= d_perp_squared) & (dz*dz <= d_para_squared):
+                                    _union(&parent[0], i, j)
+
+    # Return the label of each point in the order of the input arrays
+    roots = np.empty(len(idx_sorted), dtype=np.int64)
+    cdef cnp.int64_t[:] roots_view = roots
+    for i in range(len(idx_sorted)):
+        roots_view[i] = _find(&parent[0], i)
+    labels = np.empty(len(idx_sorted), dtype=np.int64)
+    labels[idx_sorted] = idx_sorted[roots]
+    return labels
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def merge_fof_labels(list_of_labels):
+    """ Merge the groups found by several calls to `fof_xy_z_engine`
+    over different ranges of cells.
+
+    Parameters
+    ------------
+    list_of_labels : list
+        List of the integer arrays returned by `fof_xy_z_engine`
+
+    Returns
+    --------
+    labels : array
+        Integer array in which two points have the same label if and only if
+        they are connected by the pairs found in any of the calls.
+    """
+    cdef cnp.int64_t npts = len(list_of_labels[0])
+    cdef cnp.int64_t[:] parent = np.arange(npts, dtype=np.int64)
+    cdef cnp.int64_t[:] labels
+    cdef cnp.int64_t i
+
+    for partial_labels in list_of_labels:
+        labels = np.ascontiguousarray(partial_labels, dtype=np.int64)
+        for i in range(npts):
+            if labels[i] != i:
+                _union(&parent[0], i, labels[i])
+
+    result = np.empty(npts, dtype=np.int64)
+    cdef cnp.int64_t[:] result_view = result
+    for i in range(npts):
+        result_view[i] = _find(&parent[0], i)
+    return result
+
+
+cdef inline cnp.int64_t _find(cnp.int64_t* parent, cnp.int64_t i) nogil:
+    """ Return the root of the tree containing i, halving the path along the way.
+    """
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+cdef inline void _union(cnp.int64_t* parent, cnp.int64_t i, cnp.int64_t j) nogil:
+    """ Merge the trees containing i and j, attaching the larger root to the smaller one.
+    """
+    i = _find(parent, i)
+    j = _find(parent, j)
+    if i < j:
+        parent[j] = i
+    elif j < i:
+        parent[i] = j
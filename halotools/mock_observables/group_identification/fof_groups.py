@@ -5,9 +5,14 @@ identify friends-of-friends groups of points.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import numpy as np
-from scipy.sparse import csgraph, csr_matrix
+import multiprocessing
+from functools import partial
+from scipy.sparse import csr_matrix
 
+from .engines import fof_xy_z_engine, merge_fof_labels
 from ..pair_counters.pairwise_distance_xy_z import pairwise_distance_xy_z
+from ..pair_counters.rectangular_mesh import RectangularDoubleMesh
+from ..pair_counters.mesh_helpers import _cell1_parallelization_indices
 
 from ...custom_exceptions import HalotoolsError
 
@@ -74,6 +79,15 @@ class FoFGroups(object):
             never be instantiated. A string 'max' may be used to indicate that
             the pair counters should use all available cores on the machine.
 
+        Notes
+        -----
+        Groups are linked by a disjoint-set (union-find) engine that merges groups as
+        linked pairs are found on a mesh of the points, so that memory usage is proportional
+        to the number of points rather than to the number of linked pairs.
+        The sparse matrices of pairwise separations ``m_perp``, ``m_para`` and ``m``
+        are only computed the first time they are accessed, e.g.,
+        by the methods requiring the igraph package.
+
         Examples
         --------
         In this example we will populate the `~halotools.sim_manager.FakeSim`
@@ -162,12 +176,80 @@ class FoFGroups(object):
         self.n_gal = len(positions)/self.volume
         self.d_perp = self.b_perp/(self.n_gal**(1.0/3.0))
         self.d_para = self.b_para/(self.n_gal**(1.0/3.0))
-        self.m_perp, self.m_para = pairwise_distance_xy_z(
+
+        if num_threads == 'max':
+            num_threads = multiprocessing.cpu_count()
+        self.num_threads = num_threads
+
+        roots = self._fof_roots(num_threads)
+        # Label the groups in order of their first member, as scipy.sparse.csgraph does
+        __, first_members, inverse = np.unique(roots, return_index=True, return_inverse=True)
+        group_order = np.empty(len(first_members), dtype=int)
+        group_order[np.argsort(first_members)] = np.arange(len(first_members))
+        self._n_groups = len(first_members)
+        self._group_ids = group_order[inverse]
+
+    def _fof_roots(self, num_threads):
+        r"""
+        Return an array in which two points have the same entry if and only if
+        they belong to the same friends-of-friends group.
+        """
+        x, y, z = (self.positions[:, 0], self.positions[:, 1], self.positions[:, 2])
+        xperiod, yperiod, zperiod = self.Lbox
+
+        double_mesh = RectangularDoubleMesh(x, y, z, x, y, z,
+            self.d_perp, self.d_perp, self.d_para,
+            self.d_perp, self.d_perp, self.d_para,
+            self.d_perp, self.d_perp, self.d_para, xperiod, yperiod, zperiod, True)
+
+        engine = partial(fof_xy_z_engine, double_mesh, x, y, z, self.d_perp, self.d_para)
+
+        num_threads, cell1_tuples = _cell1_parallelization_indices(
+            double_mesh.mesh1.ncells, num_threads)
+
+        if num_threads > 1:
+            pool = multiprocessing.Pool(num_threads)
+            result = pool.map(engine, cell1_tuples)
+            pool.close()
+            return merge_fof_labels(result)
+        else:
+            return engine(cell1_tuples[0])
+
+    def _compute_distance_matrices(self):
+        self._m_perp, self._m_para = pairwise_distance_xy_z(
             self.positions, self.positions, self.d_perp, self.d_para,
-            period=self.period, num_threads=num_threads)
+            period=self.period, num_threads=self.num_threads)
+
+    @property
+    def m_perp(self):
+        r"""
+        Sparse matrix storing the perpendicular separation of all linked pairs,
+        computed the first time it is accessed.
+        """
+        if getattr(self, '_m_perp', None) is None:
+            self._compute_distance_matrices()
+        return self._m_perp
+
+    @property
+    def m_para(self):
+        r"""
+        Sparse matrix storing the parallel separation of all linked pairs,
+        computed the first time it is accessed.
+        """
+        if getattr(self, '_m_para', None) is None:
+            self._compute_distance_matrices()
+        return self._m_para
 
-        self.m = self.m_perp.multiply(self.m_perp)+self.m_para.multiply(self.m_para)
-        self.m = self.m.sqrt()
+    @property
+    def m(self):
+        r"""
+        Sparse matrix storing the total separation of all linked pairs,
+        computed the first time it is accessed.
+        """
+        if getattr(self, '_m', None) is None:
+            m = self.m_perp.multiply(self.m_perp)+self.m_para.multiply(self.m_para)
+            self._m = m.sqrt()
+        return self._m
 
     @property
     def group_ids(self):
@@ -183,9 +265,6 @@ class FoFGroups(object):
             array of group IDs for each galaxy
 
         """
-        if getattr(self, '_group_ids', None) is None:
-            self._n_groups, self._group_ids = csgraph.connected_components(
-                self.m_perp, directed=False, return_labels=True)
         return self._group_ids
 
     @property
@@ -199,9 +278,6 @@ class FoFGroups(object):
             number of distinct groups
 
         """
-        if getattr(self, '_n_groups', None) is None:
-            self._n_groups = csgraph.connected_components(self.m_perp,
-                directed=False, return_labels=False)
         return self._n_groups
 
     def create_graph(self):
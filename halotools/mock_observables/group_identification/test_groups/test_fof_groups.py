@@ -3,7 +3,7 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import numpy as np
-from scipy.sparse import coo_matrix
+from scipy.sparse import coo_matrix, csgraph
 from astropy.tests.helper import pytest
 from astropy.utils.misc import NumpyRNGContext
 
@@ -17,7 +17,7 @@ except ImportError:
     print("igraph package not installed.  Some functions will not be available.")
 
 __all__ = ['test_fof_groups_init', 'test_fof_group_IDs',
-           'test_igraph_functionality']
+           'test_igraph_functionality', 'test_fof_group_IDs_agree_with_distance_matrix']
 
 # set random seed to get consistent behavior
 N = 1000
@@ -92,3 +92,23 @@ def test_igraph_functionality():
 
     else:
         pass
+
+
+def test_fof_group_IDs_agree_with_distance_matrix():
+    """
+    test that the groups linked by the union-find engine are the connected components
+    of the sparse matrix of linked pairs, for serial and parallel calculations
+    """
+    with NumpyRNGContext(fixed_seed):
+        clustered_sample = np.concatenate([np.random.random((500, 3)),
+            np.random.normal(loc=0.5, scale=0.03, size=(500, 3)) % 1.])
+
+    for num_threads in (1, 2):
+        fof_group = FoFGroups(clustered_sample, 0.2, 0.7, Lbox=Lbox, num_threads=num_threads)
+        assert getattr(fof_group, '_m_perp', None) is None
+
+        n_groups, correct_group_IDs = csgraph.connected_components(
+            fof_group.m_perp, directed=False, return_labels=True)
+        assert fof_group.n_groups == n_groups
+        assert np.all(fof_group.group_ids == correct_group_IDs)
+        assert 1 < n_groups < len(clustered_sample)
@@ -297,7 +297,9 @@ def conditional_cylindrical_isolation(sample1, sample2, rp_max, pi_max,
     if num_threads > 1:
         pool = multiprocessing.Pool(num_threads)
         result = pool.map(engine, cell1_tuples)
-        counts = np.sum(np.array(result), axis=0)
+        # Each process only searches the neighbors of the points in its own cells,
+        # so a point is isolated only if no process found a neighbor
+        counts = np.prod(np.array(result), axis=0)
         pool.close()
     else:
         counts = engine(cell1_tuples[0])
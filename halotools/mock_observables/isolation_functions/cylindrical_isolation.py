@@ -16,7 +16,7 @@ from ..mock_observables_helpers import enforce_sample_respects_pbcs, get_num_thr
 from ..pair_counters.rectangular_mesh import RectangularDoubleMesh
 from ..pair_counters.mesh_helpers import (
     _set_approximate_cell_sizes, _cell1_parallelization_indices, _enclose_in_box,
-    _enforce_maximum_search_length)
+    _enforce_maximum_search_length, _is_auto_count, _double_mesh_supports_auto_count)
 
 __all__ = ('cylindrical_isolation', )
 
@@ -180,9 +180,14 @@ def cylindrical_isolation(sample1, sample2, rp_max, pi_max, period=None,
         approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
         search_xlength, search_ylength, search_zlength, xperiod, yperiod, zperiod, PBCs)
 
+    # When the two samples are identical, each neighbor found flags both points of the pair
+    autocorrelation = (_is_auto_count(x1in, y1in, z1in, x2in, y2in, z2in) &
+        _double_mesh_supports_auto_count(double_mesh))
+
     # Create a function object that has a single argument, for parallelization purposes
     engine = partial(cylindrical_isolation_engine,
-        double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, rp_max, pi_max)
+        double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, rp_max, pi_max,
+        autocorrelation=autocorrelation)
 
     # Calculate the cell1 indices that will be looped over by the engine
     num_threads, cell1_tuples = _cell1_parallelization_indices(
@@ -191,7 +196,9 @@ def cylindrical_isolation(sample1, sample2, rp_max, pi_max, period=None,
     if num_threads > 1:
         pool = multiprocessing.Pool(num_threads)
         result = pool.map(engine, cell1_tuples)
-        counts = np.sum(np.array(result), axis=0)
+        # Each process only searches the neighbors of the points in its own cells,
+        # so a point is isolated only if no process found a neighbor
+        counts = np.prod(np.array(result), axis=0)
         pool.close()
     else:
         counts = engine(cell1_tuples[0])
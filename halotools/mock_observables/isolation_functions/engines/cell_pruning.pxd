@@ -0,0 +1,18 @@
+cimport numpy as cnp
+
+cdef inline cnp.float64_t cell_separation(cnp.float64_t low1, cnp.float64_t high1,
+        cnp.float64_t low2, cnp.float64_t high2) nogil:
+    """ Return the minimum separation along one dimension between any point
+    in the interval [low1, high1] and any point in the interval [low2, high2],
+    or 0 if the two intervals overlap.
+
+    Isolation engines use this lower bound on the separation between the points
+    of two cells to skip the cell pairs that are farther apart than the largest
+    search radius of the points in the first cell.
+    """
+    if low2 > high1:
+        return low2 - high1
+    elif low1 > high2:
+        return low1 - high2
+    else:
+        return 0.
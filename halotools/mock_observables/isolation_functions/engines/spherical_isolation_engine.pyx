@@ -6,7 +6,8 @@ from __future__ import (absolute_import, division, print_function, unicode_liter
 import numpy as np
 cimport numpy as cnp
 cimport cython 
-from libc.math cimport ceil 
+from libc.math cimport ceil
+from .cell_pruning cimport cell_separation
 
 __author__ = ('Andrew Hearin', 'Duncan Campbell')
 __all__ = ('spherical_isolation_engine', )
@@ -14,7 +15,8 @@ __all__ = ('spherical_isolation_engine', )
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.nonecheck(False)
-def spherical_isolation_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, r_max, cell1_tuple):
+def spherical_isolation_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, r_max, cell1_tuple,
+        autocorrelation=False):
     """
     Cython engine for determining if points in 'sample 1' are isolated, meaning no 
     neighbors within a spherical volume, with respect to points in 'sample 2'.
@@ -51,6 +53,13 @@ def spherical_isolation_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
         double_mesh.mesh1 that will be looped over. Intended for use with 
         python multiprocessing. 
         
+    autocorrelation : bool, optional
+        If True, sample 2 is identical to sample 1 and both meshes of ``double_mesh``
+        have identical cells. Whenever a point j is found to be a neighbor of a point i,
+        point j is also flagged as having a neighbor if i lies within the search volume of j,
+        so that the cell of j is skipped entirely once all of its points are flagged.
+        Default is False.
+        
     Returns
     -------
     is_isolated : numpy.array
@@ -108,36 +117,60 @@ def spherical_isolation_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     cdef int num_z2_per_z1 = num_z2divs // num_z1divs
 
     cdef cnp.float64_t x2shift, y2shift, z2shift, dx, dy, dz, dsq
-    cdef cnp.float64_t x1tmp, y1tmp, z1tmp, r_max_squaredtmp 
-    cdef int Ni, Nj, i, j, k, l, current_data1_index
-
-    cdef cnp.float64_t[:] x_icell1, x_icell2
-    cdef cnp.float64_t[:] y_icell1, y_icell2
-    cdef cnp.float64_t[:] z_icell1, z_icell2
+    cdef cnp.float64_t x1tmp, y1tmp, z1tmp, r_max_squaredtmp
+    cdef cnp.int64_t i, j
+    cdef int Ni
+
+    # Cell sizes used to bound the separation between the points of two cells
+    cdef cnp.float64_t x1cell_size = double_mesh.mesh1.xcell_size
+    cdef cnp.float64_t y1cell_size = double_mesh.mesh1.ycell_size
+    cdef cnp.float64_t z1cell_size = double_mesh.mesh1.zcell_size
+    cdef cnp.float64_t x2cell_size = double_mesh.mesh2.xcell_size
+    cdef cnp.float64_t y2cell_size = double_mesh.mesh2.ycell_size
+    cdef cnp.float64_t z2cell_size = double_mesh.mesh2.zcell_size
+    cdef cnp.float64_t x1low, y1low, z1low, x2low, y2low, z2low
+    cdef cnp.float64_t dx_cell, dy_cell, dz_cell, dx_cell_sq, dxy_cell_sq, dxyz_cell_sq
+    cdef cnp.float64_t max_r_max_squared_icell1
+    cdef int auto = bool(autocorrelation)
+
+    # Number of points of each cell of mesh1 that are known to have a neighbor,
+    # so that a cell can be abandoned as soon as all of its points are flagged
+    cdef cnp.int64_t[:] num_flagged = np.zeros(Ncell1, dtype=np.int64)
+    cdef int icell1_done
 
     for icell1 in range(first_cell1_element, last_cell1_element):
         ifirst1 = cell1_indices[icell1]
         ilast1 = cell1_indices[icell1+1]
-        x_icell1 = x1[ifirst1:ilast1]
-        y_icell1 = y1[ifirst1:ilast1]
-        z_icell1 = z1[ifirst1:ilast1]
 
         Ni = ilast1 - ifirst1
-        if Ni > 0:
+        if (Ni > 0) & (num_flagged[icell1] < Ni):
 
             ix1 = icell1 // (num_y1divs*num_z1divs)
             iy1 = (icell1 - ix1*num_y1divs*num_z1divs) // num_z1divs
             iz1 = icell1 - (ix1*num_y1divs*num_z1divs) - (iy1*num_z1divs)
 
+            x1low = ix1*x1cell_size
+            y1low = iy1*y1cell_size
+            z1low = iz1*z1cell_size
+
+            # Largest search length of the points in cell1
+            max_r_max_squared_icell1 = 0.
+            for i in range(ifirst1, ilast1):
+                if r_max_squared[i] > max_r_max_squared_icell1:
+                    max_r_max_squared_icell1 = r_max_squared[i]
+
             leftmost_ix2 = ix1*num_x2_per_x1 - num_x2_covering_steps
             leftmost_iy2 = iy1*num_y2_per_y1 - num_y2_covering_steps
             leftmost_iz2 = iz1*num_z2_per_z1 - num_z2_covering_steps
 
-            rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps 
-            rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps 
-            rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps 
+            rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps
+            rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps
+            rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps
 
+            icell1_done = 0
             for nonPBC_ix2 in range(leftmost_ix2, rightmost_ix2):
+                if icell1_done:
+                    break
                 if nonPBC_ix2 < 0:
                     x2shift = -xperiod*PBCs
                 elif nonPBC_ix2 >= num_x2divs:
@@ -147,7 +180,16 @@ def spherical_isolation_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
                 # Now apply the PBCs
                 ix2 = nonPBC_ix2 % num_x2divs
 
+                # Skip the cells that are too far from cell1 to contain a neighbor
+                x2low = ix2*x2cell_size + x2shift
+                dx_cell = cell_separation(x1low, x1low + x1cell_size, x2low, x2low + x2cell_size)
+                dx_cell_sq = dx_cell*dx_cell
+                if dx_cell_sq >= max_r_max_squared_icell1:
+                    continue
+
                 for nonPBC_iy2 in range(leftmost_iy2, rightmost_iy2):
+                    if icell1_done:
+                        break
                     if nonPBC_iy2 < 0:
                         y2shift = -yperiod*PBCs
                     elif nonPBC_iy2 >= num_y2divs:
@@ -157,7 +199,16 @@ def spherical_isolation_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
                     # Now apply the PBCs
                     iy2 = nonPBC_iy2 % num_y2divs
 
+                    # Skip the cells that are too far from cell1 to contain a neighbor
+                    y2low = iy2*y2cell_size + y2shift
+                    dy_cell = cell_separation(y1low, y1low + y1cell_size, y2low, y2low + y2cell_size)
+                    dxy_cell_sq = dx_cell_sq + dy_cell*dy_cell
+                    if dxy_cell_sq >= max_r_max_squared_icell1:
+                        continue
+
                     for nonPBC_iz2 in range(leftmost_iz2, rightmost_iz2):
+                        if icell1_done:
+                            break
                         if nonPBC_iz2 < 0:
                             z2shift = -zperiod*PBCs
                         elif nonPBC_iz2 >= num_z2divs:
@@ -167,36 +218,54 @@ def spherical_isolation_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
                         # Now apply the PBCs
                         iz2 = nonPBC_iz2 % num_z2divs
 
+                        # Skip the cells that are too far from cell1 to contain a neighbor
+                        z2low = iz2*z2cell_size + z2shift
+                        dz_cell = cell_separation(z1low, z1low + z1cell_size, z2low, z2low + z2cell_size)
+                        dxyz_cell_sq = dxy_cell_sq + dz_cell*dz_cell
+                        if dxyz_cell_sq >= max_r_max_squared_icell1:
+                            continue
+
                         icell2 = ix2*(num_y2divs*num_z2divs) + iy2*num_z2divs + iz2
                         ifirst2 = cell2_indices[icell2]
                         ilast2 = cell2_indices[icell2+1]
 
-                        x_icell2 = x2[ifirst2:ilast2]
-                        y_icell2 = y2[ifirst2:ilast2]
-                        z_icell2 = z2[ifirst2:ilast2]
-
-                        Nj = ilast2 - ifirst2
                         #loop over points in cell1 points
-                        if Nj > 0:
-                            for i in range(0,Ni):
-                                current_data1_index = ifirst1 + i
-                                x1tmp = x_icell1[i] - x2shift
-                                y1tmp = y_icell1[i] - y2shift
-                                z1tmp = z_icell1[i] - z2shift
-                                r_max_squaredtmp = r_max_squared[ifirst1+i]
-                                
-                                #loop over points in cell2 points
-                                for j in range(0,Nj):
-                                    #calculate the square distance
-                                    dx = x1tmp - x_icell2[j]
-                                    dy = y1tmp - y_icell2[j]
-                                    dz = z1tmp - z_icell2[j]
-                                    dsq = dx*dx + dy*dy + dz*dz
-
-                                    if (dsq < r_max_squaredtmp) & (dsq > 0.0):
-                                        has_neighbor[ifirst1+i] = 1
-                                        break
-    
+                        if ilast2 > ifirst2:
+                            for i in range(ifirst1, ilast1):
+                                # Points already known to have a neighbor are not searched again
+                                if has_neighbor[i] == 0:
+                                    x1tmp = x1[i] - x2shift
+                                    y1tmp = y1[i] - y2shift
+                                    z1tmp = z1[i] - z2shift
+                                    r_max_squaredtmp = r_max_squared[i]
+
+                                    # Skip cell2 when it lies outside of the search volume of point i
+                                    dx = cell_separation(x1[i], x1[i], x2low, x2low + x2cell_size)
+                                    dy = cell_separation(y1[i], y1[i], y2low, y2low + y2cell_size)
+                                    dz = cell_separation(z1[i], z1[i], z2low, z2low + z2cell_size)
+                                    if dx*dx + dy*dy + dz*dz >= r_max_squaredtmp:
+                                        continue
+
+                                    #loop over points in cell2 points
+                                    for j in range(ifirst2, ilast2):
+                                        #calculate the square distance
+                                        dx = x1tmp - x2[j]
+                                        dy = y1tmp - y2[j]
+                                        dz = z1tmp - z2[j]
+                                        dsq = dx*dx + dy*dy + dz*dz
+
+                                        if (dsq < r_max_squaredtmp) & (dsq > 0.0):
+                                            has_neighbor[i] = 1
+                                            num_flagged[icell1] += 1
+                                            # In an auto-correlation, point i is also a neighbor of point j
+                                            # whenever it lies within the search length of point j
+                                            if auto & (has_neighbor[j] == 0) & (dsq < r_max_squared[j]):
+                                                has_neighbor[j] = 1
+                                                num_flagged[icell2] += 1
+                                            break
+
+                            icell1_done = (num_flagged[icell1] == Ni)
+
     #turn result into numpy array
     new_has_neighbor = np.array(has_neighbor)
 
@@ -208,17 +277,5 @@ def spherical_isolation_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
 
     new_is_isolated = np.zeros(Npts1)
     new_is_isolated[is_isolated] = 1
-    
-    return new_is_isolated
-
-
-
-
-
-
-
-
-
-
-
 
+    return new_is_isolated
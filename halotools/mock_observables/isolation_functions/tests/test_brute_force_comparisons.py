@@ -107,3 +107,55 @@ def test_cylindrical_isolation2():
     assert np.any(iso1)
     assert not np.all(iso1)
 
+
+
+def test_spherical_isolation_autocorrelation_variable_rmax():
+    """ Verify that the symmetric flagging of pairs used when sample2 is sample1
+    agrees with the naive algorithm when each point has its own search radius,
+    and that the result does not depend on ``num_threads``.
+    """
+    npts = 200
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts, 3))
+        r_max = np.where(np.random.rand(npts) < 0.5, 1e-6, np.random.uniform(0.02, 0.15, npts))
+
+    #  points at zero separation, such as a point and itself, are never neighbors
+    iso2 = np.zeros(npts, dtype=bool)
+    for i in range(npts):
+        x2arr, y2arr, z2arr = np.delete(sample1, i, axis=0).T
+        iso2[i] = naive_spherical_isolation(sample1[i:i+1, 0], sample1[i:i+1, 1], sample1[i:i+1, 2],
+            x2arr, y2arr, z2arr, r_max[i], 1, 1, 1)[0]
+
+    for num_threads in (1, 3):
+        iso1 = spherical_isolation(sample1, sample1, r_max, period=1, num_threads=num_threads)
+        assert np.all(iso1 == iso2)
+    #  ensure the test is non-trivial
+    assert np.any(iso1)
+    assert not np.all(iso1)
+
+
+def test_cylindrical_isolation_autocorrelation_variable_rmax():
+    """ Verify that the symmetric flagging of pairs used when sample2 is sample1
+    agrees with the naive algorithm when each point has its own cylinder,
+    and that the result does not depend on ``num_threads``.
+    """
+    npts = 200
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts, 3))
+        rp_max = np.where(np.random.rand(npts) < 0.5, 1e-6, np.random.uniform(0.02, 0.15, npts))
+        pi_max = np.random.uniform(0.02, 0.2, npts)
+
+    #  points at zero separation, such as a point and itself, are never neighbors
+    iso2 = np.zeros(npts, dtype=bool)
+    for i in range(npts):
+        x2arr, y2arr, z2arr = np.delete(sample1, i, axis=0).T
+        iso2[i] = naive_cylindrical_isolation(sample1[i:i+1, 0], sample1[i:i+1, 1], sample1[i:i+1, 2],
+            x2arr, y2arr, z2arr, rp_max[i], pi_max[i], 1, 1, 1)[0]
+
+    for num_threads in (1, 3):
+        iso1 = cylindrical_isolation(sample1, sample1, rp_max, pi_max,
+            period=1, num_threads=num_threads)
+        assert np.all(iso1 == iso2)
+    #  ensure the test is non-trivial
+    assert np.any(iso1)
+    assert not np.all(iso1)
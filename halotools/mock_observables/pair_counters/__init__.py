@@ -3,6 +3,7 @@ from __future__ import (absolute_import, division, print_function, unicode_liter
 from .rectangular_mesh import RectangularDoubleMesh
 from .rectangular_mesh_2d import RectangularDoubleMesh2D
 from .npairs_3d import npairs_3d
+from .npairs_angular import npairs_angular
 from .npairs_projected import npairs_projected
 from .npairs_xy_z import npairs_xy_z
 from .marked_npairs_3d import marked_npairs_3d
@@ -10,5 +11,6 @@ from .marked_npairs_xy_z import marked_npairs_xy_z
 from .npairs_jackknife_3d import npairs_jackknife_3d
 from .npairs_s_mu import npairs_s_mu
 from .npairs_per_object_3d import npairs_per_object_3d
-from .pairwise_distance_3d import pairwise_distance_3d
-from .pairwise_distance_xy_z import pairwise_distance_xy_z
+from .npairs_multi import npairs_multi
+from .pairwise_distance_3d import pairwise_distance_3d, pairwise_distance_3d_blocks
+from .pairwise_distance_xy_z import pairwise_distance_xy_z, pairwise_distance_xy_z_blocks
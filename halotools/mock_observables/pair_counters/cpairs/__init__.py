@@ -4,6 +4,8 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 from .pairwise_distances import *
 from .npairs_3d_engine import npairs_3d_engine
+from .npairs_angular_engine import npairs_angular_engine
+from .npairs_multi_engine import npairs_multi_engine
 from .npairs_projected_engine import npairs_projected_engine
 from .npairs_xy_z_engine import npairs_xy_z_engine
 from .npairs_jackknife_3d_engine import npairs_jackknife_3d_engine
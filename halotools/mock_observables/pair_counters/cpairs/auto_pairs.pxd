@@ -0,0 +1,28 @@
+cimport numpy as cnp
+
+cdef inline int auto_cell_pair_weight(int auto, cnp.int64_t icell1, cnp.int64_t icell2,
+        int wrapped) nogil:
+    """ Return the number of times each pair of points found in the cell pair
+    (icell1, icell2) should be counted by a pair-counting engine.
+
+    When ``auto`` is 0, the two samples are distinct and every pair is counted once.
+    When ``auto`` is 1, the two samples and their meshes are identical, so that the
+    cell pair (icell2, icell1) is visited with the opposite periodic shift
+    whenever (icell1, icell2) is visited. Only cell pairs with icell2 >= icell1
+    then need to be visited, each pair being counted twice, and the remaining
+    cell pairs are skipped by returning 0. A cell paired with a periodic image of itself
+    is visited with both shifts and so is counted once.
+
+    Within the same (unshifted) cell, engines visit only the pairs with j >= i,
+    and count the pair i == j once rather than twice.
+    """
+    if auto == 0:
+        return 1
+    elif icell2 > icell1:
+        return 2
+    elif icell2 < icell1:
+        return 0
+    elif wrapped:
+        return 1
+    else:
+        return 2
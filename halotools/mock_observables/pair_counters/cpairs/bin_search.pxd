@@ -0,0 +1,45 @@
+cimport numpy as cnp
+from libc.math cimport ceil, sqrt
+
+cdef inline int lower_bound_bin(cnp.float64_t* bins, int num_bins, cnp.float64_t value) nogil:
+    """ Return the index of the first entry of the monotonically increasing array
+    ``bins`` that is greater than or equal to ``value``, or ``num_bins`` if ``value``
+    exceeds every entry.
+
+    Pair-counting engines use this binary search to assign each pair to a single
+    differential bin in O(log(num_bins)) operations, and then convert the
+    differential counts into cumulative counts once all pairs have been visited.
+    """
+    cdef int low = 0
+    cdef int high = num_bins
+    cdef int mid
+    while low < high:
+        mid = (low + high) >> 1
+        if bins[mid] < value:
+            low = mid + 1
+        else:
+            high = mid
+    return low
+
+
+cdef inline int linear_bin(cnp.float64_t* bins_squared, int num_bins,
+        cnp.float64_t value_squared, cnp.float64_t first_bin,
+        cnp.float64_t bin_width) nogil:
+    """ Return the same index as ``lower_bound_bin(bins_squared, num_bins, value_squared)``
+    when the square roots of ``bins_squared`` are evenly spaced by ``bin_width``
+    starting from ``first_bin``.
+
+    The index is calculated directly from the separation, and then corrected by
+    comparison with the neighboring entries of ``bins_squared``,
+    so that roundoff never assigns a pair to a different bin than the binary search would.
+    """
+    cdef int k = <int>ceil((sqrt(value_squared) - first_bin)/bin_width)
+    if k < 0:
+        k = 0
+    elif k > num_bins:
+        k = num_bins
+    while (k > 0) and (bins_squared[k-1] >= value_squared):
+        k = k - 1
+    while (k < num_bins) and (bins_squared[k] < value_squared):
+        k = k + 1
+    return k
@@ -4,8 +4,11 @@ from __future__ import (absolute_import, division, print_function, unicode_liter
 
 import numpy as np
 cimport numpy as cnp
-cimport cython 
-from libc.math cimport ceil 
+cimport cython
+from cython.parallel cimport prange, parallel, threadid
+from .bin_search cimport lower_bound_bin
+from .auto_pairs cimport auto_cell_pair_weight
+from libc.math cimport ceil
 
 __author__ = ('Andrew Hearin', 'Duncan Campbell')
 __all__ = ('npairs_3d_engine', )
@@ -13,46 +16,61 @@ __all__ = ('npairs_3d_engine', )
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.nonecheck(False)
-def npairs_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, rbins, cell1_tuple):
-    """ Cython engine for counting pairs of points as a function of three-dimensional separation. 
+@cython.cdivision(True)
+def npairs_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, rbins, cell1_tuple,
+        num_threads=1, autocorrelation=False):
+    """ Cython engine for counting pairs of points as a function of three-dimensional separation.
 
-    Parameters 
+    Parameters
     ------------
-    double_mesh : object 
+    double_mesh : object
         Instance of `~halotools.mock_observables.RectangularDoubleMesh`
 
-    x1in, y1in, z1in : arrays 
+    x1in, y1in, z1in : arrays
         Numpy arrays storing Cartesian coordinates of points in sample 1
 
-    x2in, y2in, z2in : arrays 
+    x2in, y2in, z2in : arrays
         Numpy arrays storing Cartesian coordinates of points in sample 2
 
     rbins : array
         Boundaries defining the bins in which pairs are counted.
 
     cell1_tuple : tuple
-        Two-element tuple defining the first and last cells in 
-        double_mesh.mesh1 that will be looped over. Intended for use with 
-        python multiprocessing. 
+        Two-element tuple defining the first and last cells in
+        double_mesh.mesh1 that will be looped over.
 
-    Returns 
+    num_threads : int, optional
+        Number of OpenMP threads over which the cells of mesh1 are distributed.
+        The coordinate arrays are shared by all threads, and each thread
+        accumulates its own counts which are summed at the end. Default is 1.
+
+    autocorrelation : bool, optional
+        If True, sample 2 is identical to sample 1 and both meshes of ``double_mesh``
+        have identical cells. Only the cell pairs with icell2 >= icell1, and the pairs
+        with j >= i within the same cell, are visited, and each unordered pair is
+        counted twice so that the result is identical to the ordered count. Default is False.
+
+    Returns
     --------
-    counts : array 
-        Integer array of length len(rbins) giving the number of pairs 
-        separated by a distance less than the corresponding entry of ``rbins``. 
+    counts : array
+        Integer array of length len(rbins) giving the number of pairs
+        separated by a distance less than the corresponding entry of ``rbins``.
 
-    """    
-    cdef cnp.float64_t[:] rbins_squared = rbins*rbins
+    """
+    cdef cnp.float64_t[:] rbins_squared = np.ascontiguousarray(rbins*rbins, dtype=np.float64)
+    cdef cnp.float64_t rmax_squared = np.max(rbins_squared)
     cdef cnp.float64_t xperiod = double_mesh.xperiod
     cdef cnp.float64_t yperiod = double_mesh.yperiod
     cdef cnp.float64_t zperiod = double_mesh.zperiod
     cdef cnp.int64_t first_cell1_element = cell1_tuple[0]
     cdef cnp.int64_t last_cell1_element = cell1_tuple[1]
     cdef int PBCs = double_mesh._PBCs
+    cdef int nthreads = max(int(num_threads), 1)
+    cdef int auto = bool(autocorrelation)
 
     cdef int Ncell1 = double_mesh.mesh1.ncells
     cdef int num_rbins = len(rbins)
-    cdef cnp.int64_t[:] counts = np.zeros(num_rbins, dtype=np.int64)
+    cdef cnp.int64_t[:, :] counts = np.zeros((nthreads, num_rbins), dtype=np.int64)
 
     cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
     cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
@@ -92,95 +110,96 @@ def npairs_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, rbins, cel
     cdef int num_z2_per_z1 = num_z2divs // num_z1divs
 
     cdef cnp.float64_t x2shift, y2shift, z2shift, dx, dy, dz, dsq
-    cdef cnp.float64_t x1tmp, y1tmp, z1tmp 
-    cdef int Ni, Nj, i, j, k, l
-
-    cdef cnp.float64_t[:] x_icell1, x_icell2
-    cdef cnp.float64_t[:] y_icell1, y_icell2
-    cdef cnp.float64_t[:] z_icell1, z_icell2
-
-    for icell1 in range(first_cell1_element, last_cell1_element):
-        ifirst1 = cell1_indices[icell1]
-        ilast1 = cell1_indices[icell1+1]
-        x_icell1 = x1[ifirst1:ilast1]
-        y_icell1 = y1[ifirst1:ilast1]
-        z_icell1 = z1[ifirst1:ilast1]
-
-        Ni = ilast1 - ifirst1
-        if Ni > 0:
-
-            ix1 = icell1 // (num_y1divs*num_z1divs)
-            iy1 = (icell1 - ix1*num_y1divs*num_z1divs) // num_z1divs
-            iz1 = icell1 - (ix1*num_y1divs*num_z1divs) - (iy1*num_z1divs)
-
-            leftmost_ix2 = ix1*num_x2_per_x1 - num_x2_covering_steps
-            leftmost_iy2 = iy1*num_y2_per_y1 - num_y2_covering_steps
-            leftmost_iz2 = iz1*num_z2_per_z1 - num_z2_covering_steps
-
-            rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps 
-            rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps 
-            rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps 
-
-            for nonPBC_ix2 in range(leftmost_ix2, rightmost_ix2):
-                if nonPBC_ix2 < 0:
-                    x2shift = -xperiod*PBCs
-                elif nonPBC_ix2 >= num_x2divs:
-                    x2shift = +xperiod*PBCs
-                else:
-                    x2shift = 0.
-                # Now apply the PBCs
-                ix2 = nonPBC_ix2 % num_x2divs
-
-                for nonPBC_iy2 in range(leftmost_iy2, rightmost_iy2):
-                    if nonPBC_iy2 < 0:
-                        y2shift = -yperiod*PBCs
-                    elif nonPBC_iy2 >= num_y2divs:
-                        y2shift = +yperiod*PBCs
+    cdef cnp.float64_t x1tmp, y1tmp, z1tmp
+    cdef cnp.int64_t i, j
+    cdef int k, tid
+    cdef int wrapped, same_cell, cell_weight
+    cdef cnp.int64_t jfirst2
+
+    with nogil, parallel(num_threads=nthreads):
+        tid = threadid()
+        for icell1 in prange(first_cell1_element, last_cell1_element, schedule='dynamic'):
+            ifirst1 = cell1_indices[icell1]
+            ilast1 = cell1_indices[icell1+1]
+
+            if ilast1 > ifirst1:
+
+                ix1 = icell1 // (num_y1divs*num_z1divs)
+                iy1 = (icell1 - ix1*num_y1divs*num_z1divs) // num_z1divs
+                iz1 = icell1 - (ix1*num_y1divs*num_z1divs) - (iy1*num_z1divs)
+
+                leftmost_ix2 = ix1*num_x2_per_x1 - num_x2_covering_steps
+                leftmost_iy2 = iy1*num_y2_per_y1 - num_y2_covering_steps
+                leftmost_iz2 = iz1*num_z2_per_z1 - num_z2_covering_steps
+
+                rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps
+                rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps
+                rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps
+
+                for nonPBC_ix2 in range(leftmost_ix2, rightmost_ix2):
+                    # Apply the PBCs
+                    if nonPBC_ix2 < 0:
+                        x2shift = -xperiod*PBCs
+                        ix2 = nonPBC_ix2 + num_x2divs
+                    elif nonPBC_ix2 >= num_x2divs:
+                        x2shift = +xperiod*PBCs
+                        ix2 = nonPBC_ix2 - num_x2divs
                     else:
-                        y2shift = 0.
-                    # Now apply the PBCs
-                    iy2 = nonPBC_iy2 % num_y2divs
-
-                    for nonPBC_iz2 in range(leftmost_iz2, rightmost_iz2):
-                        if nonPBC_iz2 < 0:
-                            z2shift = -zperiod*PBCs
-                        elif nonPBC_iz2 >= num_z2divs:
-                            z2shift = +zperiod*PBCs
+                        x2shift = 0.
+                        ix2 = nonPBC_ix2
+
+                    for nonPBC_iy2 in range(leftmost_iy2, rightmost_iy2):
+                        if nonPBC_iy2 < 0:
+                            y2shift = -yperiod*PBCs
+                            iy2 = nonPBC_iy2 + num_y2divs
+                        elif nonPBC_iy2 >= num_y2divs:
+                            y2shift = +yperiod*PBCs
+                            iy2 = nonPBC_iy2 - num_y2divs
                         else:
-                            z2shift = 0.
-                        # Now apply the PBCs
-                        iz2 = nonPBC_iz2 % num_z2divs
-
-                        icell2 = ix2*(num_y2divs*num_z2divs) + iy2*num_z2divs + iz2
-                        ifirst2 = cell2_indices[icell2]
-                        ilast2 = cell2_indices[icell2+1]
-
-                        x_icell2 = x2[ifirst2:ilast2]
-                        y_icell2 = y2[ifirst2:ilast2]
-                        z_icell2 = z2[ifirst2:ilast2]
-
-                        Nj = ilast2 - ifirst2
-                        #loop over points in cell1 points
-                        if Nj > 0:
-                            for i in range(0,Ni):
-                                x1tmp = x_icell1[i] - x2shift
-                                y1tmp = y_icell1[i] - y2shift
-                                z1tmp = z_icell1[i] - z2shift
-                                #loop over points in cell2 points
-                                for j in range(0,Nj):
-                                    #calculate the square distance
-                                    dx = x1tmp - x_icell2[j]
-                                    dy = y1tmp - y_icell2[j]
-                                    dz = z1tmp - z_icell2[j]
-                                    dsq = dx*dx + dy*dy + dz*dz
-
-                                    k = num_rbins-1
-                                    while dsq <= rbins_squared[k]:
-                                        counts[k] += 1
-                                        k=k-1
-                                        if k<0: break
-                                        
-    return np.array(counts)
-
-
-
+                            y2shift = 0.
+                            iy2 = nonPBC_iy2
+
+                        for nonPBC_iz2 in range(leftmost_iz2, rightmost_iz2):
+                            if nonPBC_iz2 < 0:
+                                z2shift = -zperiod*PBCs
+                                iz2 = nonPBC_iz2 + num_z2divs
+                            elif nonPBC_iz2 >= num_z2divs:
+                                z2shift = +zperiod*PBCs
+                                iz2 = nonPBC_iz2 - num_z2divs
+                            else:
+                                z2shift = 0.
+                                iz2 = nonPBC_iz2
+
+                            icell2 = ix2*(num_y2divs*num_z2divs) + iy2*num_z2divs + iz2
+                            ifirst2 = cell2_indices[icell2]
+                            ilast2 = cell2_indices[icell2+1]
+
+                            # In auto-correlation mode, each unordered pair of cells is visited once
+                            wrapped = (nonPBC_ix2 != ix2) | (nonPBC_iy2 != iy2) | (nonPBC_iz2 != iz2)
+                            cell_weight = auto_cell_pair_weight(auto, icell1, icell2, wrapped)
+                            same_cell = auto & (icell2 == icell1) & (wrapped == 0)
+
+                            #loop over points in cell1 points
+                            if (ilast2 > ifirst2) & (cell_weight > 0):
+                                for i in range(ifirst1, ilast1):
+                                    x1tmp = x1[i] - x2shift
+                                    y1tmp = y1[i] - y2shift
+                                    z1tmp = z1[i] - z2shift
+                                    if same_cell:
+                                        jfirst2 = i
+                                    else:
+                                        jfirst2 = ifirst2
+                                    #loop over points in cell2 points
+                                    for j in range(jfirst2, ilast2):
+                                        #calculate the square distance
+                                        dx = x1tmp - x2[j]
+                                        dy = y1tmp - y2[j]
+                                        dz = z1tmp - z2[j]
+                                        dsq = dx*dx + dy*dy + dz*dz
+
+                                        if dsq <= rmax_squared:
+                                            k = lower_bound_bin(&rbins_squared[0], num_rbins, dsq)
+                                            counts[tid, k] += cell_weight - same_cell*(j == i)
+
+    # Convert the differential counts into the number of pairs with separation <= rbins
+    return np.cumsum(np.sum(counts, axis=0))
@@ -0,0 +1,202 @@
+"""
+"""
+from __future__ import (absolute_import, division, print_function, unicode_literals)
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+from cython.parallel cimport prange, parallel, threadid
+from .bin_search cimport lower_bound_bin
+from .auto_pairs cimport auto_cell_pair_weight
+from libc.math cimport floor, fabs, sin, cos, asin, M_PI
+
+__author__ = ('Andrew Hearin', 'Duncan Campbell')
+__all__ = ('npairs_angular_engine', )
+
+# Padding in degrees of the search window of each cell,
+# guarding against roundoff in the cell boundaries
+cdef cnp.float64_t ANGULAR_PADDING = 1e-8
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+def npairs_angular_engine(mesh1, mesh2, x1in, y1in, z1in, x2in, y2in, z2in,
+        chord_bins, theta_max, cell1_tuple, num_threads=1, autocorrelation=False):
+    """ Cython engine for counting pairs of points on the unit sphere
+    as a function of angular separation.
+
+    Parameters
+    ------------
+    mesh1, mesh2 : objects
+        Instances of `~halotools.mock_observables.pair_counters.spherical_mesh.SphericalMesh`
+        with identical cells, storing the angular positions of sample 1 and sample 2.
+
+    x1in, y1in, z1in : arrays
+        Numpy arrays storing the Cartesian coordinates of the points in sample 1
+        on the unit sphere.
+
+    x2in, y2in, z2in : arrays
+        Numpy arrays storing the Cartesian coordinates of the points in sample 2
+        on the unit sphere.
+
+    chord_bins : array
+        Boundaries defining the bins in which pairs are counted,
+        in units of the chord length between points on the unit sphere.
+
+    theta_max : float
+        Angular separation in degrees corresponding to the largest entry of ``chord_bins``.
+
+    cell1_tuple : tuple
+        Two-element tuple defining the first and last cells in
+        mesh1 that will be looped over.
+
+    num_threads : int, optional
+        Number of OpenMP threads over which the cells of mesh1 are distributed.
+        Default is 1.
+
+    autocorrelation : bool, optional
+        If True, sample 2 is identical to sample 1 and ``mesh2`` is ``mesh1``.
+        Only the cell pairs with icell2 >= icell1, and the pairs
+        with j >= i within the same cell, are visited, and each unordered pair is
+        counted twice so that the result is identical to the ordered count. Default is False.
+
+    Returns
+    --------
+    counts : array
+        Integer array of length len(chord_bins) giving the number of pairs
+        separated by a chord length no larger than the corresponding entry of ``chord_bins``.
+
+    """
+    cdef cnp.float64_t[:] chord_bins_squared = np.ascontiguousarray(
+        chord_bins*chord_bins, dtype=np.float64)
+    cdef cnp.float64_t chord_max_squared = np.max(chord_bins_squared)
+    cdef cnp.float64_t theta_search = float(theta_max) + ANGULAR_PADDING
+    cdef cnp.float64_t sin_theta_search = np.sin(np.radians(min(theta_search, 90.)))
+    cdef cnp.float64_t deg_per_rad = 180./M_PI
+    cdef cnp.int64_t first_cell1_element = cell1_tuple[0]
+    cdef cnp.int64_t last_cell1_element = cell1_tuple[1]
+    cdef int nthreads = max(int(num_threads), 1)
+    cdef int auto = bool(autocorrelation)
+
+    cdef int num_bins = len(chord_bins)
+    cdef cnp.int64_t[:, :] counts = np.zeros((nthreads, num_bins), dtype=np.int64)
+
+    cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z1 = np.ascontiguousarray(z1in[mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] x2 = np.ascontiguousarray(x2in[mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y2 = np.ascontiguousarray(y2in[mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z2 = np.ascontiguousarray(z2in[mesh2.idx_sorted], dtype=np.float64)
+
+    cdef cnp.int64_t[:] cell1_indices = np.ascontiguousarray(mesh1.cell_id_indices, dtype=np.int64)
+    cdef cnp.int64_t[:] cell2_indices = np.ascontiguousarray(mesh2.cell_id_indices, dtype=np.int64)
+
+    # Both meshes share the same cells
+    cdef int num_bands = mesh1.num_dec_divs
+    cdef cnp.float64_t band_height = mesh1.dec_cell_size
+    cdef cnp.int64_t[:] num_ra_divs = np.ascontiguousarray(mesh1.num_ra_divs, dtype=np.int64)
+    cdef cnp.float64_t[:] ra_cell_size = np.ascontiguousarray(mesh1.ra_cell_size, dtype=np.float64)
+    cdef cnp.int64_t[:] first_cell_in_band = np.ascontiguousarray(
+        mesh1.first_cell_in_band, dtype=np.int64)
+    cdef cnp.int64_t[:] band_of_cell = np.ascontiguousarray(np.repeat(
+        np.arange(num_bands), mesh1.num_ra_divs), dtype=np.int64)
+
+    cdef cnp.int64_t icell1, icell2
+    cdef cnp.int64_t ifirst1, ilast1, ifirst2, ilast2, jfirst2
+    cdef cnp.int64_t ira1, ira2, first_ira2, last_ira2, num_ra2
+    cdef cnp.int64_t n2, t
+    cdef int iband1, iband2, first_iband2, last_iband2
+
+    cdef cnp.float64_t dec1_low, dec1_high, max_abs_dec1
+    cdef cnp.float64_t ra1_low, ra1_high, delta_ra
+    cdef int encloses_pole
+
+    cdef cnp.float64_t dx, dy, dz, dsq
+    cdef cnp.float64_t x1tmp, y1tmp, z1tmp
+    cdef cnp.int64_t i, j
+    cdef int k, tid
+    cdef int same_cell, cell_weight
+
+    with nogil, parallel(num_threads=nthreads):
+        tid = threadid()
+        for icell1 in prange(first_cell1_element, last_cell1_element, schedule='dynamic'):
+            ifirst1 = cell1_indices[icell1]
+            ilast1 = cell1_indices[icell1+1]
+
+            if ilast1 > ifirst1:
+
+                iband1 = band_of_cell[icell1]
+                ira1 = icell1 - first_cell_in_band[iband1]
+                dec1_low = -90. + iband1*band_height
+                dec1_high = dec1_low + band_height
+                max_abs_dec1 = fabs(dec1_low)
+                if fabs(dec1_high) > max_abs_dec1:
+                    max_abs_dec1 = fabs(dec1_high)
+                ra1_low = ira1*ra_cell_size[iband1]
+                ra1_high = ra1_low + ra_cell_size[iband1]
+
+                # Half-width in right ascension of the region within theta_max of the cell.
+                # When a pole lies within theta_max of the cell, every right ascension is searched.
+                encloses_pole = (max_abs_dec1 + theta_search >= 90.)
+                if encloses_pole:
+                    delta_ra = 360.
+                else:
+                    delta_ra = deg_per_rad*asin(
+                        sin_theta_search/cos(max_abs_dec1/deg_per_rad)) + ANGULAR_PADDING
+
+                first_iband2 = <int>floor((dec1_low - theta_search + 90.)/band_height)
+                last_iband2 = <int>floor((dec1_high + theta_search + 90.)/band_height)
+                if first_iband2 < 0:
+                    first_iband2 = 0
+                if last_iband2 > num_bands - 1:
+                    last_iband2 = num_bands - 1
+
+                for iband2 in range(first_iband2, last_iband2+1):
+                    n2 = num_ra_divs[iband2]
+                    first_ira2 = <cnp.int64_t>floor((ra1_low - delta_ra)/ra_cell_size[iband2])
+                    last_ira2 = <cnp.int64_t>floor((ra1_high + delta_ra)/ra_cell_size[iband2])
+                    # Never visit the same cell twice
+                    num_ra2 = last_ira2 - first_ira2 + 1
+                    if num_ra2 >= n2:
+                        first_ira2 = 0
+                        num_ra2 = n2
+
+                    for t in range(num_ra2):
+                        # Wrap around in right ascension
+                        ira2 = first_ira2 + t
+                        while ira2 < 0:
+                            ira2 = ira2 + n2
+                        while ira2 >= n2:
+                            ira2 = ira2 - n2
+
+                        icell2 = first_cell_in_band[iband2] + ira2
+                        ifirst2 = cell2_indices[icell2]
+                        ilast2 = cell2_indices[icell2+1]
+
+                        # In auto-correlation mode, each unordered pair of cells is visited once
+                        cell_weight = auto_cell_pair_weight(auto, icell1, icell2, 0)
+                        same_cell = auto & (icell2 == icell1)
+
+                        if (ilast2 > ifirst2) & (cell_weight > 0):
+                            for i in range(ifirst1, ilast1):
+                                x1tmp = x1[i]
+                                y1tmp = y1[i]
+                                z1tmp = z1[i]
+                                if same_cell:
+                                    jfirst2 = i
+                                else:
+                                    jfirst2 = ifirst2
+                                for j in range(jfirst2, ilast2):
+                                    dx = x1tmp - x2[j]
+                                    dy = y1tmp - y2[j]
+                                    dz = z1tmp - z2[j]
+                                    dsq = dx*dx + dy*dy + dz*dz
+
+                                    if dsq <= chord_max_squared:
+                                        k = lower_bound_bin(&chord_bins_squared[0], num_bins, dsq)
+                                        counts[tid, k] += cell_weight - same_cell*(j == i)
+
+    # Convert the differential counts into the number of pairs with separation <= chord_bins
+    return np.cumsum(np.sum(counts, axis=0))
@@ -6,6 +6,8 @@ import numpy as np
 cimport numpy as cnp
 cimport cython 
 from libc.math cimport ceil 
+from .bin_search cimport lower_bound_bin
+from .auto_pairs cimport auto_cell_pair_weight
 
 __author__ = ('Andrew Hearin', 'Duncan Campbell')
 __all__ = ('npairs_jackknife_3d_engine', )
@@ -14,7 +16,8 @@ __all__ = ('npairs_jackknife_3d_engine', )
 @cython.wraparound(False)
 @cython.nonecheck(False)
 def npairs_jackknife_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, 
-    weights1in, weights2in, jtags1in, jtags2in, cnp.int64_t N_samples, rbins, cell1_tuple):
+    weights1in, weights2in, jtags1in, jtags2in, cnp.int64_t N_samples, rbins, cell1_tuple,
+    autocorrelation=False):
     """ Cython engine for counting pairs of points as a function of three-dimensional separation. 
 
     Parameters 
@@ -51,24 +54,44 @@ def npairs_jackknife_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
         double_mesh.mesh1 that will be looped over. Intended for use with 
         python multiprocessing. 
 
+    autocorrelation : bool, optional
+        If True, sample 2, its weights and its subvolume labels are identical to
+        those of sample 1, and both meshes of ``double_mesh`` have identical cells.
+        Only the cell pairs with icell2 >= icell1, and the pairs with j >= i
+        within the same cell, are visited, and each unordered pair is
+        counted twice so that the result is identical to the ordered count. Default is False.
+
     Returns 
     --------
     counts : array 
-        Integer array of length len(rbins) giving the number of pairs 
-        separated by a distance less than the corresponding entry of ``rbins``. 
+        Array of shape (N_samples+1, len(rbins)). The first row gives the weighted
+        number of pairs separated by a distance less than the corresponding entry
+        of ``rbins``; row s gives the same count with subvolume s removed.
 
+    Notes
+    -----
+    Rather than evaluating the jackknife weight of each pair for every subsample,
+    the engine accumulates the weight of each pair once, into the total count and
+    into per-subvolume tables of the pairs with both points, and with exactly one point,
+    in that subvolume. The count with subvolume s removed is then the total
+    minus the pairs with both points in s, minus half the pairs with one point in s,
+    so that the cost per pair does not depend on ``N_samples``.
     """    
-    cdef cnp.float64_t[:] rbins_squared = rbins*rbins
+    cdef cnp.float64_t[:] rbins_squared = np.ascontiguousarray(rbins*rbins, dtype=np.float64)
+    cdef cnp.float64_t rmax_squared = np.max(rbins_squared)
     cdef cnp.float64_t xperiod = double_mesh.xperiod
     cdef cnp.float64_t yperiod = double_mesh.yperiod
     cdef cnp.float64_t zperiod = double_mesh.zperiod
     cdef cnp.int64_t first_cell1_element = cell1_tuple[0]
     cdef cnp.int64_t last_cell1_element = cell1_tuple[1]
     cdef int PBCs = double_mesh._PBCs
+    cdef int auto = bool(autocorrelation)
 
     cdef int Ncell1 = double_mesh.mesh1.ncells
     cdef int num_rbins = len(rbins)
-    cdef cnp.float64_t[:,:] counts = np.zeros((N_samples+1, num_rbins), dtype=np.float64)
+    cdef cnp.float64_t[:] total_counts = np.zeros(num_rbins, dtype=np.float64)
+    cdef cnp.float64_t[:,:] both_in_counts = np.zeros((N_samples+1, num_rbins), dtype=np.float64)
+    cdef cnp.float64_t[:,:] one_in_counts = np.zeros((N_samples+1, num_rbins), dtype=np.float64)
 
     cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
     cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
@@ -79,8 +102,8 @@ def npairs_jackknife_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
 
     cdef cnp.float64_t[:] weights1 = np.ascontiguousarray(weights1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
     cdef cnp.float64_t[:] weights2 = np.ascontiguousarray(weights2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
-    cdef cnp.int64_t[:] jtags1 = np.ascontiguousarray(jtags1in[double_mesh.mesh1.idx_sorted], dtype=np.int64)
-    cdef cnp.int64_t[:] jtags2 = np.ascontiguousarray(jtags2in[double_mesh.mesh2.idx_sorted], dtype=np.int64)
+    cdef cnp.int64_t[:] jtags1 = _valid_jtags(jtags1in[double_mesh.mesh1.idx_sorted], N_samples)
+    cdef cnp.int64_t[:] jtags2 = _valid_jtags(jtags2in[double_mesh.mesh2.idx_sorted], N_samples)
 
     cdef cnp.int64_t icell1, icell2
     cdef cnp.int64_t[:] cell1_indices = np.ascontiguousarray(double_mesh.mesh1.cell_id_indices, dtype=np.int64)
@@ -116,10 +139,11 @@ def npairs_jackknife_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     cdef cnp.float64_t x1tmp, y1tmp, z1tmp 
 
     cdef cnp.int64_t j1, j2
-    cdef cnp.float64_t w1, w2
+    cdef cnp.float64_t w1
 
-    cdef int Ni, Nj, i, j, k, l
-    cdef cnp.int64_t s 
+    cdef int Ni, Nj, i, j, k
+    cdef int wrapped, same_cell, cell_weight, jfirst
+    cdef cnp.float64_t pair_weight
 
     cdef cnp.float64_t[:] x_icell1, x_icell2
     cdef cnp.float64_t[:] y_icell1, y_icell2
@@ -191,6 +215,13 @@ def npairs_jackknife_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
                         ifirst2 = cell2_indices[icell2]
                         ilast2 = cell2_indices[icell2+1]
 
+                        # In auto-correlation mode, each unordered pair of cells is visited once
+                        wrapped = (nonPBC_ix2 != ix2) | (nonPBC_iy2 != iy2) | (nonPBC_iz2 != iz2)
+                        cell_weight = auto_cell_pair_weight(auto, icell1, icell2, wrapped)
+                        same_cell = auto & (icell2 == icell1) & (wrapped == 0)
+                        if cell_weight == 0:
+                            continue
+
                         #extract the points in cell2
                         x_icell2 = x2[ifirst2:ilast2]
                         y_icell2 = y2[ifirst2:ilast2]
@@ -212,79 +243,43 @@ def npairs_jackknife_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
 
                                 w1 = w_icell1[i]
                                 j1 = j_icell1[i]
+                                if same_cell:
+                                    jfirst = i
+                                else:
+                                    jfirst = 0
                                 #loop over points in cell2
-                                for j in range(0,Nj):
+                                for j in range(jfirst,Nj):
                                     #calculate the square distance
                                     dx = x1tmp - x_icell2[j]
                                     dy = y1tmp - y_icell2[j]
                                     dz = z1tmp - z_icell2[j]
                                     dsq = dx*dx + dy*dy + dz*dz
 
-                                    w2 = w_icell2[j]
-                                    j2 = j_icell2[j]
-
-                                    for s in range(N_samples+1):
-                                        k = num_rbins-1
-                                        while dsq<=rbins_squared[k]:
-                                            counts[s,k] += jweight(s, j1, j2, w1, w2)
-                                            k=k-1
-                                            if k<0: break                                        
-                                        
-                                        
-    return np.array(counts)
-
-
-cdef inline cnp.float64_t jweight(cnp.int64_t j, cnp.int64_t j1, cnp.int64_t j2,
-    cnp.float64_t w1, cnp.float64_t w2):
-    """
-    Return the jackknife weighted count.
-    
-    parameters
-    ----------
-    j : int
-        subsample being removed
-    
-    j1 : int
-        integer label indicating which subsample point 1 occupies
-    
-    j2 : int
-        integer label indicating which subsample point 2 occupies
-    
-    w1 : float
-        weight associated with point 1
-    
-    w2 : float
-        weight associated with point 2
-    
-    Returns
-    -------
-    w : double
-        0.0, w1*w2*0.5, or w1*w2
-    
-    Notes
-    -----
-    We use the tag '0' to indicated we want to use the entire sample, i.e. no subsample
-    should be labeled with a '0'.
-    
-    jackknife wiehgt is caclulated as follows:
-    if both points are inside the sample, return w1*w2
-    if both points are outside the sample, return 0.0
-    if one point is within and one point is outside the sample, return 0.5*w1*w2
+                                    if dsq <= rmax_squared:
+                                        k = lower_bound_bin(&rbins_squared[0], num_rbins, dsq)
+                                        j2 = j_icell2[j]
+                                        pair_weight = (cell_weight - same_cell*(j == i))*w1*w_icell2[j]
+
+                                        total_counts[k] += pair_weight
+                                        if j1 == j2:
+                                            both_in_counts[j1, k] += pair_weight
+                                        else:
+                                            one_in_counts[j1, k] += pair_weight
+                                            one_in_counts[j2, k] += pair_weight
+
+    # Derive the leave-one-out counts, then convert the differential counts
+    # into the number of pairs with separation <= rbins
+    counts = np.array(total_counts) - np.array(both_in_counts) - 0.5*np.array(one_in_counts)
+    counts[0, :] = total_counts
+    return np.cumsum(counts, axis=1)
+
+
+def _valid_jtags(jtags, N_samples):
+    """ Return the subvolume labels as a contiguous int64 array, with all labels outside
+    the range [1, N_samples] set to 0. These points are never removed from the sample,
+    and row 0 of the per-subvolume tables, which is reserved for the entire sample,
+    collects their pairs without being used.
     """
-    cdef cnp.float64_t result
-    if j==0: 
-        result = w1 * w2
-    # both outside the sub-sample
-    elif (j1 == j2) & (j1 == j): 
-        result = 0.0
-    # both inside the sub-sample
-    elif (j1 != j) & (j2 != j): 
-        result = (w1 * w2)
-    # only one inside the sub-sample
-    elif (j1 != j2) & ((j1 == j) | (j2 == j)): 
-        result = 0.5*(w1 * w2)
-
-    return result
-
-
+    jtags = np.ascontiguousarray(jtags, dtype=np.int64)
+    return np.where((jtags >= 1) & (jtags <= N_samples), jtags, 0)
 
@@ -0,0 +1,292 @@
+"""
+"""
+from __future__ import (absolute_import, division, print_function, unicode_literals)
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+from cython.parallel cimport prange, parallel, threadid
+from .bin_search cimport lower_bound_bin
+from .auto_pairs cimport auto_cell_pair_weight
+
+__author__ = ('Andrew Hearin', 'Duncan Campbell')
+__all__ = ('npairs_multi_engine', )
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+def npairs_multi_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
+        rbins, rp_bins, pi_bins, s_bins, mu_bins_prime, cell1_tuple,
+        num_threads=1, autocorrelation=False):
+    """ Cython engine simultaneously counting pairs of points as a function of
+    three-dimensional separation, of projected and line-of-sight separation,
+    and of redshift-space separation and line-of-sight angle,
+    in a single traversal of the mesh.
+
+    Parameters
+    ------------
+    double_mesh : object
+        Instance of `~halotools.mock_observables.RectangularDoubleMesh`,
+        built with search lengths large enough for all requested binnings.
+
+    x1in, y1in, z1in : arrays
+        Numpy arrays storing Cartesian coordinates of points in sample 1
+
+    x2in, y2in, z2in : arrays
+        Numpy arrays storing Cartesian coordinates of points in sample 2
+
+    rbins : array
+        Boundaries defining the bins of three-dimensional separation,
+        as in `~halotools.mock_observables.pair_counters.cpairs.npairs_3d_engine`.
+        An empty array skips this binning.
+
+    rp_bins, pi_bins : arrays
+        Boundaries defining the bins of separation in the xy-plane and along z,
+        as in `~halotools.mock_observables.pair_counters.cpairs.npairs_xy_z_engine`.
+        Empty arrays skip this binning.
+
+    s_bins, mu_bins_prime : arrays
+        Boundaries defining the bins of redshift-space separation and of the sine of
+        the angle to the line-of-sight, as in
+        `~halotools.mock_observables.pair_counters.cpairs.npairs_s_mu_engine`.
+        Empty arrays skip this binning.
+
+    cell1_tuple : tuple
+        Two-element tuple defining the first and last cells in
+        double_mesh.mesh1 that will be looped over.
+
+    num_threads : int, optional
+        Number of OpenMP threads over which the cells of mesh1 are distributed.
+        Default is 1.
+
+    autocorrelation : bool, optional
+        If True, sample 2 is identical to sample 1 and both meshes of ``double_mesh``
+        have identical cells. Only the cell pairs with icell2 >= icell1, and the pairs
+        with j >= i within the same cell, are visited, and each unordered pair is
+        counted twice so that the result is identical to the ordered count. Default is False.
+
+    Returns
+    --------
+    r_counts, xy_z_counts, s_mu_counts : arrays
+        Cumulative pair counts identical to those returned by
+        the npairs_3d, npairs_xy_z and npairs_s_mu engines for the same binnings.
+        Skipped binnings are returned as empty arrays.
+
+    """
+    rbins = np.atleast_1d(rbins).astype(np.float64)
+    rp_bins = np.atleast_1d(rp_bins).astype(np.float64)
+    pi_bins = np.atleast_1d(pi_bins).astype(np.float64)
+    s_bins = np.atleast_1d(s_bins).astype(np.float64)
+    mu_bins_prime = np.atleast_1d(mu_bins_prime).astype(np.float64)
+
+    cdef int do_r = len(rbins) > 0
+    cdef int do_xy_z = (len(rp_bins) > 0) & (len(pi_bins) > 0)
+    cdef int do_s_mu = (len(s_bins) > 0) & (len(mu_bins_prime) > 0)
+
+    # Skipped binnings are replaced by a single bin that is never filled
+    cdef int num_rbins = max(len(rbins), 1)
+    cdef int num_rp_bins = max(len(rp_bins), 1) if do_xy_z else 1
+    cdef int num_pi_bins = max(len(pi_bins), 1) if do_xy_z else 1
+    cdef int num_s_bins = max(len(s_bins), 1) if do_s_mu else 1
+    cdef int num_mu_bins = max(len(mu_bins_prime), 1) if do_s_mu else 1
+
+    cdef cnp.float64_t[:] rbins_squared = np.ascontiguousarray(
+        rbins*rbins if do_r else np.zeros(1), dtype=np.float64)
+    cdef cnp.float64_t[:] rp_bins_squared = np.ascontiguousarray(
+        rp_bins*rp_bins if do_xy_z else np.zeros(1), dtype=np.float64)
+    cdef cnp.float64_t[:] pi_bins_squared = np.ascontiguousarray(
+        pi_bins*pi_bins if do_xy_z else np.zeros(1), dtype=np.float64)
+    cdef cnp.float64_t[:] s_bins_squared = np.ascontiguousarray(
+        s_bins*s_bins if do_s_mu else np.zeros(1), dtype=np.float64)
+    cdef cnp.float64_t[:] mu_bins_squared = np.ascontiguousarray(
+        mu_bins_prime*mu_bins_prime if do_s_mu else np.zeros(1), dtype=np.float64)
+
+    cdef cnp.float64_t rmax_squared = np.max(rbins_squared)
+    cdef cnp.float64_t rp_max_squared = np.max(rp_bins_squared)
+    cdef cnp.float64_t pi_max_squared = np.max(pi_bins_squared)
+    cdef cnp.float64_t s_max_squared = np.max(s_bins_squared)
+    cdef cnp.float64_t mu_max_squared = np.max(mu_bins_squared)
+
+    # Pairs farther apart than these separations do not contribute to any binning
+    cdef cnp.float64_t xy_max_squared = max(rmax_squared*do_r,
+        rp_max_squared*do_xy_z, s_max_squared*do_s_mu)
+    cdef cnp.float64_t z_max_squared = max(rmax_squared*do_r,
+        pi_max_squared*do_xy_z, s_max_squared*do_s_mu)
+
+    cdef cnp.float64_t xperiod = double_mesh.xperiod
+    cdef cnp.float64_t yperiod = double_mesh.yperiod
+    cdef cnp.float64_t zperiod = double_mesh.zperiod
+    cdef cnp.int64_t first_cell1_element = cell1_tuple[0]
+    cdef cnp.int64_t last_cell1_element = cell1_tuple[1]
+    cdef int PBCs = double_mesh._PBCs
+    cdef int nthreads = max(int(num_threads), 1)
+    cdef int auto = bool(autocorrelation)
+
+    cdef cnp.int64_t[:, :] r_counts = np.zeros((nthreads, num_rbins), dtype=np.int64)
+    cdef cnp.int64_t[:, :, :] xy_z_counts = np.zeros(
+        (nthreads, num_rp_bins, num_pi_bins), dtype=np.int64)
+    cdef cnp.int64_t[:, :, :] s_mu_counts = np.zeros(
+        (nthreads, num_s_bins, num_mu_bins), dtype=np.int64)
+
+    cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z1 = np.ascontiguousarray(z1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] x2 = np.ascontiguousarray(x2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y2 = np.ascontiguousarray(y2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z2 = np.ascontiguousarray(z2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+
+    cdef cnp.int64_t icell1, icell2
+    cdef cnp.int64_t[:] cell1_indices = np.ascontiguousarray(double_mesh.mesh1.cell_id_indices, dtype=np.int64)
+    cdef cnp.int64_t[:] cell2_indices = np.ascontiguousarray(double_mesh.mesh2.cell_id_indices, dtype=np.int64)
+
+    cdef cnp.int64_t ifirst1, ilast1, ifirst2, ilast2
+
+    cdef int ix2, iy2, iz2, ix1, iy1, iz1
+    cdef int nonPBC_ix2, nonPBC_iy2, nonPBC_iz2
+
+    cdef int num_x2_covering_steps = int(np.ceil(
+        double_mesh.search_xlength / double_mesh.mesh2.xcell_size))
+    cdef int num_y2_covering_steps = int(np.ceil(
+        double_mesh.search_ylength / double_mesh.mesh2.ycell_size))
+    cdef int num_z2_covering_steps = int(np.ceil(
+        double_mesh.search_zlength / double_mesh.mesh2.zcell_size))
+
+    cdef int leftmost_ix2, rightmost_ix2
+    cdef int leftmost_iy2, rightmost_iy2
+    cdef int leftmost_iz2, rightmost_iz2
+
+    cdef int num_x1divs = double_mesh.mesh1.num_xdivs
+    cdef int num_y1divs = double_mesh.mesh1.num_ydivs
+    cdef int num_z1divs = double_mesh.mesh1.num_zdivs
+    cdef int num_x2divs = double_mesh.mesh2.num_xdivs
+    cdef int num_y2divs = double_mesh.mesh2.num_ydivs
+    cdef int num_z2divs = double_mesh.mesh2.num_zdivs
+    cdef int num_x2_per_x1 = num_x2divs // num_x1divs
+    cdef int num_y2_per_y1 = num_y2divs // num_y1divs
+    cdef int num_z2_per_z1 = num_z2divs // num_z1divs
+
+    cdef cnp.float64_t x2shift, y2shift, z2shift, dx, dy, dz
+    cdef cnp.float64_t dxy_sq, dz_sq, dsq, sqr_mu
+    cdef cnp.float64_t x1tmp, y1tmp, z1tmp
+    cdef cnp.int64_t i, j
+    cdef int k, g, tid, pair_weight
+    cdef int wrapped, same_cell, cell_weight
+    cdef cnp.int64_t jfirst2
+
+    with nogil, parallel(num_threads=nthreads):
+        tid = threadid()
+        for icell1 in prange(first_cell1_element, last_cell1_element, schedule='dynamic'):
+            ifirst1 = cell1_indices[icell1]
+            ilast1 = cell1_indices[icell1+1]
+
+            if ilast1 > ifirst1:
+
+                ix1 = icell1 // (num_y1divs*num_z1divs)
+                iy1 = (icell1 - ix1*num_y1divs*num_z1divs) // num_z1divs
+                iz1 = icell1 - (ix1*num_y1divs*num_z1divs) - (iy1*num_z1divs)
+
+                leftmost_ix2 = ix1*num_x2_per_x1 - num_x2_covering_steps
+                leftmost_iy2 = iy1*num_y2_per_y1 - num_y2_covering_steps
+                leftmost_iz2 = iz1*num_z2_per_z1 - num_z2_covering_steps
+
+                rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps
+                rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps
+                rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps
+
+                for nonPBC_ix2 in range(leftmost_ix2, rightmost_ix2):
+                    # Apply the PBCs
+                    if nonPBC_ix2 < 0:
+                        x2shift = -xperiod*PBCs
+                        ix2 = nonPBC_ix2 + num_x2divs
+                    elif nonPBC_ix2 >= num_x2divs:
+                        x2shift = +xperiod*PBCs
+                        ix2 = nonPBC_ix2 - num_x2divs
+                    else:
+                        x2shift = 0.
+                        ix2 = nonPBC_ix2
+
+                    for nonPBC_iy2 in range(leftmost_iy2, rightmost_iy2):
+                        if nonPBC_iy2 < 0:
+                            y2shift = -yperiod*PBCs
+                            iy2 = nonPBC_iy2 + num_y2divs
+                        elif nonPBC_iy2 >= num_y2divs:
+                            y2shift = +yperiod*PBCs
+                            iy2 = nonPBC_iy2 - num_y2divs
+                        else:
+                            y2shift = 0.
+                            iy2 = nonPBC_iy2
+
+                        for nonPBC_iz2 in range(leftmost_iz2, rightmost_iz2):
+                            if nonPBC_iz2 < 0:
+                                z2shift = -zperiod*PBCs
+                                iz2 = nonPBC_iz2 + num_z2divs
+                            elif nonPBC_iz2 >= num_z2divs:
+                                z2shift = +zperiod*PBCs
+                                iz2 = nonPBC_iz2 - num_z2divs
+                            else:
+                                z2shift = 0.
+                                iz2 = nonPBC_iz2
+
+                            icell2 = ix2*(num_y2divs*num_z2divs) + iy2*num_z2divs + iz2
+                            ifirst2 = cell2_indices[icell2]
+                            ilast2 = cell2_indices[icell2+1]
+
+                            # In auto-correlation mode, each unordered pair of cells is visited once
+                            wrapped = (nonPBC_ix2 != ix2) | (nonPBC_iy2 != iy2) | (nonPBC_iz2 != iz2)
+                            cell_weight = auto_cell_pair_weight(auto, icell1, icell2, wrapped)
+                            same_cell = auto & (icell2 == icell1) & (wrapped == 0)
+
+                            if (ilast2 > ifirst2) & (cell_weight > 0):
+                                for i in range(ifirst1, ilast1):
+                                    x1tmp = x1[i] - x2shift
+                                    y1tmp = y1[i] - y2shift
+                                    z1tmp = z1[i] - z2shift
+                                    if same_cell:
+                                        jfirst2 = i
+                                    else:
+                                        jfirst2 = ifirst2
+                                    for j in range(jfirst2, ilast2):
+                                        dx = x1tmp - x2[j]
+                                        dy = y1tmp - y2[j]
+                                        dz = z1tmp - z2[j]
+                                        dxy_sq = dx*dx + dy*dy
+                                        dz_sq = dz*dz
+                                        if (dxy_sq > xy_max_squared) | (dz_sq > z_max_squared):
+                                            continue
+                                        dsq = dxy_sq + dz_sq
+                                        pair_weight = cell_weight - same_cell*(j == i)
+
+                                        if do_r & (dsq <= rmax_squared):
+                                            k = lower_bound_bin(&rbins_squared[0], num_rbins, dsq)
+                                            r_counts[tid, k] += pair_weight
+
+                                        if do_xy_z & (dxy_sq <= rp_max_squared) & (dz_sq <= pi_max_squared):
+                                            k = lower_bound_bin(&rp_bins_squared[0], num_rp_bins, dxy_sq)
+                                            g = lower_bound_bin(&pi_bins_squared[0], num_pi_bins, dz_sq)
+                                            xy_z_counts[tid, k, g] += pair_weight
+
+                                        if do_s_mu & (dsq <= s_max_squared):
+                                            if dsq > 0.0:
+                                                sqr_mu = dxy_sq/dsq
+                                            else:
+                                                sqr_mu = 0.0
+                                            if sqr_mu <= mu_max_squared:
+                                                k = lower_bound_bin(&s_bins_squared[0], num_s_bins, dsq)
+                                                g = lower_bound_bin(&mu_bins_squared[0], num_mu_bins, sqr_mu)
+                                                s_mu_counts[tid, k, g] += pair_weight
+
+    # Convert the differential counts into cumulative counts
+    if do_r:
+        r_result = np.cumsum(np.sum(r_counts, axis=0))
+    else:
+        r_result = np.zeros(0, dtype=np.int64)
+    if do_xy_z:
+        xy_z_result = np.cumsum(np.cumsum(np.sum(xy_z_counts, axis=0), axis=0), axis=1)
+    else:
+        xy_z_result = np.zeros((0, 0), dtype=np.int64)
+    if do_s_mu:
+        s_mu_result = np.cumsum(np.cumsum(np.sum(s_mu_counts, axis=0), axis=0), axis=1)
+    else:
+        s_mu_result = np.zeros((0, 0), dtype=np.int64)
+    return r_result, xy_z_result, s_mu_result
@@ -5,6 +5,8 @@ from __future__ import (absolute_import, division, print_function, unicode_liter
 import numpy as np
 cimport numpy as cnp
 cimport cython
+from cython.parallel cimport prange, parallel, threadid
+from .bin_search cimport lower_bound_bin
 from libc.math cimport ceil
 
 __author__ = ('Andrew Hearin', 'Duncan Campbell')
@@ -13,8 +15,9 @@ __all__ = ('npairs_projected_engine', )
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.nonecheck(False)
+@cython.cdivision(True)
 def npairs_projected_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
-    rp_bins, pi_max, cell1_tuple):
+    rp_bins, pi_max, cell1_tuple, num_threads=1):
     r""" Cython engine for counting pairs of points as a function of projected separation.
 
     Parameters
@@ -37,8 +40,12 @@ def npairs_projected_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
 
     cell1_tuple : tuple
         Two-element tuple defining the first and last cells in
-        double_mesh.mesh1 that will be looped over. Intended for use with
-        python multiprocessing.
+        double_mesh.mesh1 that will be looped over.
+
+    num_threads : int, optional
+        Number of OpenMP threads over which the cells of mesh1 are distributed.
+        The coordinate arrays are shared by all threads, and each thread
+        accumulates its own counts which are summed at the end. Default is 1.
 
     Returns
     --------
@@ -47,7 +54,8 @@ def npairs_projected_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
         separated by a distance less than the corresponding entry of ``rp_bins``.
 
     """
-    cdef cnp.float64_t[:] rp_bins_squared = rp_bins*rp_bins
+    cdef cnp.float64_t[:] rp_bins_squared = np.ascontiguousarray(rp_bins*rp_bins, dtype=np.float64)
+    cdef cnp.float64_t rp_max_squared = np.max(rp_bins_squared)
     cdef cnp.float64_t pi_max_squared = pi_max*pi_max
     cdef cnp.float64_t xperiod = double_mesh.xperiod
     cdef cnp.float64_t yperiod = double_mesh.yperiod
@@ -55,10 +63,11 @@ def npairs_projected_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     cdef cnp.int64_t first_cell1_element = cell1_tuple[0]
     cdef cnp.int64_t last_cell1_element = cell1_tuple[1]
     cdef int PBCs = double_mesh._PBCs
+    cdef int nthreads = max(int(num_threads), 1)
 
     cdef int Ncell1 = double_mesh.mesh1.ncells
     cdef int num_rp_bins = len(rp_bins)
-    cdef cnp.int64_t[:] counts = np.zeros(num_rp_bins, dtype=np.int64)
+    cdef cnp.int64_t[:, :] counts = np.zeros((nthreads, num_rp_bins), dtype=np.int64)
 
     cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
     cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
@@ -99,96 +108,85 @@ def npairs_projected_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
 
     cdef cnp.float64_t x2shift, y2shift, z2shift, dx, dy, dz, dxy_sq, dz_sq
     cdef cnp.float64_t x1tmp, y1tmp, z1tmp
-    cdef int Ni, Nj, i, j, k, l
-
-    cdef cnp.float64_t[:] x_icell1, x_icell2
-    cdef cnp.float64_t[:] y_icell1, y_icell2
-    cdef cnp.float64_t[:] z_icell1, z_icell2
-
-    for icell1 in range(first_cell1_element, last_cell1_element):
-        ifirst1 = cell1_indices[icell1]
-        ilast1 = cell1_indices[icell1+1]
-        x_icell1 = x1[ifirst1:ilast1]
-        y_icell1 = y1[ifirst1:ilast1]
-        z_icell1 = z1[ifirst1:ilast1]
-
-        Ni = ilast1 - ifirst1
-        if Ni > 0:
-
-            ix1 = icell1 // (num_y1divs*num_z1divs)
-            iy1 = (icell1 - ix1*num_y1divs*num_z1divs) // num_z1divs
-            iz1 = icell1 - (ix1*num_y1divs*num_z1divs) - (iy1*num_z1divs)
-
-            leftmost_ix2 = ix1*num_x2_per_x1 - num_x2_covering_steps
-            leftmost_iy2 = iy1*num_y2_per_y1 - num_y2_covering_steps
-            leftmost_iz2 = iz1*num_z2_per_z1 - num_z2_covering_steps
-
-            rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps
-            rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps
-            rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps
-
-            for nonPBC_ix2 in range(leftmost_ix2, rightmost_ix2):
-                if nonPBC_ix2 < 0:
-                    x2shift = -xperiod*PBCs
-                elif nonPBC_ix2 >= num_x2divs:
-                    x2shift = +xperiod*PBCs
-                else:
-                    x2shift = 0.
-                # Now apply the PBCs
-                ix2 = nonPBC_ix2 % num_x2divs
-
-                for nonPBC_iy2 in range(leftmost_iy2, rightmost_iy2):
-                    if nonPBC_iy2 < 0:
-                        y2shift = -yperiod*PBCs
-                    elif nonPBC_iy2 >= num_y2divs:
-                        y2shift = +yperiod*PBCs
+    cdef cnp.int64_t i, j
+    cdef int k, tid
+
+    with nogil, parallel(num_threads=nthreads):
+        tid = threadid()
+        for icell1 in prange(first_cell1_element, last_cell1_element, schedule='dynamic'):
+            ifirst1 = cell1_indices[icell1]
+            ilast1 = cell1_indices[icell1+1]
+
+            if ilast1 > ifirst1:
+
+                ix1 = icell1 // (num_y1divs*num_z1divs)
+                iy1 = (icell1 - ix1*num_y1divs*num_z1divs) // num_z1divs
+                iz1 = icell1 - (ix1*num_y1divs*num_z1divs) - (iy1*num_z1divs)
+
+                leftmost_ix2 = ix1*num_x2_per_x1 - num_x2_covering_steps
+                leftmost_iy2 = iy1*num_y2_per_y1 - num_y2_covering_steps
+                leftmost_iz2 = iz1*num_z2_per_z1 - num_z2_covering_steps
+
+                rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps
+                rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps
+                rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps
+
+                for nonPBC_ix2 in range(leftmost_ix2, rightmost_ix2):
+                    # Apply the PBCs
+                    if nonPBC_ix2 < 0:
+                        x2shift = -xperiod*PBCs
+                        ix2 = nonPBC_ix2 + num_x2divs
+                    elif nonPBC_ix2 >= num_x2divs:
+                        x2shift = +xperiod*PBCs
+                        ix2 = nonPBC_ix2 - num_x2divs
                     else:
-                        y2shift = 0.
-                    # Now apply the PBCs
-                    iy2 = nonPBC_iy2 % num_y2divs
-
-                    for nonPBC_iz2 in range(leftmost_iz2, rightmost_iz2):
-                        if nonPBC_iz2 < 0:
-                            z2shift = -zperiod*PBCs
-                        elif nonPBC_iz2 >= num_z2divs:
-                            z2shift = +zperiod*PBCs
+                        x2shift = 0.
+                        ix2 = nonPBC_ix2
+
+                    for nonPBC_iy2 in range(leftmost_iy2, rightmost_iy2):
+                        if nonPBC_iy2 < 0:
+                            y2shift = -yperiod*PBCs
+                            iy2 = nonPBC_iy2 + num_y2divs
+                        elif nonPBC_iy2 >= num_y2divs:
+                            y2shift = +yperiod*PBCs
+                            iy2 = nonPBC_iy2 - num_y2divs
                         else:
-                            z2shift = 0.
-                        # Now apply the PBCs
-                        iz2 = nonPBC_iz2 % num_z2divs
-
-                        icell2 = ix2*(num_y2divs*num_z2divs) + iy2*num_z2divs + iz2
-                        ifirst2 = cell2_indices[icell2]
-                        ilast2 = cell2_indices[icell2+1]
-
-                        x_icell2 = x2[ifirst2:ilast2]
-                        y_icell2 = y2[ifirst2:ilast2]
-                        z_icell2 = z2[ifirst2:ilast2]
-
-                        Nj = ilast2 - ifirst2
-                        #loop over points in cell1 points
-                        if Nj > 0:
-                            for i in range(0,Ni):
-                                x1tmp = x_icell1[i] - x2shift
-                                y1tmp = y_icell1[i] - y2shift
-                                z1tmp = z_icell1[i] - z2shift
-                                #loop over points in cell2 points
-                                for j in range(0,Nj):
-                                    #calculate the square distance
-                                    dx = x1tmp - x_icell2[j]
-                                    dy = y1tmp - y_icell2[j]
-                                    dz = z1tmp - z_icell2[j]
-                                    dxy_sq = dx*dx + dy*dy
-                                    dz_sq = dz*dz
-
-                                    k = num_rp_bins-1
-                                    while dxy_sq <= rp_bins_squared[k]:
-                                        if dz_sq <= pi_max_squared:
-                                            counts[k] += 1
-                                        k=k-1
-                                        if k<0: break
-
-    return np.array(counts)
-
-
-
+                            y2shift = 0.
+                            iy2 = nonPBC_iy2
+
+                        for nonPBC_iz2 in range(leftmost_iz2, rightmost_iz2):
+                            if nonPBC_iz2 < 0:
+                                z2shift = -zperiod*PBCs
+                                iz2 = nonPBC_iz2 + num_z2divs
+                            elif nonPBC_iz2 >= num_z2divs:
+                                z2shift = +zperiod*PBCs
+                                iz2 = nonPBC_iz2 - num_z2divs
+                            else:
+                                z2shift = 0.
+                                iz2 = nonPBC_iz2
+
+                            icell2 = ix2*(num_y2divs*num_z2divs) + iy2*num_z2divs + iz2
+                            ifirst2 = cell2_indices[icell2]
+                            ilast2 = cell2_indices[icell2+1]
+
+                            #loop over points in cell1 points
+                            if ilast2 > ifirst2:
+                                for i in range(ifirst1, ilast1):
+                                    x1tmp = x1[i] - x2shift
+                                    y1tmp = y1[i] - y2shift
+                                    z1tmp = z1[i] - z2shift
+                                    #loop over points in cell2 points
+                                    for j in range(ifirst2, ilast2):
+                                        #calculate the square distance
+                                        dx = x1tmp - x2[j]
+                                        dy = y1tmp - y2[j]
+                                        dz = z1tmp - z2[j]
+                                        dxy_sq = dx*dx + dy*dy
+                                        dz_sq = dz*dz
+
+                                        if (dxy_sq <= rp_max_squared) & (dz_sq <= pi_max_squared):
+                                            k = lower_bound_bin(&rp_bins_squared[0], num_rp_bins, dxy_sq)
+                                            counts[tid, k] += 1
+
+    # Convert the differential counts into the number of pairs with separation <= rp_bins
+    return np.cumsum(np.sum(counts, axis=0))
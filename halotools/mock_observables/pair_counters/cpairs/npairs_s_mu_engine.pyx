@@ -5,6 +5,9 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import numpy as np
 cimport numpy as cnp
 cimport cython
+from cython.parallel cimport prange, parallel, threadid
+from .bin_search cimport lower_bound_bin
+from .auto_pairs cimport auto_cell_pair_weight
 from libc.math cimport ceil
 from libc.math cimport sqrt
 
@@ -14,8 +17,9 @@ __all__ = ('npairs_s_mu_engine', )
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.nonecheck(False)
+@cython.cdivision(True)
 def npairs_s_mu_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
-    s_bins_in, mu_bins_in, cell1_tuple):
+    s_bins_in, mu_bins_in, cell1_tuple, num_threads=1, autocorrelation=False):
     r""" Cython engine for counting pairs of points as a function of radial separation, s,
     and the angle between the line-of-sight (LOS) and s.
 
@@ -41,8 +45,18 @@ def npairs_s_mu_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
 
     cell1_tuple : tuple
         Two-element tuple defining the first and last cells in
-        double_mesh.mesh1 that will be looped over. Intended for use with
-        python multiprocessing.
+        double_mesh.mesh1 that will be looped over.
+
+    num_threads : int, optional
+        Number of OpenMP threads over which the cells of mesh1 are distributed.
+        The coordinate arrays are shared by all threads, and each thread
+        accumulates its own counts which are summed at the end. Default is 1.
+
+    autocorrelation : bool, optional
+        If True, sample 2 is identical to sample 1 and both meshes of ``double_mesh``
+        have identical cells. Only the cell pairs with icell2 >= icell1, and the pairs
+        with j >= i within the same cell, are visited, and each unordered pair is
+        counted twice so that the result is identical to the ordered count. Default is False.
 
     Returns
     --------
@@ -55,21 +69,21 @@ def npairs_s_mu_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     mu is defined as the sin(theta_LOS) so that as theta_LOS increases, mu increases.
     
     """
-    cdef cnp.float64_t[:] sqr_s_bins = s_bins_in * s_bins_in
-    cdef cnp.float64_t[:] sqr_mu_bins = mu_bins_in * mu_bins_in
-
+    cdef cnp.float64_t[:] sqr_s_bins = np.ascontiguousarray(s_bins_in * s_bins_in, dtype=np.float64)
+    cdef cnp.float64_t[:] sqr_mu_bins = np.ascontiguousarray(mu_bins_in * mu_bins_in, dtype=np.float64)
     cdef cnp.float64_t xperiod = double_mesh.xperiod
     cdef cnp.float64_t yperiod = double_mesh.yperiod
     cdef cnp.float64_t zperiod = double_mesh.zperiod
     cdef cnp.int64_t first_cell1_element = cell1_tuple[0]
     cdef cnp.int64_t last_cell1_element = cell1_tuple[1]
     cdef int PBCs = double_mesh._PBCs
+    cdef int nthreads = max(int(num_threads), 1)
+    cdef int auto = bool(autocorrelation)
 
     cdef int Ncell1 = double_mesh.mesh1.ncells
     cdef int num_s_bins = len(sqr_s_bins)
     cdef int num_mu_bins = len(sqr_mu_bins)
-    cdef cnp.int64_t[:,:] counts = np.zeros((num_s_bins, num_mu_bins), dtype=np.int64)
-    cdef cnp.int64_t[:,:] counts_sum = np.zeros((num_s_bins, num_mu_bins), dtype=np.int64)
+    cdef cnp.int64_t[:, :, :] counts = np.zeros((nthreads, num_s_bins, num_mu_bins), dtype=np.int64)
 
     cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
     cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
@@ -109,130 +123,117 @@ def npairs_s_mu_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     cdef int num_z2_per_z1 = num_z2divs // num_z1divs
 
     cdef cnp.float64_t x2shift, y2shift, z2shift, dx, dy, dz, dxy_sq, dz_sq
-    cdef cnp.float64_t x1tmp, y1tmp, z1tmp, s, mu
-    cdef int Ni, Nj, i, j, k, l, g, max_k
+    cdef int g
     cdef cnp.float64_t sqr_s_max = np.max(sqr_s_bins)
     cdef cnp.float64_t sqr_mu_max = np.max(sqr_mu_bins)
     cdef cnp.float64_t sqr_s, sqr_mu
-
-    cdef cnp.float64_t[:] x_icell1, x_icell2
-    cdef cnp.float64_t[:] y_icell1, y_icell2
-    cdef cnp.float64_t[:] z_icell1, z_icell2
-
-    for icell1 in range(first_cell1_element, last_cell1_element):
-        ifirst1 = cell1_indices[icell1]
-        ilast1 = cell1_indices[icell1+1]
-        x_icell1 = x1[ifirst1:ilast1]
-        y_icell1 = y1[ifirst1:ilast1]
-        z_icell1 = z1[ifirst1:ilast1]
-
-        Ni = ilast1 - ifirst1
-        if Ni > 0:
-
-            ix1 = icell1 // (num_y1divs*num_z1divs)
-            iy1 = (icell1 - ix1*num_y1divs*num_z1divs) // num_z1divs
-            iz1 = icell1 - (ix1*num_y1divs*num_z1divs) - (iy1*num_z1divs)
-
-            leftmost_ix2 = ix1*num_x2_per_x1 - num_x2_covering_steps
-            leftmost_iy2 = iy1*num_y2_per_y1 - num_y2_covering_steps
-            leftmost_iz2 = iz1*num_z2_per_z1 - num_z2_covering_steps
-
-            rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps
-            rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps
-            rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps
-
-            for nonPBC_ix2 in range(leftmost_ix2, rightmost_ix2):
-                if nonPBC_ix2 < 0:
-                    x2shift = -xperiod*PBCs
-                elif nonPBC_ix2 >= num_x2divs:
-                    x2shift = +xperiod*PBCs
-                else:
-                    x2shift = 0.
-                # Now apply the PBCs
-                ix2 = nonPBC_ix2 % num_x2divs
-
-                for nonPBC_iy2 in range(leftmost_iy2, rightmost_iy2):
-                    if nonPBC_iy2 < 0:
-                        y2shift = -yperiod*PBCs
-                    elif nonPBC_iy2 >= num_y2divs:
-                        y2shift = +yperiod*PBCs
+    cdef cnp.float64_t x1tmp, y1tmp, z1tmp
+    cdef cnp.int64_t i, j
+    cdef int k, tid
+    cdef int wrapped, same_cell, cell_weight
+    cdef cnp.int64_t jfirst2
+
+    with nogil, parallel(num_threads=nthreads):
+        tid = threadid()
+        for icell1 in prange(first_cell1_element, last_cell1_element, schedule='dynamic'):
+            ifirst1 = cell1_indices[icell1]
+            ilast1 = cell1_indices[icell1+1]
+
+            if ilast1 > ifirst1:
+
+                ix1 = icell1 // (num_y1divs*num_z1divs)
+                iy1 = (icell1 - ix1*num_y1divs*num_z1divs) // num_z1divs
+                iz1 = icell1 - (ix1*num_y1divs*num_z1divs) - (iy1*num_z1divs)
+
+                leftmost_ix2 = ix1*num_x2_per_x1 - num_x2_covering_steps
+                leftmost_iy2 = iy1*num_y2_per_y1 - num_y2_covering_steps
+                leftmost_iz2 = iz1*num_z2_per_z1 - num_z2_covering_steps
+
+                rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps
+                rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps
+                rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps
+
+                for nonPBC_ix2 in range(leftmost_ix2, rightmost_ix2):
+                    # Apply the PBCs
+                    if nonPBC_ix2 < 0:
+                        x2shift = -xperiod*PBCs
+                        ix2 = nonPBC_ix2 + num_x2divs
+                    elif nonPBC_ix2 >= num_x2divs:
+                        x2shift = +xperiod*PBCs
+                        ix2 = nonPBC_ix2 - num_x2divs
                     else:
-                        y2shift = 0.
-                    # Now apply the PBCs
-                    iy2 = nonPBC_iy2 % num_y2divs
-
-                    for nonPBC_iz2 in range(leftmost_iz2, rightmost_iz2):
-                        if nonPBC_iz2 < 0:
-                            z2shift = -zperiod*PBCs
-                        elif nonPBC_iz2 >= num_z2divs:
-                            z2shift = +zperiod*PBCs
+                        x2shift = 0.
+                        ix2 = nonPBC_ix2
+
+                    for nonPBC_iy2 in range(leftmost_iy2, rightmost_iy2):
+                        if nonPBC_iy2 < 0:
+                            y2shift = -yperiod*PBCs
+                            iy2 = nonPBC_iy2 + num_y2divs
+                        elif nonPBC_iy2 >= num_y2divs:
+                            y2shift = +yperiod*PBCs
+                            iy2 = nonPBC_iy2 - num_y2divs
                         else:
-                            z2shift = 0.
-                        # Now apply the PBCs
-                        iz2 = nonPBC_iz2 % num_z2divs
-
-                        icell2 = ix2*(num_y2divs*num_z2divs) + iy2*num_z2divs + iz2
-                        ifirst2 = cell2_indices[icell2]
-                        ilast2 = cell2_indices[icell2+1]
-
-                        x_icell2 = x2[ifirst2:ilast2]
-                        y_icell2 = y2[ifirst2:ilast2]
-                        z_icell2 = z2[ifirst2:ilast2]
-
-                        Nj = ilast2 - ifirst2
-                        # loop over points in cell1 points
-                        if Nj > 0:
-                            for i in range(0,Ni):
-                                x1tmp = x_icell1[i] - x2shift
-                                y1tmp = y_icell1[i] - y2shift
-                                z1tmp = z_icell1[i] - z2shift
-                                # loop over points in cell2 points
-                                for j in range(0,Nj):
-                                    # calculate the square distance
-                                    dx = x1tmp - x_icell2[j]
-                                    dy = y1tmp - y_icell2[j]
-                                    dz = z1tmp - z_icell2[j]
-                                    dxy_sq = dx*dx + dy*dy
-                                    dz_sq = dz*dz
-
-                                    # transform to s and mu
-                                    sqr_s = dz_sq + dxy_sq
-
-                                    if sqr_s > sqr_s_max:
-                                        continue
-
-                                    if sqr_s > 0.0:
-                                        sqr_mu = dxy_sq/sqr_s
+                            y2shift = 0.
+                            iy2 = nonPBC_iy2
+
+                        for nonPBC_iz2 in range(leftmost_iz2, rightmost_iz2):
+                            if nonPBC_iz2 < 0:
+                                z2shift = -zperiod*PBCs
+                                iz2 = nonPBC_iz2 + num_z2divs
+                            elif nonPBC_iz2 >= num_z2divs:
+                                z2shift = +zperiod*PBCs
+                                iz2 = nonPBC_iz2 - num_z2divs
+                            else:
+                                z2shift = 0.
+                                iz2 = nonPBC_iz2
+
+                            icell2 = ix2*(num_y2divs*num_z2divs) + iy2*num_z2divs + iz2
+                            ifirst2 = cell2_indices[icell2]
+                            ilast2 = cell2_indices[icell2+1]
+
+                            # In auto-correlation mode, each unordered pair of cells is visited once
+                            wrapped = (nonPBC_ix2 != ix2) | (nonPBC_iy2 != iy2) | (nonPBC_iz2 != iz2)
+                            cell_weight = auto_cell_pair_weight(auto, icell1, icell2, wrapped)
+                            same_cell = auto & (icell2 == icell1) & (wrapped == 0)
+
+                            #loop over points in cell1 points
+                            if (ilast2 > ifirst2) & (cell_weight > 0):
+                                for i in range(ifirst1, ilast1):
+                                    x1tmp = x1[i] - x2shift
+                                    y1tmp = y1[i] - y2shift
+                                    z1tmp = z1[i] - z2shift
+                                    if same_cell:
+                                        jfirst2 = i
                                     else:
-                                        sqr_mu = 0.0
-
-                                    if sqr_mu > sqr_mu_max:
-                                        continue
-
-                                    # The loop has been intentionally split up
-                                    # Since division is slow,
-                                    # computing mu is a bottle-neck.
-                                    # Computing the 's' bin however can proceed
-                                    # in the meantime.
-                                    k = num_s_bins-2
-                                    while k!=-1:
-                                        if sqr_s > sqr_s_bins[k]: break
-                                        k=k-1
-
-                                    g = num_mu_bins-2
-                                    while g!=-1:
-                                        if sqr_mu > sqr_mu_bins[g]: break
-                                        g=g-1
-
-                                    # Only counts pairs in that bin.
-                                    counts[k+1,g+1] += 1
+                                        jfirst2 = ifirst2
+                                    #loop over points in cell2 points
+                                    for j in range(jfirst2, ilast2):
+                                        # calculate the square distance
+                                        dx = x1tmp - x2[j]
+                                        dy = y1tmp - y2[j]
+                                        dz = z1tmp - z2[j]
+                                        dxy_sq = dx*dx + dy*dy
+                                        dz_sq = dz*dz
+
+                                        # transform to s and mu
+                                        sqr_s = dz_sq + dxy_sq
+
+                                        if sqr_s > sqr_s_max:
+                                            continue
+
+                                        if sqr_s > 0.0:
+                                            sqr_mu = dxy_sq/sqr_s
+                                        else:
+                                            sqr_mu = 0.0
+
+                                        if sqr_mu > sqr_mu_max:
+                                            continue
+
+                                        # Only counts pairs in the first bin
+                                        # with sqr_s <= sqr_s_bins and sqr_mu <= sqr_mu_bins
+                                        k = lower_bound_bin(&sqr_s_bins[0], num_s_bins, sqr_s)
+                                        g = lower_bound_bin(&sqr_mu_bins[0], num_mu_bins, sqr_mu)
+                                        counts[tid, k, g] += cell_weight - same_cell*(j == i)
 
     # Adds counts for all bins where s < s_bin and mu < mu_bin.
-    for k in range(num_s_bins):
-        for g in range(num_mu_bins):
-            counts_sum[k,g] = np.sum(counts[:k+1,:g+1])
-
-    return np.array(counts_sum)
-
-
-
+    return np.cumsum(np.cumsum(np.sum(counts, axis=0), axis=0), axis=1)
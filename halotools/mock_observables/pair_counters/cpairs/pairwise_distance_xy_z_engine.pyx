@@ -14,7 +14,8 @@ __all__ = ('pairwise_distance_xy_z_engine', )
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.nonecheck(False)
-def pairwise_distance_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, rp_max, pi_max, cell1_tuple):
+def pairwise_distance_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, rp_max, pi_max, cell1_tuple,
+        count_only=False, presorted=False):
     """ 
     Cython engine for returning pairs of points and xy-projected and z separation. 
     
@@ -40,6 +41,19 @@ def pairwise_distance_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2i
         double_mesh.mesh1 that will be looped over. Intended for use with 
         python multiprocessing. 
     
+    count_only : bool, optional
+        If True, the pairs are only counted and the engine returns an integer array 
+        of length len(x1in) storing the number of pairs of each point in sample 1, 
+        which is used to preallocate the output of the sparse-matrix builders. 
+        Default is False. 
+    
+    presorted : bool, optional
+        If True, the arrays of sample 1 (sample 2) are already sorted according to 
+        double_mesh.mesh1.idx_sorted (double_mesh.mesh2.idx_sorted), so that 
+        they are not sorted again each time the engine is called 
+        on a new block of cells. The returned indices always refer to the unsorted arrays. 
+        Default is False. 
+    
     Returns 
     --------
     distance_perp : numpy.array
@@ -65,23 +79,31 @@ def pairwise_distance_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2i
     
     cdef int Ncell1 = double_mesh.mesh1.ncells
     
+    if presorted:
+        idx_sorted1, idx_sorted2 = slice(None), slice(None)
+    else:
+        idx_sorted1, idx_sorted2 = double_mesh.mesh1.idx_sorted, double_mesh.mesh2.idx_sorted
+    
     rp_max = rp_max*rp_max
-    cdef cnp.float64_t[:] rp_max_squared = np.ascontiguousarray(rp_max[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] rp_max_squared = np.ascontiguousarray(rp_max[idx_sorted1], dtype=np.float64)
     pi_max = pi_max*pi_max
-    cdef cnp.float64_t[:] pi_max_squared = np.ascontiguousarray(pi_max[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] pi_max_squared = np.ascontiguousarray(pi_max[idx_sorted1], dtype=np.float64)
     
-    cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
-    cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
-    cdef cnp.float64_t[:] z1 = np.ascontiguousarray(z1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
-    cdef cnp.float64_t[:] x2 = np.ascontiguousarray(x2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
-    cdef cnp.float64_t[:] y2 = np.ascontiguousarray(y2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
-    cdef cnp.float64_t[:] z2 = np.ascontiguousarray(z2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[idx_sorted1], dtype=np.float64)
+    cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[idx_sorted1], dtype=np.float64)
+    cdef cnp.float64_t[:] z1 = np.ascontiguousarray(z1in[idx_sorted1], dtype=np.float64)
+    cdef cnp.float64_t[:] x2 = np.ascontiguousarray(x2in[idx_sorted2], dtype=np.float64)
+    cdef cnp.float64_t[:] y2 = np.ascontiguousarray(y2in[idx_sorted2], dtype=np.float64)
+    cdef cnp.float64_t[:] z2 = np.ascontiguousarray(z2in[idx_sorted2], dtype=np.float64)
     
     cdef vector[cnp.int_t] i_ind
     cdef vector[cnp.int_t] j_ind
     cdef vector[cnp.float64_t] rp_distances
     cdef vector[cnp.float64_t] pi_distances
     
+    cdef int count_pairs_only = bool(count_only)
+    cdef cnp.int64_t[:] num_pairs = np.zeros(len(x1), dtype=np.int64)
+    
     cdef cnp.int64_t icell1, icell2
     cdef cnp.int64_t[:] cell1_indices = np.ascontiguousarray(double_mesh.mesh1.cell_id_indices, dtype=np.int64)
     cdef cnp.int64_t[:] cell2_indices = np.ascontiguousarray(double_mesh.mesh2.cell_id_indices, dtype=np.int64)
@@ -197,15 +219,34 @@ def pairwise_distance_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2i
                                     dz_sq = dz*dz
                                     
                                     if (dxy_sq <= rp_max_squared[ifirst1+i]) & (dz_sq <= pi_max_squared[ifirst1+i]):
-                                        rp_distances.push_back(dxy_sq)
-                                        pi_distances.push_back(dz_sq)
-                                        i_ind.push_back(ifirst1 + i)
-                                        j_ind.push_back(ifirst2 + j)
+                                        if count_pairs_only:
+                                            num_pairs[ifirst1+i] += 1
+                                        else:
+                                            rp_distances.push_back(dxy_sq)
+                                            pi_distances.push_back(dz_sq)
+                                            i_ind.push_back(ifirst1 + i)
+                                            j_ind.push_back(ifirst2 + j)
+    
+    if count_pairs_only:
+        #input points were sorted.  return the counts in the order of the unsorted arrays
+        result = np.zeros(len(x1), dtype=np.int64)
+        result[double_mesh.mesh1.idx_sorted] = num_pairs
+        return result
+    
+    # Copy the pairs directly out of the vectors, avoiding an intermediate list of python objects
+    cdef cnp.int64_t ipair, npairs = i_ind.size()
+    cdef cnp.int64_t[:] i_sorted = np.empty(npairs, dtype=np.int64)
+    cdef cnp.int64_t[:] j_sorted = np.empty(npairs, dtype=np.int64)
+    cdef cnp.float64_t[:] d_perp = np.empty(npairs, dtype=np.float64)
+    cdef cnp.float64_t[:] d_para = np.empty(npairs, dtype=np.float64)
+    for ipair in range(npairs):
+        i_sorted[ipair] = i_ind[ipair]
+        j_sorted[ipair] = j_ind[ipair]
+        d_perp[ipair] = sqrt(rp_distances[ipair])
+        d_para[ipair] = sqrt(pi_distances[ipair])
     
     #input points were sorted.  return the indices of the unsorted arrays
-    i_ind = np.array(i_ind).astype(int)
-    i_ind = double_mesh.mesh1.idx_sorted[i_ind]
-    j_ind = np.array(j_ind).astype(int)
-    j_ind = double_mesh.mesh2.idx_sorted[j_ind]
+    i_out = double_mesh.mesh1.idx_sorted[np.asarray(i_sorted)]
+    j_out = double_mesh.mesh2.idx_sorted[np.asarray(j_sorted)]
     
-    return (np.sqrt(rp_distances).astype(float), np.sqrt(pi_distances).astype(float), i_ind, j_ind)
+    return (np.asarray(d_perp), np.asarray(d_para), i_out, j_out)
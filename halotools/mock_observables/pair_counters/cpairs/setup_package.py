@@ -3,11 +3,52 @@ import os
 
 PATH_TO_PKG = os.path.relpath(os.path.dirname(__file__))
 SOURCES = ("distances.pyx", "pairwise_distances.pyx",
-    "npairs_3d_engine.pyx", "npairs_projected_engine.pyx",
+    "npairs_3d_engine.pyx", "npairs_angular_engine.pyx", "npairs_multi_engine.pyx",
+    "npairs_projected_engine.pyx",
     "npairs_xy_z_engine.pyx", "npairs_jackknife_3d_engine.pyx", "npairs_s_mu_engine.pyx",
     "pairwise_distance_3d_engine.pyx", "pairwise_distance_xy_z_engine.pyx")
 THIS_PKG_NAME = '.'.join(__name__.split('.')[:-1])
 
+OPENMP_TEST_PROGRAM = """
+#include <omp.h>
+int main(void) {
+    #pragma omp parallel
+    {}
+    return omp_get_max_threads() > 0 ? 0 : 1;
+}
+"""
+
+
+def openmp_flag():
+    """ Return the list of compiler/linker flags needed to build the
+    thread-parallel engines, or an empty list if the available compiler
+    does not support OpenMP, in which case the engines run serially.
+    """
+    import shutil
+    import tempfile
+    from distutils.ccompiler import new_compiler
+    from distutils.sysconfig import customize_compiler
+    from distutils.errors import CompileError, LinkError
+
+    compiler = new_compiler()
+    customize_compiler(compiler)
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(tmpdir, 'test_openmp.c')
+        with open(fname, 'w') as f:
+            f.write(OPENMP_TEST_PROGRAM)
+        try:
+            objects = compiler.compile([fname], output_dir=tmpdir, extra_postargs=['-fopenmp'])
+            compiler.link_executable(objects, os.path.join(tmpdir, 'test_openmp'),
+                extra_postargs=['-fopenmp'])
+        except (CompileError, LinkError):
+            return []
+        else:
+            return ['-fopenmp']
+    finally:
+        shutil.rmtree(tmpdir)
+
 
 def get_extensions():
 
@@ -16,7 +57,9 @@ def get_extensions():
     include_dirs = ['numpy']
     libraries = []
     language = 'c++'
-    extra_compile_args = ['-Ofast']
+    openmp_flags = openmp_flag()
+    extra_compile_args = ['-Ofast'] + openmp_flags
+    extra_link_args = openmp_flags
 
     extensions = []
     for name, source in zip(names, sources):
@@ -25,6 +68,7 @@ def get_extensions():
             include_dirs=include_dirs,
             libraries=libraries,
             language=language,
-            extra_compile_args=extra_compile_args))
+            extra_compile_args=extra_compile_args,
+            extra_link_args=extra_link_args))
 
     return extensions
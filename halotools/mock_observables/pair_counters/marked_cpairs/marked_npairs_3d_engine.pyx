@@ -9,6 +9,7 @@ from libc.math cimport ceil
 
 from .marking_functions cimport *
 from .custom_marking_func cimport custom_func
+from ..cpairs.bin_search cimport lower_bound_bin
 
 __author__ = ('Andrew Hearin', 'Duncan Campbell')
 __all__ = ('marked_npairs_3d_engine', )
@@ -34,10 +35,14 @@ def marked_npairs_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
         Numpy arrays storing Cartesian coordinates of points in sample 2
 
     weights1in : array 
-        Numpy array storing the weights for points in sample 1
+        Numpy array of shape (Npts1, N_weights) storing the weights for points in sample 1,
+        or of shape (Npts1, K, N_weights) storing K sets of weights, e.g.,
+        K different permutations of the marks.
 
     weights2in : array 
-        Numpy array storing the weights for points in sample 2
+        Numpy array storing the weights for points in sample 2,
+        with the same conventions as ``weights1in``. If both arrays store
+        several sets of weights, they must store the same number of sets.
 
     weight_func_id : int, optional
         weighting function integer ID. 
@@ -53,8 +58,12 @@ def marked_npairs_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     Returns 
     --------
     counts : array 
-        Integer array of length len(rbins) giving the number of pairs 
-        separated by a distance less than the corresponding entry of ``rbins``. 
+        Array of length len(rbins) giving the weighted number of pairs 
+        separated by a distance less than the corresponding entry of ``rbins``.
+        If either of the weights arrays stores K sets of weights,
+        the array has shape (K, len(rbins)), and row k gives the weighted counts
+        using set k of each weights array storing several sets.
+        Each pair is found and binned once, regardless of K.
 
     """
     cdef int weight_func_id = weight_func_idin
@@ -62,7 +71,8 @@ def marked_npairs_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     cdef f_type wfunc
     wfunc = return_weighting_function(weight_func_id)
 
-    cdef cnp.float64_t[:] rbins_squared = rbins*rbins
+    cdef cnp.float64_t[:] rbins_squared = np.ascontiguousarray(rbins*rbins, dtype=np.float64)
+    cdef cnp.float64_t rmax_squared = np.max(rbins_squared)
     cdef cnp.float64_t xperiod = double_mesh.xperiod
     cdef cnp.float64_t yperiod = double_mesh.yperiod
     cdef cnp.float64_t zperiod = double_mesh.zperiod
@@ -72,7 +82,6 @@ def marked_npairs_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
 
     cdef int Ncell1 = double_mesh.mesh1.ncells
     cdef int num_rbins = len(rbins)
-    cdef cnp.float64_t[:] counts = np.zeros(num_rbins, dtype=np.float64)
 
     cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
     cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
@@ -80,8 +89,26 @@ def marked_npairs_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     cdef cnp.float64_t[:] x2 = np.ascontiguousarray(x2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
     cdef cnp.float64_t[:] y2 = np.ascontiguousarray(y2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
     cdef cnp.float64_t[:] z2 = np.ascontiguousarray(z2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
-    cdef cnp.float64_t[:, :] weights1 = np.ascontiguousarray(weights1in[double_mesh.mesh1.idx_sorted,:], dtype=np.float64)
-    cdef cnp.float64_t[:, :] weights2 = np.ascontiguousarray(weights2in[double_mesh.mesh2.idx_sorted,:], dtype=np.float64)
+
+    # The K sets of weights of each point are stored contiguously,
+    # and a weights array storing a single set is used for all K sets
+    weights1in, weights2in = np.asarray(weights1in), np.asarray(weights2in)
+    cdef int return_weight_sets = (weights1in.ndim == 3) | (weights2in.ndim == 3)
+    if weights1in.ndim == 2:
+        weights1in = weights1in[:, np.newaxis, :]
+    if weights2in.ndim == 2:
+        weights2in = weights2in[:, np.newaxis, :]
+    cdef int num_weight_sets = max(weights1in.shape[1], weights2in.shape[1])
+    cdef int weight_set_step1 = weights1in.shape[2]*(weights1in.shape[1] > 1)
+    cdef int weight_set_step2 = weights2in.shape[2]*(weights2in.shape[1] > 1)
+    cdef cnp.float64_t[:, :] weights1 = np.ascontiguousarray(
+        weights1in[double_mesh.mesh1.idx_sorted].reshape((len(weights1in), -1)), dtype=np.float64)
+    cdef cnp.float64_t[:, :] weights2 = np.ascontiguousarray(
+        weights2in[double_mesh.mesh2.idx_sorted].reshape((len(weights2in), -1)), dtype=np.float64)
+    cdef cnp.float64_t* w1_ptr
+    cdef cnp.float64_t* w2_ptr
+    cdef int iset
+    cdef cnp.float64_t[:, :] counts = np.zeros((num_weight_sets, num_rbins), dtype=np.float64)
 
     cdef cnp.int64_t icell1, icell2
     cdef cnp.int64_t[:] cell1_indices = np.ascontiguousarray(double_mesh.mesh1.cell_id_indices, dtype=np.int64)
@@ -113,7 +140,7 @@ def marked_npairs_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     cdef int num_y2_per_y1 = num_y2divs // num_y1divs
     cdef int num_z2_per_z1 = num_z2divs // num_z1divs
 
-    cdef cnp.float64_t x2shift, y2shift, z2shift, dx, dy, dz, dsq, weight
+    cdef cnp.float64_t x2shift, y2shift, z2shift, dx, dy, dz, dsq
     cdef cnp.float64_t x1tmp, y1tmp, z1tmp 
     cdef int Ni, Nj, i, j, k, l
 
@@ -207,14 +234,20 @@ def marked_npairs_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
                                     dz = z1tmp - z_icell2[j]
                                     dsq = dx*dx + dy*dy + dz*dz
 
-                                    weight = wfunc(&w_icell1[i,0], &w_icell2[j,0])
-                                    k = num_rbins-1
-                                    while dsq <= rbins_squared[k]:
-                                        counts[k] += weight
-                                        k=k-1
-                                        if k<0: break
-                                        
-    return np.array(counts)
+                                    if dsq <= rmax_squared:
+                                        k = lower_bound_bin(&rbins_squared[0], num_rbins, dsq)
+                                        w1_ptr = &w_icell1[i,0]
+                                        w2_ptr = &w_icell2[j,0]
+                                        for iset in range(num_weight_sets):
+                                            counts[iset, k] += wfunc(w1_ptr + iset*weight_set_step1,
+                                                w2_ptr + iset*weight_set_step2)
+
+    # Convert the differential weighted counts into cumulative counts
+    result = np.cumsum(counts, axis=1)
+    if return_weight_sets:
+        return result
+    else:
+        return result[0]
 
 
 cdef f_type return_weighting_function(weight_func_id):
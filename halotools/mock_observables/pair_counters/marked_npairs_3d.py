@@ -59,11 +59,15 @@ def marked_npairs_3d(sample1, sample2, rbins,
         Either a 1-D array of length *N1*, or a 2-D array of length *N1* x *N_weights*,
         containing the weights used for the weighted pair counts. If this parameter is
         None, the weights are set to np.ones(*(N1,N_weights)*).
+        A 3-D array of shape *N1* x *K* x *N_weights* stores *K* sets of weights,
+        e.g., *K* random permutations of the marks, whose weighted counts are
+        all accumulated while the pairs are counted once.
 
     weights2 : array_like, optional
         Either a 1-D array of length *N1*, or a 2-D array of length *N1* x *N_weights*,
         containing the weights used for the weighted pair counts. If this parameter is
         None, the weights are set to np.ones(*(N1,N_weights)*).
+        May also be a 3-D array storing *K* sets of weights, as for ``weights1``.
 
     weight_func_id : int, optional
         weighting function integer ID. Each weighting function requires a specific
@@ -97,7 +101,9 @@ def marked_npairs_3d(sample1, sample2, rbins,
     Returns
     -------
     wN_pairs : numpy.array
-        array of length *Nrbins* containing the weighted number counts of pairs
+        array of length *Nrbins* containing the weighted number counts of pairs.
+        If either ``weights1`` or ``weights2`` stores *K* sets of weights,
+        the array has shape *K* x *Nrbins*.
 
     Examples
     --------
@@ -196,20 +202,20 @@ def _marked_npairs_process_weights(sample1, sample2, weights1, weights2, weight_
             _converted_to_2d_from_1d = True
             npts1 = len(weights1)
             weights1 = weights1.reshape((npts1, 1))
-        elif weights1.ndim == 2:
+        elif weights1.ndim in (2, 3):
             pass
         else:
             ndim1 = weights1.ndim
-            msg = ("\n You must either pass in a 1-D or 2-D array \n"
+            msg = ("\n You must either pass in a 1-D, 2-D or 3-D array \n"
                    "for the input `weights1`. Instead, an array of \n"
                    "dimension %i was received.")
             raise HalotoolsError(msg % ndim1)
 
     npts_weights1 = np.shape(weights1)[0]
-    num_weights1 = np.shape(weights1)[1]
-    # At this point, weights1 is guaranteed to be a 2-d ndarray
+    num_weights1 = np.shape(weights1)[-1]
+    # At this point, weights1 is guaranteed to be a 2-d or 3-d ndarray
     # now we check its shape
-    if np.shape(weights1) != correct_shape1:
+    if (npts_weights1, num_weights1) != correct_shape1:
         if _converted_to_2d_from_1d is True:
             msg = ("\n You passed in a 1-D array for `weights1` that \n"
                    "does not have the correct length. The number of \n"
@@ -237,20 +243,20 @@ def _marked_npairs_process_weights(sample1, sample2, weights1, weights2, weight_
             _converted_to_2d_from_1d = True
             npts2 = len(weights2)
             weights2 = weights2.reshape((npts2, 1))
-        elif weights2.ndim == 2:
+        elif weights2.ndim in (2, 3):
             pass
         else:
             ndim2 = weights2.ndim
-            msg = ("\n You must either pass in a 1-D or 2-D array \n"
+            msg = ("\n You must either pass in a 1-D, 2-D or 3-D array \n"
                    "for the input `weights2`. Instead, an array of \n"
                    "dimension %i was received.")
             raise HalotoolsError(msg % ndim2)
 
     npts_weights2 = np.shape(weights2)[0]
-    num_weights2 = np.shape(weights2)[1]
-    # At this point, weights2 is guaranteed to be a 2-d ndarray
+    num_weights2 = np.shape(weights2)[-1]
+    # At this point, weights2 is guaranteed to be a 2-d or 3-d ndarray
     # now we check its shape
-    if np.shape(weights2) != correct_shape2:
+    if (npts_weights2, num_weights2) != correct_shape2:
         if _converted_to_2d_from_1d is True:
             msg = ("\n You passed in a 1-D array for `weights2` that \n"
                    "does not have the correct length. The number of \n"
@@ -266,6 +272,13 @@ def _marked_npairs_process_weights(sample1, sample2, weights1, weights2, weight_
             raise HalotoolsError(msg %
                 (npts_sample2, weight_func_id, correct_num_weights, npts_weights2, num_weights2))
 
+    # Sets of weights must be consistent when both inputs store several sets
+    if (weights1.ndim == 3) & (weights2.ndim == 3):
+        if np.shape(weights1)[1] != np.shape(weights2)[1]:
+            msg = ("\n You passed in 3-D arrays for both `weights1` and `weights2` \n"
+                   "that store a different number of sets of weights: %i and %i.\n")
+            raise HalotoolsError(msg % (np.shape(weights1)[1], np.shape(weights2)[1]))
+
     return weights1, weights2
 
 
@@ -65,11 +65,15 @@ def marked_npairs_xy_z(sample1, sample2, rp_bins, pi_bins,
         Either a 1-D array of length *N1*, or a 2-D array of length *N1* x *N_weights*,
         containing the weights used for the weighted pair counts. If this parameter is
         None, the weights are set to np.ones(*(N1,N_weights)*).
+        A 3-D array of shape *N1* x *K* x *N_weights* stores *K* sets of weights,
+        e.g., *K* random permutations of the marks, whose weighted counts are
+        all accumulated while the pairs are counted once.
 
     weights2 : array_like, optional
         Either a 1-D array of length *N1*, or a 2-D array of length *N1* x *N_weights*,
         containing the weights used for the weighted pair counts. If this parameter is
         None, the weights are set to np.ones(*(N1,N_weights)*).
+        May also be a 3-D array storing *K* sets of weights, as for ``weights1``.
 
     wfunc : int, optional
         weighting function integer ID. Each weighting function requires a specific
@@ -104,7 +108,8 @@ def marked_npairs_xy_z(sample1, sample2, rp_bins, pi_bins,
     -------
     wN_pairs : numpy.ndarray
         2-D array of shape *(Nrp_bins,Npi_bins)* containing the weighted number
-        counts of pairs
+        counts of pairs. If either ``weights1`` or ``weights2`` stores *K* sets of weights,
+        the array has shape *(K,Nrp_bins,Npi_bins)*.
     """
 
     # Process the inputs with the helper function
@@ -221,6 +221,40 @@ def _cell1_parallelization_indices(ncells, num_threads):
         return num_threads, list_of_tuples
 
 
+def _cell1_block_indices(mesh1, num_cells_per_block=None):
+    """ Return a list of tuples defining consecutive ranges of cells of ``mesh1``
+    that are looped over one at a time by the engines that stream their output in blocks.
+
+    Parameters
+    -----------
+    mesh1 : object
+        Instance of `~halotools.mock_observables.pair_counters.rectangular_mesh.RectangularMesh`
+
+    num_cells_per_block : int, optional
+        Number of cells in each block. Default is None, in which case
+        each block is a slab of cells sharing the same x-index of the mesh.
+
+    Returns
+    -------
+    list_of_tuples : list
+        List of two-element tuples containing the first and last values of icell1
+        that will be looped over in the outermost loop of the engine.
+    """
+    if num_cells_per_block is None:
+        num_cells_per_block = mesh1.num_ydivs*mesh1.num_zdivs
+
+    try:
+        num_cells_per_block = int(num_cells_per_block)
+        assert num_cells_per_block > 0
+    except (TypeError, ValueError, AssertionError):
+        msg = "Input ``num_cells_per_block`` must be a positive integer"
+        raise ValueError(msg)
+
+    ncells = mesh1.ncells
+    return [(a, min(a + num_cells_per_block, ncells))
+        for a in range(0, ncells, num_cells_per_block)]
+
+
 def _enforce_maximum_search_length(search_length, period=None):
     """ The `~halotools.mock_observables.pair_counters.RectangularDoubleMesh`
     algorithm requires that the search length cannot exceed period/3 in any dimension.
@@ -251,3 +285,114 @@ def _enforce_maximum_search_length(search_length, period=None):
             "Your function call would require searching for pairs separated by a distance of {0:.2f}*Lbox.\n"
             "Either decrease your search length or use a larger simulation.")
         raise ValueError(msg.format(max_search_fraction))
+
+
+def _check_prebuilt_double_mesh(double_mesh, x1, x2, search_xlength,
+        search_ylength, search_zlength, period, PBCs):
+    """ Verify that a pre-built
+    `~halotools.mock_observables.pair_counters.RectangularDoubleMesh`
+    passed to a pair counter via the ``double_mesh`` argument
+    can be used to count pairs of the input samples.
+
+    Parameters
+    -----------
+    double_mesh : object
+        Instance of `~halotools.mock_observables.RectangularDoubleMesh`
+
+    x1, x2 : arrays
+        Coordinate arrays of sample 1 and sample 2, used to check the number of points.
+
+    search_xlength, search_ylength, search_zlength : floats
+        Maximum length over which pairs will be searched for in each dimension.
+        The mesh must have been built with search lengths at least this large.
+
+    period : array_like
+        Length-3 array defining the periodicity of the box.
+
+    PBCs : bool
+        Boolean specifying whether or not the box has periodic boundary conditions.
+        Pre-built meshes are only supported for periodic boxes, since for non-periodic
+        boxes the points are shifted by an amount depending on both samples.
+    """
+    try:
+        assert PBCs is True
+        assert double_mesh._PBCs is True
+    except AssertionError:
+        msg = ("\nA pre-built ``double_mesh`` can only be used \n"
+            "for samples in a periodic box.\n")
+        raise ValueError(msg)
+
+    try:
+        assert double_mesh.mesh1.npts == len(x1)
+        assert double_mesh.mesh2.npts == len(x2)
+    except AssertionError:
+        msg = ("\nInput ``double_mesh`` was built for samples with (%i, %i) points,\n"
+            "but the input samples have (%i, %i) points.\n" %
+            (double_mesh.mesh1.npts, double_mesh.mesh2.npts, len(x1), len(x2)))
+        raise ValueError(msg)
+
+    try:
+        assert np.allclose([double_mesh.xperiod, double_mesh.yperiod, double_mesh.zperiod],
+            period)
+    except AssertionError:
+        msg = ("\nInput ``double_mesh`` was built for a box with a different period\n"
+            "than the input ``period``.\n")
+        raise ValueError(msg)
+
+    try:
+        assert double_mesh.search_xlength >= search_xlength
+        assert double_mesh.search_ylength >= search_ylength
+        assert double_mesh.search_zlength >= search_zlength
+    except AssertionError:
+        msg = ("\nInput ``double_mesh`` was built with search lengths "
+            "(%.2f, %.2f, %.2f),\n"
+            "but the requested bins require search lengths of (%.2f, %.2f, %.2f).\n" %
+            (double_mesh.search_xlength, double_mesh.search_ylength, double_mesh.search_zlength,
+            search_xlength, search_ylength, search_zlength))
+        raise ValueError(msg)
+
+
+def _is_auto_count(x1, y1, z1, x2, y2, z2):
+    """ Determine whether the two input samples are identical, in which case
+    the pair counters only need to visit each unordered pair of points once.
+
+    Parameters
+    -----------
+    x1, y1, z1 : arrays
+        Coordinate arrays of sample 1
+
+    x2, y2, z2 : arrays
+        Coordinate arrays of sample 2
+
+    Returns
+    --------
+    is_auto : bool
+    """
+    if (x1 is x2) & (y1 is y2) & (z1 is z2):
+        return True
+    return (np.array_equal(x1, x2) and np.array_equal(y1, y2) and np.array_equal(z1, z2))
+
+
+def _double_mesh_supports_auto_count(double_mesh):
+    """ Determine whether the two meshes of the input
+    `~halotools.mock_observables.pair_counters.RectangularDoubleMesh`
+    have identical cells and identical sorting of the points,
+    which is required to count the pairs of an auto-correlation by
+    visiting only the cell pairs with icell2 >= icell1.
+
+    Parameters
+    -----------
+    double_mesh : object
+        Instance of `~halotools.mock_observables.RectangularDoubleMesh`
+
+    Returns
+    --------
+    supports_auto_count : bool
+    """
+    mesh1, mesh2 = double_mesh.mesh1, double_mesh.mesh2
+    if mesh1 is mesh2:
+        return True
+    same_cells = ((mesh1.num_xdivs == mesh2.num_xdivs) &
+        (mesh1.num_ydivs == mesh2.num_ydivs) &
+        (mesh1.num_zdivs == mesh2.num_zdivs))
+    return bool(same_cells) and np.array_equal(mesh1.idx_sorted, mesh2.idx_sorted)
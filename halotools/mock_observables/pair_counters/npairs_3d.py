@@ -4,10 +4,10 @@ used to count pairs as a function of separation.
 from __future__ import (absolute_import, division, print_function, unicode_literals)
 import numpy as np
 import multiprocessing
-from functools import partial
 
 from .rectangular_mesh import RectangularDoubleMesh
-from .mesh_helpers import _set_approximate_cell_sizes, _enclose_in_box, _cell1_parallelization_indices
+from .mesh_helpers import (_set_approximate_cell_sizes, _enclose_in_box,
+    _check_prebuilt_double_mesh, _is_auto_count, _double_mesh_supports_auto_count)
 from .cpairs import npairs_3d_engine
 from ...utils.array_utils import array_is_monotonic, custom_len
 
@@ -19,7 +19,7 @@ __all__ = ('npairs_3d', )
 
 def npairs_3d(sample1, sample2, rbins, period=None,
         verbose=False, num_threads=1,
-        approx_cell1_size=None, approx_cell2_size=None):
+        approx_cell1_size=None, approx_cell2_size=None, double_mesh=None):
     """
     Function counts the number of pairs of points separated by
     a three-dimensional distance smaller than the input ``rbins``.
@@ -28,6 +28,8 @@ def npairs_3d(sample1, sample2, rbins, period=None,
     `~halotools.mock_observables.npairs_3d` function double-counts pairs.
     If your science application requires sample1==sample2 inputs and also pairs
     to not be double-counted, simply divide the final counts by 2.
+    Internally, identical samples are only counted over the unordered pairs of points,
+    which takes roughly half the time of an equivalent cross-count.
 
     A common variation of pair-counting calculations is to count pairs with
     separations *between* two different distances *r1* and *r2*. You can retrieve
@@ -60,9 +62,8 @@ def npairs_3d(sample1, sample2, rbins, period=None,
 
     num_threads : int, optional
         Number of threads to use in calculation, where parallelization is performed
-        using the python ``multiprocessing`` module. Default is 1 for a purely serial
-        calculation, in which case a multiprocessing Pool object will
-        never be instantiated. A string 'max' may be used to indicate that
+        using OpenMP threads that share the input arrays. Default is 1 for a purely serial
+        calculation. A string 'max' may be used to indicate that
         the pair counters should use all available cores on the machine.
 
     approx_cell1_size : array_like, optional
@@ -79,6 +80,14 @@ def npairs_3d(sample1, sample2, rbins, period=None,
         Analogous to ``approx_cell1_size``, but for sample2.  See comments for
         ``approx_cell1_size`` for details.
 
+    double_mesh : `~halotools.mock_observables.RectangularDoubleMesh`, optional
+        Mesh of ``sample1`` and ``sample2`` built in advance, e.g.,
+        for a random sample that will be used in many calculations.
+        Only supported for periodic boxes. The mesh must have been built with
+        search lengths at least as large as those required by the input bins.
+        If passed, ``approx_cell1_size`` and ``approx_cell2_size`` are ignored.
+        Default is None, in which case the mesh will be built from scratch.
+
     Returns
     -------
     num_pairs : array_like
@@ -121,34 +130,33 @@ def npairs_3d(sample1, sample2, rbins, period=None,
     rmax = np.max(rbins)
     search_xlength, search_ylength, search_zlength = rmax, rmax, rmax
 
-    # Compute the estimates for the cell sizes
-    approx_cell1_size, approx_cell2_size = (
-        _set_approximate_cell_sizes(approx_cell1_size, approx_cell2_size, period)
-        )
-    approx_x1cell_size, approx_y1cell_size, approx_z1cell_size = approx_cell1_size
-    approx_x2cell_size, approx_y2cell_size, approx_z2cell_size = approx_cell2_size
-
-    # Build the rectangular mesh
-    double_mesh = RectangularDoubleMesh(x1in, y1in, z1in, x2in, y2in, z2in,
-        approx_x1cell_size, approx_y1cell_size, approx_z1cell_size,
-        approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
-        search_xlength, search_ylength, search_zlength, xperiod, yperiod, zperiod, PBCs)
-
-    # Create a function object that has a single argument, for parallelization purposes
-    engine = partial(npairs_3d_engine,
-        double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, rbins)
-
-    # Calculate the cell1 indices that will be looped over by the engine
-    num_threads, cell1_tuples = _cell1_parallelization_indices(
-        double_mesh.mesh1.ncells, num_threads)
-
-    if num_threads > 1:
-        pool = multiprocessing.Pool(num_threads)
-        result = pool.map(engine, cell1_tuples)
-        counts = np.sum(np.array(result), axis=0)
-        pool.close()
+    # When sample1 is sample2, each unordered pair of points is only visited once
+    autocorrelation = _is_auto_count(x1in, y1in, z1in, x2in, y2in, z2in)
+
+    if double_mesh is None:
+        # Compute the estimates for the cell sizes
+        approx_cell1_size, approx_cell2_size = (
+            _set_approximate_cell_sizes(approx_cell1_size, approx_cell2_size, period)
+            )
+        approx_x1cell_size, approx_y1cell_size, approx_z1cell_size = approx_cell1_size
+        approx_x2cell_size, approx_y2cell_size, approx_z2cell_size = approx_cell2_size
+
+        # Build the rectangular mesh
+        double_mesh = RectangularDoubleMesh(x1in, y1in, z1in, x2in, y2in, z2in,
+            approx_x1cell_size, approx_y1cell_size, approx_z1cell_size,
+            approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
+            search_xlength, search_ylength, search_zlength, xperiod, yperiod, zperiod, PBCs,
+            shared_mesh=autocorrelation)
     else:
-        counts = engine(cell1_tuples[0])
+        _check_prebuilt_double_mesh(double_mesh, x1in, x2in,
+            search_xlength, search_ylength, search_zlength, period, PBCs)
+        autocorrelation = autocorrelation & _double_mesh_supports_auto_count(double_mesh)
+
+    # The engine distributes the cells of mesh1 over num_threads threads
+    # that share the coordinate arrays and the mesh
+    counts = npairs_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
+        rbins, (0, double_mesh.mesh1.ncells), num_threads,
+        autocorrelation)
 
     return np.array(counts)
 
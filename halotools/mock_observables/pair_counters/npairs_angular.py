@@ -0,0 +1,151 @@
+""" Module containing the `~halotools.mock_observables.pair_counters.npairs_angular` function
+used to count pairs of points on the sky as a function of angular separation.
+"""
+from __future__ import (absolute_import, division, print_function, unicode_literals)
+import numpy as np
+import multiprocessing
+
+from .spherical_mesh import SphericalMesh
+from .mesh_helpers import _is_auto_count
+from .cpairs import npairs_angular_engine
+from ...utils.array_utils import array_is_monotonic
+from ...utils.spherical_geometry import spherical_to_cartesian, chord_to_cartesian
+
+
+__author__ = ('Andrew Hearin', 'Duncan Campbell')
+
+__all__ = ('npairs_angular', )
+
+
+def npairs_angular(sample1, sample2, theta_bins, num_threads=1, approx_cell_size=None):
+    """
+    Function counts the number of pairs of points on the sky separated by
+    an angle smaller than or equal to the input ``theta_bins``.
+
+    Points are apportioned into declination bands that are divided into cells
+    of approximately equal solid angle, so that, in contrast to counting pairs
+    of the unit-sphere Cartesian coordinates with `~halotools.mock_observables.npairs_3d`,
+    no cell is wasted on the empty interior of the sphere, and any angular separation
+    smaller than 180 degrees is supported.
+
+    Note that if sample1 == sample2 that the
+    `~halotools.mock_observables.pair_counters.npairs_angular` function double-counts pairs,
+    in the same manner as `~halotools.mock_observables.npairs_3d`.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 2 numpy array containing the right ascension and declination
+        of the points in degrees.
+
+    sample2 : array_like
+        Npts2 x 2 numpy array containing the right ascension and declination
+        of the points in degrees.
+
+    theta_bins : array_like
+        Boundaries in degrees defining the bins in which pairs are counted.
+
+    num_threads : int, optional
+        Number of OpenMP threads over which the calculation is distributed.
+        Default is 1 for a purely serial calculation. A string 'max' may be used
+        to indicate that all available cores on the machine should be used.
+
+    approx_cell_size : float, optional
+        Approximate angular size in degrees of the cells into which
+        the points are apportioned. Default is a third of the largest entry of
+        ``theta_bins``, or the size of cells containing a few points of ``sample2``
+        on average if larger.
+
+    Returns
+    -------
+    num_pairs : array_like
+        Numpy array of length len(theta_bins) storing the numbers of pairs
+        separated by an angle no larger than the corresponding entry of ``theta_bins``.
+
+    Examples
+    --------
+    >>> from halotools.utils import sample_spherical_surface
+    >>> sample1 = sample_spherical_surface(1000)
+    >>> sample2 = sample_spherical_surface(1000)
+    >>> theta_bins = np.logspace(-1, 1, 10)
+    >>> result = npairs_angular(sample1, sample2, theta_bins)
+    """
+    result = _npairs_angular_process_args(sample1, sample2, theta_bins,
+        num_threads, approx_cell_size)
+    ra1, dec1, ra2, dec2, theta_bins, num_threads, approx_cell_size = result
+    theta_max = np.max(theta_bins)
+
+    x1, y1, z1 = spherical_to_cartesian(ra1, dec1)
+    x2, y2, z2 = spherical_to_cartesian(ra2, dec2)
+    chord_bins = chord_to_cartesian(theta_bins, radians=False)
+
+    # When sample1 is sample2, each unordered pair of points is only visited once
+    autocorrelation = _is_auto_count(x1, y1, z1, x2, y2, z2)
+
+    mesh1 = SphericalMesh(ra1, dec1, approx_cell_size)
+    if autocorrelation:
+        mesh2 = mesh1
+    else:
+        mesh2 = SphericalMesh(ra2, dec2, approx_cell_size)
+
+    counts = npairs_angular_engine(mesh1, mesh2, x1, y1, z1, x2, y2, z2,
+        chord_bins, theta_max, (0, mesh1.ncells), num_threads, autocorrelation)
+
+    return np.array(counts)
+
+
+def _npairs_angular_process_args(sample1, sample2, theta_bins, num_threads, approx_cell_size):
+    """
+    """
+    if num_threads is not 1:
+        if num_threads == 'max':
+            num_threads = multiprocessing.cpu_count()
+        if not isinstance(num_threads, int):
+            msg = "Input ``num_threads`` argument must be an integer or the string 'max'"
+            raise ValueError(msg)
+
+    sample1 = np.atleast_2d(sample1)
+    sample2 = np.atleast_2d(sample2)
+    try:
+        assert sample1.shape[1] == 2
+        assert sample2.shape[1] == 2
+    except AssertionError:
+        msg = ("Inputs ``sample1`` and ``sample2`` must be arrays of shape (Npts, 2)\n"
+            "storing the right ascension and declination of the points in degrees")
+        raise ValueError(msg)
+
+    ra1, dec1 = sample1[:, 0], sample1[:, 1]
+    ra2, dec2 = sample2[:, 0], sample2[:, 1]
+    try:
+        assert np.all(np.abs(dec1) <= 90.)
+        assert np.all(np.abs(dec2) <= 90.)
+    except AssertionError:
+        msg = "Input declinations must be between -90 and 90 degrees"
+        raise ValueError(msg)
+
+    theta_bins = np.atleast_1d(theta_bins).astype('f8')
+    try:
+        assert theta_bins.ndim == 1
+        assert len(theta_bins) > 1
+        if len(theta_bins) > 2:
+            assert array_is_monotonic(theta_bins, strict=True) == 1
+    except AssertionError:
+        msg = ("Input ``theta_bins`` must be a monotonically increasing 1D array "
+            "with at least two entries")
+        raise ValueError(msg)
+
+    try:
+        assert np.all(theta_bins >= 0)
+        assert np.all(theta_bins <= 180)
+    except AssertionError:
+        msg = "Input ``theta_bins`` must be between 0 and 180 degrees"
+        raise ValueError(msg)
+
+    if approx_cell_size is None:
+        # Cells of a third of theta_max keep the searched area close to that of the
+        # spherical cap, unless that leaves fewer than a few points of sample2 per cell
+        full_sky_area = 4*np.pi*(180./np.pi)**2
+        approx_cell_size = max(np.max(theta_bins)/3.,
+            np.sqrt(3*full_sky_area/max(len(ra2), 1)))
+
+    return ra1, dec1, ra2, dec2, theta_bins, num_threads, approx_cell_size
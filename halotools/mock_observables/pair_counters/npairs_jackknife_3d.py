@@ -9,7 +9,8 @@ from functools import partial
 from warnings import warn
 
 from .rectangular_mesh import RectangularDoubleMesh
-from .mesh_helpers import _set_approximate_cell_sizes, _cell1_parallelization_indices
+from .mesh_helpers import (_set_approximate_cell_sizes, _cell1_parallelization_indices,
+    _is_auto_count)
 from .cpairs import npairs_jackknife_3d_engine
 from .npairs_3d import _npairs_3d_process_args
 
@@ -160,6 +161,11 @@ def npairs_jackknife_3d(sample1, sample2, rbins, period=None, weights1=None, wei
         _npairs_jackknife_3d_process_weights_jtags(sample1, sample2,
             weights1, weights2, jtags1, jtags2, N_samples))
 
+    # When sample1 is sample2, and the weights and jackknife-tags are also identical,
+    # each unordered pair of points is only visited once
+    autocorrelation = (_is_auto_count(x1in, y1in, z1in, x2in, y2in, z2in) and
+        np.array_equal(weights1, weights2) and np.array_equal(jtags1, jtags2))
+
     # Compute the estimates for the cell sizes
     approx_cell1_size, approx_cell2_size = (
         _set_approximate_cell_sizes(approx_cell1_size, approx_cell2_size, period)
@@ -171,12 +177,14 @@ def npairs_jackknife_3d(sample1, sample2, rbins, period=None, weights1=None, wei
     double_mesh = RectangularDoubleMesh(x1in, y1in, z1in, x2in, y2in, z2in,
         approx_x1cell_size, approx_y1cell_size, approx_z1cell_size,
         approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
-        search_xlength, search_ylength, search_zlength, xperiod, yperiod, zperiod, PBCs)
+        search_xlength, search_ylength, search_zlength, xperiod, yperiod, zperiod, PBCs,
+        shared_mesh=autocorrelation)
 
     # Create a function object that has a single argument, for parallelization purposes
     engine = partial(npairs_jackknife_3d_engine,
         double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
-        weights1, weights2, jtags1, jtags2, N_samples, rbins)
+        weights1, weights2, jtags1, jtags2, N_samples, rbins,
+        autocorrelation=autocorrelation)
 
     # Calculate the cell1 indices that will be looped over by the engine
     num_threads, cell1_tuples = _cell1_parallelization_indices(
@@ -0,0 +1,253 @@
+""" Module containing the `~halotools.mock_observables.pair_counters.npairs_multi` function
+used to count pairs in several binnings in a single pass over the pairs.
+"""
+from __future__ import (absolute_import, division, print_function, unicode_literals)
+import numpy as np
+import multiprocessing
+
+from .rectangular_mesh import RectangularDoubleMesh
+from .mesh_helpers import _set_approximate_cell_sizes, _enclose_in_box, _is_auto_count
+from .cpairs import npairs_multi_engine
+from ...utils.array_utils import array_is_monotonic, custom_len
+
+__author__ = ('Andrew Hearin', 'Duncan Campbell')
+
+__all__ = ('npairs_multi', )
+
+
+def npairs_multi(sample1, sample2, rbins=None, rp_bins=None, pi_bins=None,
+        s_bins=None, mu_bins=None, period=None, num_threads=1,
+        approx_cell1_size=None, approx_cell2_size=None):
+    r"""
+    Function simultaneously counts the number of pairs of points as a function of
+    three-dimensional separation, of separation perpendicular and parallel
+    to the line-of-sight, and of redshift-space separation and line-of-sight angle.
+
+    A single mesh is built with search lengths large enough for all of the requested
+    binnings, and each pair of points is only visited once, so that calling
+    `~halotools.mock_observables.pair_counters.npairs_multi` is faster than separately
+    calling `~halotools.mock_observables.npairs_3d`,
+    `~halotools.mock_observables.npairs_xy_z` and
+    `~halotools.mock_observables.pair_counters.npairs_s_mu` on the same samples.
+    The counts are identical to those returned by these functions.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 3 numpy array containing 3-D positions of points.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    sample2 : array_like
+        Npts2 x 3 array containing 3-D positions of points.
+
+    rbins : array_like, optional
+        Boundaries defining the bins of three-dimensional separation,
+        as in `~halotools.mock_observables.npairs_3d`.
+
+    rp_bins, pi_bins : array_like, optional
+        Boundaries defining the bins of separation perpendicular and parallel
+        to the line-of-sight (z-direction), as in `~halotools.mock_observables.npairs_xy_z`.
+        Must be passed together.
+
+    s_bins, mu_bins : array_like, optional
+        Boundaries defining the bins of redshift-space separation and of the cosine
+        of the angle to the line-of-sight, as in
+        `~halotools.mock_observables.pair_counters.npairs_s_mu`. Must be passed together.
+
+    period : array_like, optional
+        Length-3 sequence defining the periodic boundary conditions
+        in each dimension. If you instead provide a single scalar, Lbox,
+        period is assumed to be the same in all Cartesian directions.
+
+    num_threads : int, optional
+        Number of threads to use in calculation, where parallelization is performed
+        using OpenMP threads that share the input arrays. Default is 1 for a purely serial
+        calculation. A string 'max' may be used to indicate that
+        the pair counters should use all available cores on the machine.
+
+    approx_cell1_size : array_like, optional
+        Length-3 array serving as a guess for the optimal manner by how points
+        will be apportioned into subvolumes of the simulation box.
+        Default is to use the largest search length of the requested binnings
+        in each dimension.
+
+    approx_cell2_size : array_like, optional
+        Analogous to ``approx_cell1_size``, but for sample2.
+
+    Returns
+    -------
+    counts : dict
+        Dictionary storing the pair counts of each requested binning under the name of
+        the pair counter returning the same counts: ``'npairs_3d'`` for ``rbins``,
+        ``'npairs_xy_z'`` for ``rp_bins`` and ``pi_bins``,
+        and ``'npairs_s_mu'`` for ``s_bins`` and ``mu_bins``.
+
+    Examples
+    --------
+    >>> Npts1, Npts2, Lbox = 1000, 1000, 250.
+    >>> sample1 = np.random.uniform(0, Lbox, Npts1*3).reshape((Npts1, 3))
+    >>> sample2 = np.random.uniform(0, Lbox, Npts2*3).reshape((Npts2, 3))
+    >>> rbins = np.logspace(-1, 1.5, 15)
+    >>> rp_bins, pi_bins = np.logspace(-1, 1.5, 15), np.linspace(0, 40, 41)
+    >>> counts = npairs_multi(sample1, sample2, rbins=rbins,
+    ...     rp_bins=rp_bins, pi_bins=pi_bins, period=Lbox)
+    >>> DD_r, DD_rp_pi = counts['npairs_3d'], counts['npairs_xy_z']
+    """
+    # Process the inputs with the helper function
+    result = _npairs_multi_process_args(sample1, sample2, rbins, rp_bins, pi_bins,
+        s_bins, mu_bins, period, num_threads, approx_cell1_size, approx_cell2_size)
+    x1in, y1in, z1in, x2in, y2in, z2in = result[0:6]
+    rbins, rp_bins, pi_bins, s_bins, mu_bins = result[6:11]
+    period, num_threads, PBCs, approx_cell1_size, approx_cell2_size = result[11:]
+    xperiod, yperiod, zperiod = period
+    search_xlength, search_ylength, search_zlength = _multi_search_lengths(
+        rbins, rp_bins, pi_bins, s_bins)
+
+    # convert to mu=sin(theta_los) binning used by the cython engine,
+    # as in npairs_s_mu
+    if s_bins is not None:
+        mu_bins_prime = np.sort(np.sin(np.arccos(mu_bins)))
+    else:
+        mu_bins_prime = None
+
+    # When sample1 is sample2, each unordered pair of points is only visited once
+    autocorrelation = _is_auto_count(x1in, y1in, z1in, x2in, y2in, z2in)
+
+    # Compute the estimates for the cell sizes
+    approx_cell1_size, approx_cell2_size = (
+        _set_approximate_cell_sizes(approx_cell1_size, approx_cell2_size, period)
+        )
+    approx_x1cell_size, approx_y1cell_size, approx_z1cell_size = approx_cell1_size
+    approx_x2cell_size, approx_y2cell_size, approx_z2cell_size = approx_cell2_size
+
+    # Build the rectangular mesh
+    double_mesh = RectangularDoubleMesh(x1in, y1in, z1in, x2in, y2in, z2in,
+        approx_x1cell_size, approx_y1cell_size, approx_z1cell_size,
+        approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
+        search_xlength, search_ylength, search_zlength, xperiod, yperiod, zperiod, PBCs,
+        shared_mesh=autocorrelation)
+
+    def _engine_bins(bins):
+        return np.zeros(0) if bins is None else bins
+
+    r_counts, xy_z_counts, s_mu_counts = npairs_multi_engine(double_mesh,
+        x1in, y1in, z1in, x2in, y2in, z2in,
+        _engine_bins(rbins), _engine_bins(rp_bins), _engine_bins(pi_bins),
+        _engine_bins(s_bins), _engine_bins(mu_bins_prime),
+        (0, double_mesh.mesh1.ncells), num_threads, autocorrelation)
+
+    counts = {}
+    if rbins is not None:
+        counts['npairs_3d'] = np.array(r_counts)
+    if rp_bins is not None:
+        counts['npairs_xy_z'] = np.array(xy_z_counts)
+    if s_bins is not None:
+        counts['npairs_s_mu'] = np.array(s_mu_counts)
+    return counts
+
+
+def _multi_search_lengths(rbins, rp_bins, pi_bins, s_bins):
+    """ Return the search lengths in each dimension covering all of the requested binnings.
+    """
+    xy_lengths, z_lengths = [], []
+    for bins in (rbins, s_bins):
+        if bins is not None:
+            xy_lengths.append(np.max(bins))
+            z_lengths.append(np.max(bins))
+    if rp_bins is not None:
+        xy_lengths.append(np.max(rp_bins))
+        z_lengths.append(np.max(pi_bins))
+    return max(xy_lengths), max(xy_lengths), max(z_lengths)
+
+
+def _process_optional_bins(bins, name):
+    """ Return None if ``bins`` is None, otherwise verify that ``bins``
+    is a monotonically increasing 1D array with at least two entries.
+    """
+    if bins is None:
+        return None
+    bins = np.atleast_1d(bins).astype('f8')
+    try:
+        assert bins.ndim == 1
+        assert len(bins) > 1
+        if len(bins) > 2:
+            assert array_is_monotonic(bins, strict=True) == 1
+    except AssertionError:
+        msg = ("Input ``{0}`` must be a monotonically increasing 1D array "
+            "with at least two entries".format(name))
+        raise ValueError(msg)
+    return bins
+
+
+def _npairs_multi_process_args(sample1, sample2, rbins, rp_bins, pi_bins,
+        s_bins, mu_bins, period, num_threads, approx_cell1_size, approx_cell2_size):
+    """
+    """
+    if num_threads is not 1:
+        if num_threads == 'max':
+            num_threads = multiprocessing.cpu_count()
+        if not isinstance(num_threads, int):
+            msg = "Input ``num_threads`` argument must be an integer or the string 'max'"
+            raise ValueError(msg)
+
+    # Passively enforce that we are working with ndarrays
+    x1 = sample1[:, 0]
+    y1 = sample1[:, 1]
+    z1 = sample1[:, 2]
+    x2 = sample2[:, 0]
+    y2 = sample2[:, 1]
+    z2 = sample2[:, 2]
+
+    rbins = _process_optional_bins(rbins, 'rbins')
+    rp_bins = _process_optional_bins(rp_bins, 'rp_bins')
+    pi_bins = _process_optional_bins(pi_bins, 'pi_bins')
+    s_bins = _process_optional_bins(s_bins, 's_bins')
+    mu_bins = _process_optional_bins(mu_bins, 'mu_bins')
+
+    try:
+        assert (rp_bins is None) == (pi_bins is None)
+        assert (s_bins is None) == (mu_bins is None)
+    except AssertionError:
+        msg = ("Inputs ``rp_bins`` and ``pi_bins``, and inputs ``s_bins`` and ``mu_bins``,\n"
+            "must either both be passed or both be None")
+        raise ValueError(msg)
+
+    if (rbins is None) & (rp_bins is None) & (s_bins is None):
+        msg = "At least one of ``rbins``, ``rp_bins`` or ``s_bins`` must be passed"
+        raise ValueError(msg)
+
+    search_xlength, search_ylength, search_zlength = _multi_search_lengths(
+        rbins, rp_bins, pi_bins, s_bins)
+
+    # Set the boolean value for the PBCs variable
+    if period is None:
+        PBCs = False
+        x1, y1, z1, x2, y2, z2, period = (
+            _enclose_in_box(x1, y1, z1, x2, y2, z2,
+                min_size=[search_xlength*3.0, search_ylength*3.0, search_zlength*3.0]))
+    else:
+        PBCs = True
+        period = np.atleast_1d(period).astype(float)
+        if len(period) == 1:
+            period = np.array([period[0]]*3)
+        try:
+            assert np.all(period < np.inf)
+            assert np.all(period > 0)
+        except AssertionError:
+            msg = "Input ``period`` must be a bounded positive number in all dimensions"
+            raise ValueError(msg)
+
+    default_cell_size = [search_xlength, search_ylength, search_zlength]
+    if approx_cell1_size is None:
+        approx_cell1_size = default_cell_size
+    elif custom_len(approx_cell1_size) == 1:
+        approx_cell1_size = [approx_cell1_size, approx_cell1_size, approx_cell1_size]
+    if approx_cell2_size is None:
+        approx_cell2_size = default_cell_size
+    elif custom_len(approx_cell2_size) == 1:
+        approx_cell2_size = [approx_cell2_size, approx_cell2_size, approx_cell2_size]
+
+    return (x1, y1, z1, x2, y2, z2,
+        rbins, rp_bins, pi_bins, s_bins, mu_bins,
+        period, num_threads, PBCs,
+        approx_cell1_size, approx_cell2_size)
@@ -4,11 +4,9 @@ used to count pairs as a function of separation.
 from __future__ import (absolute_import, division, print_function, unicode_literals)
 import numpy as np
 import multiprocessing
-from functools import partial
 
 from .rectangular_mesh import RectangularDoubleMesh
-from .mesh_helpers import (_set_approximate_cell_sizes, _enclose_in_box,
-    _cell1_parallelization_indices)
+from .mesh_helpers import _set_approximate_cell_sizes, _enclose_in_box
 from .cpairs import npairs_projected_engine
 from ...utils.array_utils import array_is_monotonic, custom_len
 
@@ -66,9 +64,8 @@ def npairs_projected(sample1, sample2, rp_bins, pi_max, period=None,
 
     num_threads : int, optional
         Number of threads to use in calculation, where parallelization is performed
-        using the python ``multiprocessing`` module. Default is 1 for a purely serial
-        calculation, in which case a multiprocessing Pool object will
-        never be instantiated. A string 'max' may be used to indicate that
+        using OpenMP threads that share the input arrays. Default is 1 for a purely serial
+        calculation. A string 'max' may be used to indicate that
         the pair counters should use all available cores on the machine.
 
     approx_cell1_size : array_like, optional
@@ -141,21 +138,10 @@ def npairs_projected(sample1, sample2, rp_bins, pi_max, period=None,
         approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
         search_xlength, search_ylength, search_zlength, xperiod, yperiod, zperiod, PBCs)
 
-    # # Create a function object that has a single argument, for parallelization purposes
-    engine = partial(npairs_projected_engine,
-        double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, rp_bins, pi_max)
-
-    # # Calculate the cell1 indices that will be looped over by the engine
-    num_threads, cell1_tuples = _cell1_parallelization_indices(
-        double_mesh.mesh1.ncells, num_threads)
-
-    if num_threads > 1:
-        pool = multiprocessing.Pool(num_threads)
-        result = pool.map(engine, cell1_tuples)
-        counts = np.sum(np.array(result), axis=0)
-        pool.close()
-    else:
-        counts = engine(cell1_tuples[0])
+    # The engine distributes the cells of mesh1 over num_threads threads
+    # that share the coordinate arrays and the mesh
+    counts = npairs_projected_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
+        rp_bins, pi_max, (0, double_mesh.mesh1.ncells), num_threads)
 
     return np.array(counts)
 
@@ -6,23 +6,24 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import numpy as np
 import multiprocessing
 from functools import partial
-from scipy.sparse import coo_matrix
+from scipy.sparse import coo_matrix, csr_matrix
 
 
 from .rectangular_mesh import RectangularDoubleMesh
-from .mesh_helpers import _set_approximate_cell_sizes, _enclose_in_box, _cell1_parallelization_indices
+from .mesh_helpers import (_set_approximate_cell_sizes, _enclose_in_box,
+    _cell1_parallelization_indices, _cell1_block_indices)
 from .cpairs import pairwise_distance_3d_engine
 
 from ...utils.array_utils import custom_len
 
 __author__ = ('Andrew Hearin', 'Duncan Campbell')
 
-__all__ = ('pairwise_distance_3d', )
+__all__ = ('pairwise_distance_3d', 'pairwise_distance_3d_blocks')
 
 
 def pairwise_distance_3d(data1, data2, r_max, period=None,
         verbose=False, num_threads=1,
-        approx_cell1_size=None, approx_cell2_size=None):
+        approx_cell1_size=None, approx_cell2_size=None, output_format='coo'):
     """
     Function returns pairs of points separated by
     a three-dimensional distance smaller than or eqaul to the input ``r_max``.
@@ -80,10 +81,21 @@ def pairwise_distance_3d(data1, data2, r_max, period=None,
     approx_cell2_size : array_like, optional
         See comments for ``approx_cell1_size``.
 
+    output_format : string, optional
+        Format of the returned sparse matrix, either ``coo`` or ``csr``.
+        For ``coo``, the default option, the pairs found by each thread
+        are concatenated into a `~scipy.sparse.coo_matrix`.
+        For ``csr``, the pairs of each point in ``data1`` are first counted
+        so that the `~scipy.sparse.csr_matrix` is preallocated, and the pairs
+        are then streamed into it one block of cells at a time with
+        `~halotools.mock_observables.pair_counters.pairwise_distance_3d_blocks`,
+        so that the peak memory is only a single copy of the output
+        plus one block of pairs.
+
     Returns
     -------
-     distance : `~scipy.sparse.coo_matrix`
-        sparse matrix in COO format containing distances
+     distance : `~scipy.sparse.coo_matrix` or `~scipy.sparse.csr_matrix`
+        sparse matrix containing distances
         between the ith entry in ``data1`` and jth in ``data2``.
 
     Examples
@@ -113,6 +125,102 @@ def pairwise_distance_3d(data1, data2, r_max, period=None,
 
     """
 
+    engine, double_mesh, num_threads = _pairwise_distance_3d_engine(data1, data2, r_max,
+        period, verbose, num_threads, approx_cell1_size, approx_cell2_size)
+    shape = (len(data1), len(data2))
+
+    if output_format == 'csr':
+        return _edge_blocks_to_csr(engine, double_mesh, num_threads, shape, 1)[0]
+    elif output_format != 'coo':
+        msg = "Input ``output_format`` must be either 'coo' or 'csr'"
+        raise ValueError(msg)
+
+    # Calculate the cell1 indices that will be looped over by the engine
+    num_threads, cell1_tuples = _cell1_parallelization_indices(
+        double_mesh.mesh1.ncells, num_threads)
+
+    if num_threads > 1:
+        pool = multiprocessing.Pool(num_threads)
+        result = pool.map(engine, cell1_tuples)
+        pool.close()
+    else:
+        result = [engine(cell1_tuples[0])]
+
+    # unpack the results
+    d = np.concatenate([r[0] for r in result])
+    i_inds = np.concatenate([r[1] for r in result])
+    j_inds = np.concatenate([r[2] for r in result])
+
+    return coo_matrix((d, (i_inds, j_inds)), shape=shape)
+
+
+def pairwise_distance_3d_blocks(data1, data2, r_max, period=None,
+        verbose=False, num_threads=1,
+        approx_cell1_size=None, approx_cell2_size=None, num_cells_per_block=None):
+    """
+    Generator yielding the pairs of points separated by
+    a three-dimensional distance smaller than or equal to the input ``r_max``,
+    one block of cells of the mesh at a time.
+
+    In contrast to `~halotools.mock_observables.pair_counters.pairwise_distance_3d`,
+    the full list of pairs is never held in memory, so that calculations
+    requiring each pair only once, e.g., histograms or sums over pairs,
+    can be carried out for samples with an arbitrarily large number of pairs.
+
+    Parameters
+    ----------
+    data1, data2, r_max, period, verbose, approx_cell1_size, approx_cell2_size
+        See the docstring of `~halotools.mock_observables.pair_counters.pairwise_distance_3d`.
+
+    num_threads : int, optional
+        Number of CPU cores to use in the pair-finding.
+        If ``num_threads`` is set to the string 'max', use all available cores.
+        When ``num_threads`` is larger than 1, ``num_threads`` blocks are computed
+        at a time by a multiprocessing pool, and are yielded in order.
+        Default is 1.
+
+    num_cells_per_block : int, optional
+        Number of cells of the mesh of ``data1`` that are looped over
+        to compute each block. Default is None, in which case each block
+        is the slab of cells sharing the same x-index of the mesh.
+
+    Yields
+    ------
+    i : numpy.array
+        Integer array of 0-indexed indices in ``data1``
+
+    j : numpy.array
+        Integer array of 0-indexed indices in ``data2``
+
+    d : numpy.array
+        Array of separation distances of the pairs (i, j)
+
+    Notes
+    -----
+    Each point in ``data1`` belongs to a single cell of the mesh, and so all of its pairs
+    appear in the same block.
+
+    Examples
+    --------
+    >>> Npts, Lbox = 1000, 250.
+    >>> data = np.random.uniform(0, Lbox, Npts*3).reshape((Npts, 3))
+    >>> num_pairs = 0
+    >>> for i, j, d in pairwise_distance_3d_blocks(data, data, 5., period=Lbox):
+    ...     num_pairs += len(i)
+    """
+    engine, double_mesh, num_threads = _pairwise_distance_3d_engine(data1, data2, r_max,
+        period, verbose, num_threads, approx_cell1_size, approx_cell2_size)
+    cell1_tuples = _cell1_block_indices(double_mesh.mesh1, num_cells_per_block)
+
+    for d, i, j in _iterate_edge_blocks(engine, cell1_tuples, num_threads):
+        yield i, j, d
+
+
+def _pairwise_distance_3d_engine(data1, data2, r_max, period,
+        verbose, num_threads, approx_cell1_size, approx_cell2_size):
+    """ Build the double mesh of the two samples and return the Cython engine
+    with all arguments bound except for the tuple of cells to loop over.
+    """
     # Process the inputs with the helper function
     result = _pairwise_distance_3d_process_args(data1, data2, r_max, period,
             verbose, num_threads, approx_cell1_size, approx_cell2_size)
@@ -135,33 +243,94 @@ def pairwise_distance_3d(data1, data2, r_max, period=None,
         approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
         search_xlength, search_ylength, search_zlength, xperiod, yperiod, zperiod, PBCs)
 
+    # Sort the points by cell once, rather than each time the engine is called on a block of cells
+    idx_sorted1, idx_sorted2 = double_mesh.mesh1.idx_sorted, double_mesh.mesh2.idx_sorted
+    x1in, y1in, z1in, r_max = (np.ascontiguousarray(a[idx_sorted1], dtype=np.float64)
+        for a in (x1in, y1in, z1in, r_max))
+    x2in, y2in, z2in = (np.ascontiguousarray(a[idx_sorted2], dtype=np.float64)
+        for a in (x2in, y2in, z2in))
+
     # Create a function object that has a single argument, for parallelization purposes
     engine = partial(pairwise_distance_3d_engine,
-        double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, r_max)
+        double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, r_max, presorted=True)
+
+    return engine, double_mesh, num_threads
 
-    # Calculate the cell1 indices that will be looped over by the engine
-    num_threads, cell1_tuples = _cell1_parallelization_indices(
-        double_mesh.mesh1.ncells, num_threads)
 
+# Engine bound to the worker processes of _iterate_edge_blocks by _init_edge_block_worker
+_edge_block_engine = None
+
+
+def _init_edge_block_worker(engine):
+    """ Bind the engine to a worker process once, so that its coordinate arrays and
+    double mesh are not sent to the worker again with every tuple of cells.
+    """
+    global _edge_block_engine
+    _edge_block_engine = engine
+
+
+def _edge_block(cell1_tuple):
+    return _edge_block_engine(cell1_tuple)
+
+
+def _iterate_edge_blocks(engine, cell1_tuples, num_threads):
+    """ Generator yielding the output of the engine for each tuple of cells in turn.
+    In the parallel case, the engine is sent to each worker process once,
+    and ``num_threads`` tuples are passed to the pool at a time,
+    so that at most ``num_threads`` blocks of pairs are held in memory.
+    """
     if num_threads > 1:
-        pool = multiprocessing.Pool(num_threads)
-        result = pool.map(engine, cell1_tuples)
-        pool.close()
+        pool = multiprocessing.Pool(num_threads,
+            initializer=_init_edge_block_worker, initargs=(engine, ))
+        try:
+            for first in range(0, len(cell1_tuples), num_threads):
+                for block in pool.map(_edge_block, cell1_tuples[first:first+num_threads]):
+                    yield block
+        finally:
+            pool.close()
+            pool.join()
     else:
-        result = [engine(cell1_tuples[0])]
+        for cell1_tuple in cell1_tuples:
+            yield engine(cell1_tuple)
 
-    # unpack result
-    d = np.zeros((0,), dtype='float')
-    i_inds = np.zeros((0,), dtype='int')
-    j_inds = np.zeros((0,), dtype='int')
 
-    # unpack the results
-    for i in range(len(result)):
-        d = np.append(d, result[i][0])
-        i_inds = np.append(i_inds, result[i][1])
-        j_inds = np.append(j_inds, result[i][2])
+def _edge_blocks_to_csr(engine, double_mesh, num_threads, shape, num_distances):
+    """ Build one `~scipy.sparse.csr_matrix` per distance returned by the engine,
+    e.g., two matrices for the perpendicular and parallel distances of the xy_z engine.
 
-    return coo_matrix((d, (i_inds, j_inds)), shape=(len(data1), len(data2)))
+    The pairs of each point in sample 1 are first counted to preallocate
+    the output arrays, and the pairs are then streamed into them one block at a time.
+    Since all the pairs of a point belong to the same block, each row of
+    the matrices is filled by a single block, with its column indices sorted.
+    """
+    # First pass: count the number of pairs of each point in sample 1
+    __, cell1_tuples = _cell1_parallelization_indices(double_mesh.mesh1.ncells, num_threads)
+    count_engine = partial(engine, count_only=True)
+    num_pairs = np.zeros(shape[0], dtype=np.int64)
+    for block_num_pairs in _iterate_edge_blocks(count_engine, cell1_tuples, num_threads):
+        num_pairs += block_num_pairs
+
+    indptr = np.zeros(shape[0]+1, dtype=np.int64)
+    np.cumsum(num_pairs, out=indptr[1:])
+    indices = np.empty(indptr[-1], dtype=np.int64)
+    data = [np.empty(indptr[-1], dtype=np.float64) for __ in range(num_distances)]
+
+    # Second pass: stream the pairs directly into their rows
+    cell1_tuples = _cell1_block_indices(double_mesh.mesh1)
+    for block in _iterate_edge_blocks(engine, cell1_tuples, num_threads):
+        distances, i, j = block[:num_distances], block[num_distances], block[num_distances+1]
+        idx_sorted = np.lexsort((j, i))
+        i = i[idx_sorted]
+        rank_within_row = np.arange(len(i)) - np.searchsorted(i, i)
+        pos = indptr[i] + rank_within_row
+        indices[pos] = j[idx_sorted]
+        for output, d in zip(data, distances):
+            output[pos] = d[idx_sorted]
+
+    # Matrices do not share their index arrays so that in-place operations on one
+    # such as eliminate_zeros do not corrupt the others
+    return [csr_matrix((d, indices if n == 0 else indices.copy(), indptr if n == 0 else indptr.copy()),
+        shape=shape) for n, d in enumerate(data)]
 
 
 def _pairwise_distance_3d_process_args(data1, data2, r_max, period,
@@ -8,20 +8,21 @@ import multiprocessing
 from functools import partial
 from scipy.sparse import coo_matrix
 
-from .pairwise_distance_3d import _get_r_max
+from .pairwise_distance_3d import _get_r_max, _iterate_edge_blocks, _edge_blocks_to_csr
 from .rectangular_mesh import RectangularDoubleMesh
-from .mesh_helpers import _set_approximate_cell_sizes, _enclose_in_box, _cell1_parallelization_indices
+from .mesh_helpers import (_set_approximate_cell_sizes, _enclose_in_box,
+    _cell1_parallelization_indices, _cell1_block_indices)
 from .cpairs import pairwise_distance_xy_z_engine
 
 from ...utils.array_utils import custom_len
 
-__all__ = ('pairwise_distance_xy_z', )
+__all__ = ('pairwise_distance_xy_z', 'pairwise_distance_xy_z_blocks')
 __author__ = ('Andrew Hearin', 'Duncan Campbell')
 
 
 def pairwise_distance_xy_z(data1, data2, rp_max, pi_max, period=None,
         verbose=False, num_threads=1,
-        approx_cell1_size=None, approx_cell2_size=None):
+        approx_cell1_size=None, approx_cell2_size=None, output_format='coo'):
     """
     Function returns pairs of points separated by
     a xy-projected distance smaller than or eqaul to the input ``rp_max`` and z distance ``pi_max``.
@@ -87,10 +88,25 @@ def pairwise_distance_xy_z(data1, data2, rp_max, pi_max, period=None,
     approx_cell2_size : array_like, optional
         See comments for ``approx_cell1_size``.
 
+    output_format : string, optional
+        Format of the returned sparse matrices, either ``coo`` or ``csr``.
+        For ``coo``, the default option, the pairs found by each thread
+        are concatenated into `~scipy.sparse.coo_matrix` objects.
+        For ``csr``, the pairs of each point in ``data1`` are first counted
+        so that the `~scipy.sparse.csr_matrix` objects are preallocated, and the pairs
+        are then streamed into them one block of cells at a time with
+        `~halotools.mock_observables.pair_counters.pairwise_distance_xy_z_blocks`,
+        so that the peak memory is only a single copy of the output
+        plus one block of pairs.
+
     Returns
     -------
-     distance : `~scipy.sparse.coo_matrix`
-        sparse matrix in COO format containing distances
+     perp_distance : `~scipy.sparse.coo_matrix` or `~scipy.sparse.csr_matrix`
+        sparse matrix containing xy-projected distances
+        between the ith entry in ``data1`` and jth in ``data2``.
+
+     para_distance : `~scipy.sparse.coo_matrix` or `~scipy.sparse.csr_matrix`
+        sparse matrix containing z distances
         between the ith entry in ``data1`` and jth in ``data2``.
 
     Examples
@@ -121,6 +137,108 @@ def pairwise_distance_xy_z(data1, data2, rp_max, pi_max, period=None,
 
     """
 
+    engine, double_mesh, num_threads = _pairwise_distance_xy_z_engine(data1, data2,
+        rp_max, pi_max, period, verbose, num_threads, approx_cell1_size, approx_cell2_size)
+    shape = (len(data1), len(data2))
+
+    if output_format == 'csr':
+        return tuple(_edge_blocks_to_csr(engine, double_mesh, num_threads, shape, 2))
+    elif output_format != 'coo':
+        msg = "Input ``output_format`` must be either 'coo' or 'csr'"
+        raise ValueError(msg)
+
+    # Calculate the cell1 indices that will be looped over by the engine
+    num_threads, cell1_tuples = _cell1_parallelization_indices(
+        double_mesh.mesh1.ncells, num_threads)
+
+    if num_threads > 1:
+        pool = multiprocessing.Pool(num_threads)
+        result = pool.map(engine, cell1_tuples)
+        pool.close()
+    else:
+        result = [engine(cell1_tuples[0])]
+
+    # unpack the results
+    d_perp = np.concatenate([r[0] for r in result])
+    d_para = np.concatenate([r[1] for r in result])
+    i_inds = np.concatenate([r[2] for r in result])
+    j_inds = np.concatenate([r[3] for r in result])
+
+    return (coo_matrix((d_perp, (i_inds, j_inds)), shape=shape),
+        coo_matrix((d_para, (i_inds, j_inds)), shape=shape))
+
+
+def pairwise_distance_xy_z_blocks(data1, data2, rp_max, pi_max, period=None,
+        verbose=False, num_threads=1,
+        approx_cell1_size=None, approx_cell2_size=None, num_cells_per_block=None):
+    """
+    Generator yielding the pairs of points separated by
+    a xy-projected distance smaller than or equal to the input ``rp_max``
+    and z distance smaller than or equal to ``pi_max``,
+    one block of cells of the mesh at a time.
+
+    In contrast to `~halotools.mock_observables.pair_counters.pairwise_distance_xy_z`,
+    the full list of pairs is never held in memory, so that calculations
+    requiring each pair only once, e.g., linking groups or sums over pairs,
+    can be carried out for samples with an arbitrarily large number of pairs.
+
+    Parameters
+    ----------
+    data1, data2, rp_max, pi_max, period, verbose, approx_cell1_size, approx_cell2_size
+        See the docstring of `~halotools.mock_observables.pair_counters.pairwise_distance_xy_z`.
+
+    num_threads : int, optional
+        Number of CPU cores to use in the pair-finding.
+        If ``num_threads`` is set to the string 'max', use all available cores.
+        When ``num_threads`` is larger than 1, ``num_threads`` blocks are computed
+        at a time by a multiprocessing pool, and are yielded in order.
+        Default is 1.
+
+    num_cells_per_block : int, optional
+        Number of cells of the mesh of ``data1`` that are looped over
+        to compute each block. Default is None, in which case each block
+        is the slab of cells sharing the same x-index of the mesh.
+
+    Yields
+    ------
+    i : numpy.array
+        Integer array of 0-indexed indices in ``data1``
+
+    j : numpy.array
+        Integer array of 0-indexed indices in ``data2``
+
+    d_perp : numpy.array
+        Array of xy-projected separation distances of the pairs (i, j)
+
+    d_para : numpy.array
+        Array of z separation distances of the pairs (i, j)
+
+    Notes
+    -----
+    Each point in ``data1`` belongs to a single cell of the mesh, and so all of its pairs
+    appear in the same block.
+
+    Examples
+    --------
+    >>> Npts, Lbox = 1000, 250.
+    >>> data = np.random.uniform(0, Lbox, Npts*3).reshape((Npts, 3))
+    >>> num_pairs = 0
+    >>> for i, j, d_perp, d_para in pairwise_distance_xy_z_blocks(data, data, 2., 5., period=Lbox):
+    ...     num_pairs += len(i)
+    """
+    engine, double_mesh, num_threads = _pairwise_distance_xy_z_engine(data1, data2,
+        rp_max, pi_max, period, verbose, num_threads, approx_cell1_size, approx_cell2_size)
+    cell1_tuples = _cell1_block_indices(double_mesh.mesh1, num_cells_per_block)
+
+    for d_perp, d_para, i, j in _iterate_edge_blocks(engine, cell1_tuples, num_threads):
+        yield i, j, d_perp, d_para
+
+
+def _pairwise_distance_xy_z_engine(data1, data2, rp_max, pi_max, period,
+        verbose, num_threads, approx_cell1_size, approx_cell2_size):
+    """ Build the double mesh of the two samples and return the Cython engine
+    with all arguments bound except for the tuple of cells to loop over.
+    """
     # Process the inputs with the helper function
     result = _pairwise_distance_xy_z_process_args(data1, data2, rp_max, pi_max, period,
             verbose, num_threads, approx_cell1_size, approx_cell2_size)
@@ -143,36 +261,18 @@ def pairwise_distance_xy_z(data1, data2, rp_max, pi_max, period=None,
         approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
         search_xlength, search_ylength, search_zlength, xperiod, yperiod, zperiod, PBCs)
 
+    # Sort the points by cell once, rather than each time the engine is called on a block of cells
+    idx_sorted1, idx_sorted2 = double_mesh.mesh1.idx_sorted, double_mesh.mesh2.idx_sorted
+    x1in, y1in, z1in, rp_max, pi_max = (np.ascontiguousarray(a[idx_sorted1], dtype=np.float64)
+        for a in (x1in, y1in, z1in, rp_max, pi_max))
+    x2in, y2in, z2in = (np.ascontiguousarray(a[idx_sorted2], dtype=np.float64)
+        for a in (x2in, y2in, z2in))
+
     # Create a function object that has a single argument, for parallelization purposes
     engine = partial(pairwise_distance_xy_z_engine,
-        double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, rp_max, pi_max)
-
-    # Calculate the cell1 indices that will be looped over by the engine
-    num_threads, cell1_tuples = _cell1_parallelization_indices(
-        double_mesh.mesh1.ncells, num_threads)
-
-    if num_threads > 1:
-        pool = multiprocessing.Pool(num_threads)
-        result = pool.map(engine, cell1_tuples)
-        pool.close()
-    else:
-        result = [engine(cell1_tuples[0])]
-
-    # unpack result
-    d_perp = np.zeros((0,), dtype='float')
-    d_para = np.zeros((0,), dtype='float')
-    i_inds = np.zeros((0,), dtype='int')
-    j_inds = np.zeros((0,), dtype='int')
+        double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, rp_max, pi_max, presorted=True)
 
-    # unpack the results
-    for i in range(len(result)):
-        d_perp = np.append(d_perp, result[i][0])
-        d_para = np.append(d_para, result[i][1])
-        i_inds = np.append(i_inds, result[i][2])
-        j_inds = np.append(j_inds, result[i][3])
-
-    return (coo_matrix((d_perp, (i_inds, j_inds)), shape=(len(data1), len(data2))),
-        coo_matrix((d_para, (i_inds, j_inds)), shape=(len(data1), len(data2))))
+    return engine, double_mesh, num_threads
 
 
 def _pairwise_distance_xy_z_process_args(data1, data2, rp_max, pi_max, period,
@@ -179,11 +179,75 @@ class RectangularMesh(object):
     def cell_id_from_cell_tuple(self, ix, iy, iz):
         return ix*(self.num_ydivs*self.num_zdivs) + iy*self.num_zdivs + iz
 
+    def _as_dict(self, prefix=''):
+        """ Return a dictionary of the arrays and scalars that fully specify the mesh,
+        with each key prepended by the input ``prefix``.
+        """
+        keys = ('npts', 'xperiod', 'yperiod', 'zperiod',
+            'num_xdivs', 'num_ydivs', 'num_zdivs', 'idx_sorted', 'cell_id_indices')
+        return dict((prefix+key, getattr(self, key)) for key in keys)
+
+    @classmethod
+    def _from_dict(cls, d, prefix=''):
+        """ Reconstruct a mesh from the output of `_as_dict` without re-sorting the points.
+        """
+        mesh = cls.__new__(cls)
+        mesh.npts = int(d[prefix+'npts'])
+        mesh.xperiod = float(d[prefix+'xperiod'])
+        mesh.yperiod = float(d[prefix+'yperiod'])
+        mesh.zperiod = float(d[prefix+'zperiod'])
+        mesh.num_xdivs = int(d[prefix+'num_xdivs'])
+        mesh.num_ydivs = int(d[prefix+'num_ydivs'])
+        mesh.num_zdivs = int(d[prefix+'num_zdivs'])
+        mesh.ncells = mesh.num_xdivs*mesh.num_ydivs*mesh.num_zdivs
+        mesh.xcell_size = mesh.xperiod / float(mesh.num_xdivs)
+        mesh.ycell_size = mesh.yperiod / float(mesh.num_ydivs)
+        mesh.zcell_size = mesh.zperiod / float(mesh.num_zdivs)
+        mesh.idx_sorted = np.ascontiguousarray(d[prefix+'idx_sorted'])
+        mesh.cell_id_indices = np.ascontiguousarray(d[prefix+'cell_id_indices'])
+        return mesh
+
+    def save(self, fname):
+        """ Store the mesh on disk in ``.npz`` format so that it can be
+        reloaded with `RectangularMesh.load` rather than rebuilt from the points.
+
+        Parameters
+        ----------
+        fname : string
+            Absolute path to the output file.
+        """
+        np.savez(fname, **self._as_dict())
+
+    @classmethod
+    def load(cls, fname):
+        """ Load a mesh previously stored with `RectangularMesh.save`.
+
+        Parameters
+        ----------
+        fname : string
+            Absolute path to the file.
+
+        Returns
+        -------
+        mesh : `RectangularMesh`
+        """
+        with np.load(fname) as d:
+            return cls._from_dict(d)
+
 
 class RectangularDoubleMesh(object):
     """ Fundamental data structure of the `~halotools.mock_observables` sub-package.
     `~halotools.mock_observables.RectangularDoubleMesh` is built up from two instances
     of `~halotools.mock_observables.pair_counters.rectangular_mesh.RectangularMesh`.
+
+    Building the mesh requires sorting all the points by their cell ID,
+    which is frequently the most expensive step of a pair-counting calculation
+    for large samples. When the same sample is used repeatedly,
+    e.g., the randoms of a correlation function computed at every step of an MCMC,
+    the mesh can be built once and then passed to the pair counters
+    via their ``double_mesh`` argument, stored to disk with
+    `RectangularDoubleMesh.save`, and re-used as either component
+    of a new double mesh via the ``mesh1`` and ``mesh2`` arguments.
     """
 
     def __init__(self, x1, y1, z1, x2, y2, z2,
@@ -192,7 +256,8 @@ class RectangularDoubleMesh(object):
             search_xlength, search_ylength, search_zlength,
             xperiod, yperiod, zperiod, PBCs=True,
             max_cells_per_dimension_cell1=default_max_cells_per_dimension_cell1,
-            max_cells_per_dimension_cell2=default_max_cells_per_dimension_cell2):
+            max_cells_per_dimension_cell2=default_max_cells_per_dimension_cell2,
+            mesh1=None, mesh2=None, shared_mesh=False):
         """
         Parameters
         ----------
@@ -236,6 +301,24 @@ class RectangularDoubleMesh(object):
         max_cells_per_dimension_cell2 : int, optional
             Maximum number of cells per dimension. Default is 50.
 
+        mesh1 : `RectangularMesh`, optional
+            Previously built mesh of the points in *x1, y1, z1*. If passed,
+            the points of sample 1 will not be re-sorted and the
+            ``approx_x1cell_size``-type arguments will be ignored.
+            Default is None, in which case mesh1 will be built from scratch.
+
+        mesh2 : `RectangularMesh`, optional
+            Previously built mesh of the points in *x2, y2, z2*. The cells of
+            a pre-built ``mesh2`` must evenly divide the cells of mesh1.
+            Default is None, in which case mesh2 will be built from scratch.
+
+        shared_mesh : bool, optional
+            If True, sample 2 is taken to be identical to sample 1, and a single mesh
+            is used for both samples so that the pair-counting engines can visit
+            each unordered pair of points only once.
+            The ``approx_x2cell_size``-type arguments and ``mesh2`` are then ignored.
+            Default is False.
+
         """
         self.xperiod = xperiod
         self.yperiod = yperiod
@@ -247,23 +330,44 @@ class RectangularDoubleMesh(object):
 
         self._check_sensible_constructor_inputs()
 
-        approx_x1cell_size = sample1_cell_size(xperiod, search_xlength, approx_x1cell_size,
-            max_cells_per_dimension=max_cells_per_dimension_cell1)
-        approx_y1cell_size = sample1_cell_size(yperiod, search_ylength, approx_y1cell_size,
-            max_cells_per_dimension=max_cells_per_dimension_cell1)
-        approx_z1cell_size = sample1_cell_size(zperiod, search_zlength, approx_z1cell_size,
+        if mesh1 is None:
+            approx_x1cell_size = sample1_cell_size(xperiod, search_xlength, approx_x1cell_size,
+                max_cells_per_dimension=max_cells_per_dimension_cell1)
+            approx_y1cell_size = sample1_cell_size(yperiod, search_ylength, approx_y1cell_size,
                 max_cells_per_dimension=max_cells_per_dimension_cell1)
-        self.mesh1 = RectangularMesh(x1, y1, z1, xperiod, yperiod, zperiod,
-            approx_x1cell_size, approx_y1cell_size, approx_z1cell_size)
-
-        approx_x2cell_size = sample2_cell_sizes(xperiod, self.mesh1.xcell_size, approx_x2cell_size,
-            max_cells_per_dimension=max_cells_per_dimension_cell2)
-        approx_y2cell_size = sample2_cell_sizes(yperiod, self.mesh1.ycell_size, approx_y2cell_size,
-            max_cells_per_dimension=max_cells_per_dimension_cell2)
-        approx_z2cell_size = sample2_cell_sizes(zperiod, self.mesh1.zcell_size, approx_z2cell_size,
-            max_cells_per_dimension=max_cells_per_dimension_cell2)
-        self.mesh2 = RectangularMesh(x2, y2, z2, xperiod, yperiod, zperiod,
-            approx_x2cell_size, approx_y2cell_size, approx_z2cell_size)
+            approx_z1cell_size = sample1_cell_size(zperiod, search_zlength, approx_z1cell_size,
+                    max_cells_per_dimension=max_cells_per_dimension_cell1)
+            self.mesh1 = RectangularMesh(x1, y1, z1, xperiod, yperiod, zperiod,
+                approx_x1cell_size, approx_y1cell_size, approx_z1cell_size)
+        else:
+            self._check_prebuilt_mesh(mesh1, x1, 'mesh1')
+            self.mesh1 = mesh1
+
+        if shared_mesh is True:
+            self.mesh2 = self.mesh1
+        elif mesh2 is None:
+            approx_x2cell_size = sample2_cell_sizes(xperiod, self.mesh1.xcell_size, approx_x2cell_size,
+                max_cells_per_dimension=max_cells_per_dimension_cell2)
+            approx_y2cell_size = sample2_cell_sizes(yperiod, self.mesh1.ycell_size, approx_y2cell_size,
+                max_cells_per_dimension=max_cells_per_dimension_cell2)
+            approx_z2cell_size = sample2_cell_sizes(zperiod, self.mesh1.zcell_size, approx_z2cell_size,
+                max_cells_per_dimension=max_cells_per_dimension_cell2)
+            self.mesh2 = RectangularMesh(x2, y2, z2, xperiod, yperiod, zperiod,
+                approx_x2cell_size, approx_y2cell_size, approx_z2cell_size)
+        else:
+            self._check_prebuilt_mesh(mesh2, x2, 'mesh2')
+            try:
+                assert mesh2.num_xdivs % self.mesh1.num_xdivs == 0
+                assert mesh2.num_ydivs % self.mesh1.num_ydivs == 0
+                assert mesh2.num_zdivs % self.mesh1.num_zdivs == 0
+            except AssertionError:
+                msg = ("\nThe cells of the input ``mesh2`` must evenly divide the cells of mesh1.\n"
+                    "Input ``mesh2`` has (%i, %i, %i) cells per dimension, \n"
+                    "but mesh1 has (%i, %i, %i) cells per dimension.\n" %
+                    (mesh2.num_xdivs, mesh2.num_ydivs, mesh2.num_zdivs,
+                    self.mesh1.num_xdivs, self.mesh1.num_ydivs, self.mesh1.num_zdivs))
+                raise ValueError(msg)
+            self.mesh2 = mesh2
 
         self.num_xcell2_per_xcell1 = self.mesh2.num_xdivs // self.mesh1.num_xdivs
         self.num_ycell2_per_ycell1 = self.mesh2.num_ydivs // self.mesh1.num_ydivs
@@ -302,3 +406,72 @@ class RectangularDoubleMesh(object):
                 "If you need to count pairs on these length scales, \n"
                 "you should use a larger simulation.\n" % (self.search_zlength, self.zperiod))
             raise ValueError(msg)
+
+    def _check_prebuilt_mesh(self, mesh, x, name):
+        """ Verify that a pre-built mesh was constructed for a sample of the same size
+        in a box with the same periodicity as the double mesh.
+        """
+        try:
+            assert mesh.npts == len(x)
+        except AssertionError:
+            msg = ("\nInput ``%s`` was built for %i points, \n"
+                "but the corresponding sample has %i points.\n" % (name, mesh.npts, len(x)))
+            raise ValueError(msg)
+
+        try:
+            assert np.allclose([mesh.xperiod, mesh.yperiod, mesh.zperiod],
+                [self.xperiod, self.yperiod, self.zperiod])
+        except AssertionError:
+            msg = ("\nInput ``%s`` was built for a box with period = (%.2f, %.2f, %.2f),\n"
+                "but the double mesh has period = (%.2f, %.2f, %.2f).\n" %
+                (name, mesh.xperiod, mesh.yperiod, mesh.zperiod,
+                self.xperiod, self.yperiod, self.zperiod))
+            raise ValueError(msg)
+
+    def save(self, fname):
+        """ Store the double mesh on disk in ``.npz`` format so that it can be
+        reloaded with `RectangularDoubleMesh.load` rather than rebuilt.
+
+        Parameters
+        ----------
+        fname : string
+            Absolute path to the output file, e.g., a file stored
+            alongside the halo catalog the mesh was built from.
+        """
+        d = self.mesh1._as_dict(prefix='mesh1_')
+        d.update(self.mesh2._as_dict(prefix='mesh2_'))
+        d['search_xlength'] = self.search_xlength
+        d['search_ylength'] = self.search_ylength
+        d['search_zlength'] = self.search_zlength
+        d['PBCs'] = self._PBCs
+        np.savez(fname, **d)
+
+    @classmethod
+    def load(cls, fname):
+        """ Load a double mesh previously stored with `RectangularDoubleMesh.save`.
+
+        Parameters
+        ----------
+        fname : string
+            Absolute path to the file.
+
+        Returns
+        -------
+        double_mesh : `RectangularDoubleMesh`
+        """
+        double_mesh = cls.__new__(cls)
+        with np.load(fname) as d:
+            double_mesh.mesh1 = RectangularMesh._from_dict(d, prefix='mesh1_')
+            double_mesh.mesh2 = RectangularMesh._from_dict(d, prefix='mesh2_')
+            double_mesh.search_xlength = float(d['search_xlength'])
+            double_mesh.search_ylength = float(d['search_ylength'])
+            double_mesh.search_zlength = float(d['search_zlength'])
+            double_mesh._PBCs = bool(d['PBCs'])
+
+        double_mesh.xperiod = double_mesh.mesh1.xperiod
+        double_mesh.yperiod = double_mesh.mesh1.yperiod
+        double_mesh.zperiod = double_mesh.mesh1.zperiod
+        double_mesh.num_xcell2_per_xcell1 = double_mesh.mesh2.num_xdivs // double_mesh.mesh1.num_xdivs
+        double_mesh.num_ycell2_per_ycell1 = double_mesh.mesh2.num_ydivs // double_mesh.mesh1.num_ydivs
+        double_mesh.num_zcell2_per_zcell1 = double_mesh.mesh2.num_zdivs // double_mesh.mesh1.num_zdivs
+        return double_mesh
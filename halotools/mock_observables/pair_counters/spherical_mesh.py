@@ -0,0 +1,112 @@
+""" Module containing the `~halotools.mock_observables.pair_counters.SphericalMesh` class
+used to divide the surface of the unit sphere into cells for angular pair-counting.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+
+__all__ = ('SphericalMesh', )
+__author__ = ('Andrew Hearin', 'Duncan Campbell')
+
+default_max_cells_per_dimension = 500
+
+
+class SphericalMesh(object):
+    """ Data structure dividing the surface of the unit sphere into
+    declination bands of equal height, each of which is divided into
+    cells of equal width in right ascension.
+
+    The number of cells in each band is proportional to the circumference of the band,
+    so that all cells subtend a similar solid angle. In contrast to a
+    `~halotools.mock_observables.pair_counters.rectangular_mesh.RectangularMesh`
+    of the unit-sphere Cartesian coordinates, in which points lying on a thin shell
+    leave most cells of the enclosing cube empty, every cell of a `SphericalMesh`
+    covers a patch of the sphere.
+
+    As for `~halotools.mock_observables.pair_counters.rectangular_mesh.RectangularMesh`,
+    the points are sorted by the ID of the cell they belong to, so that the points of
+    the cell with ID *i* are those with indices
+    ``idx_sorted[cell_id_indices[i]:cell_id_indices[i+1]]``.
+    Cell IDs increase with right ascension within each band,
+    and bands are ordered by increasing declination.
+    """
+
+    def __init__(self, ra, dec, approx_cell_size,
+            max_cells_per_dimension=default_max_cells_per_dimension):
+        """
+        Parameters
+        ----------
+        ra, dec : arrays
+            Length-*Npts* arrays storing the right ascension and declination
+            of the points in degrees.
+
+        approx_cell_size : float
+            Approximate angular size of the cells in degrees.
+            The height of the declination bands is the closest value that evenly
+            divides 180 degrees, and the width of the cells of each band
+            is the closest value that evenly divides 360 degrees once projected
+            onto the band edge that is closest to the equator.
+
+        max_cells_per_dimension : int, optional
+            Maximum number of declination bands. Bands are divided into at most
+            twice as many cells in right ascension. Default is 500.
+
+        Examples
+        --------
+        >>> from halotools.utils import sample_spherical_surface
+        >>> angular_coords = np.array(sample_spherical_surface(1000, seed=43))
+        >>> ra, dec = angular_coords[:, 0], angular_coords[:, 1]
+        >>> mesh = SphericalMesh(ra, dec, 5.)
+
+        The points of the cell with ID *i* can be accessed as follows:
+
+        >>> i = 100
+        >>> ifirst, ilast = mesh.cell_id_indices[i], mesh.cell_id_indices[i+1]
+        >>> ra_ith_cell = ra[mesh.idx_sorted][ifirst:ilast]
+        """
+        ra = np.atleast_1d(ra).astype('f8')
+        dec = np.atleast_1d(dec).astype('f8')
+        self.npts = ra.shape[0]
+
+        approx_cell_size = float(approx_cell_size)
+        try:
+            assert approx_cell_size > 0
+        except AssertionError:
+            msg = "Input ``approx_cell_size`` must be strictly positive"
+            raise ValueError(msg)
+
+        self.num_dec_divs = min(max(int(np.round(180./approx_cell_size)), 1),
+            max_cells_per_dimension)
+        self.dec_cell_size = 180./self.num_dec_divs
+
+        # The widest circle of each band is at its edge closest to the equator
+        dec_low = -90. + np.arange(self.num_dec_divs)*self.dec_cell_size
+        dec_high = dec_low + self.dec_cell_size
+        min_abs_dec = np.where(dec_low*dec_high <= 0, 0.,
+            np.minimum(np.abs(dec_low), np.abs(dec_high)))
+        band_circumference = 360.*np.cos(np.radians(min_abs_dec))
+        num_ra_divs = np.round(band_circumference/approx_cell_size).astype(np.int64)
+        self.num_ra_divs = np.clip(num_ra_divs, 1, 2*max_cells_per_dimension)
+        self.ra_cell_size = 360./self.num_ra_divs
+
+        self.first_cell_in_band = np.append(0, np.cumsum(self.num_ra_divs)).astype(np.int64)
+        self.ncells = int(self.first_cell_in_band[-1])
+
+        idec = np.floor((dec + 90.)/self.dec_cell_size).astype(np.int64)
+        idec = np.clip(idec, 0, self.num_dec_divs-1)
+        ira = np.floor(np.mod(ra, 360.)/self.ra_cell_size[idec]).astype(np.int64)
+        ira = np.clip(ira, 0, self.num_ra_divs[idec]-1)
+
+        cell_ids = self.first_cell_in_band[idec] + ira
+        self.idx_sorted = np.ascontiguousarray(np.argsort(cell_ids, kind='mergesort'))
+
+        cell_id_indices = np.searchsorted(cell_ids, np.arange(self.ncells),
+            sorter=self.idx_sorted)
+        cell_id_indices = np.append(cell_id_indices, self.npts)
+        self.cell_id_indices = np.ascontiguousarray(cell_id_indices, dtype=np.int64)
+
+    def same_cells_as(self, other):
+        """ Return True if ``other`` is a `SphericalMesh` with identical cells.
+        """
+        return ((self.num_dec_divs == other.num_dec_divs) and
+            np.array_equal(self.num_ra_divs, other.num_ra_divs))
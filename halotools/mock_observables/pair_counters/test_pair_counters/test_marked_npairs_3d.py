@@ -411,3 +411,34 @@ def test_marked_npairs_behavior_weight_func_id10():
     result = marked_npairs_3d(grid_points, grid_points, rbins, period=period,
     weights1=weights, weights2=weights, weight_func_id=10, approx_cell1_size=[rmax, rmax, rmax])
     assert np.all(result == -3*test_result), error_msg
+
+
+def test_marked_npairs_3d_weight_sets():
+    """ Verify that passing K sets of weights returns the same counts as
+    K separate calls, and that a single set of weights is used for all K sets.
+    """
+    Npts, num_sets = 500, 4
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts, 3))
+        sample2 = np.random.random((Npts, 3))
+        weights1 = np.random.random((Npts, 2))
+        weight_sets2 = np.random.random((Npts, num_sets, 2))
+    rbins = np.array([0.0, 0.05, 0.1, 0.2])
+    period = np.array([1.0, 1.0, 1.0])
+
+    for num_threads in (1, 2):
+        result = marked_npairs_3d(sample1, sample2, rbins, period=period,
+            weights1=weights1, weights2=weight_sets2, weight_func_id=5,
+            num_threads=num_threads)
+        assert np.shape(result) == (num_sets, len(rbins))
+
+        for k in range(num_sets):
+            correct_result = marked_npairs_3d(sample1, sample2, rbins, period=period,
+                weights1=weights1, weights2=weight_sets2[:, k, :], weight_func_id=5)
+            assert np.allclose(result[k], correct_result)
+
+    with pytest.raises(HalotoolsError) as err:
+        marked_npairs_3d(sample1, sample2, rbins, period=period,
+            weights1=weight_sets2[:, :2, :], weights2=weight_sets2, weight_func_id=5)
+    substr = "that store a different number of sets of weights: 2 and 4"
+    assert substr in err.value.args[0]
@@ -420,3 +420,25 @@ def test_marked_npairs_behavior_weight_func_id10():
     result = marked_npairs_xy_z(grid_points, grid_points, rp_bins, pi_bins, period=period,
     weights1=weights, weights2=weights, weight_func_id=10, approx_cell1_size=[rmax, rmax, rmax])
     assert np.all(result == -3*test_result), error_msg
+
+
+def test_marked_npairs_xy_z_weight_sets():
+    """ Verify that passing K sets of weights returns the same counts as K separate calls.
+    """
+    Npts, num_sets = 500, 3
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts, 3))
+        weight_sets1 = np.random.random((Npts, num_sets, 1))
+        weight_sets2 = np.random.random((Npts, num_sets, 1))
+    rp_bins = np.array([0.0, 0.05, 0.1, 0.2])
+    pi_bins = np.array([0.0, 0.1, 0.2])
+    period = np.array([1.0, 1.0, 1.0])
+
+    result = marked_npairs_xy_z(sample1, sample1, rp_bins, pi_bins, period=period,
+        weights1=weight_sets1, weights2=weight_sets2, weight_func_id=1)
+    assert np.shape(result) == (num_sets, len(rp_bins), len(pi_bins))
+
+    for k in range(num_sets):
+        correct_result = marked_npairs_xy_z(sample1, sample1, rp_bins, pi_bins, period=period,
+            weights1=weight_sets1[:, k, :], weights2=weight_sets2[:, k, :], weight_func_id=1)
+        assert np.allclose(result[k], correct_result)
@@ -8,6 +8,7 @@ from astropy.utils.misc import NumpyRNGContext
 from astropy.config.paths import _find_home
 
 from ..npairs_3d import npairs_3d
+from ..rectangular_mesh import RectangularDoubleMesh
 from ..pairs import npairs as pure_python_brute_force_npairs_3d
 
 from ...tests.cf_helpers import generate_locus_of_3d_points
@@ -221,6 +222,20 @@ def test_parallel():
     assert np.all(serial_result == parallel_result7)
 
 
+def test_threaded_engine_agrees_with_serial():
+    """ Verify that distributing the cells over several threads
+    sharing the same arrays does not change the counts.
+    """
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((1000, 3))
+        sample2 = np.random.random((500, 3))
+    rbins = np.array([0.001, 0.1, 0.2, 0.3])
+
+    serial_result = npairs_3d(sample1, sample2, rbins, period=1, num_threads=1)
+    threaded_result = npairs_3d(sample1, sample2, rbins, period=1, num_threads=3)
+    assert np.all(serial_result == threaded_result)
+
+
 def test_npairs_brute_force_periodic():
     """
     Function tests npairs with periodic boundary conditions.
@@ -265,6 +280,68 @@ def test_npairs_brute_force_nonperiodic():
     assert np.all(test_result == result), msg
 
 
+def test_auto_count_agrees_with_brute_force():
+    """ Verify that counting the unordered pairs of identical samples gives
+    the same double-counted result as the brute-force pair counter,
+    including for small cells in which a cell is paired with its own periodic image,
+    for multiple threads, and for a pre-built mesh with two separately-built meshes.
+    """
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((500, 3))
+    rbins = np.array([0.001, 0.1, 0.2, 0.3])
+    period = 1.
+
+    correct_result = pure_python_brute_force_npairs_3d(sample1, sample1, rbins, period=period)
+
+    result = npairs_3d(sample1, sample1.copy(), rbins, period=period)
+    assert np.all(result == correct_result)
+
+    result = npairs_3d(sample1, sample1, rbins, period=period, approx_cell1_size=0.25)
+    assert np.all(result == correct_result)
+
+    result = npairs_3d(sample1, sample1, rbins, period=period, num_threads=3)
+    assert np.all(result == correct_result)
+
+    double_mesh = RectangularDoubleMesh(
+        sample1[:, 0], sample1[:, 1], sample1[:, 2],
+        sample1[:, 0], sample1[:, 1], sample1[:, 2],
+        0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.3, 0.3, 0.3, period, period, period)
+    result = npairs_3d(sample1, sample1, rbins, period=period, double_mesh=double_mesh)
+    assert np.all(result == correct_result)
+
+
+def test_npairs_prebuilt_double_mesh():
+    """ Verify that passing a pre-built mesh to `~halotools.mock_observables.npairs_3d`
+    gives the same result as building the mesh from scratch.
+    """
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((500, 3))
+        sample2 = np.random.random((300, 3))
+    rbins = np.array([0.001, 0.1, 0.2, 0.3])
+    period = 1.
+
+    double_mesh = RectangularDoubleMesh(
+        sample1[:, 0], sample1[:, 1], sample1[:, 2],
+        sample2[:, 0], sample2[:, 1], sample2[:, 2],
+        0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.3, 0.3, 0.3, period, period, period)
+
+    result = npairs_3d(sample1, sample2, rbins, period=period)
+    result2 = npairs_3d(sample1, sample2, rbins, period=period, double_mesh=double_mesh)
+    result3 = npairs_3d(sample1, sample2, rbins[:-1], period=period, double_mesh=double_mesh)
+    assert np.all(result == result2)
+    assert np.all(result[:-1] == result3)
+
+    with pytest.raises(ValueError) as err:
+        _ = npairs_3d(sample2, sample1, rbins, period=period, double_mesh=double_mesh)
+    substr = "Input ``double_mesh`` was built for samples with (500, 300) points"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        _ = npairs_3d(sample1, sample2, rbins, period=None, double_mesh=double_mesh)
+    substr = "A pre-built ``double_mesh`` can only be used"
+    assert substr in err.value.args[0]
+
+
 def test_sensible_num_threads():
     npts1, npts2 = 100, 100
     data1 = generate_locus_of_3d_points(npts1, xc=0.1, yc=0.1, zc=0.1, seed=fixed_seed)
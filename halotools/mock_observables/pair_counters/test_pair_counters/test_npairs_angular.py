@@ -0,0 +1,127 @@
+""" Module providing testing for the
+`~halotools.mock_observables.pair_counters.npairs_angular` function.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from astropy.tests.helper import pytest
+from astropy.utils.misc import NumpyRNGContext
+
+from ..npairs_angular import npairs_angular
+from ..npairs_3d import npairs_3d
+from ..spherical_mesh import SphericalMesh
+
+from ....utils.spherical_geometry import (spherical_to_cartesian,
+    chord_to_cartesian, sample_spherical_surface)
+
+__all__ = ('test_npairs_angular_brute_force', )
+
+fixed_seed = 43
+
+
+def _brute_force_npairs_angular(sample1, sample2, theta_bins):
+    """ Count the pairs by computing the chord length between every pair of points.
+    """
+    x1, y1, z1 = spherical_to_cartesian(sample1[:, 0], sample1[:, 1])
+    x2, y2, z2 = spherical_to_cartesian(sample2[:, 0], sample2[:, 1])
+    dsq = ((x1[:, None] - x2[None, :])**2 + (y1[:, None] - y2[None, :])**2 +
+        (z1[:, None] - z2[None, :])**2)
+    chord_bins = chord_to_cartesian(theta_bins, radians=False)
+    return np.array([np.sum(dsq <= chord**2) for chord in chord_bins])
+
+
+def test_npairs_angular_brute_force():
+    """ Verify that `~halotools.mock_observables.pair_counters.npairs_angular` agrees with
+    brute force counts in auto- and cross-correlation mode,
+    including for angles wide enough to enclose the poles.
+    """
+    sample1 = np.array(sample_spherical_surface(300, seed=fixed_seed))
+    sample2 = np.array(sample_spherical_surface(200, seed=fixed_seed+1))
+    # Add a cluster of points around the north pole and points on either side of ra=0
+    with NumpyRNGContext(fixed_seed):
+        polar_points = np.vstack([np.random.uniform(0, 360, 50),
+            np.random.uniform(85, 90, 50)]).T
+        wrapping_points = np.vstack([np.random.uniform(-3, 3, 50),
+            np.random.uniform(-10, 10, 50)]).T
+    sample1 = np.concatenate([sample1, polar_points, wrapping_points])
+
+    for theta_bins in (np.logspace(-1, 1, 8), np.array([1, 10, 45, 90, 135, 180])):
+        result = npairs_angular(sample1, sample1, theta_bins)
+        correct_result = _brute_force_npairs_angular(sample1, sample1, theta_bins)
+        assert np.all(result == correct_result)
+
+        result = npairs_angular(sample1, sample2, theta_bins)
+        correct_result = _brute_force_npairs_angular(sample1, sample2, theta_bins)
+        assert np.all(result == correct_result)
+    #  ensure the test is non-trivial
+    assert result[0] > 0
+
+
+def test_npairs_angular_agrees_with_npairs_3d():
+    """ Verify that `~halotools.mock_observables.pair_counters.npairs_angular` agrees with
+    `~halotools.mock_observables.npairs_3d` applied to the unit-sphere Cartesian coordinates,
+    and does not depend on the number of threads or on the cell size.
+    """
+    sample1 = np.array(sample_spherical_surface(2000, seed=fixed_seed))
+    sample2 = np.array(sample_spherical_surface(3000, seed=fixed_seed+1))
+    theta_bins = np.logspace(-1, 1, 10)
+    chord_bins = chord_to_cartesian(theta_bins, radians=False)
+
+    cartesian_sample1 = np.vstack(spherical_to_cartesian(sample1[:, 0], sample1[:, 1])).T
+    cartesian_sample2 = np.vstack(spherical_to_cartesian(sample2[:, 0], sample2[:, 1])).T
+
+    result = npairs_angular(sample1, sample2, theta_bins)
+    correct_result = npairs_3d(cartesian_sample1, cartesian_sample2, chord_bins)
+    assert np.all(result == correct_result)
+
+    result2 = npairs_angular(sample1, sample2, theta_bins, num_threads=2, approx_cell_size=2.)
+    assert np.all(result2 == result)
+
+    result = npairs_angular(sample1, sample1, theta_bins, num_threads=3)
+    correct_result = npairs_3d(cartesian_sample1, cartesian_sample1, chord_bins)
+    assert np.all(result == correct_result)
+
+
+def test_spherical_mesh():
+    """ Verify that every point of the `SphericalMesh` lies in the cell it is assigned to.
+    """
+    sample = np.array(sample_spherical_surface(1000, seed=fixed_seed))
+    ra, dec = sample[:, 0], sample[:, 1]
+    mesh = SphericalMesh(ra, dec, 5.)
+    assert mesh.ncells == np.sum(mesh.num_ra_divs)
+    assert np.all(np.diff(mesh.cell_id_indices) >= 0)
+    assert mesh.cell_id_indices[-1] == 1000
+
+    band_of_cell = np.repeat(np.arange(mesh.num_dec_divs), mesh.num_ra_divs)
+    for icell in range(mesh.ncells):
+        idx = mesh.idx_sorted[mesh.cell_id_indices[icell]:mesh.cell_id_indices[icell+1]]
+        iband = band_of_cell[icell]
+        ira = icell - mesh.first_cell_in_band[iband]
+        assert np.all(dec[idx] >= -90 + iband*mesh.dec_cell_size)
+        assert np.all(dec[idx] <= -90 + (iband+1)*mesh.dec_cell_size)
+        assert np.all(ra[idx] >= ira*mesh.ra_cell_size[iband])
+        assert np.all(ra[idx] <= (ira+1)*mesh.ra_cell_size[iband])
+
+
+def test_npairs_angular_error_handling():
+    sample1 = np.array(sample_spherical_surface(100, seed=fixed_seed))
+
+    with pytest.raises(ValueError) as err:
+        __ = npairs_angular(sample1, sample1, [1, 10, 5])
+    substr = "Input ``theta_bins`` must be a monotonically increasing 1D array"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        __ = npairs_angular(sample1, sample1, [1, 200])
+    substr = "Input ``theta_bins`` must be between 0 and 180 degrees"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        __ = npairs_angular(np.zeros((100, 3)), sample1, [1, 10])
+    substr = "Inputs ``sample1`` and ``sample2`` must be arrays of shape (Npts, 2)"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        __ = npairs_angular(sample1 + [0, 100], sample1, [1, 10])
+    substr = "Input declinations must be between -90 and 90 degrees"
+    assert substr in err.value.args[0]
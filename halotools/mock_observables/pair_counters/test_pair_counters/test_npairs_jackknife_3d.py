@@ -7,6 +7,7 @@ import numpy as np
 # load pair counters
 from ..npairs_jackknife_3d import npairs_jackknife_3d
 # load comparison simple pair counters
+from .pure_python_distance_matrix import pure_python_distance_matrix_3d
 
 from astropy.tests.helper import pytest
 from astropy.utils.misc import NumpyRNGContext
@@ -113,3 +114,67 @@ def test_npairs_jackknife_3d_nonperiodic():
 
     for icell in range(1, grid_jackknife_ncells**3-1):
         assert np.all(grid_result[icell, :] == grid_result[icell+1, :])
+
+
+def test_npairs_jackknife_3d_auto_count_brute_force():
+    """ Verify that the jackknife counts of identical samples, which are computed by
+    visiting each unordered pair once, agree with a brute-force calculation.
+    """
+    rbins = np.array([0.0, 0.1, 0.2, 0.3])
+
+    Npts, N_jsamples = 200, 5
+    with NumpyRNGContext(fixed_seed):
+        sample = np.random.random((Npts, 3))
+        jtags = np.random.randint(1, N_jsamples+1, size=Npts)
+        weights = np.random.random(Npts)
+
+    result = npairs_jackknife_3d(sample, sample, rbins, period=period,
+        jtags1=jtags, jtags2=jtags, N_samples=N_jsamples,
+        weights1=weights, weights2=weights)
+
+    dij = pure_python_distance_matrix_3d(sample, sample, 1., Lbox=1.)
+    wij = np.outer(weights, weights)
+    correct_result = np.zeros((N_jsamples+1, len(rbins)))
+    for s in range(N_jsamples+1):
+        if s == 0:
+            jweight = np.ones((Npts, Npts))
+        else:
+            inside = (jtags != s).astype(float)
+            jweight = 0.5*np.add.outer(inside, inside)
+        for k, r in enumerate(rbins):
+            correct_result[s, k] = np.sum((wij*jweight)[dij <= r])
+
+    assert np.allclose(result, correct_result)
+
+
+def test_npairs_jackknife_3d_cross_count_brute_force():
+    """ Verify that the leave-one-out counts of two different samples, which the engine
+    derives from per-subvolume tables, agree with a brute-force calculation.
+    """
+    rbins = np.array([0.0, 0.05, 0.1, 0.2, 0.3])
+
+    Npts1, Npts2, N_jsamples = 200, 150, 8
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts1, 3))
+        sample2 = np.random.random((Npts2, 3))
+        jtags1 = np.random.randint(1, N_jsamples+1, size=Npts1)
+        jtags2 = np.random.randint(1, N_jsamples+1, size=Npts2)
+        weights1 = np.random.random(Npts1)
+        weights2 = np.random.random(Npts2)
+
+    dij = pure_python_distance_matrix_3d(sample1, sample2, 1., Lbox=1.)
+    wij = np.outer(weights1, weights2)
+    correct_result = np.zeros((N_jsamples+1, len(rbins)))
+    for s in range(N_jsamples+1):
+        if s == 0:
+            jweight = np.ones((Npts1, Npts2))
+        else:
+            jweight = 0.5*np.add.outer((jtags1 != s).astype(float), (jtags2 != s).astype(float))
+        for k, r in enumerate(rbins):
+            correct_result[s, k] = np.sum((wij*jweight)[dij <= r])
+
+    for num_threads in (1, 2):
+        result = npairs_jackknife_3d(sample1, sample2, rbins, period=period,
+            jtags1=jtags1, jtags2=jtags2, N_samples=N_jsamples,
+            weights1=weights1, weights2=weights2, num_threads=num_threads)
+        assert np.allclose(result, correct_result)
@@ -0,0 +1,67 @@
+""" Module providing testing for the
+`~halotools.mock_observables.pair_counters.npairs_multi` function.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from astropy.tests.helper import pytest
+from astropy.utils.misc import NumpyRNGContext
+
+from ..npairs_multi import npairs_multi
+from ..npairs_3d import npairs_3d
+from ..npairs_xy_z import npairs_xy_z
+from ..npairs_s_mu import npairs_s_mu
+
+__all__ = ('test_npairs_multi_agrees_with_individual_counters', )
+
+fixed_seed = 43
+
+
+def test_npairs_multi_agrees_with_individual_counters():
+    """ Verify that each binning of `~halotools.mock_observables.pair_counters.npairs_multi`
+    agrees with the corresponding pair counter, with and without PBCs,
+    in auto- and cross-correlation mode.
+    """
+    npts1, npts2 = 500, 800
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts1, 3))
+        sample2 = np.random.random((npts2, 3))
+    rbins = np.linspace(0.01, 0.2, 6)
+    rp_bins, pi_bins = np.linspace(0.01, 0.15, 5), np.linspace(0, 0.3, 7)
+    s_bins, mu_bins = np.linspace(0.01, 0.25, 5), np.linspace(0, 1, 6)
+
+    for period in (1, None):
+        for s2 in (sample1, sample2):
+            counts = npairs_multi(sample1, s2, rbins=rbins, rp_bins=rp_bins,
+                pi_bins=pi_bins, s_bins=s_bins, mu_bins=mu_bins, period=period,
+                num_threads=2)
+            assert np.all(counts['npairs_3d'] == npairs_3d(sample1, s2, rbins, period=period))
+            assert np.all(counts['npairs_xy_z'] ==
+                npairs_xy_z(sample1, s2, rp_bins, pi_bins, period=period))
+            assert np.all(counts['npairs_s_mu'] ==
+                npairs_s_mu(sample1, s2, s_bins, mu_bins, period=period))
+
+    # binnings that are not requested are not counted
+    counts = npairs_multi(sample1, sample2, rp_bins=rp_bins, pi_bins=pi_bins, period=1)
+    assert list(counts.keys()) == ['npairs_xy_z']
+    assert np.all(counts['npairs_xy_z'] == npairs_xy_z(sample1, sample2, rp_bins, pi_bins, period=1))
+
+
+def test_npairs_multi_error_handling():
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((100, 3))
+
+    with pytest.raises(ValueError) as err:
+        __ = npairs_multi(sample1, sample1, period=1)
+    substr = "At least one of ``rbins``, ``rp_bins`` or ``s_bins`` must be passed"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        __ = npairs_multi(sample1, sample1, rp_bins=[0.1, 0.2], period=1)
+    substr = "Inputs ``rp_bins`` and ``pi_bins``, and inputs ``s_bins`` and ``mu_bins``"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        __ = npairs_multi(sample1, sample1, rbins=[0.1, 0.3, 0.2], period=1)
+    substr = "Input ``rbins`` must be a monotonically increasing 1D array"
+    assert substr in err.value.args[0]
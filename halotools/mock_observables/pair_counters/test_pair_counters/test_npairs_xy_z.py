@@ -264,6 +264,51 @@ def test_npairs_xy_z_brute_force_non_periodic():
     assert np.all(result == test_result)
 
 
+def test_npairs_xy_z_linear_pi_bins():
+    """ Verify that evenly spaced ``pi_bins``, for which the engine calculates
+    the line-of-sight bin directly, give the same counts as the brute force counter,
+    including for points separated by exactly a bin edge.
+    """
+    npts1, npts2 = 200, 150
+    with NumpyRNGContext(fixed_seed):
+        data1 = np.random.random((npts1, 3))
+        data2 = np.random.random((npts2, 3))
+    rp_bins = np.logspace(-2, -0.6, 6)
+
+    for pi_bins in (np.linspace(0, 0.3, 31), np.linspace(0.015, 0.29, 12)):
+        for period in (1, None):
+            result = npairs_xy_z(data1, data2, rp_bins, pi_bins, period=period)
+            test_result = pure_python_brute_force_npairs_xy_z(
+                data1, data2, rp_bins, pi_bins, period=period)
+            assert np.all(result == test_result)
+
+    # points of a regular mesh are separated by exactly the bin edges
+    data1 = generate_3d_regular_mesh(10)
+    pi_bins = np.linspace(0, 0.3, 4)
+    result = npairs_xy_z(data1, data1, rp_bins, pi_bins, period=1)
+    test_result = pure_python_brute_force_npairs_xy_z(data1, data1, rp_bins, pi_bins, period=1)
+    assert np.all(result == test_result)
+
+
+def test_npairs_xy_z_differential_counts():
+    """ Verify that ``cumulative=False`` returns the differential counts
+    in auto- and cross-correlation mode.
+    """
+    npts1, npts2 = 200, 150
+    with NumpyRNGContext(fixed_seed):
+        data1 = np.random.random((npts1, 3))
+        data2 = np.random.random((npts2, 3))
+    rp_bins = np.logspace(-2, -0.6, 6)
+    pi_bins = np.array((0.01, 0.05, 0.1, 0.3))
+
+    for data2 in (data1, data2):
+        cumulative_counts = npairs_xy_z(data1, data2, rp_bins, pi_bins, period=1)
+        counts = npairs_xy_z(data1, data2, rp_bins, pi_bins, period=1,
+            num_threads=2, cumulative=False)
+        assert np.shape(counts) == (len(rp_bins)-1, len(pi_bins)-1)
+        assert np.all(counts == np.diff(np.diff(cumulative_counts, axis=0), axis=1))
+
+
 def test_sensible_num_threads():
     npts1, npts2 = 100, 100
     data1 = generate_locus_of_3d_points(npts1, xc=0.1, yc=0.1, zc=0.1, seed=fixed_seed)
@@ -9,8 +9,8 @@ from astropy.tests.helper import pytest
 
 from .pure_python_distance_matrix import pure_python_distance_matrix_3d, pure_python_distance_matrix_xy_z
 
-from ..pairwise_distance_3d import pairwise_distance_3d, _get_r_max
-from ..pairwise_distance_xy_z import pairwise_distance_xy_z
+from ..pairwise_distance_3d import pairwise_distance_3d, pairwise_distance_3d_blocks, _get_r_max
+from ..pairwise_distance_xy_z import pairwise_distance_xy_z, pairwise_distance_xy_z_blocks
 
 from ...tests.cf_helpers import generate_locus_of_3d_points
 from ...tests.cf_helpers import generate_3d_regular_mesh
@@ -237,3 +237,64 @@ def test_get_rmax2():
         __ = _get_r_max(sample1, np.inf)
     substr = "Input ``r_max`` must be an array of bounded positive numbers."
     assert substr in err.value.args[0]
+
+
+def test_pairwise_distance_3d_output_formats():
+    """ Verify that the csr output and the streamed blocks agree with the coo output,
+    including for the case where points have individual search radii.
+    """
+    Npts1, Npts2 = 300, 200
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts1, 3))
+        sample2 = np.random.random((Npts2, 3))
+        r_max = np.random.uniform(0.05, 0.2, Npts1)
+
+    for period in (1, None):
+        coo = pairwise_distance_3d(sample1, sample2, r_max, period=period)
+        correct_matrix = coo.toarray()
+
+        csr = pairwise_distance_3d(sample1, sample2, r_max, period=period, output_format='csr')
+        assert csr.format == 'csr'
+        assert csr.nnz == coo.nnz
+        assert csr.has_sorted_indices
+        assert np.allclose(csr.toarray(), correct_matrix)
+
+        for num_threads in (1, 2):
+            num_pairs = 0
+            blocks = pairwise_distance_3d_blocks(sample1, sample2, r_max,
+                period=period, num_threads=num_threads, num_cells_per_block=7)
+            for i, j, d in blocks:
+                assert np.allclose(correct_matrix[i, j], d)
+                num_pairs += len(i)
+            assert num_pairs == coo.nnz
+
+
+def test_pairwise_distance_xy_z_output_formats():
+    """ Verify that the csr output and the streamed blocks agree with the coo output.
+    """
+    Npts1, Npts2 = 300, 200
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts1, 3))
+        sample2 = np.random.random((Npts2, 3))
+
+    rp_max, pi_max = 0.1, 0.2
+    coo_perp, coo_para = pairwise_distance_xy_z(sample1, sample2, rp_max, pi_max, period=1)
+    csr_perp, csr_para = pairwise_distance_xy_z(sample1, sample2, rp_max, pi_max,
+        period=1, output_format='csr', num_threads=2)
+    assert csr_perp.nnz == csr_para.nnz == coo_perp.nnz
+    assert np.allclose(csr_perp.toarray(), coo_perp.toarray())
+    assert np.allclose(csr_para.toarray(), coo_para.toarray())
+
+    num_pairs = 0
+    for i, j, d_perp, d_para in pairwise_distance_xy_z_blocks(
+            sample1, sample2, rp_max, pi_max, period=1):
+        assert np.allclose(coo_perp.toarray()[i, j], d_perp)
+        assert np.allclose(coo_para.toarray()[i, j], d_para)
+        num_pairs += len(i)
+    assert num_pairs == coo_perp.nnz
+
+    with pytest.raises(ValueError) as err:
+        __ = pairwise_distance_xy_z(sample1, sample2, rp_max, pi_max,
+            period=1, output_format='lil')
+    substr = "Input ``output_format`` must be either 'coo' or 'csr'"
+    assert substr in err.value.args[0]
@@ -163,3 +163,74 @@ def test_search_length_enforcement():
             xperiod, yperiod, zperiod, PBCs=PBCs)
     substr = "The maximum length over which you search for pairs of points"
     assert substr in err.value.args[0]
+
+
+def test_prebuilt_mesh_reuse():
+    """ Verify that a mesh built in advance can be re-used as either
+    component of a new double mesh.
+    """
+    with NumpyRNGContext(fixed_seed):
+        points1 = np.random.random((100, 3))
+        points2 = np.random.random((200, 3))
+    approx_cell_size, search_length, period = 0.1, 0.2, 1.
+
+    double_mesh = RectangularDoubleMesh(
+        points1[:, 0], points1[:, 1], points1[:, 2],
+        points2[:, 0], points2[:, 1], points2[:, 2],
+        approx_cell_size, approx_cell_size, approx_cell_size,
+        approx_cell_size, approx_cell_size, approx_cell_size,
+        search_length, search_length, search_length,
+        period, period, period)
+
+    double_mesh2 = RectangularDoubleMesh(
+        points1[:, 0], points1[:, 1], points1[:, 2],
+        points2[:, 0], points2[:, 1], points2[:, 2],
+        approx_cell_size, approx_cell_size, approx_cell_size,
+        approx_cell_size, approx_cell_size, approx_cell_size,
+        search_length, search_length, search_length,
+        period, period, period, mesh2=double_mesh.mesh2)
+    assert double_mesh2.mesh2 is double_mesh.mesh2
+    assert np.all(double_mesh2.mesh1.idx_sorted == double_mesh.mesh1.idx_sorted)
+    enforce_cell2_fits_in_cell1(double_mesh2)
+
+    with pytest.raises(ValueError) as err:
+        _ = RectangularDoubleMesh(
+            points1[:, 0], points1[:, 1], points1[:, 2],
+            points1[:, 0], points1[:, 1], points1[:, 2],
+            approx_cell_size, approx_cell_size, approx_cell_size,
+            approx_cell_size, approx_cell_size, approx_cell_size,
+            search_length, search_length, search_length,
+            period, period, period, mesh2=double_mesh.mesh2)
+    substr = "Input ``mesh2`` was built for 200 points"
+    assert substr in err.value.args[0]
+
+
+def test_double_mesh_save_load(tmpdir):
+    """ Verify that a double mesh survives a round trip to disk.
+    """
+    with NumpyRNGContext(fixed_seed):
+        points1 = np.random.random((100, 3))
+        points2 = np.random.random((200, 3))
+    approx_cell_size, search_length, period = 0.1, 0.2, 1.
+
+    double_mesh = RectangularDoubleMesh(
+        points1[:, 0], points1[:, 1], points1[:, 2],
+        points2[:, 0], points2[:, 1], points2[:, 2],
+        approx_cell_size, approx_cell_size, approx_cell_size,
+        approx_cell_size, approx_cell_size, approx_cell_size,
+        search_length, search_length, search_length,
+        period, period, period)
+
+    fname = str(tmpdir.join('double_mesh.npz'))
+    double_mesh.save(fname)
+    loaded_mesh = RectangularDoubleMesh.load(fname)
+
+    assert loaded_mesh.search_xlength == double_mesh.search_xlength
+    assert loaded_mesh._PBCs == double_mesh._PBCs
+    for mesh, loaded in ((double_mesh.mesh1, loaded_mesh.mesh1),
+            (double_mesh.mesh2, loaded_mesh.mesh2)):
+        assert loaded.npts == mesh.npts
+        assert loaded.ncells == mesh.ncells
+        assert loaded.xcell_size == mesh.xcell_size
+        assert np.all(loaded.idx_sorted == mesh.idx_sorted)
+        assert np.all(loaded.cell_id_indices == mesh.cell_id_indices)
@@ -7,6 +7,7 @@ cimport numpy as cnp
 cimport cython
 from libc.math cimport ceil
 from libc.math cimport sqrt as c_sqrt
+from ...pair_counters.cpairs.bin_search cimport lower_bound_bin
 
 
 __author__ = ('Andrew Hearin', )
@@ -20,7 +21,8 @@ def mean_radial_velocity_vs_r_engine(double_mesh, x1in, y1in, z1in, x2in, y2in,
     squared_normalize_rbins_by_in, rbins_normalized, cell1_tuple):
     """
     """
-    cdef cnp.float64_t[:] rbins_normalized_squared = rbins_normalized*rbins_normalized
+    cdef cnp.float64_t[:] rbins_normalized_squared = np.ascontiguousarray(
+        rbins_normalized*rbins_normalized, dtype=np.float64)
     cdef cnp.float64_t xperiod = double_mesh.xperiod
     cdef cnp.float64_t yperiod = double_mesh.yperiod
     cdef cnp.float64_t zperiod = double_mesh.zperiod
@@ -191,16 +193,15 @@ def mean_radial_velocity_vs_r_engine(double_mesh, x1in, y1in, z1in, x2in, y2in,
                                     else:
                                         normed_drsq = drsq/distance_norm1tmp
 
-                                        k = num_rbins_normalized-1
-                                        if normed_drsq <= rbins_normalized_squared[k]:
+                                        if normed_drsq <= rbins_normalized_squared[num_rbins_normalized-1]:
                                             vrad = (dx*dvx + dy*dvy + dz*dvz)/c_sqrt(drsq)
-                                        while normed_drsq <= rbins_normalized_squared[k]:
+                                            k = lower_bound_bin(&rbins_normalized_squared[0],
+                                                num_rbins_normalized, normed_drsq)
                                             vrad_sum[k] += vrad
                                             counts[k] += 1
-                                            k = k-1
-                                            if k < 0: break
 
-    return np.array(counts), np.array(vrad_sum)
+    # Convert the differential sums into cumulative sums
+    return np.cumsum(counts), np.cumsum(vrad_sum)
 
 
 
@@ -8,6 +8,7 @@ cimport cython
 from libc.math cimport ceil
 
 from .velocity_marking_functions cimport *
+from ...pair_counters.cpairs.bin_search cimport lower_bound_bin
 
 __author__ = ('Andrew Hearin', 'Duncan Campbell')
 __all__ = ('velocity_marked_npairs_3d_engine', )
@@ -57,7 +58,8 @@ def velocity_marked_npairs_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in,
     cdef f_type wfunc
     wfunc = return_velocity_weighting_function(weight_func_id)
 
-    cdef cnp.float64_t[:] rbins_squared = rbins*rbins
+    cdef cnp.float64_t[:] rbins_squared = np.ascontiguousarray(rbins*rbins, dtype=np.float64)
+    cdef cnp.float64_t rmax_squared = np.max(rbins_squared)
     cdef cnp.float64_t xperiod = double_mesh.xperiod
     cdef cnp.float64_t yperiod = double_mesh.yperiod
     cdef cnp.float64_t zperiod = double_mesh.zperiod
@@ -212,16 +214,15 @@ def velocity_marked_npairs_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in,
                                     dz = z1tmp - z_icell2[j]
                                     dsq = dx*dx + dy*dy + dz*dz
 
-                                    wfunc(&w_icell1[i,0], &w_icell2[j,0], &shift[0], &holder1, &holder2, &holder3)
-                                    k = num_rbins-1
-                                    while dsq <= rbins_squared[k]:
+                                    if dsq <= rmax_squared:
+                                        wfunc(&w_icell1[i,0], &w_icell2[j,0], &shift[0], &holder1, &holder2, &holder3)
+                                        k = lower_bound_bin(&rbins_squared[0], num_rbins, dsq)
                                         counts1[k] += holder1
                                         counts2[k] += holder2
                                         counts3[k] += holder3
-                                        k=k-1
-                                        if k<0: break
-                                        
-    return np.array(counts1), np.array(counts2), np.array(counts3)
+
+    # Convert the differential weighted counts into cumulative counts
+    return np.cumsum(counts1), np.cumsum(counts2), np.cumsum(counts3)
     
 
 cdef f_type return_velocity_weighting_function(weight_func_id):
@@ -8,6 +8,7 @@ cimport cython
 from libc.math cimport ceil
 
 from .velocity_marking_functions cimport *
+from ...pair_counters.cpairs.bin_search cimport lower_bound_bin
 
 __author__ = ('Andrew Hearin', 'Duncan Campbell')
 __all__ = ('velocity_marked_npairs_xy_z_engine', )
@@ -60,8 +61,10 @@ def velocity_marked_npairs_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in
     cdef f_type wfunc
     wfunc = return_velocity_weighting_function(weight_func_id)
 
-    cdef cnp.float64_t[:] rp_bins_squared = rp_bins*rp_bins
-    cdef cnp.float64_t[:] pi_bins_squared = pi_bins*pi_bins
+    cdef cnp.float64_t[:] rp_bins_squared = np.ascontiguousarray(rp_bins*rp_bins, dtype=np.float64)
+    cdef cnp.float64_t[:] pi_bins_squared = np.ascontiguousarray(pi_bins*pi_bins, dtype=np.float64)
+    cdef cnp.float64_t rp_max_squared = np.max(rp_bins_squared)
+    cdef cnp.float64_t pi_max_squared = np.max(pi_bins_squared)
     cdef cnp.float64_t xperiod = double_mesh.xperiod
     cdef cnp.float64_t yperiod = double_mesh.yperiod
     cdef cnp.float64_t zperiod = double_mesh.zperiod
@@ -218,21 +221,18 @@ def velocity_marked_npairs_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in
                                     dxy_sq = dx*dx + dy*dy
                                     dz_sq = dz*dz
 
-                                    wfunc(&w_icell1[i,0], &w_icell2[j,0], &shift[0], &holder1, &holder2, &holder3)
-
-                                    k = num_rp_bins-1
-                                    while dxy_sq<=rp_bins_squared[k]:
-                                        g = num_pi_bins-1
-                                        while dz_sq<=pi_bins_squared[g]:
-                                            counts1[k,g] += holder1
-                                            counts2[k,g] += holder2
-                                            counts3[k,g] += holder3
-                                            g=g-1
-                                            if g<0: break
-                                        k=k-1
-                                        if k<0: break
-                                        
-    return np.array(counts1), np.array(counts2), np.array(counts3)
+                                    if (dxy_sq <= rp_max_squared) & (dz_sq <= pi_max_squared):
+                                        wfunc(&w_icell1[i,0], &w_icell2[j,0], &shift[0], &holder1, &holder2, &holder3)
+                                        k = lower_bound_bin(&rp_bins_squared[0], num_rp_bins, dxy_sq)
+                                        g = lower_bound_bin(&pi_bins_squared[0], num_pi_bins, dz_sq)
+                                        counts1[k,g] += holder1
+                                        counts2[k,g] += holder2
+                                        counts3[k,g] += holder3
+
+    # Convert the differential weighted counts into cumulative counts
+    return (np.cumsum(np.cumsum(counts1, axis=0), axis=1),
+        np.cumsum(np.cumsum(counts2, axis=0), axis=1),
+        np.cumsum(np.cumsum(counts3, axis=0), axis=1))
     
 
 cdef f_type return_velocity_weighting_function(weight_func_id):
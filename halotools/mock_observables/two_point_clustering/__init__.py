@@ -2,6 +2,8 @@
 on galaxy/halo clustering, e.g., three-dimensional clustering
 `~halotools.mock_observables.tpcf`, projected clustering `~halotools.mock_observables.wp`,
 RSD multipoles `~halotools.mock_observables.tpcf_multipole`,
+several of these statistics from a single pass over the pairs
+`~halotools.mock_observables.tpcf_multi`,
 galaxy-galaxy lensing `~halotools.mock_observables.delta_sigma`, and more.
 """
 from __future__ import absolute_import
@@ -15,7 +17,8 @@ from .tpcf_jackknife import tpcf_jackknife
 from .tpcf_one_two_halo_decomp import tpcf_one_two_halo_decomp
 from .tpcf import tpcf
 from .marked_tpcf import marked_tpcf
+from .tpcf_multi import tpcf_multi
 
 __all__ = ('angular_tpcf', 's_mu_tpcf', 'tpcf_multipole', 'wp',
            'rp_pi_tpcf', 'tpcf_jackknife', 'tpcf_one_two_halo_decomp', 'tpcf',
-           'marked_tpcf')
+           'marked_tpcf', 'tpcf_multi')
@@ -13,10 +13,10 @@ from .clustering_helpers import (verify_tpcf_estimator,
     downsample_inputs_exceeding_max_sample_size, process_optional_input_sample2)
 
 
-from ..pair_counters import npairs_3d
+from ..pair_counters import npairs_angular
 from ..mock_observables_helpers import get_num_threads
 
-from ...utils.spherical_geometry import spherical_to_cartesian, chord_to_cartesian
+from ...utils.spherical_geometry import chord_to_cartesian
 from ...custom_exceptions import HalotoolsError
 from ...utils.array_utils import array_is_monotonic
 
@@ -71,11 +71,9 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
         Default is ``Natural``.
 
     num_threads : int, optional
-        Number of threads to use in calculation, where parallelization is performed
-        using the python ``multiprocessing`` module. Default is 1 for a purely serial
-        calculation, in which case a multiprocessing Pool object will
-        never be instantiated. A string 'max' may be used to indicate that
-        the pair counters should use all available cores on the machine.
+        Number of OpenMP threads used by `~halotools.mock_observables.pair_counters.npairs_angular`.
+        Default is 1 for a purely serial calculation. A string 'max' may be used
+        to indicate that all available cores on the machine should be used.
 
     max_sample_size : int, optional
         Defines maximum size of the sample that will be passed to the pair counter.
@@ -117,7 +115,8 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
 
     Notes
     -----
-    Pairs are counted using `~halotools.mock_observables.npairs_3d`.
+    Pairs are counted using `~halotools.mock_observables.pair_counters.npairs_angular`,
+    which apportions the points into declination bands of cells on the sky.
 
     Examples
     --------
@@ -147,19 +146,10 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
     # convert angular bins to coord lengths on a unit sphere
     chord_bins = chord_to_cartesian(theta_bins, radians=False)
 
-    # convert samples and randoms to cartesian coordinates (x,y,z) on a unit sphere
-    x, y, z = spherical_to_cartesian(sample1[:, 0], sample1[:, 1])
-    sample1 = np.vstack((x, y, z)).T
     if _sample1_is_sample2:
         sample2 = sample1
-    else:
-        x, y, z = spherical_to_cartesian(sample2[:, 0], sample2[:, 1])
-        sample2 = np.vstack((x, y, z)).T
-    if randoms is not None:
-        x, y, z = spherical_to_cartesian(randoms[:, 0], randoms[:, 1])
-        randoms = np.vstack((x, y, z)).T
 
-    def random_counts(sample1, sample2, randoms, chord_bins,
+    def random_counts(sample1, sample2, randoms, theta_bins, chord_bins,
             num_threads, do_RR, do_DR, _sample1_is_sample2):
         """
         Count random pairs.
@@ -174,13 +164,13 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
         # randoms provided, so calculate random pair counts.
         if randoms is not None:
             if do_RR is True:
-                RR = npairs_3d(randoms, randoms, chord_bins,
+                RR = npairs_angular(randoms, randoms, theta_bins,
                             num_threads=num_threads)
                 RR = np.diff(RR)
             else:
                 RR = None
             if do_DR is True:
-                D1R = npairs_3d(sample1, randoms, chord_bins,
+                D1R = npairs_angular(sample1, randoms, theta_bins,
                              num_threads=num_threads)
                 D1R = np.diff(D1R)
             else:
@@ -189,7 +179,7 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
                 D2R = None
             else:
                 if do_DR is True:
-                    D2R = npairs_3d(sample2, randoms, chord_bins,
+                    D2R = npairs_angular(sample2, randoms, theta_bins,
                                  num_threads=num_threads)
                     D2R = np.diff(D2R)
                 else:
@@ -220,14 +210,14 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
 
             return D1R, D2R, RR
 
-    def pair_counts(sample1, sample2, chord_bins,
+    def pair_counts(sample1, sample2, theta_bins,
             N_thread, do_auto, do_cross, _sample1_is_sample2):
         """
         Count data-data pairs.
         """
 
         if do_auto is True:
-            D1D1 = npairs_3d(sample1, sample1, chord_bins, num_threads=num_threads)
+            D1D1 = npairs_angular(sample1, sample1, theta_bins, num_threads=num_threads)
             D1D1 = np.diff(D1D1)
         else:
             D1D1 = None
@@ -238,12 +228,12 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
             D2D2 = D1D1
         else:
             if do_cross is True:
-                D1D2 = npairs_3d(sample1, sample2, chord_bins, num_threads=num_threads)
+                D1D2 = npairs_angular(sample1, sample2, theta_bins, num_threads=num_threads)
                 D1D2 = np.diff(D1D2)
             else:
                 D1D2 = None
             if do_auto is True:
-                D2D2 = npairs_3d(sample2, sample2, chord_bins, num_threads=num_threads)
+                D2D2 = npairs_angular(sample2, sample2, theta_bins, num_threads=num_threads)
                 D2D2 = np.diff(D2D2)
             else:
                 D2D2 = None
@@ -264,10 +254,10 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
         NR = N1
 
     # count data pairs
-    D1D1, D1D2, D2D2 = pair_counts(sample1, sample2, chord_bins,
+    D1D1, D1D2, D2D2 = pair_counts(sample1, sample2, theta_bins,
         num_threads, do_auto, do_cross, _sample1_is_sample2)
     # count random pairs
-    D1R, D2R, RR = random_counts(sample1, sample2, randoms, chord_bins,
+    D1R, D2R, RR = random_counts(sample1, sample2, randoms, theta_bins, chord_bins,
         num_threads, do_RR, do_DR, _sample1_is_sample2)
 
     # run results through the estimator and return relavent/user specified results.
@@ -4,6 +4,9 @@ helper functions used to process arguments passed to the functions in the
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import os
+import hashlib
+from collections import OrderedDict
 import numpy as np
 from warnings import warn
 from astropy.utils.misc import NumpyRNGContext
@@ -11,7 +14,8 @@ from astropy.utils.misc import NumpyRNGContext
 from ..mock_observables_helpers import enforce_sample_has_correct_shape
 
 __all__ = ('verify_tpcf_estimator', 'process_optional_input_sample2',
-    'downsample_inputs_exceeding_max_sample_size')
+    'downsample_inputs_exceeding_max_sample_size', 'RandomPairCountCache',
+    'random_pair_count_cache')
 
 __author__ = ['Duncan Campbell', 'Andrew Hearin']
 
@@ -159,3 +163,166 @@ def downsample_inputs_exceeding_max_sample_size(
             pass
 
     return sample1, sample2
+
+
+default_random_pair_count_cache_size = 32
+
+
+class RandomPairCountCache(object):
+    """ Size-bounded cache of pair counts of samples that do not change between calls
+    to the two-point clustering functions, most importantly the RR counts of a random sample.
+
+    Counts are keyed by a hash of the name of the pair counter, the two samples,
+    the binning and the box geometry, so that e.g. a chain evaluating
+    `~halotools.mock_observables.wp` many times with the same randoms only counts
+    RR once. When the number of stored counts exceeds ``max_size``,
+    the least recently used counts are discarded.
+
+    If ``dirname`` is set, counts are additionally stored on disk as ``.npy`` files
+    named by their key, and are re-loaded from disk in later sessions.
+
+    The `~halotools.mock_observables.two_point_clustering.clustering_helpers.random_pair_count_cache`
+    instance is shared by all the two-point clustering functions.
+    Setting its ``max_size`` to zero and its ``dirname`` to None disables caching.
+
+    Examples
+    --------
+    >>> from halotools.mock_observables.pair_counters import npairs_3d
+    >>> cache = RandomPairCountCache(max_size=4)
+    >>> randoms = np.random.random((1000, 3))
+    >>> rbins = np.logspace(-2, -1, 5)
+    >>> RR = cache.pair_counts(npairs_3d, randoms, randoms, (rbins, ), 1.)
+    >>> RR2 = cache.pair_counts(npairs_3d, randoms, randoms, (rbins, ), 1.)
+    >>> assert np.all(RR == RR2)
+    """
+
+    def __init__(self, max_size=default_random_pair_count_cache_size, dirname=None):
+        """
+        Parameters
+        ----------
+        max_size : int, optional
+            Maximum number of pair counts stored in memory. Default is 32.
+
+        dirname : string, optional
+            Directory in which the pair counts are additionally stored on disk.
+            Default is None, in which case counts are only stored in memory.
+        """
+        self.max_size = max_size
+        self.dirname = dirname
+        self._counts = OrderedDict()
+
+    def __len__(self):
+        return len(self._counts)
+
+    def clear(self):
+        """ Remove all counts stored in memory. Counts stored on disk are not deleted.
+        """
+        self._counts.clear()
+
+    @staticmethod
+    def key(counter_name, sample1, sample2, bins, period):
+        """ Hash uniquely identifying the pair counts of ``sample1`` and ``sample2``
+        computed by the pair counter named ``counter_name``.
+
+        Parameters
+        ----------
+        counter_name : string
+
+        sample1, sample2 : array_like
+            Npts1 x 3 and Npts2 x 3 arrays of points
+
+        bins : tuple
+            Tuple of arrays defining the binning, e.g., ``(rp_bins, pi_bins)``
+
+        period : array_like
+            Length-3 array defining the periodic boundary conditions,
+            or None for a non-periodic box.
+
+        Returns
+        -------
+        key : string
+        """
+        h = hashlib.sha1(counter_name.encode('utf-8'))
+        for arr in (sample1, sample2, period) + tuple(bins):
+            if arr is None:
+                h.update(b'None')
+            else:
+                arr = np.ascontiguousarray(arr, dtype='f8')
+                h.update(str(arr.shape).encode('utf-8'))
+                h.update(arr.tobytes())
+        return h.hexdigest()
+
+    def _fname(self, key):
+        return os.path.join(self.dirname, key + '.npy')
+
+    def get(self, key):
+        """ Return the counts stored under ``key``, or None if no counts are stored.
+        """
+        if key in self._counts:
+            counts = self._counts.pop(key)
+            self._counts[key] = counts
+            return counts.copy()
+        elif (self.dirname is not None) and os.path.isfile(self._fname(key)):
+            counts = np.load(self._fname(key))
+            self._store_in_memory(key, counts)
+            return counts.copy()
+        else:
+            return None
+
+    def set(self, key, counts):
+        """ Store ``counts`` under ``key`` in memory and, if ``dirname`` is set, on disk.
+        """
+        counts = np.array(counts)
+        self._store_in_memory(key, counts)
+        if self.dirname is not None:
+            if not os.path.isdir(self.dirname):
+                os.makedirs(self.dirname)
+            np.save(self._fname(key), counts)
+
+    def _store_in_memory(self, key, counts):
+        self._counts.pop(key, None)
+        if self.max_size > 0:
+            self._counts[key] = counts
+            while len(self._counts) > self.max_size:
+                self._counts.popitem(last=False)
+
+    def pair_counts(self, counter, sample1, sample2, bins, period, **kwargs):
+        """ Return the result of ``counter(sample1, sample2, *bins, period=period, **kwargs)``,
+        only calling the pair counter if the result is not already stored in the cache.
+
+        Parameters
+        ----------
+        counter : function
+            Pair-counting function, e.g., `~halotools.mock_observables.npairs_3d`
+
+        sample1, sample2 : array_like
+            Npts1 x 3 and Npts2 x 3 arrays of points
+
+        bins : tuple
+            Tuple of the binning arguments passed to ``counter``, e.g., ``(rp_bins, pi_bins)``
+
+        period : array_like
+            Length-3 array defining the periodic boundary conditions,
+            or None for a non-periodic box.
+
+        **kwargs : optional
+            Additional keyword arguments passed to ``counter``. These may only
+            affect the performance of the pair counter, e.g., ``num_threads``
+            and ``approx_cell1_size``, but not the result.
+
+        Returns
+        -------
+        counts : array
+        """
+        if (self.max_size <= 0) and (self.dirname is None):
+            return counter(sample1, sample2, *bins, period=period, **kwargs)
+
+        key = self.key(counter.__name__, sample1, sample2, bins, period)
+        counts = self.get(key)
+        if counts is None:
+            counts = counter(sample1, sample2, *bins, period=period, **kwargs)
+            self.set(key, counts)
+        return counts
+
+
+random_pair_count_cache = RandomPairCountCache()
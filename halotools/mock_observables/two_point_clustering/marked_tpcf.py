@@ -108,8 +108,10 @@ def marked_tpcf(sample1, rbins, sample2=None,
 
     iterations : int, optional
         integer indicating the number of times to calculate the random weights,
-        taking the mean of the outcomes.  Only applicable if ``normalize_by`` is set
-        to 'random_marks'.  See Notes for further explanation.
+        taking the median of the outcomes.  Only applicable if ``normalize_by`` is set
+        to 'random_marks'.  The weighted pair counts of all iterations are accumulated
+        in a single pass over the pairs, so that additional iterations only add
+        the cost of evaluating the marking function.  See Notes for further explanation.
 
     randomize_marks : array_like, optional
         Boolean array of length N_marks indicating which elements should be randomized
@@ -322,32 +324,20 @@ def marked_tpcf(sample1, rbins, sample2=None,
             num_threads, do_auto, do_cross, _sample1_is_sample2, None, None)
     # calculate randomized marked pairs
     elif normalize_by == 'random_marks':
-        if iterations > 1:
-            # create storage arrays of the right shape
-            R1R1 = np.zeros((iterations, len(rbins)-1))
-            R1R2 = np.zeros((iterations, len(rbins)-1))
-            R2R2 = np.zeros((iterations, len(rbins)-1))
+        # get arrays to randomize marks, one pair of permutations per iteration
+        permutations1, permutations2 = [], []
+        with NumpyRNGContext(seed):
             for i in range(iterations):
-                # get arrays to randomize marks
-                with NumpyRNGContext(seed):
-                    permutate1 = np.random.permutation(np.arange(0, len(sample1)))
-                    permutate2 = np.random.permutation(np.arange(0, len(sample2)))
-                R1R1[i, :], R1R2[i, :], R2R2[i, :] = random_counts(
-                    sample1, sample2, rbins, period, num_threads,
-                    do_auto, do_cross, marks1, marks2, weight_func_id,
-                    _sample1_is_sample2, permutate1, permutate2, randomize_marks)
-
-            R1R1 = np.median(R1R1, axis=0)
-            R1R2 = np.median(R1R2, axis=0)
-            R2R2 = np.median(R2R2, axis=0)
-        else:
-            # get arrays to randomize marks
-            with NumpyRNGContext(seed):
-                permutate1 = np.random.permutation(np.arange(0, len(sample1)))
-                permutate2 = np.random.permutation(np.arange(0, len(sample2)))
-            R1R1, R1R2, R2R2 = random_counts(sample1, sample2, rbins, period,
-                num_threads, do_auto, do_cross, marks1, marks2, weight_func_id,
-                _sample1_is_sample2, permutate1, permutate2, randomize_marks)
+                permutations1.append(np.random.permutation(np.arange(0, len(sample1))))
+                permutations2.append(np.random.permutation(np.arange(0, len(sample2))))
+
+        # the counts of all iterations are computed in one pass over the pairs
+        R1R1, R1R2, R2R2 = random_counts(sample1, sample2, rbins, period,
+            num_threads, do_auto, do_cross, marks1, marks2, weight_func_id,
+            _sample1_is_sample2, permutations1, permutations2, randomize_marks)
+
+        R1R1, R1R2, R2R2 = [None if R is None else np.median(R, axis=0)
+            for R in (R1R1, R1R2, R2R2)]
 
     # return results
     if _sample1_is_sample2:
@@ -407,25 +397,24 @@ def marked_pair_counts(sample1, sample2, rbins, period, num_threads,
 
 def random_counts(sample1, sample2, rbins, period, num_threads,
         do_auto, do_cross, marks1, marks2, weight_func_id,
-        _sample1_is_sample2, permutate1, permutate2, randomize_marks):
+        _sample1_is_sample2, permutations1, permutations2, randomize_marks):
     """
     Count random weighted data pairs.
+
+    The marks of the points are shuffled by each of the permutations in
+    ``permutations1`` and ``permutations2``, and the weighted counts of all
+    K permutations are accumulated in a single pass over the pairs.
+    Each returned array has shape (K, len(rbins)-1).
     """
 
-    permuted_marks1 = marks1
-    permuted_marks2 = marks2
-    for i in range(marks1.shape[1]):
-        if randomize_marks[i]:
-            permuted_marks1[:, i] = marks1[permutate1, i]
-    for i in range(marks2.shape[1]):
-        if randomize_marks[i]:
-            permuted_marks2[:, i] = marks2[permutate2, i]
+    permuted_marks1 = _permuted_marks(marks1, permutations1, randomize_marks)
+    permuted_marks2 = _permuted_marks(marks2, permutations2, randomize_marks)
 
     if do_auto is True:
         R1R1 = marked_npairs_3d(sample1, sample1, rbins,
-            weights1=marks1, weights2=permuted_marks1,
+            weights1=permuted_marks1, weights2=permuted_marks1,
             weight_func_id=weight_func_id, period=period, num_threads=num_threads)
-        R1R1 = np.diff(R1R1)
+        R1R1 = np.diff(R1R1, axis=1)
     else:
         R1R1 = None
         R2R2 = None
@@ -439,20 +428,32 @@ def random_counts(sample1, sample2, rbins, period, num_threads,
                 weights1=permuted_marks1,
                 weights2=permuted_marks2,
                 weight_func_id=weight_func_id, period=period, num_threads=num_threads)
-            R1R2 = np.diff(R1R2)
+            R1R2 = np.diff(R1R2, axis=1)
         else:
             R1R2 = None
         if do_auto is True:
             R2R2 = marked_npairs_3d(sample2, sample2, rbins,
-                weights1=marks2, weights2=permuted_marks2,
+                weights1=permuted_marks2, weights2=permuted_marks2,
                 weight_func_id=weight_func_id, period=period, num_threads=num_threads)
-            R2R2 = np.diff(R2R2)
+            R2R2 = np.diff(R2R2, axis=1)
         else:
             R2R2 = None
 
     return R1R1, R1R2, R2R2
 
 
+def _permuted_marks(marks, permutations, randomize_marks):
+    """
+    Return an array of shape (Npts, K, N_marks) storing the marks shuffled by each of
+    the K permutations, where only the marks flagged by ``randomize_marks`` are shuffled.
+    """
+    randomize_marks = np.asarray(randomize_marks, dtype=bool)
+    permuted_marks = np.repeat(marks[:, np.newaxis, :], len(permutations), axis=1)
+    for k, permutation in enumerate(permutations):
+        permuted_marks[:, k, randomize_marks] = marks[permutation][:, randomize_marks]
+    return permuted_marks
+
+
 def pair_counts(sample1, sample2, rbins, period, num_threads, do_auto, do_cross,
         _sample1_is_sample2, approx_cell1_size, approx_cell2_size):
     """
@@ -9,7 +9,8 @@ import numpy as np
 from math import pi
 
 from .clustering_helpers import (process_optional_input_sample2,
-    downsample_inputs_exceeding_max_sample_size, verify_tpcf_estimator)
+    downsample_inputs_exceeding_max_sample_size, verify_tpcf_estimator,
+    random_pair_count_cache)
 from .tpcf_estimators import _TP_estimator, _TP_estimator_requirements
 
 from ..mock_observables_helpers import (enforce_sample_has_correct_shape,
@@ -101,11 +102,9 @@ def rp_pi_tpcf(sample1, rp_bins, pi_bins, sample2=None, randoms=None,
         Default is ``Natural``.
 
     num_threads : int, optional
-        Number of threads to use in calculation, where parallelization is performed
-        using the python ``multiprocessing`` module. Default is 1 for a purely serial
-        calculation, in which case a multiprocessing Pool object will
-        never be instantiated. A string 'max' may be used to indicate that
-        the pair counters should use all available cores on the machine.
+        Number of OpenMP threads used by `~halotools.mock_observables.pair_counters.npairs_xy_z`.
+        Default is 1 for a purely serial calculation. A string 'max' may be used
+        to indicate that all available cores on the machine should be used.
 
     max_sample_size : int, optional
         Defines maximum size of the sample that will be passed to the pair counter.
@@ -243,8 +242,8 @@ def pair_counts(sample1, sample2, rp_bins, pi_bins, period,
     """
     D1D1 = npairs_xy_z(sample1, sample1, rp_bins, pi_bins, period=period,
         num_threads=num_threads, approx_cell1_size=approx_cell1_size,
-        approx_cell2_size=approx_cell1_size)
-    D1D1 = np.diff(np.diff(D1D1, axis=0), axis=1)
+        approx_cell2_size=approx_cell1_size,
+        cumulative=False)
     if _sample1_is_sample2:
         D1D2 = D1D1
         D2D2 = D1D1
@@ -253,16 +252,16 @@ def pair_counts(sample1, sample2, rp_bins, pi_bins, period,
             D1D2 = npairs_xy_z(sample1, sample2, rp_bins, pi_bins, period=period,
                 num_threads=num_threads,
                 approx_cell1_size=approx_cell1_size,
-                approx_cell2_size=approx_cell2_size)
-            D1D2 = np.diff(np.diff(D1D2, axis=0), axis=1)
+                approx_cell2_size=approx_cell2_size,
+                cumulative=False)
         else:
             D1D2 = None
         if do_auto is True:
             D2D2 = npairs_xy_z(sample2, sample2, rp_bins, pi_bins,
                 period=period, num_threads=num_threads,
                 approx_cell1_size=approx_cell2_size,
-                approx_cell2_size=approx_cell2_size)
-            D2D2 = np.diff(np.diff(D2D2, axis=0), axis=1)
+                approx_cell2_size=approx_cell2_size,
+                cumulative=False)
         else:
             D2D2 = None
 
@@ -293,8 +292,8 @@ def random_counts(sample1, sample2, randoms, rp_bins, pi_bins, period,
     # No PBCs, randoms must have been provided.
     if randoms is not None:
         if do_RR is True:
-            RR = npairs_xy_z(randoms, randoms, rp_bins, pi_bins,
-                period=period, num_threads=num_threads,
+            RR = random_pair_count_cache.pair_counts(npairs_xy_z,
+                randoms, randoms, (rp_bins, pi_bins), period, num_threads=num_threads,
                 approx_cell1_size=approx_cellran_size,
                 approx_cell2_size=approx_cellran_size)
             RR = np.diff(np.diff(RR, axis=0), axis=1)
@@ -304,8 +303,8 @@ def random_counts(sample1, sample2, randoms, rp_bins, pi_bins, period,
             D1R = npairs_xy_z(sample1, randoms, rp_bins, pi_bins,
                 period=period, num_threads=num_threads,
                 approx_cell1_size=approx_cell1_size,
-                approx_cell2_size=approx_cellran_size)
-            D1R = np.diff(np.diff(D1R, axis=0), axis=1)
+                approx_cell2_size=approx_cellran_size,
+                cumulative=False)
         else:
             D1R = None
         if _sample1_is_sample2:  # calculating the cross-correlation
@@ -315,8 +314,8 @@ def random_counts(sample1, sample2, randoms, rp_bins, pi_bins, period,
                 D2R = npairs_xy_z(sample2, randoms, rp_bins, pi_bins,
                     period=period, num_threads=num_threads,
                     approx_cell1_size=approx_cell2_size,
-                    approx_cell2_size=approx_cellran_size)
-                D2R = np.diff(np.diff(D2R, axis=0), axis=1)
+                    approx_cell2_size=approx_cellran_size,
+                    cumulative=False)
             else:
                 D2R = None
 
@@ -8,7 +8,7 @@ import numpy as np
 
 from .clustering_helpers import (process_optional_input_sample2,
     downsample_inputs_exceeding_max_sample_size, verify_tpcf_estimator,
-    tpcf_estimator_dd_dr_rr_requirements)
+    tpcf_estimator_dd_dr_rr_requirements, random_pair_count_cache)
 from ..mock_observables_helpers import (enforce_sample_has_correct_shape,
     get_separation_bins_array, get_line_of_sight_bins_array, get_period, get_num_threads)
 from ..pair_counters.mesh_helpers import _enforce_maximum_search_length
@@ -96,11 +96,9 @@ def s_mu_tpcf(sample1, s_bins, mu_bins, sample2=None, randoms=None,
         Default is ``Natural``.
 
     num_threads : int, optional
-        Number of threads to use in calculation, where parallelization is performed
-        using the python ``multiprocessing`` module. Default is 1 for a purely serial
-        calculation, in which case a multiprocessing Pool object will
-        never be instantiated. A string 'max' may be used to indicate that
-        the pair counters should use all available cores on the machine.
+        Number of OpenMP threads used by `~halotools.mock_observables.pair_counters.npairs_s_mu`.
+        Default is 1 for a purely serial calculation. A string 'max' may be used
+        to indicate that all available cores on the machine should be used.
 
     max_sample_size : int, optional
         Defines maximum size of the sample that will be passed to the pair counter.
@@ -288,7 +286,8 @@ def random_counts(sample1, sample2, randoms, s_bins, mu_bins,
     # PBCs and randoms.
     if randoms is not None:
         if do_RR is True:
-            RR = npairs_s_mu(randoms, randoms, s_bins, mu_bins, period=period,
+            RR = random_pair_count_cache.pair_counts(npairs_s_mu,
+                             randoms, randoms, (s_bins, mu_bins), period,
                              num_threads=num_threads,
                              approx_cell1_size=approx_cellran_size,
                              approx_cell2_size=approx_cellran_size)
@@ -4,9 +4,11 @@ from __future__ import absolute_import, division, print_function
 
 from astropy.tests.helper import pytest
 import numpy as np
+from astropy.utils.misc import NumpyRNGContext
 
 from ..clustering_helpers import verify_tpcf_estimator, downsample_inputs_exceeding_max_sample_size
-from ..clustering_helpers import process_optional_input_sample2
+from ..clustering_helpers import process_optional_input_sample2, RandomPairCountCache
+from ...pair_counters import npairs_3d
 
 __all__ = ('test_verify_tpcf_estimator', )
 
@@ -141,3 +143,40 @@ def test_process_optional_input_sample2_case3():
     assert np.all(sample2_in == sample2_out)
     assert _sample1_is_sample2 is True
     assert do_cross is False
+
+
+def test_random_pair_count_cache(tmpdir):
+    """ Verify that the cache only calls the pair counter for new inputs,
+    discards the least recently used counts, and re-loads counts from disk.
+    """
+    ncalls = []
+
+    def counter(sample1, sample2, rbins, period=None, num_threads=1):
+        ncalls.append(1)
+        return npairs_3d(sample1, sample2, rbins, period=period, num_threads=num_threads)
+
+    with NumpyRNGContext(43):
+        randoms = np.random.random((200, 3))
+    rbins = np.array([0.05, 0.1, 0.2])
+    correct_result = npairs_3d(randoms, randoms, rbins, period=1.)
+
+    cache = RandomPairCountCache(max_size=1, dirname=str(tmpdir))
+    result = cache.pair_counts(counter, randoms, randoms, (rbins, ), 1.)
+    assert np.all(result == correct_result)
+    result = cache.pair_counts(counter, randoms, randoms, (rbins, ), 1., num_threads=2)
+    assert np.all(result == correct_result)
+    assert len(ncalls) == 1
+
+    _ = cache.pair_counts(counter, randoms, randoms, (rbins[:-1], ), 1.)
+    assert len(ncalls) == 2
+    assert len(cache) == 1
+
+    cache2 = RandomPairCountCache(max_size=1, dirname=str(tmpdir))
+    result = cache2.pair_counts(counter, randoms, randoms, (rbins, ), 1.)
+    assert np.all(result == correct_result)
+    assert len(ncalls) == 2
+
+    cache3 = RandomPairCountCache(max_size=0)
+    _ = cache3.pair_counts(counter, randoms, randoms, (rbins, ), 1.)
+    _ = cache3.pair_counts(counter, randoms, randoms, (rbins, ), 1.)
+    assert len(ncalls) == 4
@@ -0,0 +1,122 @@
+""" Module providing unit-testing of the `~halotools.mock_observables.tpcf_multi` function.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from astropy.utils.misc import NumpyRNGContext
+from astropy.tests.helper import pytest
+
+from ..tpcf_multi import tpcf_multi
+from ..tpcf import tpcf
+from ..wp import wp
+from ..rp_pi_tpcf import rp_pi_tpcf
+from ..s_mu_tpcf import s_mu_tpcf
+from ..clustering_helpers import random_pair_count_cache
+
+__all__ = ('test_tpcf_multi_periodic', 'test_tpcf_multi_randoms')
+
+fixed_seed = 43
+
+statistics = ['tpcf', 'wp', 'rp_pi_tpcf', 's_mu_tpcf']
+rbins = np.linspace(0.05, 0.25, 5)
+rp_bins = np.linspace(0.05, 0.25, 4)
+pi_bins = np.linspace(0, 0.25, 6)
+pi_max = 0.3
+s_bins = np.linspace(0.05, 0.2, 4)
+mu_bins = np.linspace(0, 1, 5)
+
+
+def _individual_results(sample1, randoms, period, estimator):
+    """ Calculate each statistic with its own function.
+    """
+    return {'tpcf': tpcf(sample1, rbins, randoms=randoms, period=period,
+            estimator=estimator),
+        'wp': wp(sample1, rp_bins, pi_max, randoms=randoms, period=period,
+            estimator=estimator),
+        'rp_pi_tpcf': rp_pi_tpcf(sample1, rp_bins, pi_bins, randoms=randoms,
+            period=period, estimator=estimator),
+        's_mu_tpcf': s_mu_tpcf(sample1, s_bins, mu_bins, randoms=randoms,
+            period=period, estimator=estimator)}
+
+
+def test_tpcf_multi_periodic():
+    """ Verify that every statistic agrees with the individual functions
+    for a periodic box with analytical randoms.
+    """
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((500, 3))
+
+    results = tpcf_multi(sample1, statistics, rbins=rbins, rp_bins=rp_bins,
+        pi_bins=pi_bins, pi_max=pi_max, s_bins=s_bins, mu_bins=mu_bins, period=1)
+    correct_results = _individual_results(sample1, None, 1, 'Natural')
+    assert set(results.keys()) == set(statistics)
+    for statistic in statistics:
+        assert results[statistic].shape == correct_results[statistic].shape
+        assert np.allclose(results[statistic], correct_results[statistic])
+
+    # each statistic can be requested on its own
+    results = tpcf_multi(sample1, 'wp', rp_bins=rp_bins, pi_max=pi_max, period=1,
+        num_threads=2)
+    assert list(results.keys()) == ['wp']
+    assert np.allclose(results['wp'], correct_results['wp'])
+
+
+def test_tpcf_multi_randoms():
+    """ Verify that every statistic agrees with the individual functions
+    for a non-periodic box with randoms, and that the RR counts of each statistic
+    are stored in the cache under the same key as those of the individual function.
+    """
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((500, 3))
+        randoms = np.random.random((1000, 3))
+
+    random_pair_count_cache.clear()
+    results = tpcf_multi(sample1, statistics, rbins=rbins, rp_bins=rp_bins,
+        pi_bins=pi_bins, pi_max=pi_max, s_bins=s_bins, mu_bins=mu_bins,
+        randoms=randoms, estimator='Landy-Szalay')
+    correct_keys = [random_pair_count_cache.key('npairs_3d', randoms, randoms, (rbins, ), None),
+        random_pair_count_cache.key('npairs_xy_z', randoms, randoms,
+            (rp_bins, np.array([0.0, pi_max])), None),
+        random_pair_count_cache.key('npairs_xy_z', randoms, randoms, (rp_bins, pi_bins), None),
+        random_pair_count_cache.key('npairs_s_mu', randoms, randoms, (s_bins, mu_bins), None)]
+    for key in correct_keys:
+        assert random_pair_count_cache.get(key) is not None
+    assert len(random_pair_count_cache) == 4
+
+    # the individual functions only read their RR counts from the cache
+    correct_results = _individual_results(sample1, randoms, None, 'Landy-Szalay')
+    assert len(random_pair_count_cache) == 4
+    for statistic in statistics:
+        assert np.allclose(results[statistic], correct_results[statistic])
+
+    # and tpcf_multi only reads the RR counts stored by the individual functions
+    random_pair_count_cache.clear()
+    correct_results = _individual_results(sample1, randoms, None, 'Landy-Szalay')
+    assert len(random_pair_count_cache) == 4
+    results = tpcf_multi(sample1, statistics, rbins=rbins, rp_bins=rp_bins,
+        pi_bins=pi_bins, pi_max=pi_max, s_bins=s_bins, mu_bins=mu_bins,
+        randoms=randoms, estimator='Landy-Szalay')
+    assert len(random_pair_count_cache) == 4
+    for statistic in statistics:
+        assert np.allclose(results[statistic], correct_results[statistic])
+    random_pair_count_cache.clear()
+
+
+def test_tpcf_multi_error_handling():
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((100, 3))
+
+    with pytest.raises(ValueError) as err:
+        __ = tpcf_multi(sample1, ['tpcf', 'xi_gm'], rbins=rbins, period=1)
+    substr = "Input ``statistics`` must be a non-empty sequence"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        __ = tpcf_multi(sample1, ['tpcf', 'wp'], rbins=rbins, rp_bins=rp_bins, period=1)
+    substr = "Input ``pi_max`` must be passed to calculate 'wp'"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        __ = tpcf_multi(sample1, ['tpcf'], rbins=rbins)
+    substr = "If no PBCs are specified, randoms must be provided."
+    assert substr in err.value.args[0]
@@ -10,7 +10,7 @@ from warnings import warn
 
 from .clustering_helpers import (process_optional_input_sample2,
     downsample_inputs_exceeding_max_sample_size, verify_tpcf_estimator,
-    tpcf_estimator_dd_dr_rr_requirements)
+    tpcf_estimator_dd_dr_rr_requirements, random_pair_count_cache)
 from .tpcf_estimators import _TP_estimator
 
 from ..mock_observables_helpers import (enforce_sample_has_correct_shape,
@@ -52,7 +52,8 @@ def _random_counts(sample1, sample2, randoms, rbins, period, PBCs, num_threads,
     # randoms provided, so calculate random pair counts.
     if randoms is not None:
         if do_RR is True:
-            RR = npairs_3d(randoms, randoms, rbins, period=period,
+            RR = random_pair_count_cache.pair_counts(npairs_3d,
+                        randoms, randoms, (rbins, ), period,
                         num_threads=num_threads,
                         approx_cell1_size=approx_cellran_size,
                         approx_cell2_size=approx_cellran_size)
@@ -216,11 +217,9 @@ def tpcf(sample1, rbins, sample2=None, randoms=None, period=None,
         Default is ``Natural``.
 
     num_threads : int, optional
-        Number of threads to use in calculation, where parallelization is performed
-        using the python ``multiprocessing`` module. Default is 1 for a purely serial
-        calculation, in which case a multiprocessing Pool object will
-        never be instantiated. A string 'max' may be used to indicate that
-        the pair counters should use all available cores on the machine.
+        Number of OpenMP threads used by `~halotools.mock_observables.pair_counters.npairs_3d`.
+        Default is 1 for a purely serial calculation. A string 'max' may be used
+        to indicate that all available cores on the machine should be used.
 
     max_sample_size : int, optional
         Defines maximum size of the sample that will be passed to the pair counter.
@@ -0,0 +1,384 @@
+r"""
+Module containing the `~halotools.mock_observables.tpcf_multi` function used to
+calculate several two-point clustering statistics of a sample from a single
+pass over its pairs.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+
+from .clustering_helpers import (downsample_inputs_exceeding_max_sample_size,
+    verify_tpcf_estimator, random_pair_count_cache)
+from .tpcf_estimators import _TP_estimator, _TP_estimator_requirements
+from .tpcf import _random_counts as _tpcf_random_counts
+from .rp_pi_tpcf import random_counts as _rp_pi_random_counts
+from .s_mu_tpcf import random_counts as _s_mu_random_counts
+
+from ..mock_observables_helpers import (enforce_sample_has_correct_shape,
+    get_separation_bins_array, get_line_of_sight_bins_array, get_period, get_num_threads)
+from ..pair_counters.mesh_helpers import _enforce_maximum_search_length
+from ..pair_counters import npairs_multi
+
+
+__all__ = ['tpcf_multi']
+__author__ = ['Andrew Hearin', 'Duncan Campbell']
+
+np.seterr(divide='ignore', invalid='ignore')  # ignore divide by zero in e.g. DD/RR
+
+available_statistics = ('tpcf', 'wp', 'rp_pi_tpcf', 's_mu_tpcf')
+
+# Name of the pair counter whose counts are used by each statistic
+_statistic_counter_names = {'tpcf': 'npairs_3d', 'wp': 'npairs_xy_z',
+    'rp_pi_tpcf': 'npairs_xy_z', 's_mu_tpcf': 'npairs_s_mu'}
+
+
+def tpcf_multi(sample1, statistics, rbins=None, rp_bins=None, pi_bins=None, pi_max=None,
+        s_bins=None, mu_bins=None, randoms=None, period=None, estimator='Natural',
+        num_threads=1, max_sample_size=int(1e6), approx_cell1_size=None,
+        approx_cellran_size=None, seed=None):
+    r"""
+    Calculate any combination of the auto-correlation functions
+    `~halotools.mock_observables.tpcf`, `~halotools.mock_observables.wp`,
+    `~halotools.mock_observables.rp_pi_tpcf` and `~halotools.mock_observables.s_mu_tpcf`
+    of ``sample1`` from a single pass over its pairs.
+
+    Each of these functions builds its own mesh and visits all pairs of points
+    within its search length. `~halotools.mock_observables.tpcf_multi` instead counts
+    the pairs of all requested statistics with
+    `~halotools.mock_observables.pair_counters.npairs_multi`, which traverses a single mesh
+    built with the largest search length and computes the separation of each pair only once.
+    The same applies to the pairs involving ``randoms``. The results are identical
+    to those of the individual functions.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 3 numpy array containing 3-D positions of points.
+        See the :ref:`mock_obs_pos_formatting` documentation page for
+        instructions on how to transform your coordinate position arrays into the
+        format accepted by the ``sample1`` argument.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    statistics : sequence of strings
+        Statistics to calculate. Options are 'tpcf', 'wp', 'rp_pi_tpcf' and 's_mu_tpcf'.
+
+    rbins : array_like, optional
+        Boundaries of the radial bins of 'tpcf'. Required if 'tpcf' is requested.
+
+    rp_bins : array_like, optional
+        Boundaries of the bins of separation perpendicular to the line-of-sight
+        of 'wp' and 'rp_pi_tpcf'. Required if either of these is requested.
+
+    pi_bins : array_like, optional
+        Boundaries of the bins of separation parallel to the line-of-sight of 'rp_pi_tpcf'.
+        Required if 'rp_pi_tpcf' is requested.
+
+    pi_max : float, optional
+        Maximum separation parallel to the line-of-sight of 'wp'.
+        Required if 'wp' is requested.
+
+    s_bins, mu_bins : array_like, optional
+        Boundaries of the bins of redshift-space separation and of the cosine of the angle
+        to the line-of-sight of 's_mu_tpcf'. Required if 's_mu_tpcf' is requested.
+
+    randoms : array_like, optional
+        Nran x 3 array containing 3-D positions of randomly distributed points.
+        If no randoms are provided (the default option),
+        the calculation proceeds using analytical randoms
+        (only valid for periodic boundary conditions).
+
+    period : array_like, optional
+        Length-3 sequence defining the periodic boundary conditions
+        in each dimension. If you instead provide a single scalar, Lbox,
+        period is assumed to be the same in all Cartesian directions.
+        If set to None (the default option), PBCs are set to infinity,
+        in which case ``randoms`` must be provided.
+
+    estimator : string, optional
+        Statistical estimator for the tpcf.
+        Options are 'Natural', 'Davis-Peebles', 'Hewett' , 'Hamilton', 'Landy-Szalay'
+        Default is ``Natural``.
+
+    num_threads : int, optional
+        Number of OpenMP threads used by `~halotools.mock_observables.pair_counters.npairs_multi`.
+        Default is 1 for a purely serial calculation. A string 'max' may be used
+        to indicate that all available cores on the machine should be used.
+
+    max_sample_size : int, optional
+        Defines maximum size of the sample that will be passed to the pair counter.
+        If sample size exeeds max_sample_size,
+        the sample will be randomly down-sampled such that the subsample
+        is equal to ``max_sample_size``. Default value is 1e6.
+
+    approx_cell1_size : array_like, optional
+        Length-3 array serving as a guess for the optimal manner by how points
+        will be apportioned into subvolumes of the simulation box.
+        Default is to use the largest search length of the requested statistics.
+
+    approx_cellran_size : array_like, optional
+        Analogous to ``approx_cell1_size``, but for randoms.
+
+    seed : int, optional
+        Random number seed used to randomly downsample data, if applicable.
+        Default is None, in which case downsampling will be stochastic.
+
+    Returns
+    -------
+    results : dict
+        Dictionary storing the result of each requested statistic under its name,
+        identical to the auto-correlation returned by the function of the same name.
+
+    Notes
+    -----
+    Only auto-correlations are supported. Cross-correlations with a second sample
+    can be calculated with the individual functions.
+
+    The RR counts of ``randoms`` of each statistic are stored in, and re-used from,
+    `~halotools.mock_observables.two_point_clustering.clustering_helpers.random_pair_count_cache`
+    under the same key as those of the function of the same name.
+
+    Examples
+    --------
+    For demonstration purposes we create a randomly distributed set of points within a
+    periodic cube with Lbox = 250 Mpc/h.
+
+    >>> Npts = 1000
+    >>> Lbox = 250.
+    >>> sample1 = np.random.uniform(0, Lbox, Npts*3).reshape((Npts, 3))
+
+    >>> rbins = np.logspace(-1, 1, 10)
+    >>> pi_max = 20.
+    >>> results = tpcf_multi(sample1, ['tpcf', 'wp'], rbins=rbins,
+    ...     rp_bins=rbins, pi_max=pi_max, period=Lbox)
+    >>> xi, w = results['tpcf'], results['wp']
+    """
+    (sample1, statistics, rbins, rp_bins, pi_bins, pi_max, s_bins, mu_bins, randoms,
+        period, PBCs, num_threads) = _tpcf_multi_process_args(sample1, statistics,
+        rbins, rp_bins, pi_bins, pi_max, s_bins, mu_bins, randoms, period,
+        estimator, num_threads, max_sample_size, seed)
+
+    wp_pi_bins = None if pi_max is None else np.array([0.0, pi_max])
+
+    # Binning of the pair counts of each statistic, as passed to the pair counter
+    # by the function of the same name
+    statistic_bins = {}
+    if 'tpcf' in statistics:
+        statistic_bins['tpcf'] = (rbins, )
+    if 'wp' in statistics:
+        statistic_bins['wp'] = (rp_bins, wp_pi_bins)
+    if 'rp_pi_tpcf' in statistics:
+        statistic_bins['rp_pi_tpcf'] = (rp_bins, pi_bins)
+    if 's_mu_tpcf' in statistics:
+        statistic_bins['s_mu_tpcf'] = (s_bins, mu_bins)
+
+    do_DD, do_DR, do_RR = _TP_estimator_requirements(estimator)
+
+    N1 = len(sample1)
+    if randoms is not None:
+        NR = len(randoms)
+    else:
+        # set the number of randoms equal to the number of points in sample1
+        # this is arbitrarily set, but must remain consistent!
+        NR = N1
+
+    # count data pairs
+    DD = _statistic_pair_counts(sample1, sample1, statistic_bins, period,
+        num_threads, approx_cell1_size, approx_cell1_size)
+
+    # count random pairs
+    if randoms is not None:
+        if do_RR is True:
+            RR = _cached_random_pair_counts(randoms, statistic_bins, period,
+                num_threads, approx_cellran_size)
+        if do_DR is True:
+            DR = _statistic_pair_counts(sample1, randoms, statistic_bins, period,
+                num_threads, approx_cell1_size, approx_cellran_size)
+
+    def differential_counts(counts, statistic):
+        counts = counts[statistic]
+        if statistic == 'tpcf':
+            return np.diff(counts)
+        return np.diff(np.diff(counts, axis=0), axis=1)
+
+    results = {}
+    for statistic in statistics:
+        D1D1 = differential_counts(DD, statistic)
+        if randoms is not None:
+            D1R = differential_counts(DR, statistic) if do_DR else None
+            RR_statistic = differential_counts(RR, statistic) if do_RR else None
+        else:
+            D1R, RR_statistic = _analytic_random_counts(sample1, statistic,
+                rbins, rp_bins, pi_bins, wp_pi_bins, s_bins, mu_bins, period, PBCs,
+                num_threads, do_RR, do_DR)
+
+        xi = _TP_estimator(D1D1, D1R, RR_statistic, N1, N1, NR, NR, estimator)
+        if statistic == 'wp':
+            xi = 2.0*xi[:, 0]*pi_max
+        elif statistic == 's_mu_tpcf':
+            # pairs are counted in order of increasing theta_LOS, i.e., decreasing mu
+            xi = xi[:, ::-1]
+        results[statistic] = xi
+
+    return results
+
+
+def _statistic_pair_counts(sample1, sample2, statistic_bins, period,
+        num_threads, approx_cell1_size, approx_cell2_size):
+    """ Count the pairs of all the statistics of ``statistic_bins`` in a single call to
+    `~halotools.mock_observables.pair_counters.npairs_multi`, returning a dictionary
+    storing the cumulative counts of each statistic in its own binning.
+
+    wp and rp_pi_tpcf are both read off the cumulative counts of a single
+    line-of-sight binning containing the edges of both.
+    """
+    bins = {}
+    xy_z_pi_bins = None
+    for statistic, statistic_binning in statistic_bins.items():
+        if statistic == 'tpcf':
+            bins['rbins'], = statistic_binning
+        elif statistic == 's_mu_tpcf':
+            bins['s_bins'], bins['mu_bins'] = statistic_binning
+        else:
+            bins['rp_bins'], pi_bins = statistic_binning
+            xy_z_pi_bins = pi_bins if xy_z_pi_bins is None else np.union1d(xy_z_pi_bins, pi_bins)
+    if xy_z_pi_bins is not None:
+        bins['pi_bins'] = xy_z_pi_bins
+
+    counts = npairs_multi(sample1, sample2, period=period, num_threads=num_threads,
+        approx_cell1_size=approx_cell1_size, approx_cell2_size=approx_cell2_size, **bins)
+
+    result = {}
+    for statistic, statistic_binning in statistic_bins.items():
+        result[statistic] = counts[_statistic_counter_names[statistic]]
+        if statistic in ('wp', 'rp_pi_tpcf'):
+            pi_bins = statistic_binning[1]
+            result[statistic] = result[statistic][:, np.searchsorted(xy_z_pi_bins, pi_bins)]
+    return result
+
+
+def _cached_random_pair_counts(randoms, statistic_bins, period, num_threads, approx_cellran_size):
+    """ Return the RR counts of all the statistics of ``statistic_bins``, only counting
+    the statistics whose counts are not already stored in the random pair count cache,
+    in a single pass over the pairs.
+
+    The counts of each statistic are stored under the same key as those
+    of the function of the same name, so that the cached counts are shared.
+    """
+    keys = {statistic: random_pair_count_cache.key(_statistic_counter_names[statistic],
+        randoms, randoms, bins, period) for statistic, bins in statistic_bins.items()}
+    RR = {statistic: random_pair_count_cache.get(key) for statistic, key in keys.items()}
+
+    missing_bins = {statistic: statistic_bins[statistic] for statistic in RR
+        if RR[statistic] is None}
+    if len(missing_bins) > 0:
+        counts = _statistic_pair_counts(randoms, randoms, missing_bins, period,
+            num_threads, approx_cellran_size, approx_cellran_size)
+        for statistic in missing_bins:
+            random_pair_count_cache.set(keys[statistic], counts[statistic])
+            RR[statistic] = counts[statistic]
+    return RR
+
+
+def _analytic_random_counts(sample1, statistic, rbins, rp_bins, pi_bins, wp_pi_bins,
+        s_bins, mu_bins, period, PBCs, num_threads, do_RR, do_DR):
+    """ Return the analytical D1R and RR counts of ``statistic``,
+    as calculated by the function of the same name.
+    """
+    if statistic == 'tpcf':
+        D1R, __, RR = _tpcf_random_counts(sample1, sample1, None, rbins, period, PBCs,
+            num_threads, do_RR, do_DR, True, None, None, None)
+    elif statistic == 'rp_pi_tpcf':
+        D1R, __, RR = _rp_pi_random_counts(sample1, sample1, None, rp_bins, pi_bins,
+            period, PBCs, num_threads, do_RR, do_DR, True, None, None, None)
+    elif statistic == 'wp':
+        D1R, __, RR = _rp_pi_random_counts(sample1, sample1, None, rp_bins, wp_pi_bins,
+            period, PBCs, num_threads, do_RR, do_DR, True, None, None, None)
+    elif statistic == 's_mu_tpcf':
+        D1R, __, RR = _s_mu_random_counts(sample1, sample1, None, s_bins, mu_bins,
+            period, PBCs, num_threads, do_RR, do_DR, True, None, None, None)
+    return D1R, RR
+
+
+def _tpcf_multi_process_args(sample1, statistics, rbins, rp_bins, pi_bins, pi_max,
+        s_bins, mu_bins, randoms, period, estimator, num_threads, max_sample_size, seed):
+    """
+    Private method to do bounds-checking on the arguments passed to
+    `~halotools.mock_observables.tpcf_multi`.
+    """
+    sample1 = enforce_sample_has_correct_shape(sample1)
+
+    if randoms is not None:
+        randoms = np.atleast_1d(randoms)
+
+    sample1, __ = downsample_inputs_exceeding_max_sample_size(
+        sample1, sample1, True, max_sample_size, seed=seed)
+
+    if isinstance(statistics, str):
+        statistics = [statistics]
+    statistics = list(statistics)
+    try:
+        assert len(statistics) > 0
+        assert set(statistics) <= set(available_statistics)
+    except AssertionError:
+        msg = ("Input ``statistics`` must be a non-empty sequence of "
+            "the following strings: {0}".format(available_statistics))
+        raise ValueError(msg)
+
+    def require(arg, argname, statistic):
+        if arg is None:
+            msg = "Input ``{0}`` must be passed to calculate '{1}'".format(argname, statistic)
+            raise ValueError(msg)
+
+    period, PBCs = get_period(period)
+
+    if 'tpcf' in statistics:
+        require(rbins, 'rbins', 'tpcf')
+        rbins = get_separation_bins_array(rbins)
+        _enforce_maximum_search_length(np.amax(rbins), period)
+        assert np.all(rbins > 0.), "All values of input ``rbins`` must be positive"
+    else:
+        rbins = None
+
+    if ('wp' in statistics) | ('rp_pi_tpcf' in statistics):
+        require(rp_bins, 'rp_bins', 'wp' if 'wp' in statistics else 'rp_pi_tpcf')
+        rp_bins = get_separation_bins_array(rp_bins)
+    else:
+        rp_bins = None
+
+    if 'wp' in statistics:
+        require(pi_max, 'pi_max', 'wp')
+        pi_max = float(pi_max)
+        _enforce_maximum_search_length([np.amax(rp_bins), np.amax(rp_bins), pi_max], period)
+    else:
+        pi_max = None
+
+    if 'rp_pi_tpcf' in statistics:
+        require(pi_bins, 'pi_bins', 'rp_pi_tpcf')
+        pi_bins = get_line_of_sight_bins_array(pi_bins)
+        _enforce_maximum_search_length(
+            [np.amax(rp_bins), np.amax(rp_bins), np.amax(pi_bins)], period)
+    else:
+        pi_bins = None
+
+    if 's_mu_tpcf' in statistics:
+        require(s_bins, 's_bins', 's_mu_tpcf')
+        require(mu_bins, 'mu_bins', 's_mu_tpcf')
+        s_bins = get_separation_bins_array(s_bins)
+        mu_bins = get_line_of_sight_bins_array(mu_bins)
+        if (np.min(mu_bins) < 0.0) | (np.max(mu_bins) > 1.0):
+            msg = "`mu_bins` must be in the range [0,1]."
+            raise ValueError(msg)
+        _enforce_maximum_search_length(np.max(s_bins), period)
+    else:
+        s_bins, mu_bins = None, None
+
+    if (randoms is None) & (PBCs is False):
+        msg = "If no PBCs are specified, randoms must be provided.\n"
+        raise ValueError(msg)
+
+    num_threads = get_num_threads(num_threads)
+
+    verify_tpcf_estimator(estimator)
+
+    return (sample1, statistics, rbins, rp_bins, pi_bins, pi_max, s_bins, mu_bins,
+        randoms, period, PBCs, num_threads)
@@ -11,7 +11,8 @@ from math import gamma
 from warnings import warn
 
 from .clustering_helpers import (process_optional_input_sample2,
-    downsample_inputs_exceeding_max_sample_size, verify_tpcf_estimator)
+    downsample_inputs_exceeding_max_sample_size, verify_tpcf_estimator,
+    random_pair_count_cache)
 
 from ..mock_observables_helpers import (enforce_sample_has_correct_shape,
     get_separation_bins_array, get_period, get_num_threads)
@@ -288,7 +289,8 @@ def random_counts(sample1, sample2, randoms, rbins, period, PBCs, num_threads,
     # randoms provided, so calculate random pair counts.
     if randoms is not None:
         if do_RR is True:
-            RR = npairs_3d(randoms, randoms, rbins, period=period,
+            RR = random_pair_count_cache.pair_counts(npairs_3d,
+                        randoms, randoms, (rbins, ), period,
                         num_threads=num_threads,
                         approx_cell1_size=approx_cellran_size,
                         approx_cell2_size=approx_cellran_size)
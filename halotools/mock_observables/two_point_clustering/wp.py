@@ -99,11 +99,9 @@ def wp(sample1, rp_bins, pi_max, sample2=None, randoms=None, period=None,
         Default is ``Natural``.
 
     num_threads : int, optional
-        Number of threads to use in calculation, where parallelization is performed
-        using the python ``multiprocessing`` module. Default is 1 for a purely serial
-        calculation, in which case a multiprocessing Pool object will
-        never be instantiated. A string 'max' may be used to indicate that
-        the pair counters should use all available cores on the machine.
+        Number of OpenMP threads used by `~halotools.mock_observables.pair_counters.npairs_xy_z`.
+        Default is 1 for a purely serial calculation. A string 'max' may be used
+        to indicate that all available cores on the machine should be used.
 
     max_sample_size : int, optional
         Defines maximum size of the sample that will be passed to the pair counter.
@@ -0,0 +1,8 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from .underdense_spheres_engine import underdense_spheres_engine
+
+__all__ = ('underdense_spheres_engine', )
@@ -0,0 +1,249 @@
+"""
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+
+from ...isolation_functions.engines.cell_pruning cimport cell_separation
+
+__author__ = ('Andrew Hearin', 'Duncan Campbell')
+__all__ = ('underdense_spheres_engine', )
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def underdense_spheres_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
+        rbins, n_max, cell1_tuple):
+    """ Cython engine counting the spheres centered on the points of sample 1
+    that contain no more than ``n_max`` points of sample 2.
+
+    Parameters
+    ------------
+    double_mesh : object
+        Instance of `~halotools.mock_observables.RectangularDoubleMesh`
+
+    x1in, y1in, z1in : arrays
+        Numpy arrays storing Cartesian coordinates of the sphere centers
+
+    x2in, y2in, z2in : arrays
+        Numpy arrays storing Cartesian coordinates of points in sample 2
+
+    rbins : array
+        Monotonically increasing array of sphere radii.
+
+    n_max : array
+        Array of the same length as ``rbins``. A sphere of radius ``rbins[k]``
+        is counted if it contains no more than ``n_max[k]`` points of sample 2.
+
+    cell1_tuple : tuple
+        Two-element tuple defining the first and last cells in
+        double_mesh.mesh1 that will be looped over. Intended for use with
+        python multiprocessing.
+
+    Returns
+    --------
+    num_underdense_spheres : array
+        Integer array of length len(rbins) storing the number of sphere centers
+        whose sphere of radius ``rbins[k]`` contains no more than ``n_max[k]``
+        points of sample 2.
+
+    Notes
+    -----
+    Points of sample 2 at a distance exactly equal to ``rbins[k]`` are counted
+    as lying inside the sphere, as in `~halotools.mock_observables.npairs_per_object_3d`.
+
+    The counts of each sphere are accumulated from its smallest radius up to
+    the largest radius whose count has not yet exceeded ``n_max``. As soon as
+    the count at that radius exceeds its threshold, the search is restricted
+    to the next smaller radius, and the sphere is abandoned once all of its
+    radii exceed their thresholds. When ``n_max`` is zero, as for the
+    void probability function, the search radius thus shrinks to the distance
+    to the nearest point found so far.
+
+    """
+    cdef cnp.float64_t[:] rbins_squared = np.ascontiguousarray(rbins*rbins, dtype=np.float64)
+    cdef cnp.float64_t[:] n_max_view = np.ascontiguousarray(n_max, dtype=np.float64)
+    cdef cnp.float64_t xperiod = double_mesh.xperiod
+    cdef cnp.float64_t yperiod = double_mesh.yperiod
+    cdef cnp.float64_t zperiod = double_mesh.zperiod
+    cdef cnp.int64_t first_cell1_element = cell1_tuple[0]
+    cdef cnp.int64_t last_cell1_element = cell1_tuple[1]
+    cdef int PBCs = double_mesh._PBCs
+
+    cdef int num_rbins = len(rbins)
+
+    cdef cnp.float64_t[:] x1_sorted = np.ascontiguousarray(
+        x1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y1_sorted = np.ascontiguousarray(
+        y1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z1_sorted = np.ascontiguousarray(
+        z1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] x2_sorted = np.ascontiguousarray(
+        x2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y2_sorted = np.ascontiguousarray(
+        y2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z2_sorted = np.ascontiguousarray(
+        z2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+
+    cdef cnp.int64_t[:] sphere_counts = np.zeros(num_rbins, dtype=np.int64)
+    cdef cnp.int64_t[:] num_underdense_spheres = np.zeros(num_rbins, dtype=np.int64)
+
+    cdef cnp.int64_t icell1, icell2
+    cdef cnp.int64_t[:] cell1_indices = np.ascontiguousarray(double_mesh.mesh1.cell_id_indices, dtype=np.int64)
+    cdef cnp.int64_t[:] cell2_indices = np.ascontiguousarray(double_mesh.mesh2.cell_id_indices, dtype=np.int64)
+
+    cdef cnp.int64_t ifirst1, ilast1, ifirst2, ilast2, i, j
+
+    cdef int ix2, iy2, iz2, ix1, iy1, iz1
+    cdef int nonPBC_ix2, nonPBC_iy2, nonPBC_iz2
+
+    cdef int num_x2_covering_steps = int(np.ceil(
+        double_mesh.search_xlength / double_mesh.mesh2.xcell_size))
+    cdef int num_y2_covering_steps = int(np.ceil(
+        double_mesh.search_ylength / double_mesh.mesh2.ycell_size))
+    cdef int num_z2_covering_steps = int(np.ceil(
+        double_mesh.search_zlength / double_mesh.mesh2.zcell_size))
+
+    cdef int leftmost_ix2, rightmost_ix2
+    cdef int leftmost_iy2, rightmost_iy2
+    cdef int leftmost_iz2, rightmost_iz2
+
+    cdef int num_x1divs = double_mesh.mesh1.num_xdivs
+    cdef int num_y1divs = double_mesh.mesh1.num_ydivs
+    cdef int num_z1divs = double_mesh.mesh1.num_zdivs
+    cdef int num_x2divs = double_mesh.mesh2.num_xdivs
+    cdef int num_y2divs = double_mesh.mesh2.num_ydivs
+    cdef int num_z2divs = double_mesh.mesh2.num_zdivs
+    cdef int num_x2_per_x1 = num_x2divs // num_x1divs
+    cdef int num_y2_per_y1 = num_y2divs // num_y1divs
+    cdef int num_z2_per_z1 = num_z2divs // num_z1divs
+
+    cdef cnp.float64_t x2cell_size = double_mesh.mesh2.xcell_size
+    cdef cnp.float64_t y2cell_size = double_mesh.mesh2.ycell_size
+    cdef cnp.float64_t z2cell_size = double_mesh.mesh2.zcell_size
+
+    cdef cnp.float64_t x2shift, y2shift, z2shift, dx, dy, dz, dsq
+    cdef cnp.float64_t x2low, y2low, z2low, dx_cell, dy_cell, dz_cell
+    cdef cnp.float64_t dx_cell_sq, dxy_cell_sq
+    cdef cnp.float64_t x1tmp, y1tmp, z1tmp, rmax_squared
+    cdef int k, kmax_alive
+
+    for icell1 in range(first_cell1_element, last_cell1_element):
+        ifirst1 = cell1_indices[icell1]
+        ilast1 = cell1_indices[icell1+1]
+        if ilast1 == ifirst1:
+            continue
+
+        ix1 = icell1 // (num_y1divs*num_z1divs)
+        iy1 = (icell1 - ix1*num_y1divs*num_z1divs) // num_z1divs
+        iz1 = icell1 - (ix1*num_y1divs*num_z1divs) - (iy1*num_z1divs)
+
+        leftmost_ix2 = ix1*num_x2_per_x1 - num_x2_covering_steps
+        leftmost_iy2 = iy1*num_y2_per_y1 - num_y2_covering_steps
+        leftmost_iz2 = iz1*num_z2_per_z1 - num_z2_covering_steps
+
+        rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps
+        rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps
+        rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps
+
+        for i in range(ifirst1, ilast1):
+            x1tmp = x1_sorted[i]
+            y1tmp = y1_sorted[i]
+            z1tmp = z1_sorted[i]
+
+            # kmax_alive is the largest radius whose count has not yet exceeded n_max
+            kmax_alive = num_rbins - 1
+            while (kmax_alive >= 0) and (n_max_view[kmax_alive] < 0):
+                kmax_alive -= 1
+            for k in range(num_rbins):
+                sphere_counts[k] = 0
+
+            for nonPBC_ix2 in range(leftmost_ix2, rightmost_ix2):
+                if kmax_alive < 0:
+                    break
+                if nonPBC_ix2 < 0:
+                    x2shift = -xperiod*PBCs
+                elif nonPBC_ix2 >= num_x2divs:
+                    x2shift = +xperiod*PBCs
+                else:
+                    x2shift = 0.
+                # Now apply the PBCs
+                ix2 = nonPBC_ix2 % num_x2divs
+
+                x2low = ix2*x2cell_size + x2shift
+                dx_cell = cell_separation(x1tmp, x1tmp, x2low, x2low + x2cell_size)
+                dx_cell_sq = dx_cell*dx_cell
+                if dx_cell_sq > rbins_squared[kmax_alive]:
+                    continue
+
+                for nonPBC_iy2 in range(leftmost_iy2, rightmost_iy2):
+                    if kmax_alive < 0:
+                        break
+                    if nonPBC_iy2 < 0:
+                        y2shift = -yperiod*PBCs
+                    elif nonPBC_iy2 >= num_y2divs:
+                        y2shift = +yperiod*PBCs
+                    else:
+                        y2shift = 0.
+                    # Now apply the PBCs
+                    iy2 = nonPBC_iy2 % num_y2divs
+
+                    y2low = iy2*y2cell_size + y2shift
+                    dy_cell = cell_separation(y1tmp, y1tmp, y2low, y2low + y2cell_size)
+                    dxy_cell_sq = dx_cell_sq + dy_cell*dy_cell
+                    if dxy_cell_sq > rbins_squared[kmax_alive]:
+                        continue
+
+                    for nonPBC_iz2 in range(leftmost_iz2, rightmost_iz2):
+                        if kmax_alive < 0:
+                            break
+                        if nonPBC_iz2 < 0:
+                            z2shift = -zperiod*PBCs
+                        elif nonPBC_iz2 >= num_z2divs:
+                            z2shift = +zperiod*PBCs
+                        else:
+                            z2shift = 0.
+                        # Now apply the PBCs
+                        iz2 = nonPBC_iz2 % num_z2divs
+
+                        z2low = iz2*z2cell_size + z2shift
+                        dz_cell = cell_separation(z1tmp, z1tmp, z2low, z2low + z2cell_size)
+                        if dxy_cell_sq + dz_cell*dz_cell > rbins_squared[kmax_alive]:
+                            continue
+
+                        icell2 = ix2*(num_y2divs*num_z2divs) + iy2*num_z2divs + iz2
+                        ifirst2 = cell2_indices[icell2]
+                        ilast2 = cell2_indices[icell2+1]
+
+                        #loop over points in cell2 points
+                        for j in range(ifirst2, ilast2):
+                            #calculate the square distance
+                            dx = x1tmp - x2shift - x2_sorted[j]
+                            dy = y1tmp - y2shift - y2_sorted[j]
+                            dz = z1tmp - z2shift - z2_sorted[j]
+                            dsq = dx*dx + dy*dy + dz*dz
+
+                            rmax_squared = rbins_squared[kmax_alive]
+                            if dsq <= rmax_squared:
+                                k = kmax_alive
+                                while dsq <= rbins_squared[k]:
+                                    sphere_counts[k] += 1
+                                    k = k-1
+                                    if k < 0: break
+
+                                # shrink the search to the radii that are still underdense
+                                while sphere_counts[kmax_alive] > n_max_view[kmax_alive]:
+                                    kmax_alive = kmax_alive - 1
+                                    if kmax_alive < 0: break
+                                if kmax_alive < 0:
+                                    break
+
+            # The counts of the radii up to kmax_alive are complete
+            for k in range(kmax_alive+1):
+                if sphere_counts[k] <= n_max_view[k]:
+                    num_underdense_spheres[k] += 1
+
+    return np.array(num_underdense_spheres)
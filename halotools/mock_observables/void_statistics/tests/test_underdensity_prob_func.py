@@ -10,6 +10,8 @@ from astropy.utils.misc import NumpyRNGContext
 from ..underdensity_prob_func import underdensity_prob_func
 from ..void_prob_func import void_prob_func
 
+from ...pair_counters import npairs_per_object_3d
+
 from ...tests.cf_helpers import generate_locus_of_3d_points
 from ....custom_exceptions import HalotoolsError
 
@@ -200,3 +202,26 @@ def test_underdensity_prob_func_process_args6():
         upf = underdensity_prob_func(sample1, rbins, period=period)
     substr = "You must pass either ``n_ran`` or ``random_sphere_centers``"
     assert substr in err.value.args[0]
+
+
+def test_upf_brute_force():
+    """ Verify that the UPF agrees with the fraction of spheres for which
+    `~halotools.mock_observables.pair_counters.npairs_per_object_3d` finds
+    fewer neighbors than the density threshold.
+    """
+    Npts = 500
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts, 3))
+        random_sphere_centers = np.random.random((Npts, 3))
+    rbins = np.linspace(0.05, 0.3, 6)
+    u = 0.7
+
+    upf = underdensity_prob_func(sample1, rbins,
+        random_sphere_centers=random_sphere_centers, period=1, u=u)
+    counts = npairs_per_object_3d(random_sphere_centers, sample1, rbins, period=1)
+    N_max = Npts*(4.0/3.0)*np.pi*rbins**3*u
+    correct_upf = np.mean(counts <= N_max, axis=0)
+    assert np.all(upf == correct_upf)
+    #  ensure the test is non-trivial
+    assert np.all(upf > 0)
+    assert np.all(upf < 1)
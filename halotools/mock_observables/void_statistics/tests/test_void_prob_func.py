@@ -7,6 +7,9 @@ from astropy.tests.helper import pytest
 from astropy.utils.misc import NumpyRNGContext
 
 from ..void_prob_func import void_prob_func
+from ..underdense_spheres import _num_underdense_spheres, _sphere_center_blocks
+
+from ...pair_counters import npairs_per_object_3d
 
 from ...tests.cf_helpers import generate_locus_of_3d_points
 
@@ -139,3 +142,44 @@ def test_vpf_process_args4():
         __ = void_prob_func(sample1, rbins, period=period)
     substr = "You must pass either ``n_ran`` or ``random_sphere_centers``"
     assert substr in err.value.args[0]
+
+
+def test_vpf_brute_force():
+    """ Verify that the VPF agrees with the fraction of spheres for which
+    `~halotools.mock_observables.pair_counters.npairs_per_object_3d` finds no neighbors,
+    for both periodic and non-periodic boxes.
+    """
+    Npts = 500
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts, 3))
+        random_sphere_centers = np.random.random((Npts, 3))
+    rbins = np.linspace(0.02, 0.15, 8)
+
+    for period in (1, None):
+        vpf = void_prob_func(sample1, rbins,
+            random_sphere_centers=random_sphere_centers, period=period)
+        counts = npairs_per_object_3d(random_sphere_centers, sample1, rbins, period=period)
+        correct_vpf = np.mean(counts == 0, axis=0)
+        assert np.all(vpf == correct_vpf)
+    #  ensure the test is non-trivial
+    assert np.all(vpf > 0)
+    assert np.all(vpf < 1)
+
+
+def test_vpf_sphere_center_blocks():
+    """ Verify that the VPF does not depend on how the spheres are divided into blocks,
+    or on the number of processes.
+    """
+    Npts = 500
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts, 3))
+        random_sphere_centers = np.random.random((Npts, 3))
+    rbins = np.linspace(0.02, 0.15, 8)
+
+    vpf = void_prob_func(sample1, rbins,
+        random_sphere_centers=random_sphere_centers, period=1)
+    num_empty_spheres, num_spheres = _num_underdense_spheres(sample1,
+        _sphere_center_blocks(random_sphere_centers, num_spheres_per_block=77),
+        rbins, np.zeros(len(rbins)), period=1, num_threads=2)
+    assert num_spheres == Npts
+    assert np.all(vpf == num_empty_spheres/float(num_spheres))
@@ -0,0 +1,179 @@
+"""
+Module containing private helper functions used by
+`~halotools.mock_observables.void_prob_func` and
+`~halotools.mock_observables.underdensity_prob_func` to count the
+randomly placed spheres that contain few points.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+import multiprocessing
+from functools import partial
+
+from .engines import underdense_spheres_engine
+
+from ..pair_counters.rectangular_mesh import RectangularDoubleMesh
+from ..pair_counters.mesh_helpers import (_set_approximate_cell_sizes,
+    _cell1_parallelization_indices)
+
+from ...utils.array_utils import custom_len
+
+__all__ = ('_num_underdense_spheres', '_random_sphere_center_blocks',
+    '_sphere_center_blocks')
+__author__ = ['Duncan Campbell', 'Andrew Hearin']
+
+default_num_spheres_per_block = int(1e6)
+
+
+def _random_sphere_center_blocks(n_ran, xlim, ylim, zlim, seed,
+        num_spheres_per_block=default_num_spheres_per_block):
+    """ Generator yielding ``n_ran`` sphere centers drawn uniformly in the box
+    defined by ``xlim``, ``ylim`` and ``zlim``, as arrays of shape
+    (num_spheres_per_block, 3).
+
+    The centers are drawn from a single stream of random numbers seeded by ``seed``,
+    so that the sequence of spheres only depends on ``num_spheres_per_block`` and
+    not on the calculation performed with each block. When ``n_ran`` does not
+    exceed ``num_spheres_per_block``, the centers are identical to those drawn with
+    ``np.random.uniform`` inside ``NumpyRNGContext(seed)``.
+    """
+    rng = np.random.RandomState(seed)
+    num_remaining = int(n_ran)
+    while num_remaining > 0:
+        num_spheres = min(num_remaining, num_spheres_per_block)
+        xran = rng.uniform(xlim[0], xlim[1], num_spheres)
+        yran = rng.uniform(ylim[0], ylim[1], num_spheres)
+        zran = rng.uniform(zlim[0], zlim[1], num_spheres)
+        yield np.vstack([xran, yran, zran]).T
+        num_remaining -= num_spheres
+
+
+def _sphere_center_blocks(sphere_centers,
+        num_spheres_per_block=default_num_spheres_per_block):
+    """ Generator yielding consecutive blocks of the input ``sphere_centers``.
+    """
+    for first in range(0, sphere_centers.shape[0], num_spheres_per_block):
+        yield sphere_centers[first:first+num_spheres_per_block]
+
+
+def _num_underdense_spheres(sample1, sphere_center_blocks, rbins, n_max,
+        period=None, num_threads=1,
+        approx_cell1_size=None, approx_cellran_size=None, sphere_center_limits=None):
+    """ Count the spheres that contain no more than ``n_max`` points of ``sample1``.
+
+    The spheres are processed one block of centers at a time, and only the
+    histogram of underdense spheres is accumulated, so that the memory used does not
+    grow with the total number of spheres. The mesh of ``sample1`` is only built once.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 3 numpy array containing 3-D positions of points.
+
+    sphere_center_blocks : iterable
+        Iterable yielding arrays of shape (Nspheres, 3) storing the sphere centers,
+        e.g., the output of `_random_sphere_center_blocks` or `_sphere_center_blocks`.
+
+    rbins : array_like
+        Monotonically increasing array of sphere radii.
+
+    n_max : array_like
+        Array of the same length as ``rbins``. A sphere of radius ``rbins[k]``
+        is counted if it contains no more than ``n_max[k]`` points of ``sample1``.
+
+    period : array_like, optional
+        Length-3 sequence defining the periodic boundary conditions.
+        Default is None, in which case the points and spheres are enclosed in a
+        non-periodic box.
+
+    num_threads : int, optional
+        Number of processes used to count the spheres of each block.
+
+    approx_cell1_size, approx_cellran_size : array_like, optional
+        Approximate cell sizes of the meshes of the sphere centers and of
+        ``sample1``, respectively.
+
+    sphere_center_limits : array_like, optional
+        Two-element sequence storing the smallest and largest coordinate of the sphere
+        centers in any dimension. Only used when ``period`` is None, in which case
+        it is required to enclose all of the blocks in the same box.
+
+    Returns
+    -------
+    num_underdense_spheres : numpy.array
+        Integer array of length len(rbins) storing the number of underdense spheres.
+
+    num_spheres : int
+        Total number of spheres.
+    """
+    if num_threads == 'max':
+        num_threads = multiprocessing.cpu_count()
+
+    rbins = np.atleast_1d(rbins).astype('f8')
+    n_max = np.atleast_1d(n_max).astype('f8')*np.ones(len(rbins))
+    rmax = np.max(rbins)
+
+    x2 = sample1[:, 0]
+    y2 = sample1[:, 1]
+    z2 = sample1[:, 2]
+
+    if period is None:
+        PBCs = False
+        xyzmin = min(np.min(sample1), sphere_center_limits[0])
+        xyzmax = max(np.max(sample1), sphere_center_limits[1])
+        period = np.zeros(3) + max(xyzmax - xyzmin, rmax*3.0)
+        x2, y2, z2 = x2 - xyzmin, y2 - xyzmin, z2 - xyzmin
+    else:
+        PBCs = True
+        xyzmin = 0.
+        period = np.atleast_1d(period).astype(float).ravel()*np.ones(3)
+    xperiod, yperiod, zperiod = period
+
+    if approx_cell1_size is None:
+        approx_cell1_size = [rmax, rmax, rmax]
+    elif custom_len(approx_cell1_size) == 1:
+        approx_cell1_size = [approx_cell1_size, approx_cell1_size, approx_cell1_size]
+    if approx_cellran_size is None:
+        approx_cellran_size = [rmax, rmax, rmax]
+    elif custom_len(approx_cellran_size) == 1:
+        approx_cellran_size = [approx_cellran_size, approx_cellran_size, approx_cellran_size]
+    approx_cell1_size, approx_cellran_size = (
+        _set_approximate_cell_sizes(approx_cell1_size, approx_cellran_size, period))
+    approx_x1cell_size, approx_y1cell_size, approx_z1cell_size = approx_cell1_size
+    approx_x2cell_size, approx_y2cell_size, approx_z2cell_size = approx_cellran_size
+
+    num_underdense_spheres = np.zeros(len(rbins), dtype=np.int64)
+    num_spheres = 0
+    mesh2 = None
+    pool = multiprocessing.Pool(num_threads) if num_threads > 1 else None
+    try:
+        for sphere_centers in sphere_center_blocks:
+            if len(sphere_centers) == 0:
+                continue
+            x1 = sphere_centers[:, 0] - xyzmin
+            y1 = sphere_centers[:, 1] - xyzmin
+            z1 = sphere_centers[:, 2] - xyzmin
+
+            double_mesh = RectangularDoubleMesh(x1, y1, z1, x2, y2, z2,
+                approx_x1cell_size, approx_y1cell_size, approx_z1cell_size,
+                approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
+                rmax, rmax, rmax, xperiod, yperiod, zperiod, PBCs, mesh2=mesh2)
+            mesh2 = double_mesh.mesh2
+
+            engine = partial(underdense_spheres_engine,
+                double_mesh, x1, y1, z1, x2, y2, z2, rbins, n_max)
+            __, cell1_tuples = _cell1_parallelization_indices(
+                double_mesh.mesh1.ncells, num_threads)
+
+            if pool is not None:
+                result = pool.map(engine, cell1_tuples)
+                num_underdense_spheres += np.sum(np.array(result), axis=0)
+            else:
+                num_underdense_spheres += engine(cell1_tuples[0])
+            num_spheres += len(sphere_centers)
+    finally:
+        if pool is not None:
+            pool.close()
+
+    return num_underdense_spheres, num_spheres
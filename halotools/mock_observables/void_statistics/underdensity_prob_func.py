@@ -7,10 +7,8 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import numpy as np
 
-from astropy.extern.six.moves import xrange as range
-from astropy.utils.misc import NumpyRNGContext
-
-from ..pair_counters import npairs_per_object_3d
+from .underdense_spheres import (_num_underdense_spheres,
+    _random_sphere_center_blocks, _sphere_center_blocks)
 
 from ...utils.array_utils import array_is_monotonic
 from ...custom_exceptions import HalotoolsError
@@ -111,9 +109,10 @@ def underdensity_prob_func(sample1, rbins, n_ran=None,
 
     Notes
     -----
-    This function requires the calculation of the number of pairs per randomly placed
-    sphere, and thus storage of an array of shape(n_ran,len(rbins)).  This can be a
-    memory intensive process as this array becomes large.
+    The spheres are processed in blocks of at most one million centers, and only
+    the number of underdense spheres of each radius is stored, so that the memory
+    required does not grow with ``n_ran``. The neighbors of a sphere
+    are only counted until the sphere is known not to be underdense at any radius.
 
     Examples
     --------
@@ -142,18 +141,13 @@ def underdensity_prob_func(sample1, rbins, n_ran=None,
     ----------
     :ref:`galaxy_catalog_analysis_tutorial8`
     """
-    (sample1, rbins, n_ran, random_sphere_centers, period,
+    (sample1, rbins, n_ran, sphere_center_blocks, sphere_center_limits, period,
         sample_volume, u, num_threads, approx_cell1_size, approx_cellran_size) = (
         _underdensity_prob_func_process_args(
             sample1, rbins, n_ran, random_sphere_centers,
             period, sample_volume, u,
             num_threads, approx_cell1_size, approx_cellran_size, seed))
 
-    result = npairs_per_object_3d(random_sphere_centers, sample1, rbins,
-        period=period, num_threads=num_threads,
-        approx_cell1_size=approx_cell1_size,
-        approx_cell2_size=approx_cellran_size)
-
     # calculate the number of galaxies as a
     # function of r that corresponds to the
     # specified under-density
@@ -161,8 +155,11 @@ def underdensity_prob_func(sample1, rbins, n_ran=None,
     vol = (4.0/3.0) * np.pi * rbins**3
     N_max = mean_rho*vol*u
 
-    num_underdense_spheres = np.array(
-        [sum(result[:, i] <= N_max[i]) for i in range(len(N_max))])
+    num_underdense_spheres, __ = _num_underdense_spheres(sample1, sphere_center_blocks,
+        rbins, N_max, period=period, num_threads=num_threads,
+        approx_cell1_size=approx_cell1_size, approx_cellran_size=approx_cellran_size,
+        sphere_center_limits=sphere_center_limits)
+
     return num_underdense_spheres/n_ran
 
 
@@ -225,18 +222,18 @@ def _underdensity_prob_func_process_args(sample1, rbins,
                 msg = ("Your input ``random_sphere_centers`` must have shape (Nspheres, 3)")
                 raise HalotoolsError(msg)
         n_ran = float(random_sphere_centers.shape[0])
+        sphere_center_limits = (np.min(random_sphere_centers), np.max(random_sphere_centers))
+        sphere_center_blocks = _sphere_center_blocks(random_sphere_centers)
     else:
         if random_sphere_centers is not None:
             msg = ("If passing in ``random_sphere_centers``, do not also pass in ``n_ran``.")
             raise HalotoolsError(msg)
         else:
-            with NumpyRNGContext(seed):
-                xran = np.random.uniform(xmin, xmax, n_ran)
-                yran = np.random.uniform(ymin, ymax, n_ran)
-                zran = np.random.uniform(zmin, zmax, n_ran)
-            random_sphere_centers = np.vstack([xran, yran, zran]).T
+            sphere_center_limits = (min(xmin, ymin, zmin), max(xmax, ymax, zmax))
+            sphere_center_blocks = _random_sphere_center_blocks(n_ran,
+                (xmin, xmax), (ymin, ymax), (zmin, zmax), seed)
 
     u = float(u)
 
-    return (sample1, rbins, n_ran, random_sphere_centers, period,
+    return (sample1, rbins, n_ran, sphere_center_blocks, sphere_center_limits, period,
         sample_volume, u, num_threads, approx_cell1_size, approx_cellran_size)
@@ -28,3 +28,4 @@ from .rockstar_hlist_reader import RockstarHlistReader
 from .tabular_ascii_reader import TabularAsciiReader
 from .halo_table_cache import HaloTableCache
 from .ptcl_table_cache import PtclTableCache
+from .lazy_hdf5_table import LazyHDF5Table
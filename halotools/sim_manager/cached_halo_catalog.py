@@ -25,6 +25,7 @@ from ..utils import broadcast_host_halo_property, add_halo_hostid
 from .halo_table_cache import HaloTableCache
 from .ptcl_table_cache import PtclTableCache
 from .halo_table_cache_log_entry import get_redshift_string
+from .lazy_hdf5_table import LazyHDF5Table
 
 from ..custom_exceptions import HalotoolsError, InvalidCacheLogEntry
 
@@ -548,6 +549,32 @@ class CachedHaloCatalog(object):
             else:
                 raise InvalidCacheLogEntry(self.log_entry._cache_safety_message)
 
+    @property
+    def lazy_halo_table(self):
+        """
+        `~halotools.sim_manager.lazy_hdf5_table.LazyHDF5Table` providing column-on-demand
+        access to the halo catalog stored on disk.
+
+        In contrast to ``halo_table``, which reads every column of the catalog into memory,
+        a column of ``lazy_halo_table`` is only read the first time it is accessed,
+        and the `~halotools.sim_manager.lazy_hdf5_table.LazyHDF5Table.read` method
+        applies row cuts while streaming over the catalog in chunks.
+        The ``halo_hostid`` and ``halo_mvir_host_halo`` columns added to ``halo_table``
+        are not available unless they are stored in the file.
+
+        >>> halocat = CachedHaloCatalog() # doctest: +SKIP
+        >>> mass_array = halocat.lazy_halo_table['halo_mvir'] # doctest: +SKIP
+        >>> hosts = halocat.lazy_halo_table.read(['halo_x', 'halo_y', 'halo_z'], row_mask_func=lambda chunk: chunk['halo_upid'] == -1) # doctest: +SKIP
+        """
+        try:
+            return self._lazy_halo_table
+        except AttributeError:
+            if self.log_entry.safe_for_cache is True:
+                self._lazy_halo_table = LazyHDF5Table(self.fname, path='data')
+                return self._lazy_halo_table
+            else:
+                raise InvalidCacheLogEntry(self.log_entry._cache_safety_message)
+
     def _add_new_derived_columns(self, t):
         if 'halo_hostid' not in list(t.keys()):
             add_halo_hostid(t)
@@ -630,6 +657,30 @@ class CachedHaloCatalog(object):
             else:
                 raise InvalidCacheLogEntry(ptcl_log_entry._cache_safety_message)
 
+    @property
+    def lazy_ptcl_table(self):
+        """
+        `~halotools.sim_manager.lazy_hdf5_table.LazyHDF5Table` providing column-on-demand
+        access to the particle catalog stored on disk.
+        See ``lazy_halo_table`` for details.
+        """
+        try:
+            return self._lazy_ptcl_table
+        except AttributeError:
+            try:
+                ptcl_log_entry = self.ptcl_log_entry
+            except AttributeError:
+                self.ptcl_log_entry = (
+                    self._retrieve_matching_ptcl_cache_log_entry()
+                    )
+                ptcl_log_entry = self.ptcl_log_entry
+
+            if ptcl_log_entry.safe_for_cache is True:
+                self._lazy_ptcl_table = LazyHDF5Table(ptcl_log_entry.fname, path='data')
+                return self._lazy_ptcl_table
+            else:
+                raise InvalidCacheLogEntry(ptcl_log_entry._cache_safety_message)
+
     def _disallow_catalogs_with_known_bugs(self, simname=sim_defaults.default_simname,
             version_name=sim_defaults.default_version_name, **kwargs):
         """
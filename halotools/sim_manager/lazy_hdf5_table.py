@@ -0,0 +1,236 @@
+""" Module storing the `LazyHDF5Table` class, which provides column-on-demand
+access to the hdf5 files storing halo and particle catalogs in the Halotools cache.
+"""
+import numpy as np
+
+from astropy.table import Table
+
+try:
+    import h5py
+    _HAS_H5PY = True
+except ImportError:
+    _HAS_H5PY = False
+
+from ..custom_exceptions import HalotoolsError
+
+__all__ = ('LazyHDF5Table', )
+
+default_chunk_size = int(1e6)
+
+
+class LazyHDF5Table(object):
+    """ Read-only view of a table stored as a compound dataset in an hdf5 file,
+    e.g., the ``data`` dataset written by `~halotools.sim_manager.UserSuppliedHaloCatalog`.
+
+    In contrast to `~astropy.table.Table.read`, which loads every column of the
+    dataset into memory, a column of a `LazyHDF5Table` is only read from disk
+    the first time it is accessed. The `read` method streams over the rows in chunks
+    so that a row mask such as a mass cut can be applied without ever holding
+    the un-masked columns in memory.
+
+    Examples
+    --------
+    >>> halocat = CachedHaloCatalog() # doctest: +SKIP
+    >>> halos = halocat.lazy_halo_table # doctest: +SKIP
+    >>> mvir = halos['halo_mvir'] # doctest: +SKIP
+    >>> t = halos.read(['halo_x', 'halo_y', 'halo_z'], row_mask_func=lambda chunk: chunk['halo_mvir'] > 1e12) # doctest: +SKIP
+    """
+
+    def __init__(self, fname, path='data', memmap=True, chunk_size=default_chunk_size):
+        """
+        Parameters
+        ----------
+        fname : string
+            Absolute path to the hdf5 file.
+
+        path : string, optional
+            Name of the compound dataset storing the table. Default is ``data``.
+
+        memmap : bool, optional
+            If True and the dataset is stored contiguously and uncompressed in the file,
+            columns are accessed through a `numpy.memmap` of the dataset,
+            so that only the pages of the file touched by a calculation are read.
+            Otherwise columns are read with h5py. Default is True.
+
+        chunk_size : int, optional
+            Number of rows read at a time by the `read` method. Default is 1e6.
+        """
+        try:
+            assert _HAS_H5PY
+        except AssertionError:
+            msg = "Must have h5py package installed to use LazyHDF5Table objects"
+            raise HalotoolsError(msg)
+
+        self.fname = fname
+        self.path = path
+        self.chunk_size = int(chunk_size)
+        self._columns = {}
+
+        with h5py.File(fname, 'r') as f:
+            try:
+                dset = f[path]
+            except KeyError:
+                msg = ("\nThe hdf5 file ``%s`` does not have a dataset named ``%s``.\n" % (fname, path))
+                raise HalotoolsError(msg)
+            self.dtype = dset.dtype
+            self._nrows = dset.shape[0]
+            offset = dset.id.get_offset()
+            is_contiguous = (dset.chunks is None) & (dset.compression is None)
+
+        try:
+            assert self.dtype.names is not None
+        except AssertionError:
+            msg = ("\nThe ``%s`` dataset of the hdf5 file ``%s`` \n"
+                "is not a table with named columns.\n" % (path, fname))
+            raise HalotoolsError(msg)
+
+        if memmap & is_contiguous & (offset is not None):
+            self._memmap = np.memmap(fname, mode='r', dtype=self.dtype,
+                offset=offset, shape=(self._nrows, ))
+        else:
+            self._memmap = None
+
+    def __len__(self):
+        return self._nrows
+
+    def keys(self):
+        """ List of the column names of the table.
+        """
+        return list(self.dtype.names)
+
+    @property
+    def colnames(self):
+        return self.keys()
+
+    def __contains__(self, key):
+        return key in self.dtype.names
+
+    def _check_colname(self, key):
+        try:
+            assert key in self.dtype.names
+        except AssertionError:
+            msg = ("\nThe ``%s`` column does not appear in the table stored in ``%s``.\n"
+                "Available columns are:\n%s\n" % (key, self.fname, self.keys()))
+            raise KeyError(msg)
+
+    def _read_rows(self, f, key, start, stop):
+        """ Read the rows [start, stop) of a single column.
+        """
+        if self._memmap is not None:
+            return np.array(self._memmap[key][start:stop])
+        else:
+            arr = f[self.path][start:stop, key]
+            if arr.dtype.names is not None:
+                arr = arr[key]
+            return arr
+
+    def __getitem__(self, key):
+        """ Return the column ``key`` as a Numpy array, reading it from disk
+        the first time it is accessed. If ``key`` is a list of column names,
+        an astropy `~astropy.table.Table` storing only those columns is returned.
+        """
+        if isinstance(key, (list, tuple, np.ndarray)):
+            return self.read(list(key))
+
+        self._check_colname(key)
+        try:
+            return self._columns[key]
+        except KeyError:
+            if self._memmap is not None:
+                self._columns[key] = self._read_rows(None, key, 0, self._nrows)
+            else:
+                with h5py.File(self.fname, 'r') as f:
+                    self._columns[key] = self._read_rows(f, key, 0, self._nrows)
+            return self._columns[key]
+
+    def iter_chunks(self, chunk_size=None):
+        """ Generator yielding consecutive chunks of rows of the table.
+        Each chunk is a dictionary-like object that only reads a column
+        from disk when it is accessed.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Number of rows per chunk. Default is set by the ``chunk_size``
+            passed to the constructor.
+        """
+        if chunk_size is None:
+            chunk_size = self.chunk_size
+        chunk_size = max(int(chunk_size), 1)
+
+        f = None if self._memmap is not None else h5py.File(self.fname, 'r')
+        try:
+            for start in range(0, self._nrows, chunk_size):
+                stop = min(start + chunk_size, self._nrows)
+                yield _TableChunk(self, f, start, stop)
+        finally:
+            if f is not None:
+                f.close()
+
+    def read(self, columns=None, row_mask_func=None, chunk_size=None):
+        """ Read the requested columns into an astropy `~astropy.table.Table`,
+        keeping only the rows selected by ``row_mask_func``.
+
+        Parameters
+        ----------
+        columns : list of strings, optional
+            Names of the columns to read. Default is None, in which case all columns are read.
+
+        row_mask_func : function, optional
+            Function accepting a chunk of rows and returning a
+            boolean array of the rows to keep, e.g.,
+            ``lambda chunk: chunk['halo_upid'] == -1``. The function may use any
+            column of the table, whether or not it appears in ``columns``.
+            Default is None, in which case all rows are kept.
+
+        chunk_size : int, optional
+            Number of rows read at a time when applying ``row_mask_func``.
+            Default is set by the ``chunk_size`` passed to the constructor.
+
+        Returns
+        -------
+        t : `~astropy.table.Table`
+        """
+        if columns is None:
+            columns = self.keys()
+        columns = list(columns)
+        for key in columns:
+            self._check_colname(key)
+
+        if row_mask_func is None:
+            return Table([self[key] for key in columns], names=columns)
+
+        chunks = dict((key, [np.zeros(0, dtype=self.dtype[key])]) for key in columns)
+        for chunk in self.iter_chunks(chunk_size=chunk_size):
+            mask = np.asarray(row_mask_func(chunk), dtype=bool)
+            for key in columns:
+                chunks[key].append(chunk[key][mask])
+
+        return Table([np.concatenate(chunks[key]) for key in columns], names=columns)
+
+
+class _TableChunk(object):
+    """ Dictionary-like view of the rows [start, stop) of a `LazyHDF5Table`
+    that reads each column from disk the first time it is accessed.
+    """
+
+    def __init__(self, table, f, start, stop):
+        self._table = table
+        self._f = f
+        self.start = start
+        self.stop = stop
+        self._columns = {}
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def keys(self):
+        return self._table.keys()
+
+    def __getitem__(self, key):
+        try:
+            return self._columns[key]
+        except KeyError:
+            self._table._check_colname(key)
+            self._columns[key] = self._table._read_rows(self._f, key, self.start, self.stop)
+            return self._columns[key]
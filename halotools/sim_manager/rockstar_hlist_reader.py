@@ -593,6 +593,19 @@ class RockstarHlistReader(TabularAsciiReader):
             choosing larger values typically improves performance.
             Default is 500 Mb.
 
+        num_processes : int, optional
+            Number of processes used to parse the ASCII data.
+            If set to 'max', use all available cores.
+            Default is 1 for a purely serial calculation.
+
+        columnar_cache_dirname : string, optional
+            Absolute path to a directory storing a columnar binary cache of the hlist file.
+            Each requested column that is not yet in the cache is parsed into its requested
+            type and stored, and subsequent calls requesting the same columns with any
+            row-cuts are read from the cache rather than from the ASCII data.
+            See `~halotools.sim_manager.TabularAsciiReader.read_ascii`.
+            Default is None, in which case no cache is used.
+
         Notes
         -----
         Regarding the ``columns_to_convert_from_kpc_to_mpc`` argument,
@@ -666,6 +679,19 @@ class RockstarHlistReader(TabularAsciiReader):
             choosing larger values typically improves performance.
             Default is 500 Mb.
 
+        num_processes : int, optional
+            Number of processes used to parse the ASCII data.
+            If set to 'max', use all available cores.
+            Default is 1 for a purely serial calculation.
+
+        columnar_cache_dirname : string, optional
+            Absolute path to a directory storing a columnar binary cache of the hlist file.
+            Each requested column that is not yet in the cache is parsed into its requested
+            type and stored, and subsequent calls requesting the same columns with any
+            row-cuts are read from the cache rather than from the ASCII data.
+            See `~halotools.sim_manager.TabularAsciiReader.read_ascii`.
+            Default is None, in which case no cache is used.
+
         Returns
         --------
         full_array : array_like
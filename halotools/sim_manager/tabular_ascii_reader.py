@@ -5,15 +5,109 @@ of a data type that is known in advance.
 
 """
 import os
+import io
 import gzip
+import json
+import warnings
 import collections
+import multiprocessing
 from time import time
 import numpy as np
 
 from astropy.extern.six.moves import xrange as range
+from astropy.utils import minversion
+
+from ..custom_exceptions import HalotoolsError
 
 __all__ = ('TabularAsciiReader', )
 
+# Starting with Numpy 1.23, np.loadtxt is implemented in C
+_HAS_C_LOADTXT = minversion(np, '1.23')
+
+
+def _parse_ascii_block(block, column_indices, dt, header_char):
+    """ Parse a block of complete lines of ASCII data into a structured Numpy array
+    storing the columns with the input ``column_indices``.
+
+    With Numpy >= 1.23, the block is parsed by the C implementation of `numpy.loadtxt`.
+    Otherwise, when every line of the block is a data line with the same number of
+    whitespace-separated entries, the block is tokenized with a single call to
+    ``bytes.split``, and each requested column is a strided slice of the tokens.
+    Blocks containing empty lines or lines beginning with
+    ``header_char`` are parsed line by line.
+    """
+    if _HAS_C_LOADTXT:
+        with warnings.catch_warnings():
+            # np.loadtxt warns about blocks without any data lines
+            warnings.simplefilter('ignore', UserWarning)
+            return np.loadtxt(io.BytesIO(block), dtype=dt, comments=header_char,
+                usecols=column_indices, ndmin=1, encoding='latin1')
+
+    header_char = header_char.encode()
+    tokens = block.split()
+    num_lines = block.count(b'\n')
+    if (len(block) > 0) and (not block.endswith(b'\n')):
+        num_lines += 1
+
+    num_columns = len(block.split(b'\n', 1)[0].split())
+    is_regular = ((num_columns > 0) and (len(tokens) == num_lines*num_columns) and
+        (header_char not in block) and (b'\n\n' not in block))
+
+    if is_regular:
+        num_rows = num_lines
+        column_tokens = [tokens[i::num_columns] for i in column_indices]
+    else:
+        rows = [line.split() for line in block.splitlines()
+            if (len(line.strip()) > 0) and (line[:1] != header_char)]
+        num_rows = len(rows)
+        column_tokens = [[row[i] for row in rows] for i in column_indices]
+
+    result = np.zeros(num_rows, dtype=dt)
+    for name, col in zip(dt.names, column_tokens):
+        if num_rows > 0:
+            result[name] = np.array(col).astype(dt[name])
+    return result
+
+
+def _apply_row_cuts(array_chunk, row_cut_min_dict, row_cut_max_dict,
+        row_cut_eq_dict, row_cut_neq_dict):
+    """ Apply the row-cuts defined by the input dictionaries to the input array.
+    See `TabularAsciiReader.apply_row_cut`.
+    """
+    mask = np.ones(len(array_chunk), dtype=bool)
+
+    for colname, lower_bound in row_cut_min_dict.items():
+        mask *= array_chunk[colname] > lower_bound
+
+    for colname, upper_bound in row_cut_max_dict.items():
+        mask *= array_chunk[colname] < upper_bound
+
+    for colname, equality_condition in row_cut_eq_dict.items():
+        mask *= array_chunk[colname] == equality_condition
+
+    for colname, inequality_condition in row_cut_neq_dict.items():
+        mask *= array_chunk[colname] != inequality_condition
+
+    return array_chunk[mask]
+
+
+def _process_ascii_block(args):
+    """ Parse and cut a block of ASCII data. The block is either passed as bytes,
+    or as the (start, stop) byte range of an uncompressed file that is read here,
+    so that the worker processes of `TabularAsciiReader.read_ascii`
+    read their byte ranges in parallel.
+
+    Returns the cut array and the number of data rows in the block.
+    """
+    block, fname, column_indices, dt, header_char, row_cuts = args
+    if fname is not None:
+        start, stop = block
+        with open(fname, 'rb') as f:
+            f.seek(start)
+            block = f.read(stop - start)
+    arr = _parse_ascii_block(block, column_indices, dt, header_char)
+    return _apply_row_cuts(arr, *row_cuts), len(arr)
+
 
 class TabularAsciiReader(object):
     """
@@ -23,9 +117,9 @@ class TabularAsciiReader(object):
 
     When reading ASCII data with
     `~halotools.sim_manager.TabularAsciiReader.read_ascii`, user-defined
-    cuts on columns are applied on-the-fly using a python generator
-    to yield only those columns whose indices appear in the
-    input ``columns_to_keep_dict``.
+    cuts on columns are applied on-the-fly, so that only those columns
+    whose indices appear in the input ``columns_to_keep_dict`` are
+    converted from text into numbers.
 
     As the file is read, the data is generated in chunks,
     and a customizable mask is applied to each newly generated chunk.
@@ -495,27 +589,280 @@ class TabularAsciiReader(object):
         --------
         cut_array : Numpy array
         """
-        mask = np.ones(len(array_chunk), dtype=bool)
+        return _apply_row_cuts(array_chunk, *self._row_cuts())
 
-        for colname, lower_bound in self.row_cut_min_dict.items():
-            mask *= array_chunk[colname] > lower_bound
+    def _row_cuts(self):
+        return (self.row_cut_min_dict, self.row_cut_max_dict,
+            self.row_cut_eq_dict, self.row_cut_neq_dict)
 
-        for colname, upper_bound in self.row_cut_max_dict.items():
-            mask *= array_chunk[colname] < upper_bound
+    def _data_start_byte(self, f):
+        """ Advance the input binary file object past the header,
+        returning the byte offset of the first line of data.
+        See `header_len`.
+        """
+        header_char = self.header_char.encode()
+        data_start = f.tell()
+        for line in iter(f.readline, b''):
+            if (line[0:len(header_char)] == header_char) or (line == b'\n'):
+                data_start = f.tell()
+            else:
+                break
+        f.seek(data_start)
+        return data_start
+
+    def _uncompressed_byte_ranges(self, block_size):
+        """ Split the data section of an uncompressed file into
+        (start, stop) byte ranges of roughly ``block_size`` bytes
+        that begin and end on line boundaries.
+        """
+        file_size = os.path.getsize(self.input_fname)
+        ranges = []
+        with open(self.input_fname, 'rb') as f:
+            start = self._data_start_byte(f)
+            while start < file_size:
+                f.seek(min(start + block_size, file_size) - 1)
+                f.readline()
+                stop = f.tell()
+                ranges.append((start, stop))
+                start = stop
+        return ranges
+
+    def _compressed_blocks(self, block_size):
+        """ Generator yielding the data section of a gzipped file
+        in blocks of roughly ``block_size`` bytes ending on line boundaries.
+        """
+        with gzip.open(self.input_fname, 'rb') as f:
+            self._data_start_byte(f)
+            while True:
+                block = f.read(block_size)
+                if len(block) == 0:
+                    break
+                if not block.endswith(b'\n'):
+                    block += f.readline()
+                yield block
+
+    def _parsed_blocks(self, column_indices, dt, row_cuts, chunk_memory_size, num_processes):
+        """ Generator yielding the cut structured array and the number of data rows
+        of each consecutive block of the ASCII data.
+        """
+        # convert to bytes and divide among the processes
+        block_size = max(int(chunk_memory_size*1e6/num_processes), 1)
+
+        is_compressed = self._compression_safe_file_opener is gzip.open
+        if is_compressed:
+            blocks = self._compressed_blocks(block_size)
+            fname = None
+        else:
+            blocks = self._uncompressed_byte_ranges(block_size)
+            fname = self.input_fname
+
+        parser_args = (fname, column_indices, dt, self.header_char, row_cuts)
 
-        for colname, equality_condition in self.row_cut_eq_dict.items():
-            mask *= array_chunk[colname] == equality_condition
+        if num_processes == 1:
+            for _i, block in enumerate(blocks):
+                print(("... working on chunk " + str(_i)))
+                yield _process_ascii_block((block, ) + parser_args)
+        else:
+            pool = multiprocessing.Pool(num_processes)
+            try:
+                if is_compressed:
+                    # Decompress num_processes blocks at a time to bound the memory
+                    batch = []
+                    for block in blocks:
+                        batch.append((block, ) + parser_args)
+                        if len(batch) == num_processes:
+                            for result in pool.map(_process_ascii_block, batch):
+                                yield result
+                            batch = []
+                    for result in pool.map(_process_ascii_block, batch):
+                        yield result
+                else:
+                    for result in pool.imap(_process_ascii_block,
+                            [(block, ) + parser_args for block in blocks]):
+                        yield result
+            finally:
+                pool.close()
+                pool.join()
+
+    def _inspect_ascii_columns(self):
+        """ Determine the header and the number of columns of the ASCII data.
+        """
+        is_compressed = self._compression_safe_file_opener is gzip.open
+        opener = gzip.open if is_compressed else open
+        header_char = self.header_char.encode()
+
+        with opener(self.input_fname, 'rb') as f:
+            data_start = self._data_start_byte(f)
+            f.seek(0)
+            header = f.read(data_start).decode('latin1')
+            first_row = None
+            for line in iter(f.readline, b''):
+                if (len(line.strip()) > 0) and (line[:1] != header_char):
+                    first_row = line.split()
+                    break
+
+        try:
+            assert first_row is not None
+        except AssertionError:
+            msg = ("\nThe ASCII file ``%s`` does not have any rows of data\n")
+            raise ValueError(msg % self.input_fname)
 
-        for colname, inequality_condition in self.row_cut_neq_dict.items():
-            mask *= array_chunk[colname] != inequality_condition
+        return header, len(first_row)
 
-        return array_chunk[mask]
+    def _columnar_cache_metadata_fname(self, dirname):
+        return os.path.join(dirname, 'columnar_cache_metadata.json')
 
-    def read_ascii(self, chunk_memory_size=500):
+    def _columnar_cache_column_fname(self, dirname, column_index, typecode):
+        return os.path.join(dirname, 'column_%i_%s.bin' % (column_index, typecode))
+
+    def _columnar_cache_typecodes(self):
+        """ List of the type codes of the columns in ``columns_to_keep_dict``, e.g., 'f4' or 'i8',
+        which determine the binary files of the columnar cache storing these columns
+        in native byte order.
+        """
+        return [self.dt[key].str.lstrip('<>|=') for key in self.dt.names]
+
+    def _columnar_cache_is_current(self, dirname):
+        """ Determine whether ``dirname`` stores a columnar cache
+        of the current version of the input ASCII file.
+        """
+        try:
+            with open(self._columnar_cache_metadata_fname(dirname), 'r') as f:
+                metadata = json.load(f)
+            assert metadata['input_fname'] == self.input_fname
+            assert metadata['input_file_size'] == os.path.getsize(self.input_fname)
+            assert metadata['input_file_mtime'] == os.path.getmtime(self.input_fname)
+            assert metadata['header_char'] == self.header_char
+        except (IOError, ValueError, KeyError, AssertionError):
+            return False
+        else:
+            return True
+
+    def _columnar_cache_missing_columns(self, dirname):
+        """ List of the (column_index, typecode) pairs of ``columns_to_keep_dict``
+        that are not yet stored in the columnar cache in ``dirname``.
+        """
+        stored_columns = {}
+        if self._columnar_cache_is_current(dirname):
+            with open(self._columnar_cache_metadata_fname(dirname), 'r') as f:
+                stored_columns = json.load(f)['columns']
+
+        missing_columns = []
+        for column_index, typecode in zip(self.column_indices_to_keep,
+                self._columnar_cache_typecodes()):
+            is_stored = typecode in stored_columns.get(str(column_index), [])
+            if (not is_stored) and ((column_index, typecode) not in missing_columns):
+                missing_columns.append((column_index, typecode))
+        return missing_columns
+
+    def _write_columnar_cache(self, dirname, missing_columns, chunk_memory_size, num_processes):
+        """ Parse the ``missing_columns`` of the ASCII data into their requested types,
+        storing each column as a flat binary file in ``dirname`` that can be memory-mapped.
+        The json file storing the header, the number of rows, the types in which each column
+        is stored, and the size and modification time of the input file is only
+        updated once all columns are complete.
+
+        The columns are parsed exactly as by `read_ascii` without a cache,
+        so that both return identical values, and other columns are never parsed.
+        """
+        if self._columnar_cache_is_current(dirname):
+            with open(self._columnar_cache_metadata_fname(dirname), 'r') as f:
+                metadata = json.load(f)
+        else:
+            header, num_columns = self._inspect_ascii_columns()
+            metadata = {'input_fname': self.input_fname,
+                'input_file_size': os.path.getsize(self.input_fname),
+                'input_file_mtime': os.path.getmtime(self.input_fname),
+                'header_char': self.header_char, 'header': header,
+                'num_columns': num_columns, 'num_rows': None, 'columns': {}}
+
+        num_columns = metadata['num_columns']
+        for key, column_index in zip(self.dt.names, self.column_indices_to_keep):
+            try:
+                assert column_index < num_columns
+            except AssertionError:
+                msg = ("\nThe ``%s`` column has index %i, \n"
+                    "but the ASCII data only has %i columns.\n")
+                raise ValueError(msg % (key, column_index, num_columns))
+
+        try:
+            os.makedirs(dirname)
+        except OSError:
+            pass
+
+        dt = np.dtype([('column_%i_%s' % column, column[1]) for column in missing_columns])
+        no_row_cuts = ({}, {}, {}, {})
+        column_files = [open(self._columnar_cache_column_fname(dirname, *column), 'wb')
+            for column in missing_columns]
+        num_rows = 0
+        try:
+            for arr, __ in self._parsed_blocks([column[0] for column in missing_columns], dt,
+                    no_row_cuts, chunk_memory_size, num_processes):
+                for column_file, name in zip(column_files, dt.names):
+                    np.ascontiguousarray(arr[name]).tofile(column_file)
+                num_rows += len(arr)
+        except:
+            for column_file in column_files:
+                column_file.close()
+                os.remove(column_file.name)
+            raise
+        else:
+            for column_file in column_files:
+                column_file.close()
+
+        if metadata['num_rows'] is None:
+            metadata['num_rows'] = num_rows
+        try:
+            assert metadata['num_rows'] == num_rows
+        except AssertionError:
+            msg = ("\nThe number of rows of ``%s`` parsed into the columnar cache\n"
+                "does not agree with the number of rows of the columns already in the cache.\n")
+            raise HalotoolsError(msg % self.input_fname)
+
+        for column_index, typecode in missing_columns:
+            metadata['columns'].setdefault(str(column_index), []).append(typecode)
+        with open(self._columnar_cache_metadata_fname(dirname), 'w') as f:
+            json.dump(metadata, f)
+
+    def _read_columnar_cache(self, dirname, chunk_memory_size):
+        """ Read the columns in ``columns_to_keep_dict`` from the columnar cache
+        in ``dirname``, applying the row-cuts in chunks of memory-mapped rows.
+        """
+        with open(self._columnar_cache_metadata_fname(dirname), 'r') as f:
+            metadata = json.load(f)
+        num_rows = metadata['num_rows']
+
+        columns = {}
+        if num_rows > 0:
+            for key, column_index, typecode in zip(self.dt.names,
+                    self.column_indices_to_keep, self._columnar_cache_typecodes()):
+                columns[key] = np.memmap(
+                    self._columnar_cache_column_fname(dirname, column_index, typecode),
+                    dtype=typecode, mode='r', shape=(num_rows, ))
+
+        num_rows_in_chunk = max(int(chunk_memory_size*1e6/self.dt.itemsize), 1)
+        chunklist = [np.zeros(0, dtype=self.dt)]
+        for first_row in range(0, num_rows, num_rows_in_chunk):
+            last_row = min(first_row + num_rows_in_chunk, num_rows)
+            chunk = np.zeros(last_row - first_row, dtype=self.dt)
+            for key in self.dt.names:
+                chunk[key] = columns[key][first_row:last_row]
+            chunklist.append(self.apply_row_cut(chunk))
+
+        return np.concatenate(chunklist), num_rows
+
+    def read_ascii(self, chunk_memory_size=500, num_processes=1, columnar_cache_dirname=None):
         """ Method reads the input ascii and returns
         a structured Numpy array of the data
         that passes the row- and column-cuts.
 
+        The data section of the file is split into blocks of complete lines.
+        Each block is tokenized with vectorized string operations,
+        only the columns in ``columns_to_keep_dict`` are converted to their Numpy dtype,
+        and `apply_row_cut` is applied before the next block is processed.
+        For uncompressed files, each block is a byte range of the file
+        that is read by the process parsing it.
+
         Parameters
         ----------
         chunk_memory_size : int, optional
@@ -523,8 +870,26 @@ class TabularAsciiReader(object):
             that will be processed in chunks. This variable
             must be smaller than the amount of RAM on your machine;
             choosing larger values typically improves performance.
+            When ``num_processes`` > 1, this memory is divided among the processes.
             Default is 500 Mb.
 
+        num_processes : int, optional
+            Number of processes over which the blocks of the file are distributed
+            using the python ``multiprocessing`` module.
+            If set to 'max', use all available cores.
+            Default is 1 for a purely serial calculation.
+
+        columnar_cache_dirname : string, optional
+            Absolute path to a directory storing a columnar binary cache of the ASCII file.
+            Each column in ``columns_to_keep_dict`` that is not yet in the cache is
+            parsed into its requested type and stored in the directory as a flat binary file
+            that can be memory-mapped, together with the header of the file.
+            Subsequent calls with the same ``columnar_cache_dirname``,
+            for any row-cuts, read the cached columns rather than parsing the ASCII file again.
+            A column requested with a different type is parsed and stored separately.
+            The cache is rebuilt if the ASCII file has been modified.
+            Default is None, in which case no cache is used.
+
         Returns
         --------
         full_array : array_like
@@ -535,56 +900,46 @@ class TabularAsciiReader(object):
 
         See also
         ----------
-        data_chunk_generator
+        apply_row_cut
         """
         print(("\n...Processing ASCII data of file: \n%s\n "
                % self.input_fname))
         start = time()
 
-        file_size = os.path.getsize(self.input_fname)
-        # convert to bytes to match units of file_size
-        chunk_memory_size *= 1e6
-        num_data_rows = int(self.data_len())
-        print(("Total number of rows in detected data = %i" % num_data_rows))
+        if num_processes == 'max':
+            num_processes = multiprocessing.cpu_count()
+        num_processes = max(int(num_processes), 1)
 
-        # Set the number of chunks to be filesize/chunk_memory,
-        # but enforcing that 0 < Nchunks <= num_data_rows
         try:
-            Nchunks = int(max(1, min(file_size / chunk_memory_size, num_data_rows)))
-        except ZeroDivisionError:
+            assert chunk_memory_size > 0
+        except AssertionError:
             msg = ("\nMust choose non-zero size for input "
                    "``chunk_memory_size``")
             raise ValueError(msg)
 
-        num_rows_in_chunk = int(num_data_rows // Nchunks)
-        num_full_chunks = int(num_data_rows // num_rows_in_chunk)
-        num_rows_in_chunk_remainder = num_data_rows - num_rows_in_chunk*Nchunks
-
-        header_length = int(self.header_len())
-        print(("Number of rows in detected header = %i \n" % header_length))
+        if columnar_cache_dirname is None:
+            header_length = int(self.header_len())
+            print(("Number of rows in detected header = %i \n" % header_length))
 
-        chunklist = []
-        with self._compression_safe_file_opener(self.input_fname, 'r') as f:
-
-            for skip_header_row in range(header_length):
-                _s = f.readline()
-
-            for _i in range(num_full_chunks):
-                print(("... working on chunk " + str(_i) +
-                       " of " + str(num_full_chunks)))
-
-                chunk_array = np.array(list(
-                    self.data_chunk_generator(num_rows_in_chunk, f)), dtype=self.dt)
-                cut_chunk = self.apply_row_cut(chunk_array)
-                chunklist.append(cut_chunk)
-
-            # Now for the remainder chunk
-            chunk_array = np.array(list(
-                self.data_chunk_generator(num_rows_in_chunk_remainder, f)), dtype=self.dt)
-            cut_chunk = self.apply_row_cut(chunk_array)
-            chunklist.append(cut_chunk)
+            results = list(self._parsed_blocks(self.column_indices_to_keep, self.dt,
+                self._row_cuts(), chunk_memory_size, num_processes))
+            chunklist = [np.zeros(0, dtype=self.dt)] + [result[0] for result in results]
+            full_array = np.concatenate(chunklist)
+            num_data_rows = sum(result[1] for result in results)
+        else:
+            missing_columns = self._columnar_cache_missing_columns(columnar_cache_dirname)
+            if len(missing_columns) > 0:
+                print(("Writing columnar binary cache of the ASCII data to %s \n"
+                    % columnar_cache_dirname))
+                self._write_columnar_cache(columnar_cache_dirname, missing_columns,
+                    chunk_memory_size, num_processes)
+            else:
+                print(("Reading ASCII data from the columnar binary cache in %s \n"
+                    % columnar_cache_dirname))
+            full_array, num_data_rows = self._read_columnar_cache(
+                columnar_cache_dirname, chunk_memory_size)
 
-        full_array = np.concatenate(chunklist)
+        print(("Total number of rows in detected data = %i" % num_data_rows))
 
         end = time()
         runtime = (end-start)
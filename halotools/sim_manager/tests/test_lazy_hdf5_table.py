@@ -0,0 +1,87 @@
+"""
+"""
+from __future__ import absolute_import, division, print_function
+
+import os
+import numpy as np
+from astropy.table import Table
+from astropy.utils.misc import NumpyRNGContext
+from astropy.tests.helper import pytest
+
+try:
+    import h5py
+    HAS_H5PY = True
+except ImportError:
+    HAS_H5PY = False
+
+from ..lazy_hdf5_table import LazyHDF5Table
+
+from ...custom_exceptions import HalotoolsError
+
+__all__ = ('test_lazy_hdf5_table_columns', )
+
+fixed_seed = 43
+
+
+def _write_fake_halo_table(tmpdir, num_halos=1000):
+    with NumpyRNGContext(fixed_seed):
+        t = Table()
+        t['halo_id'] = np.arange(num_halos).astype('i8')
+        t['halo_upid'] = np.where(np.random.rand(num_halos) < 0.8, -1, 1).astype('i8')
+        t['halo_mvir'] = 10**np.random.uniform(10, 15, num_halos)
+        t['halo_x'] = np.random.uniform(0, 250, num_halos)
+    fname = os.path.join(str(tmpdir), 'fake_halos.hdf5')
+    t.write(fname, path='data')
+    return fname, t
+
+
+@pytest.mark.skipif('not HAS_H5PY')
+def test_lazy_hdf5_table_columns(tmpdir):
+    fname, t = _write_fake_halo_table(tmpdir)
+
+    for memmap in (True, False):
+        lazy_table = LazyHDF5Table(fname, memmap=memmap)
+        assert len(lazy_table) == len(t)
+        assert lazy_table.keys() == t.keys()
+        assert 'halo_mvir' in lazy_table
+        assert np.all(lazy_table['halo_mvir'] == t['halo_mvir'])
+        assert np.all(lazy_table['halo_id'] == t['halo_id'])
+
+        t2 = lazy_table[['halo_x', 'halo_upid']]
+        assert t2.keys() == ['halo_x', 'halo_upid']
+        assert np.all(t2['halo_x'] == t['halo_x'])
+
+
+@pytest.mark.skipif('not HAS_H5PY')
+def test_lazy_hdf5_table_row_mask(tmpdir):
+    fname, t = _write_fake_halo_table(tmpdir)
+    mask = (t['halo_upid'] == -1) & (t['halo_mvir'] > 1e12)
+    correct_table = t[mask]
+
+    def host_halo_mask(chunk):
+        return (chunk['halo_upid'] == -1) & (chunk['halo_mvir'] > 1e12)
+
+    for memmap in (True, False):
+        lazy_table = LazyHDF5Table(fname, memmap=memmap)
+        for chunk_size in (1, 77, len(t), 10*len(t)):
+            t2 = lazy_table.read(['halo_id', 'halo_x'],
+                row_mask_func=host_halo_mask, chunk_size=chunk_size)
+            assert len(t2) == len(correct_table)
+            assert np.all(t2['halo_id'] == correct_table['halo_id'])
+            assert np.all(t2['halo_x'] == correct_table['halo_x'])
+
+
+@pytest.mark.skipif('not HAS_H5PY')
+def test_lazy_hdf5_table_bad_inputs(tmpdir):
+    fname, t = _write_fake_halo_table(tmpdir)
+
+    with pytest.raises(HalotoolsError) as err:
+        lazy_table = LazyHDF5Table(fname, path='not_data')
+    substr = "does not have a dataset named ``not_data``"
+    assert substr in err.value.args[0]
+
+    lazy_table = LazyHDF5Table(fname)
+    with pytest.raises(KeyError) as err:
+        __ = lazy_table['halo_vmax']
+    substr = "The ``halo_vmax`` column does not appear"
+    assert substr in err.value.args[0]
@@ -1,6 +1,7 @@
 """
 """
 import os
+import gzip
 import shutil
 import numpy as np
 from unittest import TestCase
@@ -9,6 +10,7 @@ from astropy.table import Table
 
 from astropy.config.paths import _find_home
 
+from .. import tabular_ascii_reader
 from ..tabular_ascii_reader import TabularAsciiReader
 
 
@@ -240,6 +242,110 @@ class TestTabularAsciiReader(TestCase):
         substr = "Must choose non-zero size for input ``chunk_memory_size``"
         assert substr in err.value.args[0]
 
+    def test_read_ascii_blocks(self):
+        """ Verify that read_ascii returns the same rows regardless of
+        how the file is split into blocks, the number of processes,
+        compression, and the presence of comments and empty lines in the data.
+        """
+        lines = ['# id  vmax  mvir  upid\n', '\n']
+        for i in range(50):
+            lines.append('%i  %.1f  %.3e  %i\n' % (100+i, 10.*i, 10**(9+i/10.), (i % 3)-1))
+        lines.insert(20, '# comment line within the data\n')
+        lines.insert(30, '\n')
+        lines[-1] = lines[-1][:-1]
+
+        uncompressed_fname = os.path.join(self.tmpdir, 'blocks.txt')
+        with open(uncompressed_fname, 'w') as f:
+            f.write(''.join(lines))
+        compressed_fname = os.path.join(self.tmpdir, 'blocks.txt.gz')
+        with gzip.open(compressed_fname, 'wb') as f:
+            f.write(''.join(lines).encode())
+
+        columns_to_keep_dict = {'vmax': (1, 'f4'), 'id': (0, 'i8'), 'upid': (3, 'i8')}
+        correct_id = np.arange(100, 150)
+        correct_id = correct_id[((correct_id - 100) % 3) - 1 != 0]
+
+        has_c_loadtxt = tabular_ascii_reader._HAS_C_LOADTXT
+        try:
+            for use_c_loadtxt in set((has_c_loadtxt, False)):
+                tabular_ascii_reader._HAS_C_LOADTXT = use_c_loadtxt
+                for fname in (uncompressed_fname, compressed_fname):
+                    reader = TabularAsciiReader(fname, columns_to_keep_dict,
+                        row_cut_neq_dict={'upid': 0})
+                    for chunk_memory_size in (1e-5, 1e-4, 500):
+                        for num_processes in (1, 2):
+                            arr = reader.read_ascii(chunk_memory_size=chunk_memory_size,
+                                num_processes=num_processes)
+                            assert np.all(arr['id'] == correct_id)
+                            assert np.allclose(arr['vmax'], 10.*(correct_id - 100))
+                            assert np.all(arr['upid'] == ((correct_id - 100) % 3) - 1)
+        finally:
+            tabular_ascii_reader._HAS_C_LOADTXT = has_c_loadtxt
+
+    def test_read_ascii_columnar_cache(self):
+        """ Verify that read_ascii returns identical results when reading
+        from the columnar binary cache, for different columns and row-cuts,
+        and that the cache is rebuilt when the ASCII file changes.
+        """
+        write_tabular_data(self.dummy_fname)
+        cache_dirname = os.path.join(self.tmpdir, 'columnar_cache')
+
+        columns_to_keep_dict = {'vmax': (1, 'f4'), 'id': (0, 'i8'), 'upid': (3, 'i8')}
+        reader = TabularAsciiReader(self.dummy_fname, columns_to_keep_dict,
+            row_cut_min_dict={'vmax': 101})
+        correct_arr = reader.read_ascii()
+        arr = reader.read_ascii(columnar_cache_dirname=cache_dirname)
+        assert reader._columnar_cache_is_current(cache_dirname)
+        assert np.all(arr == correct_arr)
+        arr = reader.read_ascii(columnar_cache_dirname=cache_dirname)
+        assert np.all(arr == correct_arr)
+
+        reader2 = TabularAsciiReader(self.dummy_fname, {'mvir': (2, 'f8'), 'upid': (3, 'i8')},
+            row_cut_eq_dict={'upid': -1})
+        arr2 = reader2.read_ascii(columnar_cache_dirname=cache_dirname, chunk_memory_size=1e-5)
+        assert np.all(arr2 == reader2.read_ascii())
+        assert np.all(arr2['mvir'] == 1e10)
+
+        reader3 = TabularAsciiReader(self.dummy_fname, {'mvir': (4, 'f8')})
+        with pytest.raises(ValueError) as err:
+            reader3.read_ascii(columnar_cache_dirname=cache_dirname)
+        substr = "but the ASCII data only has 4 columns"
+        assert substr in err.value.args[0]
+
+        with open(self.dummy_fname, 'a') as f:
+            f.write('104  500.  1e13  -1\n')
+        assert not reader._columnar_cache_is_current(cache_dirname)
+        arr = reader.read_ascii(columnar_cache_dirname=cache_dirname)
+        assert np.all(arr['id'] == [101, 102, 103, 104])
+
+    def test_read_ascii_columnar_cache_dtypes(self):
+        """ Verify that each column is stored in the columnar binary cache in the requested type,
+        so that reading from the cache agrees exactly with reading the ASCII data,
+        and that columns that were never requested are never parsed.
+        """
+        with open(self.dummy_fname, 'w') as f:
+            f.write('# id  vmax  mvir  upid\n')
+            for i in range(2000):
+                f.write('%i  %.9f  %.3e  %i\n' % (100+i, 0.123456789*i, 10**(9+i/1000.), -1))
+            f.write('2100  1.5  not_a_number  -1\n')
+        cache_dirname = os.path.join(self.tmpdir, 'columnar_cache')
+
+        reader = TabularAsciiReader(self.dummy_fname, {'vmax': (1, 'f4'), 'id': (0, 'i8')})
+        arr = reader.read_ascii(columnar_cache_dirname=cache_dirname)
+        assert np.all(arr == reader.read_ascii())
+
+        reader2 = TabularAsciiReader(self.dummy_fname, {'vmax': (1, 'f8')})
+        arr2 = reader2.read_ascii(columnar_cache_dirname=cache_dirname)
+        assert np.all(arr2 == reader2.read_ascii())
+        assert np.all(reader.read_ascii(columnar_cache_dirname=cache_dirname) == arr)
+
+        reader3 = TabularAsciiReader(self.dummy_fname, {'vmax': (1, 'i8')})
+        with pytest.raises(ValueError):
+            reader3.read_ascii()
+        with pytest.raises(ValueError):
+            reader3.read_ascii(columnar_cache_dirname=cache_dirname)
+        assert np.all(reader2.read_ascii(columnar_cache_dirname=cache_dirname) == arr2)
+
     def tearDown(self):
         try:
             shutil.rmtree(self.tmpdir)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Command-line script to benchmark the `~halotools.sim_manager.TabularAsciiReader`
+on a synthetic Rockstar-style hlist file.
+
+The script writes an ASCII file of the requested size with the same layout
+as the hlist files processed by `~halotools.sim_manager.RockstarHlistReader`:
+a header of lines beginning with '#', followed by rows of whitespace-separated
+integers and floats. The file is then read with the
+`~halotools.sim_manager.TabularAsciiReader.read_ascii` method, keeping
+a subset of the columns and placing a cut on the host halo mass,
+and also with the line-by-line algorithm used by previous versions of Halotools,
+which yields one tuple of strings per row with the
+`~halotools.sim_manager.TabularAsciiReader.data_chunk_generator` method.
+The runtimes of both readers are printed, and the two returned arrays
+are checked to be identical.
+
+For example, to benchmark the reader on a 2 Gb file using 4 processes:
+
+$ python benchmark_ascii_reader.py /tmp/synthetic_hlist.list -size_gb 2 -num_processes 4
+
+The synthetic file is deleted at the end of the benchmark
+unless the -keep flag is set.
+"""
+
+import argparse
+import os
+from time import time
+import numpy as np
+
+from halotools.sim_manager import TabularAsciiReader
+
+num_columns = 60
+columns_to_keep_dict = {'halo_id': (1, 'i8'), 'halo_upid': (6, 'i8'),
+    'halo_mvir': (10, 'f4'), 'halo_rvir': (11, 'f4'), 'halo_rs': (12, 'f4'),
+    'halo_vmax': (16, 'f4'), 'halo_x': (17, 'f4'), 'halo_y': (18, 'f4'),
+    'halo_z': (19, 'f4'), 'halo_vx': (20, 'f4'), 'halo_vy': (21, 'f4'),
+    'halo_vz': (22, 'f4'), 'halo_mpeak': (58, 'f4')}
+row_cut_min_dict = {'halo_mpeak': 1e11}
+
+
+def write_synthetic_hlist(fname, size_gb, num_rows_per_batch=int(1e5), seed=43):
+    """ Write a Rockstar-style hlist file of roughly ``size_gb`` Gigabytes.
+    """
+    integer_columns = (1, 3, 4, 5, 6, 7, 8, 9)
+    fmt = ' '.join('%i' if i in integer_columns else '%.5g' for i in range(num_columns))
+
+    rng = np.random.RandomState(seed)
+    with open(fname, 'w') as f:
+        f.write('#' + ' '.join('col{0}({0})'.format(i) for i in range(num_columns)) + '\n')
+        f.write('#Omega_M = 0.30711; Omega_L = 0.69289; h0 = 0.6777\n')
+        f.write('#Full box size = 250.000000 Mpc/h\n')
+        id_offset = 0
+        while os.path.getsize(fname) < size_gb*1e9:
+            data = rng.uniform(0, 250, (num_rows_per_batch, num_columns))
+            data[:, 1] = np.arange(id_offset, id_offset + num_rows_per_batch)
+            data[:, 6] = np.where(rng.rand(num_rows_per_batch) < 0.8, -1, data[:, 1] + 1)
+            data[:, 10] = 10**rng.uniform(10, 15, num_rows_per_batch)
+            data[:, 58] = data[:, 10]*rng.uniform(1, 1.5, num_rows_per_batch)
+            np.savetxt(f, data, fmt=fmt)
+            f.flush()
+            id_offset += num_rows_per_batch
+
+
+def read_ascii_line_by_line(reader, num_rows_in_chunk=int(1e6)):
+    """ Line-by-line algorithm used by previous versions of
+    `~halotools.sim_manager.TabularAsciiReader.read_ascii`.
+    """
+    chunklist = []
+    num_data_rows = reader.data_len()
+    with reader._compression_safe_file_opener(reader.input_fname, 'r') as f:
+        for _i in range(reader.header_len()):
+            f.readline()
+        while num_data_rows > 0:
+            num_rows = min(num_rows_in_chunk, num_data_rows)
+            chunk_array = np.array(list(
+                reader.data_chunk_generator(num_rows, f)), dtype=reader.dt)
+            chunklist.append(reader.apply_row_cut(chunk_array))
+            num_data_rows -= num_rows
+    return np.concatenate(chunklist)
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("fname", type=str,
+    help="Absolute path to the synthetic hlist file. "
+    "If the file already exists, it will be read without being overwritten.")
+parser.add_argument("-size_gb", type=float, default=2.,
+    help="Size of the synthetic hlist file in Gigabytes. Default is 2.")
+parser.add_argument("-num_processes", type=int, default=1,
+    help="Number of processes used by read_ascii. Default is 1.")
+parser.add_argument("-chunk_memory_size", type=int, default=500,
+    help="Megabytes of ASCII data processed at a time. Default is 500.")
+parser.add_argument("-keep", action='store_true',
+    help="Do not delete the synthetic hlist file at the end of the benchmark.")
+args = parser.parse_args()
+
+file_already_existed = os.path.isfile(args.fname)
+if not file_already_existed:
+    print("\n...Writing {0:.1f} Gb synthetic hlist file to {1}\n".format(args.size_gb, args.fname))
+    write_synthetic_hlist(args.fname, args.size_gb)
+
+try:
+    reader = TabularAsciiReader(args.fname, columns_to_keep_dict,
+        row_cut_min_dict=row_cut_min_dict)
+
+    start = time()
+    result = reader.read_ascii(chunk_memory_size=args.chunk_memory_size,
+        num_processes=args.num_processes)
+    runtime = time() - start
+
+    start = time()
+    reference_result = read_ascii_line_by_line(reader)
+    reference_runtime = time() - start
+
+    assert np.all(result == reference_result)
+
+    file_size_gb = os.path.getsize(args.fname)/1e9
+    print("\nFile size = {0:.2f} Gb; number of rows passing the cut = {1}".format(
+        file_size_gb, len(result)))
+    print("read_ascii with num_processes = {0}: {1:.1f} seconds".format(
+        args.num_processes, runtime))
+    print("line-by-line reader: {0:.1f} seconds".format(reference_runtime))
+    print("speedup = {0:.1f}\n".format(reference_runtime/runtime))
+finally:
+    if (not args.keep) & (not file_already_existed):
+        os.remove(args.fname)